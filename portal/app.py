@@ -1,7 +1,8 @@
 # portal/app.py 
 from flask import (
     Flask, jsonify, render_template, abort, request, redirect, url_for,
-    session, send_from_directory, flash, make_response, send_file, g     # ← added g (Day 84)
+    session, send_from_directory, flash, make_response, send_file, g,    # ← added g (Day 84)
+    Response, stream_with_context,                                       # Day 155: streamed exports
 )
 
 # --- Standard libs & typing ---
@@ -13,6 +14,7 @@ import os
 import threading
 import json
 import shutil
+import tempfile
 from datetime import datetime
 from typing import Optional, Iterable, Tuple, List, Dict, Any
 import hashlib  # <-- added for cat_hue filter
@@ -27,6 +29,11 @@ if str(ROOT) not in sys.path:
     sys.path.append(str(ROOT))
 
 from storage import import_jobs as import_jobs_store  # <-- NEW: structured import helpers
+from storage import db_pool
+from storage import export_cache
+from storage import migrate
+from portal.lazy_imports import lazy_module
+from portal import export_stream
 # segment_document import removed — facade provides layout data; no need for duplicate call
 
 
@@ -38,16 +45,13 @@ def _pdf_to_text(pdf_path: Path) -> str: ...
 # stdlib for exports
 import io
 import csv
+import base64
+import gzip
 import re  # <-- for OCR parsing
 import statistics  # <-- for export metrics (Day 81)
 
-# NEW: optional Excel export dependency
-openpyxl = None  # type: ignore[assignment]
-try:
-    import openpyxl as _openpyxl  # type: ignore[import]
-    openpyxl = _openpyxl  # type: ignore[assignment]
-except Exception:
-    openpyxl = None  # type: ignore[assignment]
+# Optional Excel export dependency: the XLSX routes import openpyxl
+# themselves (Day 151: no longer loaded at app start)
 
 
 # safer filename + big-file error handling
@@ -55,25 +59,42 @@ from werkzeug.utils import secure_filename
 from werkzeug.exceptions import RequestEntityTooLarge
 from werkzeug.security import check_password_hash
 
-# OCR health imports
-import pytesseract
+# Day 151: heavy OCR dependencies (pytesseract, cv2/numpy via the OCR
+# worker and facade) are imported on first use, not at app start; see
+# portal/lazy_imports.py.  Tesseract discovery runs when pytesseract loads.
+def _configure_tesseract(mod) -> None:
+    """Point pytesseract at a tesseract binary (Windows-friendly discovery):
+    1) respect explicit TESSERACT_CMD if it exists, 2) else PATH,
+    3) else common install locations."""
+    if TESSERACT_CMD and Path(TESSERACT_CMD).exists():
+        mod.pytesseract.tesseract_cmd = TESSERACT_CMD
+        return
+    _which = shutil.which("tesseract") or shutil.which("tesseract.exe")
+    if _which:
+        mod.pytesseract.tesseract_cmd = _which
+        return
+    for p in (
+        r"C:\Program Files\Tesseract-OCR\tesseract.exe",
+        r"C:\Program Files (x86)\Tesseract-OCR\tesseract.exe",
+    ):
+        if Path(p).exists():
+            mod.pytesseract.tesseract_cmd = p
+            break
+
 
-# OCR health (single source of truth)
-ocr_health_lib = None  # type: ignore[assignment]
+pytesseract = lazy_module("pytesseract", on_load=_configure_tesseract)
 
-try:
-    from storage.ocr_facade import health as _ocr_health_lib  # type: ignore
-    ocr_health_lib = _ocr_health_lib
-except Exception as e:
-    _ocr_health_import_error = repr(e)
 
-    def _fallback_ocr_health_lib():
+# OCR health (single source of truth)
+def ocr_health_lib():
+    try:
+        from storage.ocr_facade import health as _ocr_health_lib  # type: ignore
+    except Exception as e:
         return {
             "engine": "error",
-            "error": f"ocr_facade health import failed: {_ocr_health_import_error}",
+            "error": f"ocr_facade health import failed: {e!r}",
         }
-
-    ocr_health_lib = _fallback_ocr_health_lib
+    return _ocr_health_lib()
 
 
 
@@ -87,10 +108,8 @@ except Exception:
         return True, ""
 
 
-# ✅ Make sure the OCR worker is imported at app startup
-#    (this triggers the version banner inside ocr_worker.py)
-from portal import ocr_worker
-print("[App] Imported portal.ocr_worker")  # optional confirmation from app.py
+# Legacy OCR worker (cv2 + numpy); Day 151: imported on first use
+ocr_worker = lazy_module("portal.ocr_worker")
 
 
 # ------------------------
@@ -137,26 +156,6 @@ TAXONOMY_SEED = [
     "breakfast", "lunch specials", "dinner specials", "kids menu"
 ]
 
-# Windows-friendly Tesseract discovery:
-# 1) Respect explicit env var if it exists
-# 2) Else use PATH
-# 3) Else try common install locations
-if TESSERACT_CMD and Path(TESSERACT_CMD).exists():
-    pytesseract.pytesseract.tesseract_cmd = TESSERACT_CMD
-else:
-    _which = shutil.which("tesseract") or shutil.which("tesseract.exe")
-    if _which:
-        pytesseract.pytesseract.tesseract_cmd = _which
-    else:
-        _common = [
-            r"C:\Program Files\Tesseract-OCR\tesseract.exe",
-            r"C:\Program Files (x86)\Tesseract-OCR\tesseract.exe",
-        ]
-        for p in _common:
-            if Path(p).exists():
-                pytesseract.pytesseract.tesseract_cmd = p
-                break
-
 # storage layer for drafts (DB-first, Day 12+)
 try:
     from storage import drafts as drafts_store
@@ -174,9 +173,9 @@ except Exception:
 users_store = None  # type: ignore[assignment]
 try:
     from storage import users as users_store
-    users_store._ensure_users_schema()
-    users_store._ensure_restaurant_columns()  # Day 128: cuisine_type, website, updated_at
-    users_store._ensure_tier_column()  # Day 131: account_tier
+    # Day 150: users / restaurant columns (Day 128) / account_tier (Day 131)
+    # are migrate.py steps; this is a version check on a current DB
+    migrate.on_import(DB_PATH, "storage.users")
 except Exception:
     users_store = None  # guarded below
 
@@ -196,45 +195,29 @@ try:
 except Exception:
     ai_price_intel = None
 
-# Day 136: ensure pipeline_stage column exists on import_jobs
-# Day 139: use sqlite3 directly since db_connect isn't defined yet at import time
-def _ensure_import_jobs_columns():
-    """Add missing columns to import_jobs (idempotent)."""
-    try:
-        import sqlite3 as _sq
-        from pathlib import Path as _P
-        _db_path = _P(__file__).resolve().parents[1] / "storage" / "servline.db"
-        if not _db_path.exists():
-            return
-        conn = _sq.connect(str(_db_path))
-        try:
-            cols = {r[1] for r in conn.execute("PRAGMA table_info(import_jobs)").fetchall()}
-            if "pipeline_stage" not in cols:
-                conn.execute("ALTER TABLE import_jobs ADD COLUMN pipeline_stage TEXT")
-                conn.commit()
-                print("[APP] Added pipeline_stage column to import_jobs")
-            # Day 141: store extra page filenames (JSON array) for multi-page menus
-            if "extra_filenames" not in cols:
-                conn.execute("ALTER TABLE import_jobs ADD COLUMN extra_filenames TEXT")
-                conn.commit()
-                print("[APP] Added extra_filenames column to import_jobs")
-        finally:
-            conn.close()
-    except Exception as _e:
-        print(f"[APP] import_jobs column backfill: {_e}")
-
-_ensure_import_jobs_columns()
+
+# Day 153: request-scoped memo for drafts_store.get_draft_items — routes
+# that read a draft's items several times hit the database once.
+@app.before_request
+def _start_item_read_scope():
+    start = getattr(drafts_store, "start_item_read_scope", None)
+    if start is not None:
+        start()
+
+
+@app.teardown_request
+def _end_item_read_scope(_exc=None):
+    end = getattr(drafts_store, "end_item_read_scope", None)
+    if end is not None:
+        end()
+
 
 # OCR engine (Day-21 revamp / One Brain façade)
-try:
+# Day 151: the facade (OCR pipeline, cv2, tesseract) loads on the first
+# OCR run; an import failure surfaces there, where callers already catch it.
+def extract_items_from_path(path):
     from storage.ocr_facade import build_structured_menu
-    extract_items_from_path = build_structured_menu
-    print("[APP] Loaded OCR facade OK")
-except Exception as e:
-    print("[APP] OCR facade failed:", e)
-
-    extract_items_from_path = None
-    _ocr_facade_error = repr(e)
+    return build_structured_menu(path)
 
 # AI OCR Heuristics (Day 20) — removed from pipeline in Day 100.5
 # analyze_ocr_text import removed: heuristic fallback no longer used in pipeline or routes
@@ -541,10 +524,8 @@ def inject_globals():
 # DB helpers (align with schema.sql: status only)
 # ------------------------
 def db_connect():
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA foreign_keys = ON;")
-    return conn
+    # Day 147: pooled per-thread WAL connection (see storage/db_pool.py)
+    return db_pool.connect(DB_PATH)
 
 def create_import_job(filename: str, restaurant_id: Optional[int] = None) -> int:
     with db_connect() as conn:
@@ -1701,24 +1682,34 @@ def _ocr_via_google_vision(img_path: Path) -> str:
     on any error. Requires GOOGLE_CLOUD_API_KEY in environment.
     """
     try:
-        import requests as _requests
-        import base64 as _b64
+        from storage import ai_replay, image_prep
         key = os.environ.get("GOOGLE_CLOUD_API_KEY", "").strip()
-        if not key:
+        if not key and not ai_replay.replaying():
             return ""
-        with open(str(img_path), "rb") as f:
-            img_data = _b64.b64encode(f.read()).decode()
-        resp = _requests.post(
-            f"https://vision.googleapis.com/v1/images:annotate?key={key}",
-            json={
-                "requests": [{
-                    "image": {"content": img_data},
-                    "features": [{"type": "DOCUMENT_TEXT_DETECTION"}]
-                }]
-            },
-            timeout=30,
-        )
-        data = resp.json()
+        # Day 146: upright + under the request cap; small files pass through
+        prepared = image_prep.prepare_image(img_path, image_prep.GOOGLE_VISION_OCR)
+        if prepared:
+            img_bytes = prepared[0].data
+        else:
+            with open(str(img_path), "rb") as f:
+                img_bytes = f.read()
+
+        def _annotate(img_data: str) -> dict:
+            import requests as _requests
+            resp = _requests.post(
+                f"https://vision.googleapis.com/v1/images:annotate?key={key}",
+                json={
+                    "requests": [{
+                        "image": {"content": img_data},
+                        "features": [{"type": "DOCUMENT_TEXT_DETECTION"}]
+                    }]
+                },
+                timeout=30,
+            )
+            return resp.json()
+
+        # Day 145: record/replay-aware (see storage/ai_replay.py)
+        data = ai_replay.vision_annotate(img_bytes, _annotate)
         if "responses" in data and data["responses"]:
             r = data["responses"][0]
             if "error" not in r:
@@ -1920,9 +1911,6 @@ def _build_draft_from_helper(job_id: int, saved_file_path: Path):
     For backward compatibility, we still support the old shape:
       • dict[str, list[items]]  (category_name -> items)
     """
-    if extract_items_from_path is None:
-        raise RuntimeError("ocr_facade not available")
-
     debug_payload = None
     cats_raw = extract_items_from_path(str(saved_file_path)) or {}
 
@@ -2176,6 +2164,11 @@ def _build_draft_from_worker(job_id: int, saved_file_path: Path, worker_obj: Dic
     return draft
 
 
+# Day 142: minimum seconds between items_extracted updates while the
+# detection response streams in (keeps import_jobs writes cheap).
+STREAM_PROGRESS_INTERVAL_S = 1.0
+
+
 def run_ocr_and_make_draft(job_id: int, saved_file_path: Path, *, extra_pages: list = None):
     draft: Any = None
     debug_payload: Any = None
@@ -2221,7 +2214,7 @@ def run_ocr_and_make_draft(job_id: int, saved_file_path: Path, *, extra_pages: l
                 draft = None
 
         # 1) Helper path (typically for PDFs), fallback if image path failed
-        if draft is None and extract_items_from_path is not None:
+        if draft is None:
             try:
                 draft, debug_payload = _build_draft_from_helper(job_id, saved_file_path)
                 if isinstance(draft, dict):
@@ -2375,12 +2368,27 @@ def run_ocr_and_make_draft(job_id: int, saved_file_path: Path, *, extra_pages: l
                 from storage.ai_menu_extract import (
                     detect_menu_elements, elements_to_draft_rows,
                     extract_menu_items_via_claude, claude_items_to_draft_rows,
+                    DraftRowAssembler,
                     EXTENDED_THINKING, PIPELINE_MODE,
                     SKIP_CALL2, SKIP_CALL3,
                 )
                 _thinking_active = EXTENDED_THINKING
                 print(f"[Draft] Pipeline mode: detect+classify+locate (Day 139)")
 
+                # Day 142: assemble rows as items stream out of the detection
+                # call and publish the running count for the progress screen.
+                _assembler = DraftRowAssembler(clean_ocr_text)
+                _streamed: List[Dict[str, Any]] = []
+                _last_progress = [0.0]
+
+                def _on_detected_items(batch):
+                    _streamed.extend(batch)
+                    _assembler.extend(batch)
+                    now = time.monotonic()
+                    if now - _last_progress[0] >= STREAM_PROGRESS_INTERVAL_S:
+                        _last_progress[0] = now
+                        update_import_job(job_id, items_extracted=len(_assembler.draft_rows))
+
                 # New pipeline: detect elements with bounding boxes
                 # Day 139: pass extra pages for multi-file uploads
                 _extra_paths = [str(p) for p in all_pages[1:]] if len(all_pages) > 1 else None
@@ -2388,11 +2396,18 @@ def run_ocr_and_make_draft(job_id: int, saved_file_path: Path, *, extra_pages: l
                     clean_ocr_text, image_path=str(saved_file_path),
                     extra_image_paths=_extra_paths,
                     use_thinking=_thinking_active,
+                    on_items=_on_detected_items,
                 )
 
                 if _detected_elements:
-                    # Code assembly: elements -> structured items + coordinates
-                    items, _coord_data = elements_to_draft_rows(_detected_elements, ocr_text=clean_ocr_text)
+                    # Code assembly: elements -> structured items + coordinates.
+                    # The streamed rows are reused when the stream delivered
+                    # exactly the final item list; otherwise re-assemble.
+                    if _streamed == _detected_elements:
+                        items, _coord_data = _assembler.finish()
+                    else:
+                        items, _coord_data = elements_to_draft_rows(_detected_elements, ocr_text=clean_ocr_text)
+                    update_import_job(job_id, items_extracted=len(items))
                     n_elements = len(_detected_elements)
                     if tracker:
                         tracker.end_step(STEP_CALL1_EXTRACT, items=len(items))
@@ -5239,13 +5254,16 @@ def imports_raw(job_id: int):
 
 
 # ---- NEW: Segmentation preview bridges (JSON) ----
-def _load_debug_for_draft(draft_id: int) -> Dict[str, Any]:
-    """Helper to fetch OCR debug payload saved by worker/helper."""
+def _load_debug_for_draft(draft_id: int, sections: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    """Helper to fetch OCR debug payload saved by worker/helper.
+
+    Day 152: pass `sections` to read only those top-level keys.
+    """
     _require_drafts_storage()
     load_fn = getattr(drafts_store, "load_ocr_debug", None)
     if not load_fn:
         return {}
-    dbg = load_fn(draft_id) or {}
+    dbg = (load_fn(draft_id, sections=sections) if sections is not None else load_fn(draft_id)) or {}
     if not isinstance(dbg, dict):
         return {}
     return dbg
@@ -5260,7 +5278,7 @@ def _load_layout_debug_for_draft(draft_id: int) -> Dict[str, Any]:
       - block_labels
       - geometry_stats
     """
-    dbg = _load_debug_for_draft(draft_id)
+    dbg = _load_debug_for_draft(draft_id, sections=("layout_debug",))
     layout = dbg.get("layout_debug") or {}
     return layout if isinstance(layout, dict) else {}
 
@@ -5275,7 +5293,7 @@ def drafts_blocks(draft_id: int):
       text_blocks:    [ raw text-blocks if available ],
     }
     """
-    dbg = _load_debug_for_draft(draft_id)
+    dbg = _load_debug_for_draft(draft_id, sections=("preview_blocks", "text_blocks", "blocks"))
 
     preview_blocks = dbg.get("preview_blocks") or []
     if not isinstance(preview_blocks, list):
@@ -7022,21 +7040,10 @@ def draft_editor(draft_id: int):
     items = drafts_store.get_draft_items(draft_id, include_modifier_groups=True) or []
 
     # Position backfill (same as wizard route)
-    needs_backfill = [it for it in items if it.get("position") is None]
-    if needs_backfill:
-        max_pos = max((it.get("position") or 0) for it in items) if items else 0
-        try:
-            with db_connect() as conn:
-                for it in needs_backfill:
-                    max_pos += 1
-                    conn.execute(
-                        "UPDATE draft_items SET position=?, updated_at=? WHERE id=? AND draft_id=?",
-                        (max_pos, _now_iso(), it["id"], draft_id),
-                    )
-                    it["position"] = max_pos
-                conn.commit()
-        except Exception:
-            pass
+    try:
+        drafts_store.backfill_item_positions(draft_id, items)
+    except Exception:
+        pass
 
     # Compute per-item quality
     for it in items:
@@ -7304,22 +7311,11 @@ def draft_wizard(draft_id: int):
     items = drafts_store.get_draft_items(draft_id, include_modifier_groups=True) or []
 
     # --- Position backfill: auto-assign positions to items with position=None ---
-    needs_backfill = [it for it in items if it.get("position") is None]
-    if needs_backfill:
-        # Find the highest existing position
-        max_pos = max((it.get("position") or 0) for it in items)
-        try:
-            with db_connect() as conn:
-                for it in needs_backfill:
-                    max_pos += 1
-                    conn.execute(
-                        "UPDATE draft_items SET position=?, updated_at=? WHERE id=? AND draft_id=?",
-                        (max_pos, _now_iso(), it["id"], draft_id),
-                    )
-                    it["position"] = max_pos
-                conn.commit()
-        except Exception:
-            pass  # non-critical
+    # Day 149: one CASE-based UPDATE (see drafts_store.backfill_item_positions)
+    try:
+        drafts_store.backfill_item_positions(draft_id, items)
+    except Exception:
+        pass  # non-critical
 
     # Compute per-item quality (reuse same logic as editor)
     for it in items:
@@ -7689,6 +7685,9 @@ def _run_price_analysis_job(draft_id: int, restaurant_id: int) -> None:
             draft_id=draft_id,
             restaurant_id=restaurant_id,
         )
+        # Day 144: superseded by a rerun — the new run owns the status entry
+        if result and result.get("cancelled"):
+            return
         if result and not result.get("error"):
             # Pre-warm the editor competitor cache so the first render is
             # instant AND fully populated (shells/websites already filled
@@ -7771,7 +7770,16 @@ def draft_analyzing_prices(draft_id: int):
 def api_analyzing_prices_status(draft_id: int):
     """Poll endpoint for the analyzing-prices page."""
     with _PRICE_ANALYSIS_LOCK:
-        job = _PRICE_ANALYSIS_JOBS.get(draft_id) or {"status": "unknown"}
+        job = dict(_PRICE_ANALYSIS_JOBS.get(draft_id) or {"status": "unknown"})
+    # Day 144: ranges are persisted as they land — report how many so far
+    if job.get("status") == "running" and ai_price_intel:
+        try:
+            progress = ai_price_intel.get_price_intelligence_progress(draft_id)
+        except Exception:
+            progress = None
+        if progress:
+            job["items_priced"] = progress["items_priced"]
+            job["total_items"] = progress["total_items"]
     return jsonify(job)
 
 
@@ -7803,6 +7811,10 @@ def rerun_price_analysis(draft_id: int):
     # also clear empty-result cache rows (which have no price_comparison_results
     # rows and would otherwise be invisible to a results-table subquery).
     from storage.users import get_restaurant
+    # Day 144: stop the in-flight run first so it can't write stale
+    # ranges over the rows we're about to wipe.
+    ai_price_intel.cancel_price_analysis(draft_id)
+
     _rest = get_restaurant(int(rid)) or {}
     _zip = (_rest.get("zip_code") or "").strip().split("-", 1)[0]
     _cuisine = (_rest.get("cuisine_type") or "other").strip().lower()
@@ -9106,20 +9118,17 @@ def wizard_bulk_move(draft_id: int):
         return jsonify({"ok": False, "error": "item_ids and target_category required"}), 400
 
     try:
-        now = _now_iso()
-        with db_connect() as conn:
-            for iid in item_ids:
-                conn.execute(
-                    "UPDATE draft_items SET category=?, subcategory=?, updated_at=? WHERE id=? AND draft_id=?",
-                    (target_category, target_subcategory, now, int(iid), draft_id),
-                )
-            conn.commit()
+        moved = drafts_store.bulk_update_items(
+            draft_id,
+            [int(i) for i in item_ids],
+            {"category": target_category, "subcategory": target_subcategory},
+        )
         # Re-initialize wizard categories to pick up the new category
         drafts_store.init_wizard_categories(draft_id)
     except Exception as e:
         return jsonify({"ok": False, "error": str(e)}), 500
 
-    return jsonify({"ok": True, "moved": len(item_ids), "target_category": target_category})
+    return jsonify({"ok": True, "moved": moved, "target_category": target_category})
 
 
 @app.post("/api/drafts/<int:draft_id>/wizard/bulk_delete")
@@ -9888,22 +9897,35 @@ def draft_approve_export(draft_id: int):
         if not draft:
             return jsonify({"ok": False, "error": "Draft not found"}), 404
 
-        items = drafts_store.get_draft_items(draft_id, include_modifier_groups=True) or []
-        warnings = _validate_draft_for_export(items)
-        # Count all modifiers: grouped (in modifier_groups[].modifiers[]) + ungrouped
-        variant_count = sum(
-            sum(len(grp.get("modifiers") or []) for grp in (it.get("modifier_groups") or []))
-            + len(it.get("ungrouped_variants") or it.get("variants") or [])
-            for it in items
-        )
+        # Day 156: the validation report and POS payload come from the
+        # export cache while the draft's items are unchanged
+        entry = _export_cache_entry(draft_id, "approve")
+        report = export_cache.get_json(entry)
+        items = None
+        if report is None:
+            items = drafts_store.get_draft_items(draft_id, include_modifier_groups=True) or []
+            report = {
+                "item_count": len(items),
+                # Count all modifiers: grouped (in modifier_groups[].modifiers[]) + ungrouped
+                "variant_count": sum(
+                    sum(len(grp.get("modifiers") or []) for grp in (it.get("modifier_groups") or []))
+                    + len(it.get("ungrouped_variants") or it.get("variants") or [])
+                    for it in items
+                ),
+                "warnings": _validate_draft_for_export(items),
+            }
+            export_cache.put_json(entry, report)
+        item_count = report["item_count"]
+        variant_count = report["variant_count"]
+        warnings = report["warnings"]
 
-        pos_json = _build_generic_pos_json(items, draft)
+        pos_json = json.loads(_stamp_exported_at(_pos_json_text(draft_id, draft, items)))
 
         drafts_store.approve_draft(draft_id)
 
         drafts_store.record_export(
             draft_id, "generic_pos",
-            item_count=len(items),
+            item_count=item_count,
             variant_count=variant_count,
             warning_count=len(warnings),
         )
@@ -9916,7 +9938,7 @@ def draft_approve_export(draft_id: int):
                 "event": "draft.approved",
                 "draft_id": draft_id,
                 "title": (draft or {}).get("title", ""),
-                "item_count": len(items),
+                "item_count": item_count,
                 "variant_count": variant_count,
                 "warning_count": len(warnings),
                 "approved_at": approved_ts,
@@ -9928,7 +9950,7 @@ def draft_approve_export(draft_id: int):
                 "event": "draft.exported",
                 "draft_id": draft_id,
                 "format": "generic_pos",
-                "item_count": len(items),
+                "item_count": item_count,
                 "variant_count": variant_count,
                 "exported_at": approved_ts,
             })
@@ -9938,7 +9960,7 @@ def draft_approve_export(draft_id: int):
         return jsonify({
             "ok": True,
             "pos_json": pos_json,
-            "item_count": len(items),
+            "item_count": item_count,
             "variant_count": variant_count,
             "warnings": warnings,
             "warning_count": len(warnings),
@@ -9964,20 +9986,156 @@ def draft_export_history(draft_id: int):
 # Day 84: REST API Endpoints for External POS Integrations
 # ============================================================
 
+# Day 154: paging, projection and conditional GET for polling POS clients
+API_ITEMS_DEFAULT_PAGE = 100
+API_GZIP_MIN_BYTES = 1024
+_API_ITEM_FIELDS = frozenset((
+    "id", "draft_id", "name", "description", "price_cents", "category",
+    "subcategory", "position", "confidence", "kitchen_name",
+    "created_at", "updated_at", "variants",
+))
+
+
+def _encode_item_cursor(key: Tuple[int, int]) -> str:
+    raw = f"{int(key[0])}:{int(key[1])}".encode("ascii")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_item_cursor(cursor: str) -> Tuple[int, int]:
+    """Inverse of _encode_item_cursor; ValueError on anything malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("ascii")
+        pos, item_id = raw.split(":")
+        return int(pos), int(item_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def _parse_item_fields(raw: Optional[str]) -> Optional[List[str]]:
+    if not raw:
+        return None
+    fields = sorted({f.strip() for f in raw.split(",") if f.strip()} | {"id"})
+    unknown = [f for f in fields if f not in _API_ITEM_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(unknown)}")
+    return fields
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison (RFC 9110 If-None-Match); ignores our -gz suffix."""
+    if not if_none_match:
+        return False
+    want = etag.strip('"')
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*":
+            return True
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        tag = tag.strip('"')
+        if tag.endswith("-gz"):
+            tag = tag[:-3]
+        if tag == want:
+            return True
+    return False
+
+
+def _not_modified(etag: str):
+    resp = make_response("", 304)
+    resp.headers["ETag"] = etag
+    resp.headers["Cache-Control"] = "private, no-cache"
+    resp.headers["Vary"] = "Accept-Encoding"
+    return resp
+
+
+def _gzip_api_response(resp):
+    """Gzip a JSON response above API_GZIP_MIN_BYTES if the client accepts it."""
+    resp.headers["Vary"] = "Accept-Encoding"
+    if not request.accept_encodings["gzip"]:
+        return resp
+    data = resp.get_data()
+    if len(data) < API_GZIP_MIN_BYTES:
+        return resp
+    resp.set_data(gzip.compress(data, compresslevel=6))
+    resp.headers["Content-Encoding"] = "gzip"
+    etag = resp.headers.get("ETag")
+    if etag:
+        # a strong ETag names one representation; the gzip body is another
+        resp.headers["ETag"] = etag[:-1] + '-gz"'
+    return resp
+
+
 @app.get("/api/drafts/<int:draft_id>/items")
 @api_key_required
 def api_get_draft_items(draft_id: int):
-    """REST API: Retrieve draft items with variants."""
+    """
+    REST API: Retrieve draft items with variants.
+
+    Day 154 query params (all optional; none returns the full list as before):
+      limit   page size, 1..500; the response carries next_cursor
+      cursor  next_cursor from the previous page
+      fields  comma-separated item keys to return (id is always included)
+
+    Every 200 carries a strong ETag built from the draft's item revision;
+    a matching If-None-Match gets 304 before the item tables are read.
+    """
     draft = drafts_store.get_draft(draft_id)
     if not draft:
         return jsonify({"ok": False, "error": "Draft not found"}), 404
-    items = drafts_store.get_draft_items(draft_id, include_variants=True) or []
-    return jsonify({
+
+    limit_raw = request.args.get("limit")
+    cursor = request.args.get("cursor") or None
+    paged = limit_raw is not None or cursor is not None
+    try:
+        limit = int(limit_raw) if limit_raw not in (None, "") else API_ITEMS_DEFAULT_PAGE
+        if paged and not 1 <= limit <= drafts_store.ITEM_PAGE_MAX:
+            raise ValueError(f"limit must be 1..{drafts_store.ITEM_PAGE_MAX}")
+        after = _decode_item_cursor(cursor) if cursor else None
+        fields = _parse_item_fields(request.args.get("fields"))
+    except ValueError as e:
+        return jsonify({"ok": False, "error": str(e)}), 400
+
+    etag = None
+    rev = drafts_store.get_draft_revision(draft_id)
+    if rev is not None:
+        shape = f"{limit if paged else ''}|{cursor or ''}|{','.join(fields or ())}"
+        etag = '"items-%d-%x-%s"' % (
+            draft_id, rev & 0xFFFFFFFFFFFFFFFF,
+            hashlib.sha1(shape.encode("utf-8")).hexdigest()[:12],
+        )
+        if _etag_matches(request.headers.get("If-None-Match"), etag):
+            return _not_modified(etag)
+
+    with_variants = fields is None or "variants" in fields
+    next_cursor = None
+    if paged:
+        items, next_key = drafts_store.get_draft_items_page(
+            draft_id, limit=limit, after=after, include_variants=with_variants)
+        next_cursor = _encode_item_cursor(next_key) if next_key else None
+    else:
+        items = drafts_store.get_draft_items(draft_id, include_variants=with_variants) or []
+    if fields is not None:
+        items = [{k: it.get(k) for k in fields} for it in items]
+
+    payload = {
         "ok": True,
         "draft_id": draft_id,
         "items": items,
         "count": len(items),
-    })
+    }
+    if paged:
+        payload["limit"] = limit
+        payload["next_cursor"] = next_cursor
+    resp = jsonify(payload)
+
+    if etag is None:
+        # draft not written since revisions existed: fall back to a body hash
+        etag = '"items-%d-b%s"' % (draft_id, hashlib.sha1(resp.get_data()).hexdigest()[:20])
+        if _etag_matches(request.headers.get("If-None-Match"), etag):
+            return _not_modified(etag)
+    resp.headers["ETag"] = etag
+    resp.headers["Cache-Control"] = "private, no-cache"
+    return _gzip_api_response(resp)
 
 
 @app.post("/api/drafts/<int:draft_id>/items")
@@ -10219,8 +10377,8 @@ def draft_ocr_debug_csv(draft_id: int):
     load_fn = getattr(drafts_store, "load_ocr_debug", None)
     if load_fn is None:
         return make_response("OCR debug storage not available", 404)
-    dbg = load_fn(draft_id)
-    if not dbg:
+    dbg = load_fn(draft_id, sections=("items", "assignments"))
+    if dbg is None:
         return make_response("No OCR debug payload found for this draft", 404)
 
     rows = []
@@ -10280,7 +10438,8 @@ def draft_layout_debug_json(draft_id: int):
 
     if not layout:
         # Back-compat fallback: older keys may have been stored at root
-        dbg = _load_debug_for_draft(draft_id) or {}
+        dbg = _load_debug_for_draft(
+            draft_id, sections=("layout_debug", "layout", "debug_layout", "blocks_layout")) or {}
         if not isinstance(dbg, dict):
             dbg = {}
 
@@ -10338,29 +10497,85 @@ def ocr_layout_debug_alias(job_id: int):
 
 
 # Exporters
+# Day 155: the CSV / JSON exporters stream.  Items come from
+# drafts_store.iter_draft_items() one keyset page at a time and rows go
+# out through portal/export_stream.py as they are built, so a large draft
+# never sits in memory as an item list + row buffer + encoded body.
+def _stream_download(chunks, content_type: str, filename: str):
+    resp = Response(stream_with_context(chunks))
+    resp.headers["Content-Type"] = content_type
+    resp.headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return resp
+
+
+def _csv_download(header, rows, filename: str):
+    return _stream_download(export_stream.csv_stream(header, rows),
+                            "text/csv; charset=utf-8", filename)
+
+
+# Day 156: built export artifacts and reports are cached on disk, keyed by
+# the draft's item revision (storage/export_cache.py).  Bump
+# EXPORT_CACHE_VERSION whenever an exporter's output changes.
+EXPORT_CACHE_VERSION = 1
+# exported_at is stamped per request, not cached: artifacts carry this
+# marker in its place
+_EXPORTED_AT_MARK = "__servline_exported_at__"
+
+
+def _export_cache_entry(draft_id: int, fmt: str, extra=None):
+    """Cache file for one of a draft's export artifacts (None = don't cache)."""
+    try:
+        rev = drafts_store.get_draft_revision(draft_id)
+    except Exception:
+        rev = None
+    return export_cache.entry_path(drafts_store.DB_PATH, draft_id, fmt, rev,
+                                   EXPORT_CACHE_VERSION, extra)
+
+
+def _cached_file_response(entry, content_type: str, filename: str):
+    """Download response for a cached artifact, or None on a miss."""
+    fh = export_cache.open_artifact(entry)
+    if fh is None:
+        return None
+    resp = _stream_download(export_stream.file_chunks(fh), content_type, filename)
+    resp.headers["Content-Length"] = str(os.fstat(fh.fileno()).st_size)
+    return resp
+
+
+def _cached_download(entry, build_chunks, content_type: str, filename: str):
+    """Serve a cached artifact, or stream a fresh build into the cache."""
+    cached = _cached_file_response(entry, content_type, filename)
+    if cached is not None:
+        return cached
+    return _stream_download(export_cache.tee(entry, build_chunks()), content_type, filename)
+
+
+def _stamp_exported_at(text: str) -> str:
+    """Put the current time where a cached artifact has _EXPORTED_AT_MARK."""
+    at = text.rfind(_EXPORTED_AT_MARK)
+    if at < 0:
+        return text
+    return text[:at] + _now_iso() + text[at + len(_EXPORTED_AT_MARK):]
+
+
 @app.get("/drafts/<int:draft_id>/export.csv")
 @login_required
 def draft_export_csv(draft_id: int):
     _require_drafts_storage()
-    draft = drafts_store.get_draft(draft_id) or {}
-    items = drafts_store.get_draft_items(draft_id) or []
-    buf = io.StringIO()
-    writer = csv.DictWriter(buf, fieldnames=["id", "name", "description", "price_cents", "category", "position"])
-    writer.writeheader()
-    for it in items:
-        writer.writerow({
-            "id": it.get("id"),
-            "name": it.get("name", ""),
-            "description": it.get("description", ""),
-            "price_cents": it.get("price_cents", 0),
-            "category": it.get("category") or "",
-            "position": it.get("position") if it.get("position") is not None else ""
-        })
-    csv_data = buf.getvalue().encode("utf-8-sig")
-    resp = make_response(csv_data)
-    resp.headers["Content-Type"] = "text/csv; charset=utf-8"
-    resp.headers["Content-Disposition"] = f'attachment; filename="draft_{draft_id}.csv"'
-    return resp
+
+    def rows():
+        for it in drafts_store.iter_draft_items(draft_id):
+            yield [
+                it.get("id"),
+                it.get("name", ""),
+                it.get("description", ""),
+                it.get("price_cents", 0),
+                it.get("category") or "",
+                it.get("position") if it.get("position") is not None else "",
+            ]
+
+    return _csv_download(["id", "name", "description", "price_cents", "category", "position"],
+                         rows(), f"draft_{draft_id}.csv")
 
 @app.get("/drafts/<int:draft_id>/export_variants.csv")
 @login_required
@@ -10372,52 +10587,63 @@ def draft_export_csv_variants(draft_id: int):
     plain variant rows for backward compatibility.
     """
     _require_drafts_storage()
-    items = drafts_store.get_draft_items(draft_id, include_variants=True,
-                                          include_modifier_groups=True) or []
-    buf = io.StringIO()
-    writer = csv.writer(buf)
-    writer.writerow(["type", "id", "name", "description", "price_cents",
-                      "category", "kind", "label", "group_name", "required"])
-    for it in items:
-        writer.writerow([
-            "item",
-            it.get("id", ""),
-            it.get("name", ""),
-            it.get("description", ""),
-            it.get("price_cents", 0),
-            it.get("category") or "",
-            "", "", "", "",
-        ])
 
-        # POS-native modifier groups → group header + modifier rows
-        for grp in (it.get("modifier_groups") or []):
-            grp_name = grp.get("name", "Option")
-            required = "Y" if grp.get("required") else "N"
-            writer.writerow([
-                "modifier_group", "", "", "", "",
-                "", "", "", grp_name, required,
-            ])
-            for mod in (grp.get("modifiers") or []):
-                writer.writerow([
-                    "modifier", "", "", "",
-                    mod.get("price_cents", 0),
-                    "", mod.get("kind", "size"), mod.get("label", ""),
-                    grp_name, "",
-                ])
-
-        # Ungrouped variants (backward compat)
-        for v in (it.get("ungrouped_variants") or it.get("variants") or []):
-            writer.writerow([
-                "variant", "", "", "",
-                v.get("price_cents", 0),
-                "", v.get("kind", "size"), v.get("label", ""),
-                "", "",
-            ])
-    csv_data = buf.getvalue().encode("utf-8-sig")
-    resp = make_response(csv_data)
-    resp.headers["Content-Type"] = "text/csv; charset=utf-8"
-    resp.headers["Content-Disposition"] = f'attachment; filename="draft_{draft_id}_variants.csv"'
-    return resp
+    def rows():
+        for it in drafts_store.iter_draft_items(draft_id, include_modifier_groups=True):
+            yield [
+                "item",
+                it.get("id", ""),
+                it.get("name", ""),
+                it.get("description", ""),
+                it.get("price_cents", 0),
+                it.get("category") or "",
+                "", "", "", "",
+            ]
+
+            # POS-native modifier groups → group header + modifier rows
+            for grp in (it.get("modifier_groups") or []):
+                grp_name = grp.get("name", "Option")
+                required = "Y" if grp.get("required") else "N"
+                yield [
+                    "modifier_group", "", "", "", "",
+                    "", "", "", grp_name, required,
+                ]
+                for mod in (grp.get("modifiers") or []):
+                    yield [
+                        "modifier", "", "", "",
+                        mod.get("price_cents", 0),
+                        "", mod.get("kind", "size"), mod.get("label", ""),
+                        grp_name, "",
+                    ]
+
+            # Ungrouped variants (backward compat)
+            for v in (it.get("ungrouped_variants") or it.get("variants") or []):
+                yield [
+                    "variant", "", "", "",
+                    v.get("price_cents", 0),
+                    "", v.get("kind", "size"), v.get("label", ""),
+                    "", "",
+                ]
+
+    return _csv_download(["type", "id", "name", "description", "price_cents",
+                          "category", "kind", "label", "group_name", "required"],
+                         rows(), f"draft_{draft_id}_variants.csv")
+
+
+def _wide_price_map(it) -> dict:
+    """Column label -> price for one item of the wide CSV export."""
+    vpmap: dict = {}
+    # Modifier group modifiers → "GroupName:Label"
+    for grp in (it.get("modifier_groups") or []):
+        grp_name = grp.get("name", "Option")
+        for mod in (grp.get("modifiers") or []):
+            vpmap[f"{grp_name}:{mod.get('label', '')}"] = mod.get("price_cents", 0)
+    # Ungrouped variants → plain label (backward compat)
+    for v in (it.get("ungrouped_variants") or it.get("variants") or []):
+        lbl = (v.get("label") or "").strip()
+        if lbl:
+            vpmap[lbl] = v.get("price_cents", 0)
+    return vpmap
 
 
 @app.get("/drafts/<int:draft_id>/export_wide.csv")
@@ -10430,62 +10656,89 @@ def draft_export_csv_wide(draft_id: int):
     label directly (backward compat).
     """
     _require_drafts_storage()
-    items = drafts_store.get_draft_items(draft_id, include_variants=True,
-                                          include_modifier_groups=True) or []
 
-    # Collect all unique column labels across items (in first-appearance order)
-    seen_labels: dict = {}  # label -> insertion order
-
-    for it in items:
-        # Modifier group modifiers → "GroupName:Label"
-        for grp in (it.get("modifier_groups") or []):
-            grp_name = grp.get("name", "Option")
-            for mod in (grp.get("modifiers") or []):
-                col = f"{grp_name}:{mod.get('label', '')}"
-                if col not in seen_labels:
-                    seen_labels[col] = len(seen_labels)
-        # Ungrouped variants → plain label (backward compat)
-        for v in (it.get("ungrouped_variants") or it.get("variants") or []):
-            lbl = (v.get("label") or "").strip()
-            if lbl and lbl not in seen_labels:
-                seen_labels[lbl] = len(seen_labels)
-
-    label_order = sorted(seen_labels.keys(), key=lambda x: seen_labels[x])
+    # The header needs every label, so the items are read twice: one pass
+    # for the columns (in first-appearance order), one for the rows.  Both
+    # passes share one read snapshot, so a write in between cannot add a
+    # label the header lacks; it is opened once the body starts streaming.
+    def body():
+        with drafts_store.read_snapshot() as conn:
+            label_order: list = []
+            seen_labels: set = set()
+            for it in drafts_store.iter_draft_items(
+                    draft_id, include_modifier_groups=True, conn=conn):
+                for col in _wide_price_map(it):
+                    if col not in seen_labels:
+                        seen_labels.add(col)
+                        label_order.append(col)
+
+            def rows():
+                for it in drafts_store.iter_draft_items(
+                        draft_id, include_modifier_groups=True, conn=conn):
+                    vpmap = _wide_price_map(it)
+                    yield [
+                        it.get("id", ""),
+                        it.get("name", ""),
+                        it.get("description", ""),
+                        it.get("price_cents", 0),
+                        it.get("category") or "",
+                    ] + [vpmap.get(lbl, "") for lbl in label_order]
+
+            base_headers = ["id", "name", "description", "price_cents", "category"]
+            yield from export_stream.csv_stream(
+                base_headers + [f"price_{lbl}" for lbl in label_order], rows())
+
+    return _stream_download(body(), "text/csv; charset=utf-8", f"draft_{draft_id}_wide.csv")
+
+
+def _export_json_item(it) -> dict:
+    """One item of export.json: nested variants + modifier_groups."""
+    eitem = {
+        "id": it.get("id"),
+        "name": it.get("name", ""),
+        "description": it.get("description", ""),
+        "price_cents": it.get("price_cents", 0),
+        "category": it.get("category") or "",
+        "position": it.get("position"),
+    }
 
-    buf = io.StringIO()
-    writer = csv.writer(buf)
-    base_headers = ["id", "name", "description", "price_cents", "category"]
-    writer.writerow(base_headers + [f"price_{lbl}" for lbl in label_order])
+    # Modifier groups (POS-native)
+    modifier_groups = it.get("modifier_groups") or []
+    if modifier_groups:
+        eitem["modifier_groups"] = [
+            {
+                "name": grp.get("name", ""),
+                "required": bool(grp.get("required")),
+                "min_select": grp.get("min_select") or 0,
+                "max_select": grp.get("max_select") or 0,
+                "modifiers": [
+                    {
+                        "label": mod.get("label", ""),
+                        "price_cents": mod.get("price_cents", 0),
+                        "kind": mod.get("kind", "size"),
+                    }
+                    for mod in (grp.get("modifiers") or [])
+                ],
+            }
+            for grp in modifier_groups
+        ]
+    else:
+        eitem["modifier_groups"] = []
 
-    for it in items:
-        row = [
-            it.get("id", ""),
-            it.get("name", ""),
-            it.get("description", ""),
-            it.get("price_cents", 0),
-            it.get("category") or "",
+    # Ungrouped variants (backward compat)
+    ungrouped = it.get("ungrouped_variants") or it.get("variants") or []
+    if ungrouped:
+        eitem["variants"] = [
+            {
+                "label": v.get("label", ""),
+                "price_cents": v.get("price_cents", 0),
+                "kind": v.get("kind", "size"),
+            }
+            for v in ungrouped
         ]
-        # Build label -> price mapping
-        vpmap: dict = {}
-        for grp in (it.get("modifier_groups") or []):
-            grp_name = grp.get("name", "Option")
-            for mod in (grp.get("modifiers") or []):
-                col = f"{grp_name}:{mod.get('label', '')}"
-                vpmap[col] = mod.get("price_cents", 0)
-        for v in (it.get("ungrouped_variants") or it.get("variants") or []):
-            lbl = (v.get("label") or "").strip()
-            if lbl:
-                vpmap[lbl] = v.get("price_cents", 0)
-        # Append price columns
-        for lbl in label_order:
-            row.append(vpmap.get(lbl, ""))
-        writer.writerow(row)
-
-    csv_data = buf.getvalue().encode("utf-8-sig")
-    resp = make_response(csv_data)
-    resp.headers["Content-Type"] = "text/csv; charset=utf-8"
-    resp.headers["Content-Disposition"] = f'attachment; filename="draft_{draft_id}_wide.csv"'
-    return resp
+    else:
+        eitem["variants"] = []
+    return eitem
 
 
 @app.get("/drafts/<int:draft_id>/export.json")
@@ -10493,77 +10746,96 @@ def draft_export_csv_wide(draft_id: int):
 def draft_export_json(draft_id: int):
     _require_drafts_storage()
     draft = drafts_store.get_draft(draft_id) or {}
-    items = drafts_store.get_draft_items(draft_id, include_variants=True,
-                                          include_modifier_groups=True) or []
-
-    # Clean items for export: include nested variants + modifier_groups
-    export_items = []
-    for it in items:
-        eitem = {
-            "id": it.get("id"),
-            "name": it.get("name", ""),
-            "description": it.get("description", ""),
-            "price_cents": it.get("price_cents", 0),
-            "category": it.get("category") or "",
-            "position": it.get("position"),
-        }
-
-        # Modifier groups (POS-native)
-        modifier_groups = it.get("modifier_groups") or []
-        if modifier_groups:
-            eitem["modifier_groups"] = [
-                {
-                    "name": grp.get("name", ""),
-                    "required": bool(grp.get("required")),
-                    "min_select": grp.get("min_select") or 0,
-                    "max_select": grp.get("max_select") or 0,
-                    "modifiers": [
-                        {
-                            "label": mod.get("label", ""),
-                            "price_cents": mod.get("price_cents", 0),
-                            "kind": mod.get("kind", "size"),
-                        }
-                        for mod in (grp.get("modifiers") or [])
-                    ],
-                }
-                for grp in modifier_groups
-            ]
-        else:
-            eitem["modifier_groups"] = []
-
-        # Ungrouped variants (backward compat)
-        ungrouped = it.get("ungrouped_variants") or it.get("variants") or []
-        if ungrouped:
-            eitem["variants"] = [
-                {
-                    "label": v.get("label", ""),
-                    "price_cents": v.get("price_cents", 0),
-                    "kind": v.get("kind", "size"),
-                }
-                for v in ungrouped
-            ]
-        else:
-            eitem["variants"] = []
-        export_items.append(eitem)
 
     payload = {
         "draft_id": draft_id,
         "title": draft.get("title"),
         "restaurant_id": draft.get("restaurant_id"),
         "status": draft.get("status"),
-        "items": export_items,
+        "items": None,  # streamed below
         "exported_at": _now_iso(),
     }
-
-    resp = make_response(json.dumps(payload, indent=2))
-    resp.headers["Content-Type"] = "application/json; charset=utf-8"
-    resp.headers["Content-Disposition"] = f'attachment; filename="draft_{draft_id}.json"'
-    return resp
+    items = (_export_json_item(it)
+             for it in drafts_store.iter_draft_items(draft_id, include_modifier_groups=True))
+    return _stream_download(export_stream.json_stream(payload, "items", items),
+                            "application/json; charset=utf-8", f"draft_{draft_id}.json")
 
 
 # ---------------------------------------------------------------------------
 # XLSX shared helper (Day 125)
 # ---------------------------------------------------------------------------
+# Day 155: rows are appended as pre-styled cells, which is the only way to
+# style a write-only worksheet; the exporters build Workbook(write_only=True)
+# so openpyxl spools rows to disk instead of keeping a cell object per value.
+
+def _xlsx_styles() -> dict:
+    from openpyxl.styles import Font, PatternFill  # type: ignore[import]
+    return {
+        "header": (Font(bold=True, color="FFFFFF"),
+                   PatternFill(start_color="1a2236", end_color="1a2236", fill_type="solid")),
+        "parent": (Font(bold=True), None),
+        "group": (Font(bold=True, color="1a5276"),
+                  PatternFill(start_color="D6EAF8", end_color="D6EAF8", fill_type="solid")),
+        "modifier": (Font(color="666666"),
+                     PatternFill(start_color="F2F2F2", end_color="F2F2F2", fill_type="solid")),
+    }
+
+
+def _xlsx_append(ws, values, style) -> None:
+    from openpyxl.cell import WriteOnlyCell  # type: ignore[import]
+    font, fill = style
+    row = []
+    for value in values:
+        cell = WriteOnlyCell(ws, value=value)
+        cell.font = font
+        if fill is not None:
+            cell.fill = fill
+        row.append(cell)
+    ws.append(row)
+
+
+def _xlsx_begin_sheet(ws, xl, styles, *, include_category: bool = True) -> None:
+    """Column widths + header row; must come before any data row."""
+    if include_category:
+        headers = ["name", "description", "price_cents", "category", "group_name", "required"]
+    else:
+        headers = ["name", "description", "price_cents", "group_name", "required"]
+    for ci in range(1, len(headers) + 1):
+        ws.column_dimensions[xl.utils.get_column_letter(ci)].width = 18
+    _xlsx_append(ws, headers, styles["header"])
+
+
+def _xlsx_append_item(ws, it, styles, *, include_category: bool = True) -> None:
+    """Item row + modifier group / modifier / ungrouped variant sub-rows."""
+    mod_groups = it.get("modifier_groups") or []
+    ungrouped = it.get("ungrouped_variants") or []
+    # Fallback: if fetched with include_variants=True (no modifier_groups key)
+    if not mod_groups and not ungrouped and "variants" in it:
+        ungrouped = it.get("variants") or []
+
+    def cat(value):
+        return [value] if include_category else []
+
+    # Item row
+    _xlsx_append(ws, [it.get("name", ""), it.get("description", ""), it.get("price_cents", 0)]
+                 + cat(it.get("category") or "") + ["", ""], styles["parent"])
+
+    # Modifier group header + modifier rows
+    for grp in mod_groups:
+        grp_name = grp.get("name") or "(unnamed)"
+        required = "Y" if grp.get("required") else "N"
+        _xlsx_append(ws, ["", "", ""] + cat("") + [grp_name, required], styles["group"])
+        for mod in (grp.get("modifiers") or []):
+            _xlsx_append(ws, ["    " + (mod.get("label") or ""), mod.get("kind", "size"),
+                              mod.get("price_cents", 0)] + cat("") + [grp_name, ""],
+                         styles["modifier"])
+
+    # Ungrouped variant sub-rows
+    for v in ungrouped:
+        _xlsx_append(ws, ["  " + (v.get("label") or ""), v.get("kind", "size"),
+                          v.get("price_cents", 0)] + cat("") + ["", ""],
+                     styles["modifier"])
+
 
 def _xlsx_write_sheet(ws, items, xl, *, include_category: bool = True):
     """Write items with modifier group headers + modifier/variant sub-rows to a worksheet.
@@ -10574,130 +10846,37 @@ def _xlsx_write_sheet(ws, items, xl, *, include_category: bool = True):
       - Modifier group row: bold text on light blue bg (#D6EAF8), shows group name + required
       - Modifier row: gray text on light gray bg (#F2F2F2), indented with "    "
       - Ungrouped variant row: gray text on light gray bg (#F2F2F2), indented with "  "
+
+    Works on regular and write-only worksheets.
     """
-    from openpyxl.styles import Font, PatternFill  # type: ignore[import]
+    styles = _xlsx_styles()
+    _xlsx_begin_sheet(ws, xl, styles, include_category=include_category)
+    for it in items:
+        _xlsx_append_item(ws, it, styles, include_category=include_category)
 
-    # -- Styles --
-    header_font = Font(bold=True, color="FFFFFF")
-    header_fill = PatternFill(start_color="1a2236", end_color="1a2236", fill_type="solid")
-    parent_font = Font(bold=True)
-    group_font = Font(bold=True, color="1a5276")
-    group_fill = PatternFill(start_color="D6EAF8", end_color="D6EAF8", fill_type="solid")
-    modifier_font = Font(color="666666")
-    modifier_fill = PatternFill(start_color="F2F2F2", end_color="F2F2F2", fill_type="solid")
 
-    # -- Headers --
-    if include_category:
-        headers = ["name", "description", "price_cents", "category", "group_name", "required"]
-    else:
-        headers = ["name", "description", "price_cents", "group_name", "required"]
+_XLSX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
 
-    ws.append(headers)
-    for ci in range(1, len(headers) + 1):
-        cell = ws.cell(row=1, column=ci)
-        cell.font = header_font
-        cell.fill = header_fill
 
-    # -- Data rows --
-    for it in items:
-        mod_groups = it.get("modifier_groups") or []
-        ungrouped = it.get("ungrouped_variants") or []
-        # Fallback: if fetched with include_variants=True (no modifier_groups key)
-        if not mod_groups and not ungrouped and "variants" in it:
-            ungrouped = it.get("variants") or []
-
-        # Item row
-        if include_category:
-            row_data = [
-                it.get("name", ""),
-                it.get("description", ""),
-                it.get("price_cents", 0),
-                it.get("category") or "",
-                "",  # group_name
-                "",  # required
-            ]
-        else:
-            row_data = [
-                it.get("name", ""),
-                it.get("description", ""),
-                it.get("price_cents", 0),
-                "",  # group_name
-                "",  # required
-            ]
-        ws.append(row_data)
-        row_num = ws.max_row
-        for ci in range(1, len(headers) + 1):
-            ws.cell(row=row_num, column=ci).font = parent_font
+def _xlsx_download(wb, filename: str, entry=None):
+    """Save a (write-only) workbook to a temp file and stream it back
+    (into the export cache too, when *entry* is given).
 
-        # Modifier group header + modifier rows
-        for grp in mod_groups:
-            grp_name = grp.get("name") or "(unnamed)"
-            required = "Y" if grp.get("required") else "N"
-            if include_category:
-                grp_row = ["", "", "", "", grp_name, required]
-            else:
-                grp_row = ["", "", "", grp_name, required]
-            ws.append(grp_row)
-            grow_num = ws.max_row
-            for ci in range(1, len(headers) + 1):
-                cell = ws.cell(row=grow_num, column=ci)
-                cell.font = group_font
-                cell.fill = group_fill
-
-            for mod in (grp.get("modifiers") or []):
-                if include_category:
-                    mrow = [
-                        "    " + (mod.get("label") or ""),
-                        mod.get("kind", "size"),
-                        mod.get("price_cents", 0),
-                        "",  # category
-                        grp_name,
-                        "",  # required
-                    ]
-                else:
-                    mrow = [
-                        "    " + (mod.get("label") or ""),
-                        mod.get("kind", "size"),
-                        mod.get("price_cents", 0),
-                        grp_name,
-                        "",  # required
-                    ]
-                ws.append(mrow)
-                mrow_num = ws.max_row
-                for ci in range(1, len(headers) + 1):
-                    cell = ws.cell(row=mrow_num, column=ci)
-                    cell.font = modifier_font
-                    cell.fill = modifier_fill
-
-        # Ungrouped variant sub-rows
-        for v in ungrouped:
-            if include_category:
-                vrow = [
-                    "  " + (v.get("label") or ""),
-                    v.get("kind", "size"),
-                    v.get("price_cents", 0),
-                    "",  # category
-                    "",  # group_name
-                    "",  # required
-                ]
-            else:
-                vrow = [
-                    "  " + (v.get("label") or ""),
-                    v.get("kind", "size"),
-                    v.get("price_cents", 0),
-                    "",  # group_name
-                    "",  # required
-                ]
-            ws.append(vrow)
-            vrow_num = ws.max_row
-            for ci in range(1, len(headers) + 1):
-                cell = ws.cell(row=vrow_num, column=ci)
-                cell.font = modifier_font
-                cell.fill = modifier_fill
-
-    # Auto-width columns
-    for ci in range(1, len(headers) + 1):
-        ws.column_dimensions[xl.utils.get_column_letter(ci)].width = 18
+    An .xlsx is a zip whose directory is written last, so unlike CSV the
+    first byte can only go out once the workbook is complete; spooling to
+    disk keeps the finished file out of memory while it is sent.
+    """
+    fh = tempfile.TemporaryFile()
+    try:
+        wb.save(fh)
+        size = fh.tell()
+    except Exception:
+        fh.close()
+        raise
+    resp = _stream_download(export_cache.tee(entry, export_stream.file_chunks(fh)),
+                            _XLSX_CONTENT_TYPE, filename)
+    resp.headers["Content-Length"] = str(size)
+    return resp
 
 
 @app.get("/drafts/<int:draft_id>/export.xlsx")
@@ -10708,7 +10887,6 @@ def draft_export_xlsx(draft_id: int):
 
     try:
         import openpyxl as xl  # type: ignore[import]
-        from openpyxl.styles import Font, PatternFill, Alignment  # type: ignore[import]
     except Exception:
         xl = None
 
@@ -10716,22 +10894,18 @@ def draft_export_xlsx(draft_id: int):
         return make_response("openpyxl not installed. pip install openpyxl", 500)
 
     draft = drafts_store.get_draft(draft_id) or {}
-    items = drafts_store.get_draft_items(draft_id, include_modifier_groups=True) or []
-
-    wb = xl.Workbook()
-    ws = wb.active
-    ws.title = (draft.get("title") or f"Draft {draft_id}")[:31]
-
-    _xlsx_write_sheet(ws, items, xl, include_category=True)
+    sheet_title = (draft.get("title") or f"Draft {draft_id}")[:31]
+    filename = f"draft_{draft_id}.xlsx"
+    entry = _export_cache_entry(draft_id, "xlsx", extra=sheet_title)
+    cached = _cached_file_response(entry, _XLSX_CONTENT_TYPE, filename)
+    if cached is not None:
+        return cached
 
-    out = io.BytesIO()
-    wb.save(out)
-    out.seek(0)
-
-    resp = make_response(out.read())
-    resp.headers["Content-Type"] = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-    resp.headers["Content-Disposition"] = f'attachment; filename="draft_{draft_id}.xlsx"'
-    return resp
+    wb = xl.Workbook(write_only=True)
+    ws = wb.create_sheet(title=sheet_title)
+    _xlsx_write_sheet(ws, drafts_store.iter_draft_items(draft_id, include_modifier_groups=True),
+                      xl, include_category=True)
+    return _xlsx_download(wb, filename, entry)
 
 
 @app.get("/drafts/<int:draft_id>/export_by_category.xlsx")
@@ -10742,44 +10916,50 @@ def draft_export_xlsx_by_category(draft_id: int):
 
     try:
         import openpyxl as xl  # type: ignore[import]
-        from openpyxl.styles import Font, PatternFill  # type: ignore[import]
     except Exception:
         xl = None
 
     if xl is None:
         return make_response("openpyxl not installed. pip install openpyxl", 500)
 
-    draft = drafts_store.get_draft(draft_id) or {}
-    items = drafts_store.get_draft_items(draft_id, include_modifier_groups=True) or []
-
-    # Group items by category
-    cat_map: dict = {}  # category -> list of items
-    for it in items:
-        cat = (it.get("category") or "Uncategorized").strip()
-        cat_map.setdefault(cat, []).append(it)
-
-    wb = xl.Workbook()
-    wb.remove(wb.active)  # remove default empty sheet
-
-    for cat_name in sorted(cat_map.keys()):
-        cat_items = cat_map[cat_name]
-        sheet_title = cat_name[:31] or "Uncategorized"
-        ws = wb.create_sheet(title=sheet_title)
-        _xlsx_write_sheet(ws, cat_items, xl, include_category=False)
+    filename = f"draft_{draft_id}_by_category.xlsx"
+    entry = _export_cache_entry(draft_id, "xlsx_by_category")
+    cached = _cached_file_response(entry, _XLSX_CONTENT_TYPE, filename)
+    if cached is not None:
+        return cached
+
+    def cat_key(value) -> str:
+        return (value or "Uncategorized").strip()
+
+    # Write-only sheets keep their creation order, so open one per
+    # category (sorted) up front and fill them in a single pass.
+    wb = xl.Workbook(write_only=True)
+    styles = _xlsx_styles()
+    sheets: dict = {}  # category -> worksheet
+
+    def sheet_for(cat_name: str):
+        ws = sheets.get(cat_name)
+        if ws is None:
+            ws = wb.create_sheet(title=cat_name[:31] or "Uncategorized")
+            _xlsx_begin_sheet(ws, xl, styles, include_category=False)
+            sheets[cat_name] = ws
+        return ws
+
+    # One snapshot for both reads, so the sheets match the items written.
+    with drafts_store.read_snapshot() as conn:
+        for cat_name in sorted({cat_key(c) for c in
+                                drafts_store.get_draft_item_categories(draft_id, conn=conn)}):
+            sheet_for(cat_name)
+        for it in drafts_store.iter_draft_items(draft_id, include_modifier_groups=True, conn=conn):
+            _xlsx_append_item(sheet_for(cat_key(it.get("category"))), it, styles,
+                              include_category=False)
 
     # If no categories at all, create a placeholder sheet
-    if not cat_map:
+    if not sheets:
         ws = wb.create_sheet(title="Empty")
         ws.append(["No items"])
 
-    out = io.BytesIO()
-    wb.save(out)
-    out.seek(0)
-
-    resp = make_response(out.read())
-    resp.headers["Content-Type"] = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-    resp.headers["Content-Disposition"] = f'attachment; filename="draft_{draft_id}_by_category.xlsx"'
-    return resp
+    return _xlsx_download(wb, filename, entry)
 
 
 # ---------------------------------------------------------------------------
@@ -11127,14 +11307,22 @@ def _verify_pos_json_round_trip(items, draft=None):
 def draft_export_validate(draft_id: int):
     """Pre-export validation: returns warnings for items missing data."""
     _require_drafts_storage()
-    items = drafts_store.get_draft_items(draft_id, include_variants=True) or []
-    warnings = _validate_draft_for_export(items)
+    entry = _export_cache_entry(draft_id, "validate")
+    report = export_cache.get_json(entry)
+    if report is None:
+        items = drafts_store.get_draft_items(draft_id, include_variants=True) or []
+        report = {
+            "item_count": len(items),
+            "variant_count": sum(len(it.get("variants") or []) for it in items),
+            "warnings": _validate_draft_for_export(items),
+        }
+        export_cache.put_json(entry, report)
     return jsonify({
         "draft_id": draft_id,
-        "item_count": len(items),
-        "variant_count": sum(len(it.get("variants") or []) for it in items),
-        "warnings": warnings,
-        "warning_count": len(warnings),
+        "item_count": report["item_count"],
+        "variant_count": report["variant_count"],
+        "warnings": report["warnings"],
+        "warning_count": len(report["warnings"]),
     })
 
 
@@ -11143,8 +11331,12 @@ def draft_export_validate(draft_id: int):
 def draft_export_metrics(draft_id: int):
     """Export metrics: counts, breakdowns, price statistics."""
     _require_drafts_storage()
-    items = drafts_store.get_draft_items(draft_id, include_variants=True) or []
-    metrics = _compute_export_metrics(items)
+    entry = _export_cache_entry(draft_id, "metrics")
+    metrics = export_cache.get_json(entry)
+    if metrics is None:
+        items = drafts_store.get_draft_items(draft_id, include_variants=True) or []
+        metrics = _compute_export_metrics(items)
+        export_cache.put_json(entry, metrics)
     metrics["draft_id"] = draft_id
     return jsonify(metrics)
 
@@ -11155,11 +11347,35 @@ def draft_export_preview(draft_id: int):
     """Export preview: returns formatted output as JSON for pre-download review."""
     _require_drafts_storage()
     fmt = request.args.get("format", "generic_pos")
-    items = drafts_store.get_draft_items(draft_id, include_variants=True) or []
+    kind = fmt if fmt in ("square", "toast") else "generic_pos"
     draft = drafts_store.get_draft(draft_id) or {}
-    warnings = _validate_draft_for_export(items)
+    entry = _export_cache_entry(draft_id, f"preview_{kind}",
+                                extra=[draft.get("id"), draft.get("title")])
+    preview = export_cache.get_json(entry)
+    if preview is None:
+        items = drafts_store.get_draft_items(draft_id, include_variants=True) or []
+        preview = {
+            "content": _build_export_preview(kind, items, draft),
+            "item_count": len(items),
+            "warnings": _validate_draft_for_export(items),
+        }
+        export_cache.put_json(entry, preview)
+
+    content = preview["content"]
+    if kind == "generic_pos":
+        content = _stamp_exported_at(content)
+    return jsonify({
+        "format": fmt,
+        "content": content,
+        "item_count": preview["item_count"],
+        "warnings": preview["warnings"],
+        "truncated": fmt != "generic_pos" and preview["item_count"] > 50,
+    })
 
-    if fmt == "square":
+
+def _build_export_preview(kind: str, items, draft) -> str:
+    """Preview text for one export format (generic_pos with _EXPORTED_AT_MARK)."""
+    if kind == "square":
         rows = _build_square_rows(items)
         # Return first 50 rows as preview
         preview_lines = []
@@ -11168,26 +11384,18 @@ def draft_export_preview(draft_id: int):
         preview_lines.append(",".join(headers))
         for r in rows[:50]:
             preview_lines.append(",".join(str(c) for c in r))
-        content = "\n".join(preview_lines)
-    elif fmt == "toast":
+        return "\n".join(preview_lines)
+    if kind == "toast":
         rows = _build_toast_rows(items)
         headers = ["Menu Group", "Menu Item", "Base Price",
                     "Option Group", "Option", "Option Price"]
         preview_lines = [",".join(headers)]
         for r in rows[:50]:
             preview_lines.append(",".join(str(c) for c in r))
-        content = "\n".join(preview_lines)
-    else:
-        payload = _build_generic_pos_json(items, draft)
-        content = json.dumps(payload, indent=2)
-
-    return jsonify({
-        "format": fmt,
-        "content": content,
-        "item_count": len(items),
-        "warnings": warnings,
-        "truncated": fmt != "generic_pos" and len(items) > 50,
-    })
+        return "\n".join(preview_lines)
+    payload = _build_generic_pos_json(items, draft)
+    payload["metadata"]["exported_at"] = _EXPORTED_AT_MARK
+    return json.dumps(payload, indent=2)
 
 
 def _build_square_rows(items):
@@ -11442,28 +11650,29 @@ def _build_generic_pos_json(items, draft=None):
     }
 
 
+def _rows_per_item(build_rows, items):
+    """Day 155: feed a per-item row builder (Square / Toast) one item at a time."""
+    for it in items:
+        yield from build_rows([it])
+
+
 @app.get("/drafts/<int:draft_id>/export_square.csv")
 @login_required
 @_require_tier_chosen
 def draft_export_square_csv(draft_id: int):
     """Square POS CSV export: items + modifier groups."""
     _require_drafts_storage()
-    items = drafts_store.get_draft_items(draft_id, include_modifier_groups=True) or []
-    rows = _build_square_rows(items)
 
-    buf = io.StringIO()
-    writer = csv.writer(buf)
-    writer.writerow(["Token", "Item Name", "Description", "Category",
-                      "Price", "Modifier Set Name", "Modifier Name", "Modifier Price",
-                      "Required", "Min Select", "Max Select"])
-    for r in rows:
-        writer.writerow(r)
+    def build():
+        items = drafts_store.iter_draft_items(draft_id, include_modifier_groups=True)
+        return export_stream.csv_stream(
+            ["Token", "Item Name", "Description", "Category",
+             "Price", "Modifier Set Name", "Modifier Name", "Modifier Price",
+             "Required", "Min Select", "Max Select"],
+            _rows_per_item(_build_square_rows, items))
 
-    csv_data = buf.getvalue().encode("utf-8-sig")
-    resp = make_response(csv_data)
-    resp.headers["Content-Type"] = "text/csv; charset=utf-8"
-    resp.headers["Content-Disposition"] = f'attachment; filename="draft_{draft_id}_square.csv"'
-    return resp
+    return _cached_download(_export_cache_entry(draft_id, "square_csv"), build,
+                            "text/csv; charset=utf-8", f"draft_{draft_id}_square.csv")
 
 
 @app.get("/drafts/<int:draft_id>/export_toast.csv")
@@ -11472,21 +11681,34 @@ def draft_export_square_csv(draft_id: int):
 def draft_export_toast_csv(draft_id: int):
     """Toast POS CSV export: menu group / item / option hierarchy."""
     _require_drafts_storage()
-    items = drafts_store.get_draft_items(draft_id, include_modifier_groups=True) or []
-    rows = _build_toast_rows(items)
-
-    buf = io.StringIO()
-    writer = csv.writer(buf)
-    writer.writerow(["Menu Group", "Menu Item", "Base Price",
-                      "Option Group", "Option", "Option Price", "Required"])
-    for r in rows:
-        writer.writerow(r)
 
-    csv_data = buf.getvalue().encode("utf-8-sig")
-    resp = make_response(csv_data)
-    resp.headers["Content-Type"] = "text/csv; charset=utf-8"
-    resp.headers["Content-Disposition"] = f'attachment; filename="draft_{draft_id}_toast.csv"'
-    return resp
+    def build():
+        items = drafts_store.iter_draft_items(draft_id, include_modifier_groups=True)
+        return export_stream.csv_stream(
+            ["Menu Group", "Menu Item", "Base Price",
+             "Option Group", "Option", "Option Price", "Required"],
+            _rows_per_item(_build_toast_rows, items))
+
+    return _cached_download(_export_cache_entry(draft_id, "toast_csv"), build,
+                            "text/csv; charset=utf-8", f"draft_{draft_id}_toast.csv")
+
+
+def _pos_json_text(draft_id: int, draft, items=None) -> str:
+    """Generic POS JSON (indent=2) of a draft's nested items, with
+    _EXPORTED_AT_MARK as the timestamp; cached per draft revision (Day 156)."""
+    entry = _export_cache_entry(draft_id, "pos_json",
+                                extra=[(draft or {}).get("id"), (draft or {}).get("title")])
+    fh = export_cache.open_artifact(entry)
+    if fh is not None:
+        with fh:
+            return fh.read().decode("utf-8")
+    if items is None:
+        items = drafts_store.get_draft_items(draft_id, include_modifier_groups=True) or []
+    payload = _build_generic_pos_json(items, draft)
+    payload["metadata"]["exported_at"] = _EXPORTED_AT_MARK
+    text = json.dumps(payload, indent=2)
+    export_cache.put_bytes(entry, text.encode("utf-8"))
+    return text
 
 
 @app.get("/drafts/<int:draft_id>/export_pos.json")
@@ -11496,10 +11718,8 @@ def draft_export_pos_json(draft_id: int):
     """Generic POS JSON export: universal item/variant/modifier schema."""
     _require_drafts_storage()
     draft = drafts_store.get_draft(draft_id) or {}
-    items = drafts_store.get_draft_items(draft_id, include_modifier_groups=True) or []
-    payload = _build_generic_pos_json(items, draft)
 
-    resp = make_response(json.dumps(payload, indent=2))
+    resp = make_response(_stamp_exported_at(_pos_json_text(draft_id, draft)))
     resp.headers["Content-Type"] = "application/json; charset=utf-8"
     resp.headers["Content-Disposition"] = f'attachment; filename="draft_{draft_id}_pos.json"'
     return resp
@@ -12092,14 +12312,8 @@ def bulk_move_category(draft_id: int):
             return jsonify({"ok": False, "error": f"Invalid item id: {x}"}), 400
     if not int_ids:
         return jsonify({"ok": True, "updated": 0}), 200
-    with db_connect() as conn:
-        qmarks = ",".join(["?"] * len(int_ids))
-        conn.execute(
-            f"UPDATE draft_items SET category=? WHERE draft_id=? AND id IN ({qmarks})",
-            (category, int(draft_id), *int_ids),
-        )
-        conn.commit()
-    return jsonify({"ok": True, "updated": len(int_ids), "category": category}), 200
+    updated = drafts_store.bulk_update_items(draft_id, int_ids, {"category": category})
+    return jsonify({"ok": True, "updated": updated, "category": category}), 200
 
 
 # === /DEBUG APPEND ===
@@ -0,0 +1,89 @@
+# portal/export_stream.py
+"""
+Streaming export bodies — Day 155.
+
+The draft exporters used to build every row in a StringIO (or the whole
+payload in one json.dumps) before sending the first byte, so a 20k-item
+catalog held the item list, the rows and the encoded body in memory at
+once.  These helpers turn row / item iterators into chunked byte
+generators that Flask can send as they are produced:
+
+  - csv_stream():   UTF-8 CSV with the same BOM and dialect as before
+  - json_stream():  byte-for-byte json.dumps(payload, indent=2), with one
+                    list field filled from an iterator
+  - file_chunks():  a spooled file (XLSX) sent in fixed-size reads
+
+No Flask import here, so tools/bench_exports.py can drive the same code.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+from typing import IO, Any, Dict, Iterable, Iterator, List
+
+CHUNK_ROWS = 500          # rows buffered per yielded CSV chunk
+FILE_CHUNK_BYTES = 64 * 1024
+
+_BOM = "\ufeff".encode("utf-8")
+_PLACEHOLDER = "__servline_stream_items__"
+
+
+def csv_stream(header: List[Any], rows: Iterable[List[Any]],
+               *, chunk_rows: int = CHUNK_ROWS) -> Iterator[bytes]:
+    """Yield a utf-8-sig CSV (header + rows) in chunks of ~chunk_rows rows."""
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(header)
+    yield _BOM + buf.getvalue().encode("utf-8")
+    buf.seek(0)
+    buf.truncate()
+
+    pending = 0
+    for row in rows:
+        writer.writerow(row)
+        pending += 1
+        if pending >= chunk_rows:
+            yield buf.getvalue().encode("utf-8")
+            buf.seek(0)
+            buf.truncate()
+            pending = 0
+    if pending:
+        yield buf.getvalue().encode("utf-8")
+
+
+def json_stream(payload: Dict[str, Any], key: str,
+                items: Iterable[Any]) -> Iterator[bytes]:
+    """
+    Yield json.dumps(payload, indent=2) with payload[key] taken from
+    *items*, without materialising the list.
+
+    payload[key] is ignored; the other fields are dumped as usual.  Only a
+    top-level list field is supported (the export shapes need no more).
+    """
+    head = dict(payload)
+    head[key] = _PLACEHOLDER
+    text = json.dumps(head, indent=2)
+    prefix, suffix = text.split(json.dumps(_PLACEHOLDER), 1)
+    yield prefix.encode("utf-8")
+
+    first = True
+    for item in items:
+        body = json.dumps(item, indent=2).replace("\n", "\n    ")
+        yield (("[\n    " if first else ",\n    ") + body).encode("utf-8")
+        first = False
+    yield (("[]" if first else "\n  ]") + suffix).encode("utf-8")
+
+
+def file_chunks(fh: IO[bytes], *, chunk_bytes: int = FILE_CHUNK_BYTES) -> Iterator[bytes]:
+    """Read *fh* from the start in fixed-size chunks; closes it when done."""
+    try:
+        fh.seek(0)
+        while True:
+            chunk = fh.read(chunk_bytes)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        fh.close()
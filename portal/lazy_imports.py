@@ -0,0 +1,80 @@
+# portal/lazy_imports.py
+"""
+Day 151: deferred imports for heavy optional dependencies.
+
+portal/app.py used to import pytesseract, the legacy OCR worker (cv2 +
+numpy) and the OCR facade at module load, so every worker boot and every
+test that imports the app paid for them, even though only the upload /
+OCR routes use them.
+
+    pytesseract = lazy_module("pytesseract", on_load=_configure_tesseract)
+
+binds a stand-in module object.  The real import happens on the first
+attribute access (pytesseract.image_to_string(...)), `on_load` runs once
+right after it, and from then on attribute reads and writes go straight
+to the real module, so monkeypatching through the stand-in still works.
+An import error surfaces at that first use instead of at app start.
+"""
+
+from __future__ import annotations
+
+import importlib
+import threading
+import types
+from typing import Any, Callable, Optional
+
+
+class LazyModule(types.ModuleType):
+    """Module stand-in that imports the real module on first attribute access."""
+
+    def __init__(self, name: str, on_load: Optional[Callable[[types.ModuleType], None]] = None):
+        super().__init__(name)
+        d = self.__dict__
+        d["_lazy_target"] = None
+        d["_lazy_on_load"] = on_load
+        d["_lazy_lock"] = threading.Lock()
+
+    def _lazy_load(self) -> types.ModuleType:
+        d = self.__dict__
+        target = d["_lazy_target"]
+        if target is not None:
+            return target
+        with d["_lazy_lock"]:
+            if d["_lazy_target"] is None:
+                module = importlib.import_module(self.__name__)
+                hook = d["_lazy_on_load"]
+                if hook is not None:
+                    hook(module)
+                d["_lazy_target"] = module
+            return d["_lazy_target"]
+
+    def __getattr__(self, attr: str) -> Any:
+        # Only called for names not in the stand-in's own __dict__
+        if attr.startswith("__") and attr.endswith("__"):
+            raise AttributeError(attr)
+        return getattr(self._lazy_load(), attr)
+
+    def __setattr__(self, attr: str, value: Any) -> None:
+        setattr(self._lazy_load(), attr, value)
+
+    def __delattr__(self, attr: str) -> None:
+        delattr(self._lazy_load(), attr)
+
+    def __dir__(self):
+        return dir(self._lazy_load())
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.__dict__["_lazy_target"] is not None else "not loaded"
+        return f"<lazy module {self.__name__!r} ({state})>"
+
+
+def lazy_module(name: str, on_load: Optional[Callable[[types.ModuleType], None]] = None) -> LazyModule:
+    """Return a LazyModule for *name* (see module docstring)."""
+    return LazyModule(name, on_load)
+
+
+def is_loaded(module: Any) -> bool:
+    """True for real modules and for LazyModules whose import has happened."""
+    if isinstance(module, LazyModule):
+        return module.__dict__["_lazy_target"] is not None
+    return module is not None
@@ -1,13 +1,14 @@
 # portal/routes_debug_preocr.py
 from flask import Blueprint, send_file, request, abort, Response
 from pathlib import Path
-from portal.ocr_worker import ocr_image, _prep_cv
-from storage.ocr_pipeline import segment_document  # <-- NEW: use Phase-3 pipeline
-from PIL import Image
 import io
 import os
 import json
 
+# Day 151: the OCR worker / Phase-3 pipeline (cv2, numpy, tesseract) and
+# PIL are imported inside the routes, so registering this blueprint at
+# app start costs nothing until a debug endpoint is actually hit.
+
 debug_preocr = Blueprint("debug_preocr", __name__)
 
 
@@ -40,6 +41,9 @@ def pre_ocr_image():
     if not os.path.exists(p):
         return abort(404, "Image not found")
 
+    from PIL import Image
+    from portal.ocr_worker import _prep_cv
+
     pil = Image.open(p)
     bw = _prep_cv(pil, source_path=Path(p))
     buf = io.BytesIO()
@@ -84,6 +88,7 @@ def ocr_text():
     # 🔹 If it's a PDF, run the new Phase-3 pipeline and dump JSON.
     if lower.endswith(".pdf"):
         try:
+            from storage.ocr_pipeline import segment_document  # Phase-3 pipeline
             segmented = segment_document(pdf_path=p)
         except Exception as exc:
             # Surface the error clearly instead of a generic 500 page.
@@ -99,6 +104,7 @@ def ocr_text():
 
     # 🔹 Otherwise treat it as an image and use the legacy ocr_image() helper.
     try:
+        from portal.ocr_worker import ocr_image
         txt = ocr_image(Path(p))
     except Exception as exc:
         return Response(
@@ -25,7 +25,7 @@ import logging
 import os
 import re
 import time
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
 
 log = logging.getLogger(__name__)
 
@@ -52,16 +52,24 @@ _client = None
 
 
 def _get_client():
-    """Lazy-init Anthropic client. Returns None if API key not set."""
+    """Lazy-init Anthropic client. Returns None if API key not set.
+
+    Day 145: honours SERVLINE_AI_REPLAY — replay mode serves recorded
+    fixtures without a key, record mode saves every response.
+    """
     global _client
     if _client is not None:
         return _client
+    from . import ai_replay
+    if ai_replay.replaying():
+        _client = ai_replay.anthropic_client()
+        return _client
     api_key = os.environ.get("ANTHROPIC_API_KEY", "").strip()
     if not api_key:
         return None
     try:
         import anthropic
-        _client = anthropic.Anthropic(api_key=api_key)
+        _client = ai_replay.wrap_anthropic(anthropic.Anthropic(api_key=api_key))
         return _client
     except Exception as e:
         log.warning("Failed to init Anthropic client: %s", e)
@@ -1023,6 +1031,93 @@ Extract every menu item from this menu text (bounding boxes will be empty/approx
 Return JSON: {{"items": [...]}}"""
 
 
+# ---------------------------------------------------------------------------
+# Day 142: Streaming detection — parse items as each JSON object completes
+# ---------------------------------------------------------------------------
+_ITEMS_KEY_RE = re.compile(r'"items"\s*:\s*$')
+
+
+class _StreamingItemsParser:
+    """Incrementally pull complete item objects out of a streamed response.
+
+    The detection call returns ``{"items": [{...}, {...}, ...]}`` (optionally
+    wrapped in a markdown fence).  Text deltas are fed in as they arrive; each
+    call to feed() returns the raw item dicts whose closing brace has been
+    seen since the previous call.  Only objects that are direct children of
+    the top-level "items" array are emitted — nested sizes/bbox objects are
+    part of their parent item.
+
+    This is a progress aid only: the authoritative result is still parsed
+    from the final message, so a malformed partial object is simply skipped.
+    """
+
+    def __init__(self) -> None:
+        self._text = ""
+        self._pos = 0
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self._in_items = False
+        self._obj_start: Optional[int] = None
+        self.count = 0
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        if not chunk:
+            return []
+        self._text += chunk
+        out: List[Dict[str, Any]] = []
+        text = self._text
+        stack = self._stack
+        i = self._pos
+        n = len(text)
+        while i < n:
+            ch = text[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif not stack:
+                # Outside any JSON value (markdown fence, whitespace, prose)
+                if ch == "{":
+                    stack.append("{")
+            elif ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                if (
+                    ch == "["
+                    and len(stack) == 1
+                    and _ITEMS_KEY_RE.search(text, 0, i)
+                ):
+                    self._in_items = True
+                elif ch == "{" and self._in_items and len(stack) == 2:
+                    self._obj_start = i
+                stack.append(ch)
+            elif ch in "}]":
+                stack.pop()
+                if (
+                    ch == "}"
+                    and self._in_items
+                    and len(stack) == 2
+                    and self._obj_start is not None
+                ):
+                    try:
+                        obj = json.loads(text[self._obj_start:i + 1])
+                    except ValueError:
+                        obj = None
+                    if isinstance(obj, dict):
+                        out.append(obj)
+                        self.count += 1
+                    self._obj_start = None
+                elif ch == "]" and self._in_items and len(stack) == 1:
+                    self._in_items = False
+            i += 1
+        self._pos = i
+        return out
+
+
 def detect_menu_elements(
     ocr_text: str,
     *,
@@ -1031,6 +1126,7 @@ def detect_menu_elements(
     model: str = "claude-sonnet-4-5",
     max_tokens: int = 32000,
     use_thinking: bool = False,
+    on_items: Optional[Callable[[List[Dict[str, Any]]], None]] = None,
 ) -> Optional[List[Dict[str, Any]]]:
     """Detect and classify every text element on a menu image.
 
@@ -1044,6 +1140,12 @@ def detect_menu_elements(
     Structure assembly (parent/child grouping) is done in code, not here.
     Day 140: Opus without thinking — better precision than thinking mode
     (thinking lets Claude rationalize wrong prices for "consistency").
+
+    Day 142: streaming mode — when *on_items* is given, the response text
+    is consumed delta-by-delta and on_items(batch) is called with each batch
+    of newly completed, normalized items as soon as their JSON closes.  The
+    return value is still parsed from the final message, so it is identical
+    to the non-streaming path.  Callback errors never abort detection.
     """
     client = _get_client()
     if client is None:
@@ -1148,6 +1250,8 @@ def detect_menu_elements(
     try:
         print("[Detect] Streaming API call started...")
         with client.messages.stream(**api_kwargs) as stream:
+            if on_items is not None:
+                _consume_detect_stream(stream, on_items)
             message = stream.get_final_message()
 
         stop = getattr(message, "stop_reason", "unknown")
@@ -1226,6 +1330,36 @@ def detect_menu_elements(
         return None
 
 
+def _consume_detect_stream(
+    stream: Any,
+    on_items: Callable[[List[Dict[str, Any]]], None],
+) -> int:
+    """Drain a detection stream's text deltas, reporting items as they complete.
+
+    Each completed item goes through the same normalization and description
+    validation as the final parse, so callers see exactly the rows the
+    non-streaming path will produce.  Returns the number of items reported.
+    """
+    parser = _StreamingItemsParser()
+    reported = 0
+    for delta in stream.text_stream:
+        raw = parser.feed(delta)
+        if not raw:
+            continue
+        batch = _normalize_detected_items(raw)
+        if not batch:
+            continue
+        _validate_descriptions(batch)
+        reported += len(batch)
+        try:
+            on_items(batch)
+        except Exception as cb_err:
+            log.warning("Detect on_items callback failed: %s", cb_err)
+    if reported:
+        print(f"[Detect] Streamed {reported} items before final message")
+    return reported
+
+
 def _normalize_detected_items(raw_items: List[Any]) -> List[Dict[str, Any]]:
     """Normalize items returned by the detection call.
 
@@ -1743,49 +1877,53 @@ def _detect_fabricated_prices(item: Dict[str, Any], ocr_text: str) -> Dict[str,
     return item
 
 
-def elements_to_draft_rows(
-    items: List[Dict[str, Any]],
-    ocr_text: str = "",
-) -> tuple:
-    """Convert detected items to draft rows + coordinate data.
+# Day 141: phrases that are pricing labels, NEVER items.
+_PRICING_LABEL_NAMES = {
+    "each topping add", "each topping", "each add", "per topping",
+    "add-on price", "add on price", "per add", "topping add",
+    "additional toppings", "additional topping",
+}
 
-    Day 139 v2: Trusts Claude's category/sizes assignments. Uses bounding
-    boxes only for wizard highlighting, NOT for structure inference.
-    Day 140: raw_line price verification — cross-checks Claude's prices
-    against the text it quoted. Catches consistency-smoothing.
-    Day 140: OCR text verification — second pass against actual OCR text
-    to catch cases where Claude hallucinated both price AND raw_line.
 
-    Returns (draft_rows, coord_data) where:
-    - draft_rows: list of dicts for upsert_draft_items()
-    - coord_data: list of dicts keyed by 'position' for post-insert item_id linking
+class DraftRowAssembler:
+    """Incremental form of elements_to_draft_rows() (Day 142).
+
+    Items are fed one at a time with add() — typically from the streaming
+    detection callback — and turned into draft rows + coordinate entries
+    immediately.  finish() applies the whole-menu step (cross-section
+    inheritance expansion) and returns the same (draft_rows, coord_data)
+    tuple elements_to_draft_rows() would for the same item sequence.
     """
-    ocr_lines = ocr_text.strip().splitlines() if ocr_text else []
-    draft_rows = []
-    coord_data = []
-    inheritance_markers: List[Dict[str, Any]] = []  # Day 141: cross-section topping inheritance
-    # Day 141: phrases that are pricing labels, NEVER items.
-    _PRICING_LABEL_NAMES = {
-        "each topping add", "each topping", "each add", "per topping",
-        "add-on price", "add on price", "per add", "topping add",
-        "additional toppings", "additional topping",
-    }
 
-    for pos, it in enumerate(items, start=1):
+    def __init__(self, ocr_text: str = "") -> None:
+        self.ocr_lines = ocr_text.strip().splitlines() if ocr_text else []
+        self.draft_rows: List[Dict[str, Any]] = []
+        self.coord_data: List[Dict[str, Any]] = []
+        self.inheritance_markers: List[Dict[str, Any]] = []  # Day 141
+        self._pos = 0
+
+    def add(self, it: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Assemble one detected item.  Returns the new draft row, or None
+        when the item was dropped or recorded as an inheritance marker."""
+        # Positions advance for every input item (skipped ones included) so
+        # coord_data stays aligned with the detection order.
+        self._pos += 1
+        pos = self._pos
+
         name = (it.get("name") or "").strip()
         if not name:
-            continue
+            return None
 
         # Day 141: drop phantom pricing-label "items"
         if name.lower() in _PRICING_LABEL_NAMES:
             log.info("Dropping pricing-label phantom item: %r", name)
-            continue
+            return None
 
         # Day 141: catch cross-section inheritance markers and skip them
         if name == "_INHERIT_TOPPINGS" or it.get("_inherits_from"):
             src = it.get("_inherits_from") or {}
             if isinstance(src, dict) and src.get("category"):
-                inheritance_markers.append({
+                self.inheritance_markers.append({
                     "target_category": (it.get("category") or "").strip(),
                     "target_subcategory": (it.get("subcategory") or "").strip() or None,
                     "source_category": (src.get("category") or "").strip(),
@@ -1796,13 +1934,13 @@ def elements_to_draft_rows(
                     it.get("category"), it.get("subcategory"),
                     src.get("category"), src.get("subcategory"),
                 )
-            continue
+            return None
 
         # Day 140: verify prices against raw_line before processing
         it = _verify_prices_against_raw(it)
         # Day 140: second pass — verify against actual OCR text
-        if ocr_lines:
-            it = _verify_prices_against_ocr(it, ocr_lines)
+        if self.ocr_lines:
+            it = _verify_prices_against_ocr(it, self.ocr_lines)
 
         # Day 141: fabrication detector was too aggressive on dense-OCR menus.
         # Disabled until we have a more reliable signal.
@@ -1843,12 +1981,12 @@ def elements_to_draft_rows(
         if variants:
             row["_variants"] = variants
 
-        draft_rows.append(row)
+        self.draft_rows.append(row)
 
         # Bounding box for wizard highlighting
         bbox = it.get("bbox")
         if bbox:
-            coord_data.append({
+            self.coord_data.append({
                 "position": pos,
                 "x_pct": bbox.get("x_pct", 0),
                 "y_pct": bbox.get("y_pct", 0),
@@ -1857,12 +1995,44 @@ def elements_to_draft_rows(
                 "page": bbox.get("page", 1),
                 "element_type": "item",
             })
+        return row
 
-    # Day 141: expand cross-section inheritance markers
-    if inheritance_markers:
-        draft_rows = _expand_inheritance(draft_rows, inheritance_markers)
+    def extend(self, items: List[Dict[str, Any]]) -> int:
+        """Assemble a batch of items; returns how many became draft rows."""
+        return sum(1 for it in items if self.add(it) is not None)
 
-    return draft_rows, coord_data
+    def finish(self) -> tuple:
+        """Return (draft_rows, coord_data) with inheritance expanded."""
+        draft_rows = self.draft_rows
+        # Day 141: expand cross-section inheritance markers
+        if self.inheritance_markers:
+            draft_rows = _expand_inheritance(draft_rows, self.inheritance_markers)
+        return draft_rows, self.coord_data
+
+
+def elements_to_draft_rows(
+    items: List[Dict[str, Any]],
+    ocr_text: str = "",
+) -> tuple:
+    """Convert detected items to draft rows + coordinate data.
+
+    Day 139 v2: Trusts Claude's category/sizes assignments. Uses bounding
+    boxes only for wizard highlighting, NOT for structure inference.
+    Day 140: raw_line price verification — cross-checks Claude's prices
+    against the text it quoted. Catches consistency-smoothing.
+    Day 140: OCR text verification — second pass against actual OCR text
+    to catch cases where Claude hallucinated both price AND raw_line.
+    Day 142: per-item work lives in DraftRowAssembler so the streaming
+    detection path can assemble rows while the response is still arriving.
+
+    Returns (draft_rows, coord_data) where:
+    - draft_rows: list of dicts for upsert_draft_items()
+    - coord_data: list of dicts keyed by 'position' for post-insert item_id linking
+    """
+    assembler = DraftRowAssembler(ocr_text)
+    for it in items:
+        assembler.add(it)
+    return assembler.finish()
 
 
 def _normalize_size_label(label: str) -> str:
@@ -62,7 +62,7 @@ from storage.variant_engine import (
 )
 from .category_hierarchy import infer_category_hierarchy
 from .cross_item import check_cross_item_consistency
-from .semantic_confidence import score_semantic_confidence, classify_confidence_tiers, generate_repair_recommendations, apply_auto_repairs, generate_semantic_report
+from .semantic_confidence import score_semantic_confidence, classify_confidence_tiers, generate_repair_recommendations, apply_auto_repairs, rescore_repaired_items, generate_semantic_report
 from .parsers.menu_grammar import classify_menu_lines, _normalize_w_slash
 from .parsers.combo_vocab import extract_combo_hints
 
@@ -975,9 +975,9 @@ def analyze_ocr_text(
     # Sprint 8.4 Day 69: auto-repair execution
     apply_auto_repairs(items)
 
-    # Re-score after repairs (reflect improved quality)
-    score_semantic_confidence(items)
-    classify_confidence_tiers(items)
+    # Re-score after repairs (reflect improved quality; Day 160: only the
+    # items the repairs changed)
+    rescore_repaired_items(items)
 
     # Infer per-category subcategories (e.g., Gourmet Pizza, Cold Subs)
     hierarchy_map = infer_category_hierarchy(items)
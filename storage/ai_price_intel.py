@@ -28,6 +28,8 @@ Requires ANTHROPIC_API_KEY in environment.
 
 from __future__ import annotations
 
+import asyncio
+import contextvars
 import json
 import logging
 import os
@@ -37,12 +39,15 @@ import threading
 import time
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 log = logging.getLogger(__name__)
 
 # Reuse shared Anthropic client
 from .ai_menu_extract import _get_client
+from . import ai_replay
+from . import db_pool
+from . import migrate
 
 
 # Gemini's search-grounded pricing sometimes returns list-article headlines
@@ -109,7 +114,22 @@ def _is_article_title(name: str) -> bool:
 # ---------------------------------------------------------------------------
 _DEFAULT_MODEL = "claude-sonnet-4-5"
 _MAX_TOKENS = 8_000    # Per-batch token limit (batched by category)
-_MAX_ITEMS_PER_BATCH = 40  # Split large categories into sub-batches
+_MAX_ITEMS_PER_BATCH = 40  # Hard cap on items per batch (output JSON size)
+
+# Day 143: token-aware batch planning. Prompt size is estimated per item
+# (name + category + variant labels) at ~4 chars/token — the same ratio
+# ai_menu_extract uses for its truncation limit — and items are bin-packed
+# up to a budget instead of sliced at a fixed count.
+_CHARS_PER_TOKEN = 4
+_ITEM_LINE_OVERHEAD_TOKENS = 8     # "- #123 \"...\" (...)" framing + newline
+_ITEM_BATCH_TOKEN_BUDGET = 1_500   # item-block tokens per item-list prompt
+_EXTRACT_BATCH_TOKEN_BUDGET = 12_000  # search-result tokens per extraction prompt
+
+# Shared cap on in-flight LLM calls from this module. Every Claude/Gemini
+# batch call acquires a slot, so concurrent passes (Gemini pricing, Haiku
+# estimates, search extraction) can't stack up past the provider limit.
+_MAX_CONCURRENT_LLM_CALLS = 4
+_LLM_CALL_SLOTS = threading.BoundedSemaphore(_MAX_CONCURRENT_LLM_CALLS)
 
 # DB path (same as other storage modules)
 DB_PATH = Path(__file__).resolve().parents[1] / "storage" / "servline.db"
@@ -128,10 +148,7 @@ MIN_ITEMS_FOR_ANALYSIS = 3
 # DB helpers
 # ---------------------------------------------------------------------------
 def _db_connect() -> sqlite3.Connection:
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA foreign_keys = ON;")
-    return conn
+    return db_pool.connect(DB_PATH)
 
 
 def _now() -> str:
@@ -198,6 +215,12 @@ def _ensure_schema() -> None:
                 updated_at      TEXT NOT NULL
             )
         """)
+        # Day 144: run state — 'running' (stubs only), 'partial' (some
+        # ranges landed), 'complete'. Pre-existing rows are complete.
+        try:
+            conn.execute("ALTER TABLE price_intelligence_summary ADD COLUMN status TEXT DEFAULT 'complete'")
+        except Exception:
+            pass
         conn.execute(
             "CREATE INDEX IF NOT EXISTS idx_price_intel_draft "
             "ON price_intelligence_results(draft_id)"
@@ -277,11 +300,6 @@ def _extract_status_from_error(exc: Exception) -> Optional[int]:
     return None
 
 
-# Run on import
-_ensure_schema()
-_ensure_gemini_log_schema()
-
-
 # ---------------------------------------------------------------------------
 # Prompt construction
 # ---------------------------------------------------------------------------
@@ -491,28 +509,333 @@ def _call_claude(
 
 
 # ---------------------------------------------------------------------------
-# Batching: split items by category, sub-batch if too large
+# Batching (Day 143): token-aware bin-packing that keeps categories together
 # ---------------------------------------------------------------------------
-def _make_batches(items: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
-    """Group items by category, then split any group that exceeds the batch limit."""
-    from collections import OrderedDict
+def _estimate_text_tokens(text: str) -> int:
+    """Rough token count for prompt text (~4 chars/token, rounded up)."""
+    return -(-len(text or "") // _CHARS_PER_TOKEN)
+
+
+def _estimate_item_tokens(item: Dict[str, Any]) -> int:
+    """Estimate the prompt tokens one item line costs, including variants.
+
+    Accepts both draft-item dicts (name/category/subcategory) and the
+    pricing-pass dicts (item_name/category/variants).
+    """
+    name = item.get("item_name") or item.get("name") or ""
+    chars = len(name) + len(item.get("category") or "") + len(item.get("subcategory") or "")
+    for v in item.get("variants") or []:
+        if isinstance(v, dict):
+            chars += len(v.get("label") or "") + 2  # ", " separator
+    return _ITEM_LINE_OVERHEAD_TOKENS + -(-chars // _CHARS_PER_TOKEN)
+
+
+def _estimate_extraction_tokens(entry: Dict[str, Any]) -> int:
+    """Estimate prompt tokens for one search-result extraction entry.
 
-    by_cat: OrderedDict[str, List[Dict[str, Any]]] = OrderedDict()
+    Mirrors _search_item_prices' prompt: a header line per item plus each
+    search result truncated to 2,500 chars.
+    """
+    tokens = _estimate_item_tokens(entry)
+    for label, text in (entry.get("searches") or {}).items():
+        tokens += _estimate_text_tokens(label) + _estimate_text_tokens((text or "")[:2500]) + 4
+    return tokens
+
+
+def _plan_batches(
+    items: List[Dict[str, Any]],
+    *,
+    token_budget: int = _ITEM_BATCH_TOKEN_BUDGET,
+    max_items: int = _MAX_ITEMS_PER_BATCH,
+    cost=_estimate_item_tokens,
+) -> List[List[Dict[str, Any]]]:
+    """Bin-pack items into as few batches as fit *token_budget* / *max_items*.
+
+    Items are grouped by category first; a category that fits in one batch
+    is kept whole (so Claude/Gemini see all its items side by side), larger
+    categories are split into budget-sized chunks.  Chunks are then packed
+    first-fit-decreasing, so small categories share a call instead of each
+    paying for their own.  Category order is preserved inside every batch.
+    """
+    if not items:
+        return []
+
+    by_cat: Dict[str, List[Dict[str, Any]]] = {}
     for item in items:
-        cat = item.get("category") or "Uncategorized"
-        by_cat.setdefault(cat, []).append(item)
+        by_cat.setdefault(item.get("category") or "Uncategorized", []).append(item)
+
+    # Split each category into chunks that individually respect the limits
+    chunks: List[tuple] = []  # (order, tokens, items)
+    for cat_items in by_cat.values():
+        cur: List[Dict[str, Any]] = []
+        cur_tokens = 0
+        for item in cat_items:
+            t = max(1, int(cost(item)))
+            if cur and (cur_tokens + t > token_budget or len(cur) >= max_items):
+                chunks.append((len(chunks), cur_tokens, cur))
+                cur, cur_tokens = [], 0
+            cur.append(item)
+            cur_tokens += t
+        if cur:
+            chunks.append((len(chunks), cur_tokens, cur))
+
+    # First-fit decreasing: largest chunks claim bins first
+    bins: List[Dict[str, Any]] = []
+    for order, tokens, chunk in sorted(chunks, key=lambda c: (-c[1], c[0])):
+        for b in bins:
+            if b["tokens"] + tokens <= token_budget and b["count"] + len(chunk) <= max_items:
+                b["chunks"].append((order, chunk))
+                b["tokens"] += tokens
+                b["count"] += len(chunk)
+                break
+        else:
+            bins.append({"tokens": tokens, "count": len(chunk), "chunks": [(order, chunk)]})
 
+    # Emit batches in original menu order (by their earliest chunk)
     batches: List[List[Dict[str, Any]]] = []
-    for cat, cat_items in by_cat.items():
-        # Sub-batch large categories
-        for i in range(0, len(cat_items), _MAX_ITEMS_PER_BATCH):
-            batches.append(cat_items[i : i + _MAX_ITEMS_PER_BATCH])
+    for b in sorted(bins, key=lambda b: min(o for o, _ in b["chunks"])):
+        batch: List[Dict[str, Any]] = []
+        for _, chunk in sorted(b["chunks"], key=lambda c: c[0]):
+            batch.extend(chunk)
+        batches.append(batch)
+    return batches
 
-    # If total items fit in one batch, just send everything together
-    if len(items) <= _MAX_ITEMS_PER_BATCH:
-        return [items]
 
-    return batches
+def _make_batches(items: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+    """Group items into token-budgeted batches (see _plan_batches)."""
+    return _plan_batches(items)
+
+
+def _run_batches(fn, batches: List[Any], *, max_workers: int = _MAX_CONCURRENT_LLM_CALLS) -> List[Any]:
+    """Run fn(batch) for every batch concurrently; results in batch order.
+
+    The per-call rate limit is enforced by _LLM_CALL_SLOTS inside each
+    call site, so max_workers only bounds local fan-out.  A batch that
+    raises yields None rather than sinking its siblings.  Day 144: runs
+    on the asyncio fan-out, so a rerun of the same draft cancels the rest.
+    """
+    return _run_fan_out(fn, batches, limit=max_workers)
+
+
+# ---------------------------------------------------------------------------
+# Async fan-out + run cancellation (Day 144)
+# ---------------------------------------------------------------------------
+# Every price analysis registers a cancel Event for its draft.  Starting a
+# new run (or cancel_price_analysis) sets the previous Event; fan-outs poll
+# it between completions, stop scheduling new units, and raise
+# PriceAnalysisCancelled so the stale run unwinds without writing.  Units
+# already running in a worker thread finish, but their results are dropped.
+
+class PriceAnalysisCancelled(Exception):
+    """Raised inside a price analysis run that was superseded or cancelled."""
+
+
+_CANCEL_POLL_S = 0.1
+_ACTIVE_RUNS: Dict[int, threading.Event] = {}
+_ACTIVE_RUNS_LOCK = threading.Lock()
+# Cancel token of the run executing in this context.  asyncio.to_thread
+# copies the context, so nested fan-outs inside a unit see it too.
+_CURRENT_CANCEL: contextvars.ContextVar[Optional[threading.Event]] = (
+    contextvars.ContextVar("price_intel_cancel", default=None)
+)
+
+
+def _begin_price_run(draft_id: int) -> threading.Event:
+    """Register a new run for draft_id, cancelling any run still in flight."""
+    cancel = threading.Event()
+    with _ACTIVE_RUNS_LOCK:
+        prev = _ACTIVE_RUNS.get(draft_id)
+        if prev is not None:
+            prev.set()
+        _ACTIVE_RUNS[draft_id] = cancel
+    if prev is not None:
+        log.info("Price analysis for draft %d superseded — cancelling previous run", draft_id)
+    return cancel
+
+
+def _end_price_run(draft_id: int, cancel: threading.Event) -> None:
+    with _ACTIVE_RUNS_LOCK:
+        if _ACTIVE_RUNS.get(draft_id) is cancel:
+            del _ACTIVE_RUNS[draft_id]
+
+
+def cancel_price_analysis(draft_id: int) -> bool:
+    """Cancel the in-flight price analysis for a draft. True if one was running."""
+    with _ACTIVE_RUNS_LOCK:
+        cancel = _ACTIVE_RUNS.pop(draft_id, None)
+    if cancel is None:
+        return False
+    cancel.set()
+    return True
+
+
+def _check_cancelled(cancel: Optional[threading.Event] = None) -> None:
+    cancel = cancel if cancel is not None else _CURRENT_CANCEL.get()
+    if cancel is not None and cancel.is_set():
+        raise PriceAnalysisCancelled()
+
+
+async def _fan_out(
+    fn: Callable[[Any], Any],
+    units: List[Any],
+    *,
+    limit: int,
+    cancel: Optional[threading.Event] = None,
+    on_result: Optional[Callable[[int, Any], Any]] = None,
+) -> List[Any]:
+    """Run blocking fn(unit) for every unit, at most `limit` at a time.
+
+    on_result(index, result) is called as each unit completes, one call
+    at a time in completion order, on a worker thread so a slow hook (a
+    partial-results DB write) never stalls the other in-flight units;
+    returning True stops the fan-out early (pending units are cancelled
+    and keep a None result).  Units that raise yield None.
+
+    Stopping or cancelling only keeps units from starting: a call already
+    running on a worker thread cannot be interrupted, and the loop's
+    executor shutdown waits for it before the fan-out returns or raises.
+    """
+    results: List[Any] = [None] * len(units)
+    sem = asyncio.Semaphore(max(1, limit))
+
+    async def _one(i: int, unit: Any):
+        async with sem:
+            if cancel is not None and cancel.is_set():
+                return i, None
+            try:
+                return i, await asyncio.to_thread(fn, unit)
+            except PriceAnalysisCancelled:
+                raise
+            except Exception as e:
+                log.error("Fan-out unit %d raised: %s: %s", i, type(e).__name__, e)
+                return i, None
+
+    pending = {asyncio.ensure_future(_one(i, u)) for i, u in enumerate(units)}
+    stopped = False
+    try:
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, timeout=_CANCEL_POLL_S,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            for task in done:
+                i, res = task.result()
+                if cancel is not None and cancel.is_set():
+                    continue
+                results[i] = res
+                if on_result is not None and not stopped:
+                    try:
+                        stopped = bool(await asyncio.to_thread(on_result, i, res))
+                    except Exception as e:
+                        log.warning("Fan-out result hook failed: %s", e)
+            if stopped or (cancel is not None and cancel.is_set()):
+                break
+    finally:
+        for task in pending:
+            task.cancel()
+    if cancel is not None and cancel.is_set():
+        raise PriceAnalysisCancelled()
+    return results
+
+
+def _run_fan_out(fn: Callable[[Any], Any], units: List[Any], *, limit: int,
+                 cancel: Optional[threading.Event] = None,
+                 on_result: Optional[Callable[[int, Any], Any]] = None) -> List[Any]:
+    """Synchronous entry point for _fan_out.
+
+    Uses the current run's cancel token when none is given.  Callers
+    already inside an event loop get a private loop on a helper thread.
+    A cancelled run raises only once the calls already in flight finish.
+    """
+    if not units:
+        return []
+    if cancel is None:
+        cancel = _CURRENT_CANCEL.get()
+    _check_cancelled(cancel)
+    coro = _fan_out(fn, units, limit=limit, cancel=cancel, on_result=on_result)
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    from concurrent.futures import ThreadPoolExecutor
+    ctx = contextvars.copy_context()
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(ctx.run, asyncio.run, coro).result()
+
+
+# Day 143: the planner's token estimate for each batch call next to what
+# the provider reports, so the heuristic can be checked against billing.
+_TOKEN_USAGE: List[Dict[str, Any]] = []
+_TOKEN_USAGE_MAX = 500
+_TOKEN_USAGE_LOCK = threading.Lock()
+
+
+def _record_token_usage(model: str, planned: int, actual: Optional[int], *,
+                        overhead: int = 0, output: Optional[int] = None) -> None:
+    """Remember one call's usage; ignores calls with no reported input tokens.
+
+    planned is the planner's cost of the item block (_estimate_item_tokens
+    / _estimate_extraction_tokens summed over the batch), overhead the
+    estimated tokens of the fixed instructions around it, actual / output
+    the provider's input / output token counts.
+    """
+    if not actual or actual <= 0:
+        return
+    row = {"model": model, "planned": int(planned), "overhead": int(overhead),
+           "actual": int(actual), "output": int(output) if output else None}
+    with _TOKEN_USAGE_LOCK:
+        _TOKEN_USAGE.append(row)
+        if len(_TOKEN_USAGE) > _TOKEN_USAGE_MAX:
+            del _TOKEN_USAGE[: len(_TOKEN_USAGE) - _TOKEN_USAGE_MAX]
+
+
+def _usage_tokens(response: Any) -> Tuple[Optional[int], Optional[int]]:
+    """(input, output) token counts from a Claude or Gemini response, if any."""
+    usage = getattr(response, "usage", None)
+    n_in = getattr(usage, "input_tokens", None) if usage is not None else None
+    n_out = getattr(usage, "output_tokens", None) if usage is not None else None
+    if n_in is None:
+        meta = getattr(response, "usage_metadata", None)
+        n_in = getattr(meta, "prompt_token_count", None) if meta is not None else None
+        n_out = getattr(meta, "candidates_token_count", None) if meta is not None else None
+    return (n_in if isinstance(n_in, int) else None,
+            n_out if isinstance(n_out, int) else None)
+
+
+def _record_batch_usage(model: str, response: Any, *, planned: int,
+                        prompt: str, block: str) -> None:
+    """Record a batch call: *block* is the item text the planner costed."""
+    actual, output = _usage_tokens(response)
+    _record_token_usage(
+        model, planned, actual,
+        overhead=_estimate_text_tokens(prompt) - _estimate_text_tokens(block),
+        output=output,
+    )
+
+
+def token_estimate_accuracy(model: Optional[str] = None) -> Dict[str, Any]:
+    """Summarize how the planner's estimates compare with recorded usage.
+
+    Returns {"samples", "mean_ratio", "max_ratio", "min_ratio",
+    "max_output"}.  ratio is the reported item-block tokens (input minus
+    the fixed-instruction overhead) over the planner's estimate: 1.0 =
+    perfect, >1 means the planner under-estimates.  max_output is the
+    largest reported answer, to check batch caps against max_tokens.
+    """
+    with _TOKEN_USAGE_LOCK:
+        rows = [r for r in _TOKEN_USAGE if model is None or r["model"] == model]
+    ratios = [(r["actual"] - r["overhead"]) / r["planned"] for r in rows if r["planned"] > 0]
+    outputs = [r["output"] for r in rows if r["output"]]
+    if not ratios:
+        return {"samples": 0, "mean_ratio": None, "max_ratio": None, "min_ratio": None,
+                "max_output": None}
+    return {
+        "samples": len(ratios),
+        "mean_ratio": round(sum(ratios) / len(ratios), 3),
+        "max_ratio": round(max(ratios), 3),
+        "min_ratio": round(min(ratios), 3),
+        "max_output": max(outputs) if outputs else None,
+    }
 
 
 def _merge_batch_results(
@@ -1006,6 +1329,18 @@ def _apply_category_ranges(
     return overridden
 
 
+def _gemini_client(api_key: str):
+    """google-genai client, routed through ai_replay (Day 145).
+
+    Replay mode needs no key; the SDK is still required for the request
+    config types.
+    """
+    if ai_replay.replaying():
+        return ai_replay.gemini_client()
+    from google import genai
+    return ai_replay.wrap_gemini(genai.Client(api_key=api_key))
+
+
 def _gemini_search_category_range(
     category: str,
     size_label: str,
@@ -1025,14 +1360,13 @@ def _gemini_search_category_range(
     failure.
     """
     api_key = os.environ.get("GEMINI_API_KEY", "").strip()
-    if not api_key:
+    if not api_key and not ai_replay.replaying():
         return None
     try:
-        from google import genai
         from google.genai import types
     except ImportError:
         return None
-    client = genai.Client(api_key=api_key)
+    client = _gemini_client(api_key)
 
     price_dollars = price_cents / 100.0
     if size_label:
@@ -1063,14 +1397,15 @@ nearby comparable markets and widen the range to flag uncertainty
 rather than guessing precisely. Return ONLY the JSON, no commentary."""
 
     try:
-        resp = client.models.generate_content(
-            model=_GEMINI_MODEL,
-            contents=prompt,
-            config=types.GenerateContentConfig(
-                tools=[types.Tool(google_search=types.GoogleSearch())],
-                temperature=0.1,
-            ),
-        )
+        with _LLM_CALL_SLOTS:
+            resp = client.models.generate_content(
+                model=_GEMINI_MODEL,
+                contents=prompt,
+                config=types.GenerateContentConfig(
+                    tools=[types.Tool(google_search=types.GoogleSearch())],
+                    temperature=0.1,
+                ),
+            )
         txt = (resp.text or "").strip() if resp else ""
         if txt.startswith("```"):
             txt = txt.split("\n", 1)[1] if "\n" in txt else txt[3:]
@@ -1234,20 +1569,19 @@ def _gemini_search_prices(items: List[Dict[str, Any]], city: str, state: str,
     })
 
     api_key = os.environ.get("GEMINI_API_KEY", "").strip()
-    if not api_key:
+    if not api_key and not ai_replay.replaying():
         log.error("Gemini: GEMINI_API_KEY not set — cannot run real-price pricing")
         return {}
     if not items:
         return {}
 
     try:
-        from google import genai
         from google.genai import types
     except ImportError:
         log.error("Gemini: google-genai not installed — pip install google-genai")
         return {}
 
-    client = genai.Client(api_key=api_key)
+    client = _gemini_client(api_key)
 
     # No probe, no fallback chain — pro is the only model. If pro is down,
     # we'll find out on the first batch's failure and Haiku takes over.
@@ -1575,13 +1909,18 @@ Rules:
         def _attempt():
             t0 = time.time()
             try:
-                candidate = client.models.generate_content(
-                    model=_GEMINI_MODEL,
-                    contents=prompt,
-                    config=types.GenerateContentConfig(
-                        tools=[types.Tool(google_search=types.GoogleSearch())],
-                        temperature=0.1,
-                    ),
+                with _LLM_CALL_SLOTS:
+                    candidate = client.models.generate_content(
+                        model=_GEMINI_MODEL,
+                        contents=prompt,
+                        config=types.GenerateContentConfig(
+                            tools=[types.Tool(google_search=types.GoogleSearch())],
+                            temperature=0.1,
+                        ),
+                    )
+                _record_batch_usage(
+                    _GEMINI_MODEL, candidate, prompt=prompt, block=item_lines,
+                    planned=sum(_estimate_item_tokens(it) for it in batch),
                 )
                 txt = (candidate.text or "").strip() if candidate else ""
                 dur = time.time() - t0
@@ -1880,22 +2219,19 @@ Rules:
     # (~30-60s each) compound badly under contention; halving the pressure
     # cut the 503/timeout rate dramatically in testing without changing
     # wall time meaningfully (we're network-bound, not CPU-bound).
-    batches = [items[i:i + batch_size] for i in range(0, len(items), batch_size)]
+    # Day 143: token-aware packing — items with long size lists take more
+    # of a batch, small categories share one, and batch_size stays the cap.
+    batches = _plan_batches(items, max_items=batch_size)
     _GEMINI_LAST_RUN["batches_total"] = len(batches)
-    from concurrent.futures import ThreadPoolExecutor
     # 2 parallel workers. Earlier "sequential to avoid self-throttling"
     # turned out to be wrong — the 503s we attributed to rate limiting
     # were actually the #-prefix parser bug silently dropping successful
     # responses. With that fixed, parallel pressure is fine. 2 workers
     # cuts wall time roughly in half; the adaptive demotion makes batch
     # 2 onwards skip the failing primary model entirely.
-    with ThreadPoolExecutor(max_workers=min(2, len(batches))) as pool:
-        futures = [pool.submit(_run_batch, b) for b in batches]
-        for f in futures:
-            try:
-                out.update(f.result())
-            except Exception as e:
-                log.error("Gemini batch future raised: %s: %s", type(e).__name__, e)
+    for result in _run_batches(_run_batch, batches, max_workers=2):
+        if result:
+            out.update(result)
 
     # Batch-level retry pass: if SOME batches succeeded and others failed,
     # Pro is partially up — retry the failed batches once. Catches the
@@ -1921,6 +2257,7 @@ Rules:
                 # calls and avoids resurfacing whatever throttle hit on the
                 # first pass.
                 time.sleep(3 + random.uniform(0, 2))
+                _check_cancelled()
                 try:
                     result = _run_batch(batch)
                     if result:
@@ -1990,7 +2327,6 @@ def _search_item_prices(items: List[Dict[str, Any]], city: str, state: str,
             seen_queries[q].append((it["item_id"], None))
 
     # Step 2: Run Google searches in parallel
-    from concurrent.futures import ThreadPoolExecutor
     search_results = {}  # query -> text
 
     def _do_search(task):
@@ -1999,15 +2335,14 @@ def _search_item_prices(items: List[Dict[str, Any]], city: str, state: str,
         return query, text
 
     log.info("Running %d Google searches for price data...", len(search_tasks))
-    with ThreadPoolExecutor(max_workers=5) as pool:
-        for query, text in pool.map(lambda t: _do_search(t), search_tasks):
-            if text:
-                search_results[query] = text
+    for res in _run_fan_out(_do_search, search_tasks, limit=5):
+        if res and res[1]:
+            search_results[res[0]] = res[1]
 
     log.info("Got %d/%d search results", len(search_results), len(search_tasks))
 
     # Step 3: Batch the search results to Haiku for extraction
-    # Group items into batches of 15 for extraction
+    # Day 143: packed by search-text tokens (up to 15 items per batch)
     out: Dict[int, Dict[str, Any]] = {}
     batch_size = 15
     extraction_items = []
@@ -2068,10 +2403,16 @@ Rules:
 - Return ONLY the JSON array"""
 
         try:
-            response = client.messages.create(
-                model="claude-haiku-4-5-20251001",
-                max_tokens=4000,
-                messages=[{"role": "user", "content": prompt}],
+            with _LLM_CALL_SLOTS:
+                response = client.messages.create(
+                    model="claude-haiku-4-5-20251001",
+                    max_tokens=4000,
+                    messages=[{"role": "user", "content": prompt}],
+                )
+            _record_batch_usage(
+                "claude-haiku-4-5-20251001", response, prompt=prompt,
+                block="\n".join(prompt_parts),
+                planned=sum(_estimate_extraction_tokens(ei) for ei in batch),
             )
             text = response.content[0].text.strip()
             if text.startswith("```"):
@@ -2108,16 +2449,15 @@ Rules:
             return {}
 
     # Run extraction batches in parallel
-    batches = [extraction_items[i:i + batch_size]
-               for i in range(0, len(extraction_items), batch_size)]
-
-    with ThreadPoolExecutor(max_workers=3) as pool:
-        futures = [pool.submit(_extract_batch, b) for b in batches]
-        for f in futures:
-            try:
-                out.update(f.result())
-            except Exception:
-                pass
+    batches = _plan_batches(
+        extraction_items,
+        token_budget=_EXTRACT_BATCH_TOKEN_BUDGET,
+        max_items=batch_size,
+        cost=_estimate_extraction_tokens,
+    )
+    for result in _run_batches(_extract_batch, batches, max_workers=3):
+        if result:
+            out.update(result)
 
     log.info("Extracted prices for %d/%d items from Google search data", len(out), len(items))
     return out
@@ -2125,7 +2465,7 @@ Rules:
 
 def _estimate_item_market_rates(items: List[Dict[str, Any]], city: str, state: str,
                                 zip_code: str, cuisine: str) -> Dict[int, Dict[str, Any]]:
-    """Ask Haiku for per-item market price ranges. Batches of 40.
+    """Ask Haiku for per-item market price ranges. Token-packed, up to 25 per batch.
 
     items: list of {item_id, item_name, category, variants: [{label, price}]}
     Returns {item_id: {low, high, median, sizes: {label: {low, high, median}}}} in cents.
@@ -2177,10 +2517,15 @@ Rules:
 - Return ONLY the JSON array"""
 
         try:
-            response = client.messages.create(
-                model="claude-haiku-4-5-20251001",
-                max_tokens=6000,
-                messages=[{"role": "user", "content": prompt}],
+            with _LLM_CALL_SLOTS:
+                response = client.messages.create(
+                    model="claude-haiku-4-5-20251001",
+                    max_tokens=6000,
+                    messages=[{"role": "user", "content": prompt}],
+                )
+            _record_batch_usage(
+                "claude-haiku-4-5-20251001", response, prompt=prompt, block=item_lines,
+                planned=sum(_estimate_item_tokens(it) for it in batch),
             )
             text = response.content[0].text.strip()
             if text.startswith("```"):
@@ -2218,16 +2563,14 @@ Rules:
             log.warning("Item market estimation batch %d failed: %s", batch_idx, e)
             return {}
 
-    # Run all batches in parallel
-    batches = [items[i:i + batch_size] for i in range(0, len(items), batch_size)]
-    from concurrent.futures import ThreadPoolExecutor
-    with ThreadPoolExecutor(max_workers=min(4, len(batches))) as pool:
-        futures = [pool.submit(_run_batch, b, idx) for idx, b in enumerate(batches)]
-        for f in futures:
-            try:
-                out.update(f.result())
-            except Exception:
-                pass
+    # Run all batches in parallel under the shared call limit.  The prompt
+    # budget alone would admit ~40 short sized items, whose per-size JSON
+    # answer overruns max_tokens=6000; keep the pre-Day-143 cap of 25.
+    batches = _plan_batches(items, max_items=batch_size)
+    indexed = list(enumerate(batches))
+    for result in _run_batches(lambda ib: _run_batch(ib[1], ib[0]), indexed):
+        if result:
+            out.update(result)
 
     return out
 
@@ -2244,6 +2587,7 @@ def _estimate_category_market_rates(categories: List[str], city: str, state: str
     """
     if not categories:
         return {}
+    _check_cancelled()
 
     client = _get_client()
     if not client:
@@ -2288,10 +2632,19 @@ Rules:
 - Return ONLY the JSON array, no other text"""
 
     try:
-        response = client.messages.create(
-            model="claude-haiku-4-5-20251001",
-            max_tokens=4000,
-            messages=[{"role": "user", "content": prompt}],
+        with _LLM_CALL_SLOTS:
+            response = client.messages.create(
+                model="claude-haiku-4-5-20251001",
+                max_tokens=4000,
+                messages=[{"role": "user", "content": prompt}],
+            )
+        # Each category line is costed like an item line with its sizes.
+        _record_batch_usage(
+            "claude-haiku-4-5-20251001", response, prompt=prompt, block=cat_list,
+            planned=sum(_estimate_item_tokens({
+                "name": c,
+                "variants": [{"label": size} for size in (size_categories or {}).get(c) or []],
+            }) for c in categories),
         )
         text = response.content[0].text.strip()
         if text.startswith("```"):
@@ -2751,6 +3104,7 @@ def _aggregate_from_anchor_menus(
     target_anchor_count: int = 8,
     max_attempts: int = 15,
     force_refresh: bool = False,
+    on_partial: Optional[Callable[[Dict[int, Dict[str, Any]]], None]] = None,
 ) -> Dict[int, Dict[str, Any]]:
     """Pull menu items from up to N anchor restaurants, then for each
     customer item-cluster (grouped by category + size + price tier),
@@ -2764,6 +3118,10 @@ def _aggregate_from_anchor_menus(
     every time. Cited prices are real items from real menus, not
     synthesized.
 
+    Day 144: anchor menus are fetched on the async fan-out.  When
+    on_partial is given it receives provisional ranges recomputed from
+    the anchors fetched so far, each time another menu lands.
+
     Returns: {item_id: {"low", "high", "median", "sources",
                         "sizes": {label: {"low", "high", "median",
                                           "sources"}}}}
@@ -2777,7 +3135,7 @@ def _aggregate_from_anchor_menus(
                     "aggregation disabled")
         return {}
 
-    from concurrent.futures import ThreadPoolExecutor, as_completed
+    from concurrent.futures import ThreadPoolExecutor
 
     # Step 0: tier filter — drop Tier C anchors (brochure sites,
     # country clubs, places with no public menu) before paying for
@@ -2847,18 +3205,17 @@ def _aggregate_from_anchor_menus(
                         anchor.get("name"), e)
             return None
 
-    with ThreadPoolExecutor(max_workers=5) as pool:
-        futs = [pool.submit(_fetch, a) for a in candidates]
-        for fut in as_completed(futs):
-            r = fut.result()
-            if r:
-                anchor_menus.append(r)
-                if len(anchor_menus) >= target_anchor_count:
-                    break
-        # Cancel any still-pending futures past our target
-        for f in futs:
-            if not f.done():
-                f.cancel()
+    def _landed(_i, r) -> bool:
+        if not r:
+            return False
+        anchor_menus.append(r)
+        if len(anchor_menus) >= target_anchor_count:
+            return True  # enough anchors — drop the rest of the fan-out
+        if on_partial is not None:
+            on_partial(_ranges_from_anchor_menus(our_rows, item_variants, anchor_menus))
+        return False
+
+    _run_fan_out(_fetch, candidates, limit=5, on_result=_landed)
 
     if not anchor_menus:
         log.warning("No usable anchor menus fetched (tried %d)",
@@ -2868,7 +3225,16 @@ def _aggregate_from_anchor_menus(
     log.info("Anchor menus: %d restaurants, %d total priced items",
              len(anchor_menus),
              sum(len(m["items"]) for m in anchor_menus))
+    return _ranges_from_anchor_menus(our_rows, item_variants, anchor_menus)
+
 
+def _ranges_from_anchor_menus(
+    our_rows: List[Any],
+    item_variants: Dict[int, List[Dict[str, Any]]],
+    anchor_menus: List[Dict[str, Any]],
+) -> Dict[int, Dict[str, Any]]:
+    """Steps 2-4 of _aggregate_from_anchor_menus: cluster customer items
+    and price each cluster against the given anchor menus."""
     # Step 2: index anchor items by normalized category. Skip non-main
     # roles (sauces, toppings, sides) — those would contaminate ranges.
     anchor_by_cat: Dict[str, List[tuple]] = {}
@@ -3224,6 +3590,111 @@ def _aggregate_from_anchor_menus(
     return item_market
 
 
+def _write_item_ranges(
+    conn: sqlite3.Connection,
+    draft_id: int,
+    our_rows: List[Any],
+    item_market: Dict[int, Dict[str, Any]],
+    *,
+    city: str,
+    state: str,
+    zip_code: str,
+    final: bool,
+) -> int:
+    """Persist market ranges + assessments and refresh the summary counts.
+
+    Day 144: also used for provisional results while anchor menus are
+    still landing (final=False) — only items that already have a range
+    are written and the summary is marked 'partial'.  The final pass
+    writes every row and marks it 'complete'.  Caller commits.
+    """
+    updated = 0
+    total_underpriced = 0
+    total_fair = 0
+    total_overpriced = 0
+    total_assessed = 0
+
+    for row in our_rows:
+        current_price = row["current_price"] or 0
+        mr = item_market.get(row["item_id"])
+        if not mr and not final:
+            continue  # keep the stub until the final pass decides
+
+        if mr:
+            low, high, median = mr["low"], mr["high"], mr["median"]
+            avg = int(round((low + high) / 2))
+            if current_price and median:
+                if current_price < low:
+                    assessment = "below_market"
+                    total_underpriced += 1
+                elif current_price > high:
+                    assessment = "above_market"
+                    total_overpriced += 1
+                elif current_price < median * 0.90:
+                    assessment = "lower_range"
+                    total_underpriced += 1
+                elif current_price > median * 1.10:
+                    assessment = "higher_range"
+                    total_overpriced += 1
+                else:
+                    assessment = "fair"
+                    total_fair += 1
+                total_assessed += 1
+            else:
+                assessment = "unknown"
+            source_info: Dict[str, Any] = {
+                "source": "market_estimate",
+                "location": f"{city}, {state} {zip_code}"}
+            if mr.get("sources"):
+                source_info["sources"] = mr["sources"]
+            if mr.get("sizes"):
+                source_info["sizes"] = mr["sizes"]
+            conn.execute(
+                """UPDATE price_intelligence_results
+                   SET suggested_low = ?,
+                       suggested_high = ?,
+                       regional_avg = ?,
+                       median_price = ?,
+                       assessment = ?,
+                       price_sources = ?,
+                       comparison_count = -2,
+                       confidence = 0.35
+                   WHERE draft_id = ? AND item_id = ?""",
+                (low, high, avg, median, assessment,
+                 json.dumps([source_info]),
+                 draft_id, row["item_id"]),
+            )
+        else:
+            conn.execute(
+                """UPDATE price_intelligence_results
+                   SET suggested_low = NULL,
+                       suggested_high = NULL,
+                       regional_avg = NULL,
+                       median_price = NULL,
+                       assessment = 'unknown',
+                       price_sources = ?,
+                       comparison_count = 0
+                   WHERE draft_id = ? AND item_id = ?""",
+                (json.dumps([]), draft_id, row["item_id"]),
+            )
+        updated += 1
+
+    # Refresh summary counts from the real data we just computed
+    conn.execute(
+        """UPDATE price_intelligence_summary
+           SET items_assessed = ?,
+               underpriced = ?,
+               fair_priced = ?,
+               overpriced = ?,
+               status = ?,
+               updated_at = ?
+           WHERE draft_id = ?""",
+        (total_assessed, total_underpriced, total_fair, total_overpriced,
+         "complete" if final else "partial", _now(), draft_id),
+    )
+    return updated
+
+
 def _aggregate_price_ranges(draft_id: int, *, force_refresh: bool = False) -> int:
     """Set market ranges for all items using per-item Haiku estimates.
 
@@ -3232,8 +3703,12 @@ def _aggregate_price_ranges(draft_id: int, *, force_refresh: bool = False) -> in
     its category. Items with size variants get per-size breakdowns too.
     ~$0.02 per menu, ~10 seconds for 150 items.
 
+    Day 144: provisional ranges are persisted as anchor menus land, so
+    get_price_intelligence() serves partial results mid-run.
+
     Returns the number of rows updated.
     """
+    cancel = _CURRENT_CANCEL.get()
     with _db_connect() as conn:
         conn.row_factory = sqlite3.Row
 
@@ -3248,12 +3723,6 @@ def _aggregate_price_ranges(draft_id: int, *, force_refresh: bool = False) -> in
         if not our_rows:
             return 0
 
-        updated = 0
-        total_underpriced = 0
-        total_fair = 0
-        total_overpriced = 0
-        total_assessed = 0
-
         # Get restaurant location
         rest_row = conn.execute(
             """SELECT r.address, r.city, r.state, r.zip_code, r.cuisine_type
@@ -3344,9 +3813,20 @@ def _aggregate_price_ranges(draft_id: int, *, force_refresh: bool = False) -> in
         #
         # Same 5 anchors → same ranges every time. Cited prices are real
         # items from real menus, not synthesized.
+        def _persist_partial(partial: Dict[int, Dict[str, Any]]) -> None:
+            if not partial or (cancel is not None and cancel.is_set()):
+                return
+            with _db_connect() as pconn:
+                _write_item_ranges(
+                    pconn, draft_id, our_rows, partial,
+                    city=city, state=state, zip_code=zip_code, final=False,
+                )
+                pconn.commit()
+
         item_market = _aggregate_from_anchor_menus(
             our_rows, item_variants, competitor_anchors,
             force_refresh=force_refresh,
+            on_partial=_persist_partial,
         )
         if not item_market:
             log.warning(
@@ -3355,82 +3835,11 @@ def _aggregate_price_ranges(draft_id: int, *, force_refresh: bool = False) -> in
                 len(haiku_items),
             )
 
-        for row in our_rows:
-            current_price = row["current_price"] or 0
-            mr = item_market.get(row["item_id"])
-
-            if mr:
-                low, high, median = mr["low"], mr["high"], mr["median"]
-                avg = int(round((low + high) / 2))
-                if current_price and median:
-                    if current_price < low:
-                        assessment = "below_market"
-                        total_underpriced += 1
-                    elif current_price > high:
-                        assessment = "above_market"
-                        total_overpriced += 1
-                    elif current_price < median * 0.90:
-                        assessment = "lower_range"
-                        total_underpriced += 1
-                    elif current_price > median * 1.10:
-                        assessment = "higher_range"
-                        total_overpriced += 1
-                    else:
-                        assessment = "fair"
-                        total_fair += 1
-                    total_assessed += 1
-                else:
-                    assessment = "unknown"
-                source_info: Dict[str, Any] = {
-                    "source": "market_estimate",
-                    "location": f"{city}, {state} {zip_code}"}
-                if mr.get("sources"):
-                    source_info["sources"] = mr["sources"]
-                if mr.get("sizes"):
-                    source_info["sizes"] = mr["sizes"]
-                conn.execute(
-                    """UPDATE price_intelligence_results
-                       SET suggested_low = ?,
-                           suggested_high = ?,
-                           regional_avg = ?,
-                           median_price = ?,
-                           assessment = ?,
-                           price_sources = ?,
-                           comparison_count = -2,
-                           confidence = 0.35
-                       WHERE draft_id = ? AND item_id = ?""",
-                    (low, high, avg, median, assessment,
-                     json.dumps([source_info]),
-                     draft_id, row["item_id"]),
-                )
-            else:
-                conn.execute(
-                    """UPDATE price_intelligence_results
-                       SET suggested_low = NULL,
-                           suggested_high = NULL,
-                           regional_avg = NULL,
-                           median_price = NULL,
-                           assessment = 'unknown',
-                           price_sources = ?,
-                           comparison_count = 0
-                       WHERE draft_id = ? AND item_id = ?""",
-                    (json.dumps([]), draft_id, row["item_id"]),
-                )
-            updated += 1
-
-        # Refresh summary counts from the real data we just computed
-        conn.execute(
-            """UPDATE price_intelligence_summary
-               SET items_assessed = ?,
-                   underpriced = ?,
-                   fair_priced = ?,
-                   overpriced = ?,
-                   updated_at = ?
-               WHERE draft_id = ?""",
-            (total_assessed, total_underpriced, total_fair, total_overpriced,
-             _now(), draft_id),
+        _check_cancelled()
+        updated = _write_item_ranges(
+            conn, draft_id, our_rows, item_market,
+            city=city, state=state, zip_code=zip_code, final=True,
         )
-
         conn.commit()
         return updated
 
@@ -3452,7 +3861,37 @@ def analyze_menu_prices(
     sends to Claude for per-item price assessment, and stores results.
 
     Returns dict with assessments, category_avgs, market_context, and metadata.
+
+    Day 144: each call registers a cancellable run for the draft; starting
+    another run (or cancel_price_analysis) stops this one, which then
+    returns {"cancelled": True, ...} without writing further results.
     """
+    cancel = _begin_price_run(draft_id)
+    token = _CURRENT_CANCEL.set(cancel)
+    try:
+        return _analyze_menu_prices(
+            draft_id, restaurant_id, model=model, force_refresh=force_refresh,
+        )
+    except PriceAnalysisCancelled:
+        log.info("Price analysis for draft %d cancelled", draft_id)
+        return {
+            "error": "Price analysis cancelled",
+            "cancelled": True,
+            "skipped": True,
+            "assessments": [],
+        }
+    finally:
+        _CURRENT_CANCEL.reset(token)
+        _end_price_run(draft_id, cancel)
+
+
+def _analyze_menu_prices(
+    draft_id: int,
+    restaurant_id: int,
+    *,
+    model: str,
+    force_refresh: bool,
+) -> Dict[str, Any]:
     from storage.drafts import get_draft_items
     from storage.users import get_restaurant, get_restaurant_users, get_user_tier
     from storage.price_intel import (
@@ -3463,7 +3902,8 @@ def analyze_menu_prices(
     # Check for existing results (unless force refresh)
     if not force_refresh:
         existing = get_price_intelligence(draft_id)
-        if existing and existing.get("assessments"):
+        # A partial run (interrupted or superseded) is not a cache hit
+        if existing and existing.get("assessments") and not existing.get("partial"):
             log.info("Price intel already exists for draft %d, returning cached", draft_id)
             existing["skipped"] = False
             existing["from_cache"] = True
@@ -3541,6 +3981,7 @@ def analyze_menu_prices(
             "Places nearby search failed for rest %d: %s",
             restaurant_id, e,
         )
+    _check_cancelled()
 
     # Phase 2 (Extraction): synchronous Gemini aggregation. The Places
     # list from Phase 1 is now available to be passed into Gemini's
@@ -3549,6 +3990,8 @@ def analyze_menu_prices(
     try:
         n = _aggregate_price_ranges(draft_id, force_refresh=force_refresh)
         log.info("Gemini aggregation updated %d items for draft %d", n, draft_id)
+    except PriceAnalysisCancelled:
+        raise
     except Exception as e:
         log.warning("Gemini aggregation failed for draft %d: %s", draft_id, e)
 
@@ -3606,8 +4049,8 @@ def _stub_price_intelligence(
                (draft_id, restaurant_id, cuisine_type, zip_code,
                 competitor_count, avg_market_tier, total_items, items_assessed,
                 underpriced, fair_priced, overpriced, category_avgs,
-                model_used, created_at, updated_at)
-               VALUES (?, ?, ?, ?, ?, '$$', ?, 0, 0, 0, 0, ?, ?, ?, ?)""",
+                model_used, status, created_at, updated_at)
+               VALUES (?, ?, ?, ?, ?, '$$', ?, 0, 0, 0, 0, ?, ?, 'running', ?, ?)""",
             (
                 draft_id, restaurant_id, cuisine_type, zip_code,
                 competitor_count, len(items),
@@ -3619,7 +4062,11 @@ def _stub_price_intelligence(
 
 
 def get_price_intelligence(draft_id: int) -> Optional[Dict[str, Any]]:
-    """Retrieve stored price intelligence results for a draft."""
+    """Retrieve stored price intelligence results for a draft.
+
+    Day 144: safe to call mid-run — "partial" is True while ranges are
+    still landing, and "status" says how far the run got.
+    """
     with _db_connect() as conn:
         summary = conn.execute(
             "SELECT * FROM price_intelligence_summary WHERE draft_id = ?",
@@ -3662,10 +4109,37 @@ def get_price_intelligence(draft_id: int) -> Optional[Dict[str, Any]]:
         "overpriced": summary_d.get("overpriced", 0),
         "competitor_count": summary_d.get("competitor_count", 0),
         "created_at": summary_d.get("created_at"),
+        "status": summary_d.get("status") or "complete",
+        "partial": (summary_d.get("status") or "complete") != "complete",
         "skipped": False,
     }
 
 
+def get_price_intelligence_progress(draft_id: int) -> Optional[Dict[str, Any]]:
+    """Cheap run-progress snapshot for polling (Day 144).
+
+    Returns {"status", "total_items", "items_priced"} or None when the
+    draft has no price intelligence yet.
+    """
+    with _db_connect() as conn:
+        row = conn.execute(
+            """SELECT s.status, s.total_items,
+                      (SELECT COUNT(*) FROM price_intelligence_results r
+                        WHERE r.draft_id = s.draft_id
+                          AND r.suggested_low IS NOT NULL) AS items_priced
+               FROM price_intelligence_summary s
+               WHERE s.draft_id = ?""",
+            (draft_id,),
+        ).fetchone()
+    if not row:
+        return None
+    return {
+        "status": row["status"] or "complete",
+        "total_items": row["total_items"] or 0,
+        "items_priced": row["items_priced"] or 0,
+    }
+
+
 def get_item_assessment(draft_id: int, item_id: int) -> Optional[Dict[str, Any]]:
     """Get price assessment for a single item."""
     with _db_connect() as conn:
@@ -3728,4 +4202,5 @@ def _ensure_comparison_schema() -> None:
         conn.commit()
 
 
-_ensure_comparison_schema()
+# Day 150: schema steps run via storage/migrate.py; import only checks the version
+migrate.on_import(DB_PATH, __name__)
@@ -0,0 +1,493 @@
+# storage/ai_replay.py
+"""
+AI Call Record/Replay — Day 145.
+
+Transport shim between the pipeline and its external AI services so the
+full import pipeline can run offline:
+
+    off     (default) calls go straight to the provider SDKs
+    record  real calls go through, each response is saved as a fixture
+    replay  fixtures are served back deterministically — no keys or
+            network needed; a request with no fixture raises ReplayMiss
+
+Covered providers:
+    anthropic      client.messages.create / client.messages.stream
+                   (ai_menu_extract, ai_vision_verify, ai_reconcile and
+                   ai_price_intel all share ai_menu_extract._get_client)
+    gemini         client.models.generate_content (ai_price_intel)
+    google_vision  images:annotate REST call (portal _ocr_via_google_vision)
+
+Fixtures are one JSON file per call, keyed by a hash of the request
+(model, prompt, image bytes, config — never the API key), so replay is
+independent of call order and concurrency.
+
+Configuration (environment, or configure() for tools/tests):
+    SERVLINE_AI_REPLAY           off | record | replay
+    SERVLINE_AI_FIXTURES         fixture directory (default fixtures/ai_replay)
+    SERVLINE_AI_REPLAY_LATENCY   "recorded" to sleep for the recorded call
+                                 duration, or a fixed number of seconds
+                                 (default 0)
+    SERVLINE_AI_REPLAY_SCALE     multiplier on the simulated latency (default 1)
+
+Every call made through the shim is appended to call_log() so a benchmark
+can split wall time into AI wait vs. local work.
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+log = logging.getLogger(__name__)
+
+_ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_FIXTURES_DIR = _ROOT / "fixtures" / "ai_replay"
+
+MODES = ("off", "record", "replay")
+
+# Programmatic overrides (configure()); None → fall back to environment
+_CONFIG: Dict[str, Any] = {"mode": None, "fixtures_dir": None, "latency": None, "scale": None}
+
+_CALL_LOG: List[Dict[str, Any]] = []
+_CALL_LOG_LOCK = threading.Lock()
+_CALL_LOG_MAX = 5_000
+
+# Replay streams are cut into chunks of this many characters
+_STREAM_CHUNK_CHARS = 64
+
+
+class ReplayMiss(RuntimeError):
+    """Replay mode found no fixture for a request."""
+
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+def configure(
+    *,
+    mode: Optional[str] = None,
+    fixtures_dir: Optional[os.PathLike] = None,
+    latency: Optional[Any] = None,
+    scale: Optional[float] = None,
+) -> None:
+    """Override the environment settings for this process.
+
+    Pass mode="" (or call reset()) to go back to the environment.
+    """
+    if mode is not None:
+        if mode and mode not in MODES:
+            raise ValueError(f"Unknown replay mode {mode!r} (expected one of {MODES})")
+        _CONFIG["mode"] = mode or None
+    if fixtures_dir is not None:
+        _CONFIG["fixtures_dir"] = Path(fixtures_dir)
+    if latency is not None:
+        _CONFIG["latency"] = latency
+    if scale is not None:
+        _CONFIG["scale"] = float(scale)
+
+
+def reset() -> None:
+    """Drop all configure() overrides and clear the call log."""
+    for k in _CONFIG:
+        _CONFIG[k] = None
+    reset_call_log()
+
+
+def mode() -> str:
+    m = _CONFIG["mode"] or os.environ.get("SERVLINE_AI_REPLAY", "").strip().lower() or "off"
+    return m if m in MODES else "off"
+
+
+def replaying() -> bool:
+    return mode() == "replay"
+
+
+def fixtures_dir() -> Path:
+    if _CONFIG["fixtures_dir"] is not None:
+        return _CONFIG["fixtures_dir"]
+    env = os.environ.get("SERVLINE_AI_FIXTURES", "").strip()
+    return Path(env) if env else DEFAULT_FIXTURES_DIR
+
+
+def _simulated_latency(recorded_s: float) -> float:
+    raw = _CONFIG["latency"]
+    if raw is None:
+        raw = os.environ.get("SERVLINE_AI_REPLAY_LATENCY", "0").strip() or "0"
+    scale = _CONFIG["scale"]
+    if scale is None:
+        try:
+            scale = float(os.environ.get("SERVLINE_AI_REPLAY_SCALE", "1") or 1)
+        except ValueError:
+            scale = 1.0
+    if raw == "recorded":
+        base = recorded_s
+    else:
+        try:
+            base = float(raw)
+        except (TypeError, ValueError):
+            base = 0.0
+    return max(0.0, base * scale)
+
+
+# ---------------------------------------------------------------------------
+# Call log
+# ---------------------------------------------------------------------------
+def _log_call(provider: str, method: str, key: str, elapsed_s: float, how: str,
+              started: Optional[float] = None) -> None:
+    """Log one call; *started* defaults to now minus elapsed_s (logged on return)."""
+    now = time.monotonic()
+    with _CALL_LOG_LOCK:
+        _CALL_LOG.append({
+            "provider": provider,
+            "method": method,
+            "key": key,
+            "elapsed_s": round(elapsed_s, 4),
+            "mode": how,
+            "thread": threading.get_ident(),
+            "started": round(now - elapsed_s if started is None else started, 4),
+            "at": now,
+        })
+        if len(_CALL_LOG) > _CALL_LOG_MAX:
+            del _CALL_LOG[: len(_CALL_LOG) - _CALL_LOG_MAX]
+
+
+def call_log() -> List[Dict[str, Any]]:
+    with _CALL_LOG_LOCK:
+        return list(_CALL_LOG)
+
+
+def reset_call_log() -> None:
+    with _CALL_LOG_LOCK:
+        _CALL_LOG.clear()
+
+
+# ---------------------------------------------------------------------------
+# Request keys + (de)serialization
+# ---------------------------------------------------------------------------
+def _jsonable(obj: Any) -> Any:
+    """Best-effort plain-JSON view of SDK objects (pydantic models, bytes)."""
+    if isinstance(obj, (bytes, bytearray)):
+        return {"__bytes_sha256__": hashlib.sha256(obj).hexdigest()}
+    if hasattr(obj, "model_dump"):
+        try:
+            return obj.model_dump(mode="json", exclude_none=True)
+        except TypeError:
+            return obj.model_dump()
+    if isinstance(obj, SimpleNamespace):
+        return vars(obj)
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    return repr(obj)
+
+
+def request_key(provider: str, method: str, request: Dict[str, Any]) -> str:
+    """Stable hash of a request — order-insensitive for dict keys."""
+    blob = json.dumps([provider, method, request], sort_keys=True,
+                      default=_jsonable, ensure_ascii=False)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()[:24]
+
+
+def _fixture_path(provider: str, method: str, key: str) -> Path:
+    safe_method = method.replace("/", "_").replace(":", "_")
+    return fixtures_dir() / provider / f"{safe_method}__{key}.json"
+
+
+def _summarize_request(request: Dict[str, Any]) -> Dict[str, Any]:
+    """Small human-readable request excerpt stored next to the response."""
+    out: Dict[str, Any] = {}
+    for k in ("model", "max_tokens", "temperature"):
+        if k in request:
+            out[k] = request[k]
+    text = json.dumps(request, sort_keys=True, default=_jsonable)
+    out["chars"] = len(text)
+    out["preview"] = text[:400]
+    return out
+
+
+def _to_namespace(obj: Any) -> Any:
+    if isinstance(obj, dict):
+        return SimpleNamespace(**{k: _to_namespace(v) for k, v in obj.items()})
+    if isinstance(obj, list):
+        return [_to_namespace(v) for v in obj]
+    return obj
+
+
+def _save_fixture(provider: str, method: str, key: str, request: Dict[str, Any],
+                  response: Any, elapsed_s: float) -> None:
+    path = _fixture_path(provider, method, key)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        record = {
+            "provider": provider,
+            "method": method,
+            "key": key,
+            "recorded_at": datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S"),
+            "elapsed_s": round(elapsed_s, 3),
+            "request": _summarize_request(request),
+            "response": response,
+        }
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(record, indent=1, default=_jsonable), encoding="utf-8")
+        os.replace(tmp, path)
+    except Exception as e:
+        log.warning("ai_replay: could not save fixture %s: %s", path.name, e)
+
+
+def _load_fixture(provider: str, method: str, key: str) -> Dict[str, Any]:
+    path = _fixture_path(provider, method, key)
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        raise ReplayMiss(f"No {provider}.{method} fixture for request {key} in {path.parent}")
+
+
+# ---------------------------------------------------------------------------
+# Generic record/replay call
+# ---------------------------------------------------------------------------
+def call(
+    provider: str,
+    method: str,
+    request: Dict[str, Any],
+    live: Callable[[], Any],
+    *,
+    dump: Callable[[Any], Any] = lambda resp: resp,
+    load: Callable[[Any], Any] = lambda data: data,
+) -> Any:
+    """Route one provider call through the current mode.
+
+    live()  performs the real call (unused in replay mode)
+    dump()  turns the live response into JSON for the fixture
+    load()  rebuilds a response object from fixture JSON
+    """
+    m = mode()
+    key = request_key(provider, method, request) if m != "off" else ""
+    if m == "replay":
+        rec = _load_fixture(provider, method, key)
+        delay = _simulated_latency(float(rec.get("elapsed_s") or 0.0))
+        if delay:
+            time.sleep(delay)
+        _log_call(provider, method, key, delay, "replay")
+        return load(rec["response"])
+    t0 = time.monotonic()
+    response = live()
+    elapsed = time.monotonic() - t0
+    if m == "record":
+        _save_fixture(provider, method, key, request, dump(response), elapsed)
+    _log_call(provider, method, key, elapsed, m)
+    return response
+
+
+# ---------------------------------------------------------------------------
+# Anthropic
+# ---------------------------------------------------------------------------
+def _dump_message(message: Any) -> Any:
+    return _jsonable(message) if hasattr(message, "model_dump") else message
+
+
+def _message_text(message: Any) -> str:
+    out = ""
+    for block in getattr(message, "content", None) or []:
+        if getattr(block, "type", None) == "text" and hasattr(block, "text"):
+            out += block.text
+    return out
+
+
+class _ReplayStream:
+    """Stand-in for anthropic's MessageStream, fed from a fixture."""
+
+    def __init__(self, message: Any, delay: float):
+        self._message = message
+        self._delay = delay
+        self._slept = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    @property
+    def text_stream(self) -> Iterator[str]:
+        text = _message_text(self._message)
+        chunks = [text[i:i + _STREAM_CHUNK_CHARS]
+                  for i in range(0, len(text), _STREAM_CHUNK_CHARS)] or [""]
+        per_chunk = self._delay / len(chunks) if self._delay else 0.0
+        for c in chunks:
+            if per_chunk:
+                time.sleep(per_chunk)
+            yield c
+        self._slept = True
+
+    def get_final_message(self) -> Any:
+        if not self._slept:
+            if self._delay:
+                time.sleep(self._delay)
+            self._slept = True
+        return self._message
+
+
+class _RecordingStream:
+    """Wraps a live MessageStream manager; saves the final message on exit."""
+
+    def __init__(self, manager: Any, request: Dict[str, Any]):
+        self._manager = manager
+        self._request = request
+        self._stream = None
+        self._t0 = 0.0
+        self._final = None
+
+    def __enter__(self):
+        self._t0 = time.monotonic()
+        self._stream = self._manager.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None and self._stream is not None:
+            try:
+                self.get_final_message()
+            except Exception as e:
+                log.warning("ai_replay: could not record stream: %s", e)
+        return self._manager.__exit__(exc_type, exc, tb)
+
+    @property
+    def text_stream(self) -> Iterator[str]:
+        return self._stream.text_stream
+
+    def get_final_message(self) -> Any:
+        if self._final is None:
+            self._final = self._stream.get_final_message()
+            elapsed = time.monotonic() - self._t0
+            key = request_key("anthropic", "messages.stream", self._request)
+            if mode() == "record":
+                _save_fixture("anthropic", "messages.stream", key, self._request,
+                              _dump_message(self._final), elapsed)
+            _log_call("anthropic", "messages.stream", key, elapsed, mode())
+        return self._final
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._stream, name)
+
+
+class _AnthropicMessages:
+    def __init__(self, live: Any = None):
+        self._live = live
+
+    def create(self, **kwargs: Any) -> Any:
+        return call(
+            "anthropic", "messages.create", kwargs,
+            lambda: self._live.create(**kwargs),
+            dump=_dump_message, load=_to_namespace,
+        )
+
+    def stream(self, **kwargs: Any) -> Any:
+        if mode() == "replay":
+            key = request_key("anthropic", "messages.stream", kwargs)
+            rec = _load_fixture("anthropic", "messages.stream", key)
+            delay = _simulated_latency(float(rec.get("elapsed_s") or 0.0))
+            _log_call("anthropic", "messages.stream", key, delay, "replay",
+                      started=time.monotonic())
+            return _ReplayStream(_to_namespace(rec["response"]), delay)
+        if mode() == "record":
+            return _RecordingStream(self._live.stream(**kwargs), kwargs)
+        return self._live.stream(**kwargs)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._live, name)
+
+
+class _AnthropicProxy:
+    def __init__(self, live: Any = None):
+        self._live = live
+        self.messages = _AnthropicMessages(getattr(live, "messages", None))
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._live, name)
+
+
+def wrap_anthropic(client: Any) -> Any:
+    """Wrap a live anthropic client for record mode (no-op when off)."""
+    if client is None or mode() == "off":
+        return client
+    return _AnthropicProxy(client)
+
+
+def anthropic_client() -> Any:
+    """Key-less client that serves fixtures (replay mode)."""
+    return _AnthropicProxy(None)
+
+
+# ---------------------------------------------------------------------------
+# Gemini (google-genai)
+# ---------------------------------------------------------------------------
+def _dump_gemini(resp: Any) -> Any:
+    data = _jsonable(resp)
+    if not isinstance(data, dict):
+        data = {}
+    # .text is a computed property — keep it so replay doesn't re-derive
+    try:
+        data["text"] = resp.text
+    except Exception:
+        data["text"] = None
+    return data
+
+
+class _GeminiModels:
+    def __init__(self, live: Any = None):
+        self._live = live
+
+    def generate_content(self, **kwargs: Any) -> Any:
+        return call(
+            "gemini", "models.generate_content", kwargs,
+            lambda: self._live.generate_content(**kwargs),
+            dump=_dump_gemini, load=_to_namespace,
+        )
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._live, name)
+
+
+class _GeminiProxy:
+    def __init__(self, live: Any = None):
+        self._live = live
+        self.models = _GeminiModels(getattr(live, "models", None))
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._live, name)
+
+
+def wrap_gemini(client: Any) -> Any:
+    """Wrap a live google-genai client for record mode (no-op when off)."""
+    if client is None or mode() == "off":
+        return client
+    return _GeminiProxy(client)
+
+
+def gemini_client() -> Any:
+    """Key-less client that serves fixtures (replay mode)."""
+    return _GeminiProxy(None)
+
+
+# ---------------------------------------------------------------------------
+# Google Cloud Vision (REST)
+# ---------------------------------------------------------------------------
+def vision_annotate(image_bytes: bytes, live: Callable[[str], Dict[str, Any]]) -> Dict[str, Any]:
+    """DOCUMENT_TEXT_DETECTION through the shim.
+
+    live(image_b64) performs the real POST and returns the decoded JSON.
+    The key is derived from the image bytes, never the API key.
+    """
+    request = {"image_sha256": hashlib.sha256(image_bytes).hexdigest(),
+               "features": ["DOCUMENT_TEXT_DETECTION"]}
+    return call(
+        "google_vision", "images.annotate", request,
+        lambda: live(base64.b64encode(image_bytes).decode()),
+    )
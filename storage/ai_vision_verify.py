@@ -38,6 +38,7 @@ log = logging.getLogger(__name__)
 # Reuse the shared Anthropic client from ai_menu_extract
 # ---------------------------------------------------------------------------
 from .ai_menu_extract import _get_client, _to_float, _normalize_sizes
+from . import image_prep
 
 # ---------------------------------------------------------------------------
 # Constants
@@ -66,13 +67,20 @@ _MIME_MAP = {
 # Image encoding helpers
 # ---------------------------------------------------------------------------
 def _encode_image_file(path: str) -> Optional[Dict[str, str]]:
-    """Read an image file and return {media_type, data} for Claude vision API."""
+    """Read an image file and return {media_type, data} for Claude vision API.
+
+    Day 146: sized to the model's effective resolution and byte cap via
+    image_prep (phone photos no longer go up at full 8-12MB).
+    """
     p = Path(path)
     ext = p.suffix.lower()
     mime = _MIME_MAP.get(ext)
     if not mime:
         return None
     try:
+        prepared = image_prep.prepare_image(p)
+        if prepared:
+            return prepared[0].to_block()
         raw = p.read_bytes()
         return {"media_type": mime, "data": base64.standard_b64encode(raw).decode("ascii")}
     except Exception as e:
@@ -81,7 +89,7 @@ def _encode_image_file(path: str) -> Optional[Dict[str, str]]:
 
 
 def _pdf_to_images(path: str, dpi: int = 200) -> List[Dict[str, str]]:
-    """Convert PDF pages to base64 PNG images for Claude vision API."""
+    """Convert PDF pages to base64 images for Claude vision API."""
     try:
         from pdf2image import convert_from_path
         poppler_path = os.getenv("POPPLER_PATH") or None
@@ -92,11 +100,10 @@ def _pdf_to_images(path: str, dpi: int = 200) -> List[Dict[str, str]]:
 
     results = []
     for page in pages:
-        import io
-        buf = io.BytesIO()
-        page.save(buf, format="PNG")
-        b64 = base64.standard_b64encode(buf.getvalue()).decode("ascii")
-        results.append({"media_type": "image/png", "data": b64})
+        # Day 146: 200dpi PNG pages were ~2-6MB each; JPEG at model resolution
+        prepared = image_prep.prepare_image(page)
+        if prepared:
+            results.append(prepared[0].to_block())
     return results
 
 
@@ -1222,7 +1229,10 @@ def crop_category_region(
     )
     cropped = img.crop(crop_box)
 
-    # Encode to base64 PNG
+    # Day 146: encode through image_prep (JPEG under the byte cap)
+    prepared = image_prep.prepare_image(cropped)
+    if prepared:
+        return prepared[0].to_block()
     buf = io.BytesIO()
     cropped.save(buf, format="PNG")
     b64 = base64.standard_b64encode(buf.getvalue()).decode("ascii")
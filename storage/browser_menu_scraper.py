@@ -30,6 +30,8 @@ import tempfile
 from typing import Any, Dict, List, Optional
 from urllib.parse import urljoin, urlparse
 
+from . import image_prep
+
 log = logging.getLogger(__name__)
 
 # Chromium viewport — tall enough that Playwright's full_page screenshot
@@ -338,15 +340,11 @@ def _render_pdf_to_screenshots(pdf_url: str) -> List[str]:
         try:
             fd, path = tempfile.mkstemp(suffix=".jpg", prefix=f"pdfpage{i}_")
             os.close(fd)
-            pil_img.save(path, "JPEG", quality=85, optimize=True)
-            size = os.path.getsize(path)
-            if size > SCREENSHOT_MAX_BYTES:
-                # Re-save with lower quality. PDF pages tend to be clean,
-                # so we can drop quality aggressively without losing readability.
-                for q in (70, 55, 40):
-                    pil_img.save(path, "JPEG", quality=q, optimize=True)
-                    if os.path.getsize(path) <= SCREENSHOT_MAX_BYTES:
-                        break
+            # Day 146: quality searched in memory, written once. PDF pages
+            # tend to be clean, so low quality stays readable.
+            data, _q = image_prep.encode_jpeg(pil_img, SCREENSHOT_MAX_BYTES, q_max=85)
+            with open(path, "wb") as f:
+                f.write(data)
             out.append(path)
         except Exception as e:
             log.warning("pdf page save failed: %s", e)
@@ -385,38 +383,40 @@ def _do_compress(png_path: str) -> Optional[str]:
 
     # Width is sacred — never downscale below 1280 (our viewport width).
     # Tiny text in menu screenshots becomes unreadable to Vision if we
-    # crush the width. Only reduce quality here.
-    out_fd, out_path = tempfile.mkstemp(suffix=".jpg", prefix="menuscrn_")
-    os.close(out_fd)
+    # crush the width. Only reduce quality here (Day 146: binary search
+    # in memory via image_prep, one disk write).
     w, h = img.size
-    last_size = 0
-    for quality in (90, 80, 70, 60, 50, 40):
-        try:
-            img.save(out_path, "JPEG", quality=quality, optimize=True)
-        except Exception as e:
-            log.warning("browser scraper: JPEG save failed at Q=%d: %s", quality, e)
-            continue
-        last_size = os.path.getsize(out_path)
-        if last_size <= SCREENSHOT_MAX_BYTES:
-            log.info("browser scraper: compressed %dx%d at Q=%d -> %d bytes",
-                     w, h, quality, last_size)
-            return out_path
+    try:
+        data, quality = image_prep.encode_jpeg(img, SCREENSHOT_MAX_BYTES)
+    except Exception as e:
+        log.warning("browser scraper: JPEG encode failed for %s: %s", png_path, e)
+        return png_path
+    if len(data) <= SCREENSHOT_MAX_BYTES:
+        log.info("browser scraper: compressed %dx%d at Q=%d -> %d bytes",
+                 w, h, quality, len(data))
+        return _write_jpeg(data)
 
     # Quality alone didn't fit. If the image is unusually tall (>3x wide),
     # crop from the top half — preserves the most important menu sections
     # at readable width rather than squashing everything tiny.
     if h > w * 3:
         log.warning(
-            "browser scraper: image %dx%d too big even at Q=40 (%d bytes); "
-            "cropping top half to preserve text width", w, h, last_size,
+            "browser scraper: image %dx%d too big even at Q=%d (%d bytes); "
+            "cropping top half to preserve text width", w, h, quality, len(data),
         )
         top = img.crop((0, 0, w, h // 2))
-        for quality in (85, 75, 60, 45):
-            top.save(out_path, "JPEG", quality=quality, optimize=True)
-            if os.path.getsize(out_path) <= SCREENSHOT_MAX_BYTES:
-                return out_path
+        top_data, _q = image_prep.encode_jpeg(top, SCREENSHOT_MAX_BYTES, q_min=45, q_max=85)
+        if len(top_data) <= SCREENSHOT_MAX_BYTES:
+            return _write_jpeg(top_data)
     log.warning("browser scraper: could not fit under %d bytes; sending as-is",
                 SCREENSHOT_MAX_BYTES)
+    return _write_jpeg(data)
+
+
+def _write_jpeg(data: bytes) -> str:
+    out_fd, out_path = tempfile.mkstemp(suffix=".jpg", prefix="menuscrn_")
+    with os.fdopen(out_fd, "wb") as f:
+        f.write(data)
     return out_path
 
 
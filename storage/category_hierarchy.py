@@ -69,6 +69,8 @@ from __future__ import annotations
 from typing import Any, Dict, List, Optional, Tuple
 import re
 
+from .keyword_automaton import KeywordAutomaton
+
 
 # ---------------------------------------------------------------------------
 # Normalization helpers
@@ -83,10 +85,6 @@ def _lower(s: Optional[str]) -> str:
     return (s or "").strip().lower()
 
 
-def _has_word(text_low: str, *words: str) -> bool:
-    return any(w in text_low for w in words)
-
-
 def _slugify(text: str) -> str:
     """
     Simple slug for potential future anchors (POS exports, URLs).
@@ -162,113 +160,104 @@ def _collapse_category_name(raw_cat: Optional[str]) -> str:
 # ---------------------------------------------------------------------------
 
 
-def _infer_pizza_subcat(name: str, desc: str) -> Optional[str]:
-    low = _lower(name + " " + desc)
-
-    # Explicit pizza “families”
-    if _has_word(low, "calzone", "calzones"):
-        return "Calzones"
-    if _has_word(low, "stromboli", "strombolis"):
-        return "Strombolis"
-    if _has_word(low, "sicilian"):
-        return "Sicilian Pizza"
-
-    # “Specialty” / named pies
-    if _has_word(
-        low,
-        "meat lovers",
-        "hawaiian",
-        "margherita",
-        "margarita",
-        "veggie",
-        "veggie deluxe",
-        "supreme",
-        "buffalo chicken",
-        "bbq chicken",
-        "white pizza",
-    ):
-        return "Specialty Pizzas"
-
-    # By-the-slice / slice combos
-    if _has_word(low, "slice", "slices", "by the slice"):
-        return "Pizza By The Slice"
+# Day 159: each family is an ordered list of (subcategory, words); the first
+# rule with any word in the text wins, as in the if-chains these replace.
+# All words are compiled into one KeywordAutomaton, so the text is scanned
+# once per item instead of once per word.
+_SUBCAT_RULES: Dict[str, List[Tuple[str, Tuple[str, ...]]]] = {
+    "pizza": [
+        # Explicit pizza “families”
+        ("Calzones", ("calzone", "calzones")),
+        ("Strombolis", ("stromboli", "strombolis")),
+        ("Sicilian Pizza", ("sicilian",)),
+        # “Specialty” / named pies
+        ("Specialty Pizzas", (
+            "meat lovers", "hawaiian", "margherita", "margarita", "veggie",
+            "veggie deluxe", "supreme", "buffalo chicken", "bbq chicken",
+            "white pizza",
+        )),
+        # By-the-slice / slice combos
+        ("Pizza By The Slice", ("slice", "slices", "by the slice")),
+    ],
+    "wings": [
+        ("Boneless Wings", ("boneless",)),
+        ("Bone-In Wings", ("bone in", "bone-in")),
+        ("Tenders & Nuggets", ("tenders", "tender", "nuggets")),
+    ],
+    "burger_sandwich": [
+        ("Burgers", ("burger", "cheeseburger")),
+        ("Wraps", ("wrap",)),
+        ("Subs & Grinders", ("sub", "grinder", "hoagie", "philly")),
+        ("Panini", ("panini",)),
+        ("Gyros & Pitas", ("gyro", "pita")),
+    ],
+    "salads": [
+        ("Garden Salads", ("garden",)),
+        ("Greek Salads", ("greek",)),
+        ("Caesar Salads", ("caesar",)),
+        ("Chef Salads", ("chef",)),
+        ("Antipasto Salads", ("antipasto",)),
+    ],
+    "sides_apps": [
+        ("Fries", ("fries",)),
+        ("Onion Rings", ("onion rings", "rings")),
+        ("Mozzarella Sticks", ("mozzarella sticks", "mozzarella stick", "cheese stick")),
+        ("Garlic Bread & Breadsticks", ("garlic bread", "cheesy bread", "breadsticks")),
+        ("Poppers", ("jalapeno popper", "jalapeño popper", "poppers")),
+        ("Meatballs", ("meatball", "meatballs")),
+    ],
+    "beverages": [
+        ("Bottled Drinks", ("bottle", "bottled")),
+        ("Canned Drinks", ("can", "cans")),
+        ("2-Liter Soda", ("2 liter", "2lt", "2ltr", "2-litre", "2-litter")),
+        ("Fountain Drinks", ("fountain", "refill")),
+        ("Coffee & Espresso", ("coffee", "espresso", "latte", "cappuccino")),
+        ("Tea & Lemonade", ("tea", "iced tea", "sweet tea")),
+    ],
+    # Fallback: simple calzone/stromboli/etc hints even if category is fuzzy
+    "fallback": [
+        ("Calzones", ("calzone", "calzones")),
+        ("Strombolis", ("stromboli", "strombolis")),
+    ],
+}
 
+_SUBCAT_MATCHER = KeywordAutomaton(
+    w for rules in _SUBCAT_RULES.values() for _, words in rules for w in words
+)
+
+
+def _first_subcat(family: str, name: str, desc: str) -> Optional[str]:
+    found = _SUBCAT_MATCHER.find(_lower(name + " " + desc))
+    if not found:
+        return None
+    for subcat, words in _SUBCAT_RULES[family]:
+        if any(w in found for w in words):
+            return subcat
     return None
 
 
+def _infer_pizza_subcat(name: str, desc: str) -> Optional[str]:
+    return _first_subcat("pizza", name, desc)
+
+
 def _infer_wings_subcat(name: str, desc: str) -> Optional[str]:
-    low = _lower(name + " " + desc)
-    if _has_word(low, "boneless"):
-        return "Boneless Wings"
-    if _has_word(low, "bone in", "bone-in"):
-        return "Bone-In Wings"
-    if _has_word(low, "tenders", "tender", "nuggets"):
-        return "Tenders & Nuggets"
-    return None
+    return _first_subcat("wings", name, desc)
 
 
 def _infer_burger_sandwich_subcat(name: str, desc: str) -> Optional[str]:
-    low = _lower(name + " " + desc)
-    if _has_word(low, "burger", "cheeseburger"):
-        return "Burgers"
-    if _has_word(low, "wrap"):
-        return "Wraps"
-    if _has_word(low, "sub", "grinder", "hoagie", "philly"):
-        return "Subs & Grinders"
-    if _has_word(low, "panini"):
-        return "Panini"
-    if _has_word(low, "gyro", "pita"):
-        return "Gyros & Pitas"
-    return None
+    return _first_subcat("burger_sandwich", name, desc)
 
 
 def _infer_salads_subcat(name: str, desc: str) -> Optional[str]:
-    low = _lower(name + " " + desc)
-    if _has_word(low, "garden"):
-        return "Garden Salads"
-    if _has_word(low, "greek"):
-        return "Greek Salads"
-    if _has_word(low, "caesar"):
-        return "Caesar Salads"
-    if _has_word(low, "chef"):
-        return "Chef Salads"
-    if _has_word(low, "antipasto"):
-        return "Antipasto Salads"
-    return None
+    return _first_subcat("salads", name, desc)
 
 
 def _infer_sides_apps_subcat(name: str, desc: str) -> Optional[str]:
-    low = _lower(name + " " + desc)
-    if _has_word(low, "fries"):
-        return "Fries"
-    if _has_word(low, "onion rings", "rings"):
-        return "Onion Rings"
-    if _has_word(low, "mozzarella sticks", "mozzarella stick", "cheese stick"):
-        return "Mozzarella Sticks"
-    if _has_word(low, "garlic bread", "cheesy bread", "breadsticks"):
-        return "Garlic Bread & Breadsticks"
-    if _has_word(low, "jalapeno popper", "jalapeño popper", "poppers"):
-        return "Poppers"
-    if _has_word(low, "meatball", "meatballs"):
-        return "Meatballs"
-    return None
+    return _first_subcat("sides_apps", name, desc)
 
 
 def _infer_beverages_subcat(name: str, desc: str) -> Optional[str]:
-    low = _lower(name + " " + desc)
-    if _has_word(low, "bottle", "bottled"):
-        return "Bottled Drinks"
-    if _has_word(low, "can", "cans"):
-        return "Canned Drinks"
-    if _has_word(low, "2 liter", "2lt", "2ltr", "2-litre", "2-litter"):
-        return "2-Liter Soda"
-    if _has_word(low, "fountain", "refill"):
-        return "Fountain Drinks"
-    if _has_word(low, "coffee", "espresso", "latte", "cappuccino"):
-        return "Coffee & Espresso"
-    if _has_word(low, "tea", "iced tea", "sweet tea"):
-        return "Tea & Lemonade"
-    return None
+    return _first_subcat("beverages", name, desc)
 
 
 def _infer_subcategory_for_item(item: Dict[str, Any]) -> Optional[str]:
@@ -297,13 +286,7 @@ def _infer_subcategory_for_item(item: Dict[str, Any]) -> Optional[str]:
         return _infer_beverages_subcat(name, desc)
 
     # Fallback: simple calzone/stromboli/etc hints even if category is fuzzy
-    low = _lower(name + " " + desc)
-    if _has_word(low, "calzone", "calzones"):
-        return "Calzones"
-    if _has_word(low, "stromboli", "strombolis"):
-        return "Strombolis"
-
-    return None
+    return _first_subcat("fallback", name, desc)
 
 
 # ---------------------------------------------------------------------------
@@ -0,0 +1,187 @@
+# storage/category_model.py
+"""
+Runtime inference for the trained category classifier — Day 162.
+
+storage/ml_train_category.py trains a TF-IDF + LogisticRegression bundle
+and saves it to storage/ml_models/category_clf.pkl.  This module is the
+runtime side: the bundle is loaded lazily once per process (shared by
+every caller, reloaded when the file changes) and a whole menu is scored
+in one batch — one vectorizer.transform and one predict_proba call for
+all texts, instead of per-item work.
+
+    model = get_category_model()          # None without a usable bundle
+    preds = model.predict(["Cheese Pizza", "Coke 2 Liter", "???"])
+    preds[0].category, preds[0].probability
+    # ("Pizza", 0.93)
+
+Trained labels (Pizzas, Subs, Appetizers, ...) are mapped onto the
+category_infer names (Pizza, Subs / Sandwiches, Sides / Appetizers, ...);
+probability mass of labels with no counterpart (Kids, Specials, ...) is
+dropped rather than guessed.  Probabilities come from the classifier's
+predict_proba (softmax of decision_function if it has none).
+
+The thresholds below assume calibrated probabilities.  Bundles trained
+with CalibratedClassifierCV say so ("calibrated": True); for any other
+bundle (older ones, the raw MultinomialNB fallback, which is badly
+overconfident) CategoryModel.calibrated is False and callers must not use
+MODEL_SKIP_LLM_PROBABILITY to skip a paid call.
+
+When the model file is missing, or scikit-learn / joblib cannot load it,
+get_category_model() returns None and callers keep their keyword path.
+
+Env:
+  SERVLINE_CATEGORY_MODEL — path of the bundle (default: ml_models/category_clf.pkl
+                            next to this file)
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import os
+import pickle
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+log = logging.getLogger(__name__)
+
+DEFAULT_MODEL_PATH = Path(__file__).resolve().parent / "ml_models" / "category_clf.pkl"
+
+# A model category at or above this probability replaces the keyword guess.
+MODEL_ACCEPT_PROBABILITY = 0.80
+# Stricter bar for skipping a paid LLM classification outright; only
+# applied when the model is calibrated.
+MODEL_SKIP_LLM_PROBABILITY = 0.90
+
+# ml_train_category.CANONICAL_CATEGORIES → category_infer.CATEGORY_KEYWORDS
+LABEL_TO_CATEGORY: Dict[str, Optional[str]] = {
+    "Pizzas": "Pizza",
+    "Burgers": "Burgers",
+    "Wings": "Wings",
+    "Subs": "Subs / Sandwiches",
+    "Sandwiches": "Subs / Sandwiches",
+    "Appetizers": "Sides / Appetizers",
+    "Sides": "Sides / Appetizers",
+    "Salads": "Salads",
+    "Pasta": "Pasta",
+    "Calzones": "Calzones / Stromboli",
+    "Desserts": "Desserts",
+    "Beverages": "Beverages",
+    "Kids": None,
+    "Breakfast": None,
+    "Specials": None,
+    "Seafood": None,
+}
+
+
+@dataclass
+class CategoryPrediction:
+    category: Optional[str]          # category_infer name, None if no call
+    probability: float               # 0.0–1.0
+    source: str                      # "model"
+    probabilities: Dict[str, float] = field(default_factory=dict)
+
+
+class CategoryModel:
+    """A loaded bundle (vectorizer + clf) that scores texts in batches."""
+
+    def __init__(self, bundle: Dict[str, Any]) -> None:
+        self.vectorizer = bundle["vectorizer"]
+        self.clf = bundle["clf"]
+        labels = getattr(self.clf, "classes_", None)
+        self.labels: List[str] = [str(x) for x in (labels if labels is not None else bundle["labels"])]
+        self.algo = bundle.get("algo", "")
+        # set by ml_train_category when the clf is a CalibratedClassifierCV
+        self.calibrated = bool(bundle.get("calibrated", False))
+
+    def _proba_rows(self, X: Any) -> List[Sequence[float]]:
+        if hasattr(self.clf, "predict_proba"):
+            return list(self.clf.predict_proba(X))
+        rows = []
+        for scores in self.clf.decision_function(X):
+            top = max(scores)
+            exps = [math.exp(s - top) for s in scores]
+            total = sum(exps)
+            rows.append([e / total for e in exps])
+        return rows
+
+    def predict(self, texts: Sequence[str]) -> List[CategoryPrediction]:
+        """Score every text in one vectorizer / classifier call."""
+        if not texts:
+            return []
+        X = self.vectorizer.transform([t or "" for t in texts])
+        out: List[CategoryPrediction] = []
+        for row in self._proba_rows(X):
+            probs: Dict[str, float] = {}
+            for label, p in zip(self.labels, row):
+                category = LABEL_TO_CATEGORY.get(label)
+                if category:
+                    probs[category] = probs.get(category, 0.0) + float(p)
+            if probs:
+                best = max(probs, key=lambda c: (probs[c], c))
+                out.append(CategoryPrediction(best, probs[best], "model", probs))
+            else:
+                out.append(CategoryPrediction(None, 0.0, "model", probs))
+        return out
+
+
+# ------------------------
+# Process-shared instance
+# ------------------------
+
+_model_lock = threading.Lock()
+# ((path, mtime), model) — mtime None means the file was missing.  One
+# tuple so the lock-free fast path never sees a key with another's model.
+_model_state: Tuple[Optional[Tuple[str, Optional[float]]], Optional[CategoryModel]] = (None, None)
+
+
+def model_path() -> Path:
+    return Path(os.getenv("SERVLINE_CATEGORY_MODEL") or DEFAULT_MODEL_PATH)
+
+
+def _load_bundle(path: Path) -> Dict[str, Any]:
+    try:
+        from joblib import load
+    except ImportError:
+        # joblib.dump output without numpy arrays is a plain pickle stream
+        with path.open("rb") as f:
+            return pickle.load(f)
+    return load(path)
+
+
+def get_category_model() -> Optional[CategoryModel]:
+    """The shared model, loaded on first use; None if unavailable."""
+    global _model_state
+    path = model_path()
+    try:
+        mtime: Optional[float] = path.stat().st_mtime
+    except OSError:
+        mtime = None
+    key = (str(path), mtime)
+    loaded_key, model = _model_state
+    if key == loaded_key:
+        return model
+    with _model_lock:
+        loaded_key, model = _model_state
+        if key != loaded_key:
+            model = None
+            if mtime is not None:
+                try:
+                    model = CategoryModel(_load_bundle(path))
+                    log.info("category_model: loaded %s (%s, %d labels, %s)",
+                             path, model.algo, len(model.labels),
+                             "calibrated" if model.calibrated else "uncalibrated")
+                except Exception as e:
+                    log.warning("category_model: could not load %s: %s", path, e)
+            _model_state = (key, model)
+        return model
+
+
+def reset_category_model() -> None:
+    """Forget the loaded model; the next call re-reads the file."""
+    global _model_state
+    with _model_lock:
+        _model_state = (None, None)
+
@@ -27,6 +27,13 @@ Day 65 additions: Cross-item variant pattern enforcement — detect
 variant count outliers, mismatched size label sets, and price step
 deviations within the same category.
 
+Day 163: the checks share one per-block feature record (normalised name,
+primary price, category, size variants) and one category aggregation
+(priced members, medians) instead of each re-walking the blocks.
+
+Day 164: category medians / MADs and the MAD outlier mask come from
+price_stats.PriceColumns (one columnar pass over every priced item).
+
 Entry function: check_cross_item_consistency(text_blocks)
 Mutates in place by appending to each item's price_flags list.
 
@@ -34,14 +41,16 @@ Pipeline placement: Step 9.1, after score_variant_confidence (Step 8.7).
 """
 from __future__ import annotations
 
+import math
 import re
 import statistics
 from collections import Counter
 from difflib import SequenceMatcher
 from typing import Any, Dict, List, Optional, Set, Tuple
 
-from .category_infer import CATEGORY_KEYWORDS, CATEGORY_PRICE_BANDS
+from .category_infer import CATEGORY_PRICE_BANDS, keyword_hit_counts
 from .parsers.size_vocab import size_ordinal, size_track
+from .price_stats import GroupPriceStats, PriceColumns
 
 # ---------------------------------------------------------------------------
 # Name extraction / normalisation helpers
@@ -78,6 +87,67 @@ def _name_similarity(a: str, b: str) -> float:
     return SequenceMatcher(None, a, b).ratio()
 
 
+# Day 157: candidate generation for the fuzzy pass.  SequenceMatcher's
+# ratio is 2*M / (len(a) + len(b)) with M matched characters, and M can
+# never exceed the multiset overlap O of the two names' characters (its
+# quick_ratio bound).  A pair reaching threshold t therefore has
+#   - 2*min(la, lb) >= t*(la + lb)                      (length filter)
+#   - O >= t*len(shorter) and O >= k*len(longer), k = t/(2 - t)
+# With characters as tokens (the n-th repeat of a letter is its own
+# token) sorted rarest first, the first shared token of such a pair lies
+# in both names' short prefixes, so indexing prefixes finds every pair
+# (prefix filtering); token positions bound the overlap still reachable
+# (positional filter).  The candidates are a lossless superset of the
+# pairs the all-pairs loop flagged, so the flags do not change.
+_FUZZY_EPS = 1e-9
+
+
+def _fuzzy_candidate_pairs(names: List[str]) -> List[Tuple[int, int]]:
+    """Sorted (i, j), i < j, of the names that can reach _FUZZY_THRESHOLD.
+
+    Every returned pair passes the character-overlap bound; the caller
+    still runs the exact similarity on each.
+    """
+    t = _FUZZY_THRESHOLD - _FUZZY_EPS
+    k = t / (2.0 - t)
+    tokens = [[(ch, r) for ch, c in Counter(n).items() for r in range(c)] for n in names]
+    df: Counter = Counter(tok for toks in tokens for tok in toks)
+    token_sets = [frozenset(toks) for toks in tokens]
+    lens = [len(n) for n in names]
+
+    index: Dict[Tuple[str, int], List[Tuple[int, int]]] = {}
+    pairs: List[Tuple[int, int]] = []
+    # shortest first: every indexed name is no longer than the probe
+    for i in sorted(range(len(names)), key=lambda p: (lens[p], p)):
+        li = lens[i]
+        ordered = sorted(tokens[i], key=lambda tok: (df[tok], tok))
+        probe_len = li - max(1, math.ceil(k * li - _FUZZY_EPS)) + 1
+        shared: Dict[int, int] = {}  # j -> shared prefix tokens so far (-1 = pruned)
+        for pi, tok in enumerate(ordered[:probe_len]):
+            for j, pj in index.get(tok, ()):
+                seen = shared.get(j, 0)
+                if seen < 0:
+                    continue
+                lj = lens[j]
+                if 2 * lj < t * (li + lj):
+                    shared[j] = -1
+                    continue
+                need = t * (li + lj) / 2.0
+                if seen + 1 + min(li - pi - 1, lj - pj - 1) < need:
+                    shared[j] = -1
+                    continue
+                shared[j] = seen + 1
+        for j, seen in shared.items():
+            if seen > 0 and 2 * len(token_sets[i] & token_sets[j]) >= t * (li + lens[j]):
+                pairs.append((min(i, j), max(i, j)))
+        # a later (no shorter) partner needs O >= t*li, so a shorter prefix suffices
+        index_len = li - max(1, math.ceil(t * li - _FUZZY_EPS)) + 1
+        for pi, tok in enumerate(ordered[:index_len]):
+            index.setdefault(tok, []).append((i, pi))
+    pairs.sort()
+    return pairs
+
+
 def _extract_item_name(tb: Dict[str, Any]) -> str:
     """Extract a comparable item name from a text_block or item dict.
 
@@ -162,11 +232,7 @@ def _keyword_match_count(norm_name: str, category: str) -> int:
     """
     if not norm_name:
         return 0
-    count = 0
-    for kw in CATEGORY_KEYWORDS.get(category, ()):
-        if kw in norm_name:
-            count += 1
-    return count
+    return keyword_hit_counts(norm_name).get(category, 0)
 
 
 def _in_price_band(price_cents: int, category: str) -> bool:
@@ -180,24 +246,92 @@ def _in_price_band(price_cents: int, category: str) -> bool:
     return lo <= price_cents <= hi
 
 
+# ---------------------------------------------------------------------------
+# Day 163: shared per-block features + one category aggregation
+# ---------------------------------------------------------------------------
+# Every check used to walk the blocks again and re-derive the same values:
+# names extracted and normalised twice, the primary price parsed four
+# times, category medians computed twice.  check_cross_item_consistency
+# now builds one _MenuFeatures and hands it to every check; a check called
+# on its own builds it itself.  The checks only append to price_flags, so
+# features taken before the first check stay valid for the last.
+
+class _BlockFeatures:
+    """What the checks read from one block, extracted once."""
+
+    __slots__ = ("category", "raw_name", "norm_name", "price_cents", "variants", "sized")
+
+    def __init__(self, tb: Dict[str, Any]) -> None:
+        self.category: Optional[str] = tb.get("category")
+        self.raw_name = _extract_item_name(tb)
+        self.norm_name = _normalize_name(self.raw_name) if self.raw_name else ""
+        self.price_cents = _extract_primary_price_cents(tb)
+        self.variants: List[Dict[str, Any]] = tb.get("variants") or []
+        # size variants with an ordinal, a track and a positive price:
+        # (ordinal, price_cents, track)
+        self.sized: List[Tuple[int, int, str]] = []
+        for v in self.variants:
+            if v.get("kind") != "size":
+                continue
+            ns = v.get("normalized_size")
+            if not ns:
+                continue
+            pc = v.get("price_cents", 0)
+            if not isinstance(pc, (int, float)) or pc <= 0:
+                continue
+            ordinal = size_ordinal(ns)
+            if ordinal is None:
+                continue
+            trk = size_track(ns)
+            if not trk:
+                continue
+            self.sized.append((ordinal, int(pc), trk))
+
+
+class _MenuFeatures:
+    """Per-block features plus category price groups and their statistics."""
+
+    __slots__ = ("blocks", "categories", "priced_by_category", "priced_idx",
+                 "price_columns", "category_stats", "category_medians")
+
+    def __init__(self, text_blocks: List[Dict[str, Any]]) -> None:
+        self.blocks = [_BlockFeatures(tb) for tb in text_blocks]
+        self.categories: List[Optional[str]] = [f.category for f in self.blocks]
+        # cat -> [(idx, price_cents)] for priced items, in menu order
+        self.priced_by_category: Dict[str, List[Tuple[int, int]]] = {}
+        self.priced_idx: List[int] = []
+        for idx, f in enumerate(self.blocks):
+            if f.category and f.price_cents > 0:
+                self.priced_by_category.setdefault(f.category, []).append((idx, f.price_cents))
+                self.priced_idx.append(idx)
+        # Day 164: priced items as (category, price) columns, in menu order;
+        # every category's median / MAD comes from one columnar pass
+        self.price_columns = PriceColumns(
+            [self.blocks[idx].category for idx in self.priced_idx],
+            [self.blocks[idx].price_cents for idx in self.priced_idx],
+        )
+        self.category_stats: Dict[str, GroupPriceStats] = self.price_columns.stats
+        self.category_medians: Dict[str, float] = {
+            cat: st.median for cat, st in self.category_stats.items()
+        }
+
+
 # ---------------------------------------------------------------------------
 # Check 1: Duplicate / near-duplicate name detection
 # ---------------------------------------------------------------------------
 
-def _check_duplicate_names(text_blocks: List[Dict[str, Any]]) -> None:
+def _check_duplicate_names(
+    text_blocks: List[Dict[str, Any]], features: Optional[_MenuFeatures] = None,
+) -> None:
     """Flag items with duplicate normalised names (exact + fuzzy)."""
+    features = features or _MenuFeatures(text_blocks)
 
     # --- Phase 1: collect normalised names ---
     items: List[Tuple[int, str, int]] = []  # (idx, norm_name, price)
-    for idx, tb in enumerate(text_blocks):
-        raw_name = _extract_item_name(tb)
-        if not raw_name or len(raw_name) < 3:
-            continue
-        norm = _normalize_name(raw_name)
-        if not norm:
+    for idx, f in enumerate(features.blocks):
+        if not f.raw_name or len(f.raw_name) < 3 or not f.norm_name:
             continue
-        price = _extract_primary_price_cents(tb)
-        items.append((idx, norm, price))
+        items.append((idx, f.norm_name, f.price_cents))
 
     # --- Phase 2: exact matching (unchanged from Day 61) ---
     name_groups: Dict[str, List[Tuple[int, int]]] = {}
@@ -251,130 +385,122 @@ def _check_duplicate_names(text_blocks: List[Dict[str, Any]]) -> None:
     # Track which (i, j) pairs already fuzzy-flagged to avoid double-flagging
     fuzzy_flagged: Set[Tuple[int, int]] = set()
 
-    for a_pos in range(len(fuzzy_candidates)):
+    # Day 157: only pairs that can reach the threshold are compared, in the
+    # same (a_pos, b_pos) order the all-pairs loop used
+    candidate_pairs = _fuzzy_candidate_pairs([c[1] for c in fuzzy_candidates])
+    for a_pos, b_pos in candidate_pairs:
         a_idx, a_norm, a_price, a_group = fuzzy_candidates[a_pos]
-        for b_pos in range(a_pos + 1, len(fuzzy_candidates)):
-            b_idx, b_norm, b_price, b_group = fuzzy_candidates[b_pos]
-
-            # Skip if same exact group (already flagged)
-            if a_group == b_group:
-                continue
+        b_idx, b_norm, b_price, b_group = fuzzy_candidates[b_pos]
+        # Skip if same exact group (already flagged)
+        if a_group == b_group:
+            continue
 
-            # Skip if names are identical (should be same group, but defensive)
-            if a_norm == b_norm:
-                continue
+        # Skip if names are identical (should be same group, but defensive)
+        if a_norm == b_norm:
+            continue
 
-            sim = _name_similarity(a_norm, b_norm)
-            if sim < _FUZZY_THRESHOLD:
-                continue
+        sim = _name_similarity(a_norm, b_norm)
+        if sim < _FUZZY_THRESHOLD:
+            continue
 
-            # Avoid double-flagging the same pair
-            pair_key = (min(a_idx, b_idx), max(a_idx, b_idx))
-            if pair_key in fuzzy_flagged:
-                continue
-            fuzzy_flagged.add(pair_key)
+        # Avoid double-flagging the same pair
+        pair_key = (min(a_idx, b_idx), max(a_idx, b_idx))
+        if pair_key in fuzzy_flagged:
+            continue
+        fuzzy_flagged.add(pair_key)
 
-            same_price = a_price == b_price
-            if same_price:
-                reason = "cross_item_fuzzy_exact_duplicate"
-                severity = "info"
-            else:
-                reason = "cross_item_fuzzy_duplicate"
-                severity = "warn"
+        same_price = a_price == b_price
+        if same_price:
+            reason = "cross_item_fuzzy_exact_duplicate"
+            severity = "info"
+        else:
+            reason = "cross_item_fuzzy_duplicate"
+            severity = "warn"
 
-            text_blocks[a_idx]["price_flags"].append({
-                "severity": severity,
-                "reason": reason,
-                "details": {
-                    "this_name": a_norm,
-                    "matched_name": b_norm,
-                    "similarity": round(sim, 3),
-                    "this_price_cents": a_price,
-                    "matched_price_cents": b_price,
-                    "matched_index": b_idx,
-                },
-            })
-            text_blocks[b_idx]["price_flags"].append({
-                "severity": severity,
-                "reason": reason,
-                "details": {
-                    "this_name": b_norm,
-                    "matched_name": a_norm,
-                    "similarity": round(sim, 3),
-                    "this_price_cents": b_price,
-                    "matched_price_cents": a_price,
-                    "matched_index": a_idx,
-                },
-            })
+        text_blocks[a_idx]["price_flags"].append({
+            "severity": severity,
+            "reason": reason,
+            "details": {
+                "this_name": a_norm,
+                "matched_name": b_norm,
+                "similarity": round(sim, 3),
+                "this_price_cents": a_price,
+                "matched_price_cents": b_price,
+                "matched_index": b_idx,
+            },
+        })
+        text_blocks[b_idx]["price_flags"].append({
+            "severity": severity,
+            "reason": reason,
+            "details": {
+                "this_name": b_norm,
+                "matched_name": a_norm,
+                "similarity": round(sim, 3),
+                "this_price_cents": b_price,
+                "matched_price_cents": a_price,
+                "matched_index": a_idx,
+            },
+        })
 
 
 # ---------------------------------------------------------------------------
 # Check 2: Category price outlier detection (IQR-based)
 # ---------------------------------------------------------------------------
 
-def _check_category_price_outliers(text_blocks: List[Dict[str, Any]]) -> None:
+def _check_category_price_outliers(
+    text_blocks: List[Dict[str, Any]], features: Optional[_MenuFeatures] = None,
+) -> None:
     """Flag items whose price is a statistical outlier within their category.
 
     Uses MAD (median absolute deviation) which is robust to outliers —
     unlike IQR, a single extreme value does not corrupt the threshold.
     Threshold: 3 × MAD_effective, where MAD_effective = max(MAD, 10% of median).
     """
-    cat_groups: Dict[str, List[Tuple[int, int]]] = {}
+    features = features or _MenuFeatures(text_blocks)
 
-    for idx, tb in enumerate(text_blocks):
-        cat = tb.get("category")
-        if not cat:
-            continue
-        price = _extract_primary_price_cents(tb)
-        if price <= 0:
-            continue
-        cat_groups.setdefault(cat, []).append((idx, price))
-
-    for cat, members in cat_groups.items():
-        if len(members) < 3:
-            continue
+    # MAD with a floor of 10% of median (avoids zero-MAD on identical prices)
+    outliers = features.price_columns.mad_outlier_mask(k=3.0, floor_ratio=0.10, min_count=3)
 
-        prices = [p for (_, p) in members]
-        median_price = statistics.median(prices)
-        if median_price <= 0:
+    for idx, is_outlier in zip(features.priced_idx, outliers):
+        if not is_outlier:
             continue
-
-        # MAD with a floor of 10% of median (avoids zero-MAD on identical prices)
-        deviations = [abs(p - median_price) for p in prices]
-        mad = statistics.median(deviations)
-        mad_effective = max(mad, median_price * 0.10)
-        threshold = 3.0 * mad_effective
-
-        for (idx, price) in members:
-            deviation = abs(price - median_price)
-            if deviation > threshold:
-                direction = "above" if price > median_price else "below"
-                text_blocks[idx]["price_flags"].append({
-                    "severity": "warn",
-                    "reason": "cross_item_category_price_outlier",
-                    "details": {
-                        "category": cat,
-                        "item_price_cents": price,
-                        "category_median_cents": int(median_price),
-                        "category_mad_cents": int(mad),
-                        "deviation_cents": int(deviation),
-                        "threshold_cents": int(threshold),
-                        "direction": direction,
-                        "category_item_count": len(members),
-                    },
-                })
+        cat = features.categories[idx]
+        price = features.blocks[idx].price_cents
+        stats = features.category_stats[cat]
+        median_price, mad = stats.median, stats.mad
+        threshold = 3.0 * max(mad, median_price * 0.10)
+        deviation = abs(price - median_price)
+        direction = "above" if price > median_price else "below"
+        text_blocks[idx]["price_flags"].append({
+            "severity": "warn",
+            "reason": "cross_item_category_price_outlier",
+            "details": {
+                "category": cat,
+                "item_price_cents": price,
+                "category_median_cents": int(median_price),
+                "category_mad_cents": int(mad),
+                "deviation_cents": int(deviation),
+                "threshold_cents": int(threshold),
+                "direction": direction,
+                "category_item_count": stats.count,
+            },
+        })
 
 
 # ---------------------------------------------------------------------------
 # Check 3: Category isolation detection
 # ---------------------------------------------------------------------------
 
-def _check_category_isolation(text_blocks: List[Dict[str, Any]]) -> None:
+def _check_category_isolation(
+    text_blocks: List[Dict[str, Any]], features: Optional[_MenuFeatures] = None,
+) -> None:
     """Flag items whose category differs from all nearby neighbours."""
+    features = features or _MenuFeatures(text_blocks)
+    categories = features.categories
     n = len(text_blocks)
 
     for idx, tb in enumerate(text_blocks):
-        cat = tb.get("category")
+        cat = categories[idx]
         if not cat:
             continue
 
@@ -382,7 +508,7 @@ def _check_category_isolation(text_blocks: List[Dict[str, Any]]) -> None:
         for offset in (-2, -1, 1, 2):
             ni = idx + offset
             if 0 <= ni < n:
-                nc = text_blocks[ni].get("category")
+                nc = categories[ni]
                 if nc:
                     neighbor_cats.append(nc)
 
@@ -407,7 +533,9 @@ def _check_category_isolation(text_blocks: List[Dict[str, Any]]) -> None:
 # Check 4: Category reassignment suggestions (Day 63)
 # ---------------------------------------------------------------------------
 
-def _check_category_suggestions(text_blocks: List[Dict[str, Any]]) -> None:
+def _check_category_suggestions(
+    text_blocks: List[Dict[str, Any]], features: Optional[_MenuFeatures] = None,
+) -> None:
     """Suggest category reassignment based on multi-signal scoring.
 
     Signals:
@@ -420,10 +548,12 @@ def _check_category_suggestions(text_blocks: List[Dict[str, Any]]) -> None:
     Keyword guard: if the current category has >= 2 keyword matches in the
     item name, suppress the suggestion (item is likely correctly categorized).
     """
+    features = features or _MenuFeatures(text_blocks)
+    categories = features.categories
     n = len(text_blocks)
 
     for idx, tb in enumerate(text_blocks):
-        current_cat = tb.get("category")
+        current_cat = categories[idx]
         if not current_cat:
             continue
 
@@ -434,7 +564,7 @@ def _check_category_suggestions(text_blocks: List[Dict[str, Any]]) -> None:
                 continue
             ni = idx + offset
             if 0 <= ni < n:
-                nc = text_blocks[ni].get("category")
+                nc = categories[ni]
                 if nc:
                     neighbor_cats.append(nc)
 
@@ -452,8 +582,7 @@ def _check_category_suggestions(text_blocks: List[Dict[str, Any]]) -> None:
             continue
 
         # --- Keyword guard ---
-        raw_name = _extract_item_name(tb)
-        norm_name = _normalize_name(raw_name).lower() if raw_name else ""
+        norm_name = features.blocks[idx].norm_name
 
         current_kw_count = _keyword_match_count(norm_name, current_cat)
         if current_kw_count >= _SUGGESTION_KEYWORD_GUARD:
@@ -470,7 +599,7 @@ def _check_category_suggestions(text_blocks: List[Dict[str, Any]]) -> None:
             keyword_delta = 0.0
 
         # --- Signal 3: Price band fit ---
-        price_cents = _extract_primary_price_cents(tb)
+        price_cents = features.blocks[idx].price_cents
         price_band_delta = 0.0
         if price_cents > 0:
             fits_current = _in_price_band(price_cents, current_cat)
@@ -572,7 +701,9 @@ _CROSS_CAT_MIN_ITEMS = 2       # Need >= 2 items per category to compute median
 _CROSS_CAT_MIN_GAP_RATIO = 1.3  # Medians must differ by 30%+ to activate rule
 
 
-def _check_cross_category_coherence(text_blocks: List[Dict[str, Any]]) -> None:
+def _check_cross_category_coherence(
+    text_blocks: List[Dict[str, Any]], features: Optional[_MenuFeatures] = None,
+) -> None:
     """Flag items whose price violates cross-category ordering expectations.
 
     For each (cheap_cat, expensive_cat) rule:
@@ -585,23 +716,14 @@ def _check_cross_category_coherence(text_blocks: List[Dict[str, Any]]) -> None:
       - Each item gets at most one "above" flag and one "below" flag (most
         dramatic violation kept).
     """
-    # --- Step 1: Group items by category with prices ---
-    cat_items: Dict[str, List[Tuple[int, int]]] = {}  # cat -> [(idx, price_cents)]
-    for idx, tb in enumerate(text_blocks):
-        cat = tb.get("category")
-        if not cat:
-            continue
-        price = _extract_primary_price_cents(tb)
-        if price <= 0:
-            continue
-        cat_items.setdefault(cat, []).append((idx, price))
-
-    # --- Step 2: Compute per-category medians ---
-    cat_medians: Dict[str, float] = {}
-    for cat, members in cat_items.items():
-        if len(members) >= _CROSS_CAT_MIN_ITEMS:
-            prices = [p for (_, p) in members]
-            cat_medians[cat] = statistics.median(prices)
+    # --- Steps 1-2: priced items per category + medians (shared features) ---
+    features = features or _MenuFeatures(text_blocks)
+    cat_items = features.priced_by_category  # cat -> [(idx, price_cents)]
+    cat_medians: Dict[str, float] = {
+        cat: features.category_medians[cat]
+        for cat, members in cat_items.items()
+        if len(members) >= _CROSS_CAT_MIN_ITEMS
+    }
 
     # --- Step 3: Collect potential flags per item ---
     # For each item, keep only the most dramatic violation (largest gap).
@@ -668,7 +790,9 @@ def _check_cross_category_coherence(text_blocks: List[Dict[str, Any]]) -> None:
 # Check 6: Cross-item variant count consistency (Day 65)
 # ---------------------------------------------------------------------------
 
-def _check_variant_count_consistency(text_blocks: List[Dict[str, Any]]) -> None:
+def _check_variant_count_consistency(
+    text_blocks: List[Dict[str, Any]], features: Optional[_MenuFeatures] = None,
+) -> None:
     """Flag items whose variant count deviates from the category mode.
 
     Within each category, compute the MODE variant count among items with
@@ -676,13 +800,14 @@ def _check_variant_count_consistency(text_blocks: List[Dict[str, Any]]) -> None:
 
     Items with 0-1 variants (single-price) are excluded entirely.
     """
+    features = features or _MenuFeatures(text_blocks)
     cat_groups: Dict[str, List[Tuple[int, int]]] = {}  # cat -> [(idx, var_count)]
 
-    for idx, tb in enumerate(text_blocks):
-        cat = tb.get("category")
+    for idx, f in enumerate(features.blocks):
+        cat = f.category
         if not cat:
             continue
-        variants = tb.get("variants") or []
+        variants = f.variants
         if len(variants) < 2:
             continue
         cat_groups.setdefault(cat, []).append((idx, len(variants)))
@@ -713,7 +838,9 @@ def _check_variant_count_consistency(text_blocks: List[Dict[str, Any]]) -> None:
 # Check 7: Cross-item variant label set consistency (Day 65)
 # ---------------------------------------------------------------------------
 
-def _check_variant_label_consistency(text_blocks: List[Dict[str, Any]]) -> None:
+def _check_variant_label_consistency(
+    text_blocks: List[Dict[str, Any]], features: Optional[_MenuFeatures] = None,
+) -> None:
     """Flag items whose size-variant label set differs from the category norm.
 
     Within each category, collect the sorted tuple of ``normalized_size``
@@ -721,15 +848,15 @@ def _check_variant_label_consistency(text_blocks: List[Dict[str, Any]]) -> None:
     agreement).  Flag items using a non-dominant set that is neither a subset
     (gourmet right-alignment tolerance) nor a superset (extra sizes OK).
     """
+    features = features or _MenuFeatures(text_blocks)
     cat_groups: Dict[str, List[Tuple[int, frozenset]]] = {}
 
-    for idx, tb in enumerate(text_blocks):
-        cat = tb.get("category")
+    for idx, f in enumerate(features.blocks):
+        cat = f.category
         if not cat:
             continue
-        variants = tb.get("variants") or []
         size_labels: Set[str] = set()
-        for v in variants:
+        for v in f.variants:
             if v.get("kind") == "size" and v.get("normalized_size"):
                 size_labels.add(v["normalized_size"])
         if len(size_labels) < 2:
@@ -773,7 +900,9 @@ def _check_variant_label_consistency(text_blocks: List[Dict[str, Any]]) -> None:
 # Check 8: Cross-item price step consistency (Day 65)
 # ---------------------------------------------------------------------------
 
-def _check_variant_price_steps(text_blocks: List[Dict[str, Any]]) -> None:
+def _check_variant_price_steps(
+    text_blocks: List[Dict[str, Any]], features: Optional[_MenuFeatures] = None,
+) -> None:
     """Flag items whose size-variant price step deviates from the category norm.
 
     Within each category, compute per-item average price step between
@@ -781,34 +910,17 @@ def _check_variant_price_steps(text_blocks: List[Dict[str, Any]]) -> None:
     detection to flag items whose average step is significantly different.
     Only positive steps are considered (inversions already flagged Day 57).
     """
+    features = features or _MenuFeatures(text_blocks)
     # cat -> [(idx, avg_step_cents)]
     cat_steps: Dict[str, List[Tuple[int, float]]] = {}
 
-    for idx, tb in enumerate(text_blocks):
-        cat = tb.get("category")
+    for idx, f in enumerate(features.blocks):
+        cat = f.category
         if not cat:
             continue
-        variants = tb.get("variants") or []
-
-        # Collect size variants with valid ordinal and positive price
-        sized: List[Tuple[int, int, str]] = []  # (ordinal, price_cents, track)
-        for v in variants:
-            if v.get("kind") != "size":
-                continue
-            ns = v.get("normalized_size")
-            if not ns:
-                continue
-            pc = v.get("price_cents", 0)
-            if not isinstance(pc, (int, float)) or pc <= 0:
-                continue
-            ordinal = size_ordinal(ns)
-            if ordinal is None:
-                continue
-            trk = size_track(ns)
-            if not trk:
-                continue
-            sized.append((ordinal, int(pc), trk))
 
+        # Size variants with valid ordinal and positive price
+        sized = f.sized  # (ordinal, price_cents, track)
         if len(sized) < 2:
             continue
 
@@ -883,11 +995,13 @@ def check_cross_item_consistency(text_blocks: List[Dict[str, Any]]) -> None:
     for tb in text_blocks:
         tb.setdefault("price_flags", [])
 
-    _check_duplicate_names(text_blocks)
-    _check_category_price_outliers(text_blocks)
-    _check_category_isolation(text_blocks)
-    _check_category_suggestions(text_blocks)
-    _check_cross_category_coherence(text_blocks)
-    _check_variant_count_consistency(text_blocks)
-    _check_variant_label_consistency(text_blocks)
-    _check_variant_price_steps(text_blocks)
+    # Day 163: one feature walk + one category aggregation for all checks
+    features = _MenuFeatures(text_blocks)
+    _check_duplicate_names(text_blocks, features)
+    _check_category_price_outliers(text_blocks, features)
+    _check_category_isolation(text_blocks, features)
+    _check_category_suggestions(text_blocks, features)
+    _check_cross_category_coherence(text_blocks, features)
+    _check_variant_count_consistency(text_blocks, features)
+    _check_variant_label_consistency(text_blocks, features)
+    _check_variant_price_steps(text_blocks, features)
@@ -0,0 +1,278 @@
+# storage/db_pool.py
+"""
+Pooled SQLite connections — Day 147.
+
+Every storage module used to open a brand-new sqlite3.connect(DB_PATH) per
+function call, in the default rollback-journal mode, so a background
+import writing items blocked every editor read for the length of its
+transaction.  This module is the single connection layer they all share:
+
+  - WAL journal: readers never wait on the writer (and vice versa)
+  - tuned pragmas applied once per physical connection
+    (synchronous=NORMAL, busy_timeout, cache_size, mmap_size, temp_store)
+  - per-thread pooling keyed by database path: sqlite3 connections stay
+    bound to their thread, and each reused connection keeps its prepared
+    statement cache (cached_statements) warm across calls
+  - PooledConnection: `with conn:` commits/rolls back as before, then
+    hands the connection back to the pool; close() does the same
+
+Existing call sites keep their shape:
+
+    with db_connect() as conn:          # drafts/menus/users/... helpers
+        conn.execute(...)
+
+New code can use the explicit context manager:
+
+    from storage import db_pool
+    with db_pool.connection(DB_PATH) as conn:
+        ...
+
+A nested checkout on the same thread gets a different connection, so an
+inner helper's commit never commits the caller's half-done transaction.
+
+Env:
+  SERVLINE_DB_POOL=0   disable reuse (fresh connection per call, pragmas
+                       still applied) — for A/B benchmarks
+"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+# ---------------------------------------------------------------------------
+# Tuning
+# ---------------------------------------------------------------------------
+BUSY_TIMEOUT_MS = 5000          # same wait sqlite3.connect() defaulted to
+STATEMENT_CACHE_SIZE = 256      # per connection (sqlite3 default: 128)
+CACHE_SIZE_KIB = 16 * 1024      # page cache per connection
+MMAP_SIZE = 128 * 1024 * 1024
+
+PRAGMAS: Tuple[Tuple[str, Any], ...] = (
+    ("journal_mode", "WAL"),
+    ("synchronous", "NORMAL"),   # safe with WAL: only the last txn is at risk on power loss
+    ("busy_timeout", BUSY_TIMEOUT_MS),
+    ("cache_size", -CACHE_SIZE_KIB),
+    ("mmap_size", MMAP_SIZE),
+    ("temp_store", "MEMORY"),
+)
+
+MAX_IDLE_PER_PATH = 4           # idle connections kept per (thread, path)
+MAX_PATHS_PER_THREAD = 8        # tests point DB_PATH at many tmp files
+
+PathLike = Union[str, "os.PathLike[str]"]
+
+
+def _pool_enabled() -> bool:
+    return os.getenv("SERVLINE_DB_POOL", "1").strip().lower() not in ("0", "false", "no")
+
+
+# ---------------------------------------------------------------------------
+# Connection class
+# ---------------------------------------------------------------------------
+class PooledConnection(sqlite3.Connection):
+    """sqlite3.Connection that returns itself to the pool instead of closing."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._pool_key: Optional[str] = None
+        self._pool_generation = _STATE["generation"]
+        self._pool_pid = os.getpid()
+        self._file_id: Optional[Tuple[int, int]] = None
+        self._foreign_keys: Optional[bool] = None
+        self._checked_out = False
+        self._changes_at_checkout = 0
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            return super().__exit__(exc_type, exc, tb)
+        finally:
+            _release(self)
+
+    def close(self) -> None:
+        if self._pool_key is None:
+            super().close()
+        else:
+            _release(self)
+
+    def _close_for_real(self) -> None:
+        try:
+            sqlite3.Connection.close(self)
+        except Exception:
+            pass
+
+
+# ---------------------------------------------------------------------------
+# Pool state
+# ---------------------------------------------------------------------------
+_STATE: Dict[str, int] = {"generation": 0, "opened": 0, "reused": 0, "writes": 0}
+_STATE_LOCK = threading.Lock()
+_local = threading.local()
+
+
+def _idle() -> "OrderedDict[str, List[PooledConnection]]":
+    pid = os.getpid()
+    if getattr(_local, "pid", None) != pid:
+        # Fresh thread, or a forked child that inherited the parent's
+        # thread-local: never touch inherited sqlite handles.
+        _local.pid = pid
+        _local.idle = OrderedDict()
+    return _local.idle
+
+
+def _file_id(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_dev, st.st_ino)
+
+
+def _poolable(key: str) -> bool:
+    return _pool_enabled() and key != ":memory:" and key != "" and not key.startswith("file:")
+
+
+def _apply_pragmas(conn: sqlite3.Connection) -> None:
+    for name, value in PRAGMAS:
+        try:
+            conn.execute(f"PRAGMA {name} = {value}")
+        except sqlite3.DatabaseError:
+            # e.g. WAL on a read-only or network filesystem — keep defaults
+            pass
+
+
+def _open(key: str) -> PooledConnection:
+    conn = sqlite3.connect(
+        key,
+        factory=PooledConnection,
+        timeout=BUSY_TIMEOUT_MS / 1000.0,
+        cached_statements=STATEMENT_CACHE_SIZE,
+    )
+    _apply_pragmas(conn)
+    with _STATE_LOCK:
+        _STATE["opened"] += 1
+    return conn  # type: ignore[return-value]
+
+
+def _usable(conn: PooledConnection, key: str) -> bool:
+    return (conn._pool_generation == _STATE["generation"]
+            and conn._pool_pid == os.getpid()
+            and conn._file_id is not None
+            and conn._file_id == _file_id(key))
+
+
+def connect(path: PathLike, *, foreign_keys: bool = True) -> PooledConnection:
+    """Check out a connection to *path* for the current thread.
+
+    Rows come back as sqlite3.Row.  Hand it back with `with conn:` (commit
+    or rollback, then release) or conn.close() (rollback, then release).
+    """
+    key = os.fspath(path)
+    conn: Optional[PooledConnection] = None
+    if _poolable(key):
+        idle = _idle()
+        stack = idle.get(key)
+        while stack:
+            cand = stack.pop()
+            if _usable(cand, key):
+                conn = cand
+                break
+            cand._close_for_real()
+        if conn is not None:
+            idle.move_to_end(key)
+            with _STATE_LOCK:
+                _STATE["reused"] += 1
+            if conn.in_transaction:
+                conn.rollback()
+        else:
+            conn = _open(key)
+            conn._pool_key = key
+            conn._file_id = _file_id(key)
+    else:
+        conn = _open(key)
+
+    conn._checked_out = True
+    conn._changes_at_checkout = conn.total_changes
+    conn.row_factory = sqlite3.Row
+    if conn._foreign_keys is not foreign_keys:
+        conn.execute(f"PRAGMA foreign_keys = {'ON' if foreign_keys else 'OFF'};")
+        conn._foreign_keys = foreign_keys
+    return conn
+
+
+def _release(conn: PooledConnection) -> None:
+    if not conn._checked_out:
+        return
+    conn._checked_out = False
+    try:
+        if conn.total_changes != conn._changes_at_checkout:
+            with _STATE_LOCK:
+                _STATE["writes"] += 1
+    except sqlite3.Error:
+        pass
+    key = conn._pool_key
+    if key is None:
+        return
+    try:
+        if conn.in_transaction:
+            conn.rollback()
+    except sqlite3.Error:
+        conn._close_for_real()
+        return
+    if not _usable(conn, key):
+        conn._close_for_real()
+        return
+    idle = _idle()
+    stack = idle.setdefault(key, [])
+    idle.move_to_end(key)
+    if len(stack) >= MAX_IDLE_PER_PATH:
+        conn._close_for_real()
+        return
+    stack.append(conn)
+    while len(idle) > MAX_PATHS_PER_THREAD:
+        _old_key, old = idle.popitem(last=False)
+        for c in old:
+            c._close_for_real()
+
+
+@contextmanager
+def connection(path: PathLike, *, foreign_keys: bool = True) -> Iterator[PooledConnection]:
+    """Checked-out connection for one unit of work: commit on success,
+    rollback on error, always returned to the pool."""
+    conn = connect(path, foreign_keys=foreign_keys)
+    with conn:
+        yield conn
+
+
+def close_all() -> None:
+    """Close this thread's idle connections and retire every other pooled
+    connection (they close on their next release).  For tests, and before
+    replacing the database file out from under running code."""
+    with _STATE_LOCK:
+        _STATE["generation"] += 1
+    idle = _idle()
+    for stack in idle.values():
+        for c in stack:
+            c._close_for_real()
+    idle.clear()
+
+
+def write_generation() -> int:
+    """Day 153: bumped whenever a checked-out connection modified rows.
+
+    Changes only after a write in this process; request-scoped read memos
+    (storage/drafts.py) compare it instead of asking the database.
+    """
+    return _STATE["writes"]
+
+
+def stats() -> Dict[str, int]:
+    """Counters for benchmarks: physical opens vs. pooled reuses."""
+    with _STATE_LOCK:
+        out = dict(_STATE)
+    out["idle_here"] = sum(len(s) for s in _idle().values())
+    return out
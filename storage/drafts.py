@@ -3,16 +3,25 @@ from __future__ import annotations
 import hashlib
 import hmac
 import json
+import os
 import secrets
 import sqlite3
+import struct
 import threading
 import urllib.error
 import urllib.request
+import zlib
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
 from pathlib import Path
 from datetime import datetime
-from typing import Any, Dict, Iterable, List, Optional, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 import re
 
+from . import db_pool
+from . import export_cache
+from . import migrate
 from .import_jobs import (
     get_import_job,
     rebuild_structured_items_from_header_map,
@@ -137,10 +146,8 @@ _DEBUG_BASE.mkdir(parents=True, exist_ok=True)
 
 
 def db_connect() -> sqlite3.Connection:
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA foreign_keys = ON;")
-    return conn
+    # Day 147: pooled per-thread WAL connection (see storage/db_pool.py)
+    return db_pool.connect(DB_PATH)
 
 
 def _now() -> str:
@@ -148,12 +155,52 @@ def _now() -> str:
 
 
 def _debug_path(draft_id: int) -> Path:
+    """Legacy (pre-Day-152) plain-JSON sidecar; still read, no longer written."""
     return _DEBUG_BASE / f"{int(draft_id)}.json"
 
 
+def _debug_pack_path(draft_id: int) -> Path:
+    return _DEBUG_BASE / f"{int(draft_id)}.dbg"
+
+
 # ------------------------------------------------------------
 # Schema (idempotent; safe with external schema.sql + migrate)
 # ------------------------------------------------------------
+# Day 153: each bump moves the revision to a fresh random value rather
+# than +1, so a recreated database file never repeats a (draft, rev) pair
+# the item cache may still hold.
+_REVISION_BUMP_SQL = (
+    "INSERT INTO draft_revisions (draft_id, rev) "
+    "SELECT {draft_expr}, random() WHERE {draft_expr} IS NOT NULL "
+    "ON CONFLICT(draft_id) DO UPDATE SET rev = excluded.rev;"
+)
+_ITEM_DRAFT = "(SELECT draft_id FROM draft_items WHERE id = {row}.item_id)"
+# (trigger name, trigger event, draft id expression)
+_REVISION_TRIGGERS: Tuple[Tuple[str, str, str], ...] = (
+    ("trg_rev_items_ins", "AFTER INSERT ON draft_items", "NEW.draft_id"),
+    ("trg_rev_items_upd", "AFTER UPDATE ON draft_items", "NEW.draft_id"),
+    ("trg_rev_items_move", "AFTER UPDATE ON draft_items "
+     "WHEN OLD.draft_id IS NOT NEW.draft_id", "OLD.draft_id"),
+    ("trg_rev_items_del", "AFTER DELETE ON draft_items", "OLD.draft_id"),
+    ("trg_rev_variants_ins", "AFTER INSERT ON draft_item_variants",
+     _ITEM_DRAFT.format(row="NEW")),
+    ("trg_rev_variants_upd", "AFTER UPDATE ON draft_item_variants",
+     _ITEM_DRAFT.format(row="NEW")),
+    ("trg_rev_variants_move", "AFTER UPDATE ON draft_item_variants "
+     "WHEN OLD.item_id IS NOT NEW.item_id", _ITEM_DRAFT.format(row="OLD")),
+    ("trg_rev_variants_del", "AFTER DELETE ON draft_item_variants",
+     _ITEM_DRAFT.format(row="OLD")),
+    ("trg_rev_groups_ins", "AFTER INSERT ON draft_modifier_groups",
+     _ITEM_DRAFT.format(row="NEW")),
+    ("trg_rev_groups_upd", "AFTER UPDATE ON draft_modifier_groups",
+     _ITEM_DRAFT.format(row="NEW")),
+    ("trg_rev_groups_move", "AFTER UPDATE ON draft_modifier_groups "
+     "WHEN OLD.item_id IS NOT NEW.item_id", _ITEM_DRAFT.format(row="OLD")),
+    ("trg_rev_groups_del", "AFTER DELETE ON draft_modifier_groups",
+     _ITEM_DRAFT.format(row="OLD")),
+)
+
+
 def _ensure_schema() -> None:
     with db_connect() as conn:
         cur = conn.cursor()
@@ -332,6 +379,11 @@ def _ensure_schema() -> None:
         cur.execute(
             "CREATE INDEX IF NOT EXISTS idx_items_pos ON draft_items(draft_id, position)"
         )
+        # Day 154: matches the item sort order, so keyset pages seek instead of scanning
+        cur.execute(
+            "CREATE INDEX IF NOT EXISTS idx_items_order "
+            "ON draft_items(draft_id, COALESCE(position, 1000000000), id)"
+        )
         cur.execute(
             "CREATE INDEX IF NOT EXISTS idx_variants_item ON draft_item_variants(item_id)"
         )
@@ -511,10 +563,28 @@ def _ensure_schema() -> None:
                 "ALTER TABLE drafts ADD COLUMN wizard_completed INTEGER DEFAULT 0;"
             )
 
+        # Day 153 — per-draft item revision, bumped by triggers so every
+        # writer (this module, raw SQL in portal/app.py, other processes)
+        # invalidates the item cache (see get_draft_items)
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS draft_revisions (
+              draft_id INTEGER PRIMARY KEY,
+              rev      INTEGER NOT NULL
+            )
+            """
+        )
+        for name, event, draft_expr in _REVISION_TRIGGERS:
+            cur.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {name} {event} "
+                f"BEGIN {_REVISION_BUMP_SQL.format(draft_expr=draft_expr)} END"
+            )
+
         conn.commit()
 
 
-_ensure_schema()
+# Day 150: schema steps run via storage/migrate.py; import only checks the version
+migrate.on_import(DB_PATH, __name__)
 
 
 # ------------------------------------------------------------
@@ -766,37 +836,102 @@ def _canonical_price_cents_for_preview_item(it: Dict[str, Any]) -> Optional[int]
 # ------------------------------------------------------------
 # OCR Inspector debug sidecars
 # ------------------------------------------------------------
+# Day 152: sectioned sidecar format.  A debug payload carries the full
+# layout, every text block and the raw OCR text, so a single JSON file
+# reaches several MB; every endpoint parsed all of it to serve one key.
+# Each top-level key is now its own zlib-compressed JSON section, and a
+# small header maps key -> (offset, length):
+#
+#   b"SLDBG1\n" | u32 header length | header JSON | section bytes...
+#
+# load_ocr_debug(draft_id, sections=[...]) seeks to and inflates only the
+# sections asked for.  Old <draft_id>.json sidecars are still read.
+_DEBUG_MAGIC = b"SLDBG1\n"
+_DEBUG_HEADER = struct.Struct(">I")
+_DEBUG_ZLIB_LEVEL = 6
+
+
 def save_ocr_debug(draft_id: int, payload: Dict[str, Any]) -> None:
     """
-    Persist a rich OCR debug payload to a sidecar JSON file:
-      storage/.debug/drafts/<draft_id>.json
+    Persist a rich OCR debug payload to a sectioned sidecar file:
+      storage/.debug/drafts/<draft_id>.dbg
 
     Defensive:
       - atomic write (tmp + replace) to avoid partial files
       - default=str to tolerate Path / numpy types / odd objects
+      - a legacy <draft_id>.json sidecar is removed once replaced
     """
-    p = _debug_path(int(draft_id))
+    p = _debug_pack_path(int(draft_id))
     p.parent.mkdir(parents=True, exist_ok=True)
 
+    index: Dict[str, List[int]] = {}
+    blobs: List[bytes] = []
+    offset = 0
+    for key, value in (payload or {}).items():
+        raw = json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str)
+        blob = zlib.compress(raw.encode("utf-8"), _DEBUG_ZLIB_LEVEL)
+        index[str(key)] = [offset, len(blob)]
+        blobs.append(blob)
+        offset += len(blob)
+    header = json.dumps({"v": 1, "sections": index}, separators=(",", ":")).encode("utf-8")
+
     tmp = p.with_suffix(p.suffix + ".tmp")
-    with open(tmp, "w", encoding="utf-8") as f:
-        json.dump(payload or {}, f, ensure_ascii=False, indent=2, default=str)
+    with open(tmp, "wb") as f:
+        f.write(_DEBUG_MAGIC)
+        f.write(_DEBUG_HEADER.pack(len(header)))
+        f.write(header)
+        for blob in blobs:
+            f.write(blob)
     tmp.replace(p)
 
+    legacy = _debug_path(int(draft_id))
+    try:
+        legacy.unlink()
+    except FileNotFoundError:
+        pass
+
 
-def load_ocr_debug(draft_id: int) -> Optional[Dict[str, Any]]:
+def _read_debug_pack(p: Path, sections: Optional[Iterable[str]]) -> Optional[Dict[str, Any]]:
+    with open(p, "rb") as f:
+        if f.read(len(_DEBUG_MAGIC)) != _DEBUG_MAGIC:
+            return None
+        (hlen,) = _DEBUG_HEADER.unpack(f.read(_DEBUG_HEADER.size))
+        index = json.loads(f.read(hlen).decode("utf-8")).get("sections") or {}
+        base = len(_DEBUG_MAGIC) + _DEBUG_HEADER.size + hlen
+        wanted = list(index) if sections is None else [k for k in sections if k in index]
+        out: Dict[str, Any] = {}
+        for key in wanted:
+            off, length = index[key]
+            f.seek(base + off)
+            out[key] = json.loads(zlib.decompress(f.read(length)).decode("utf-8"))
+        return out
+
+
+def load_ocr_debug(
+    draft_id: int, sections: Optional[Iterable[str]] = None
+) -> Optional[Dict[str, Any]]:
     """
     Load the OCR debug payload if present.
     Returns None if missing/unreadable/non-dict.
+
+    sections: only these top-level keys (missing ones are left out); the
+    rest of the file is never decompressed.  None loads everything.
     """
-    p = _debug_path(int(draft_id))
-    if not p.exists():
-        return None
+    if sections is not None:
+        sections = list(sections)
     try:
+        p = _debug_pack_path(int(draft_id))
+        if p.exists():
+            return _read_debug_pack(p, sections)
+        p = _debug_path(int(draft_id))
+        if not p.exists():
+            return None
         with open(p, "r", encoding="utf-8") as f:
             obj = json.load(f)
         if not isinstance(obj, dict):
             return None
+        if sections is not None:
+            obj = {k: obj[k] for k in sections if k in obj}
         return obj
     except Exception:
         return None
@@ -977,6 +1112,105 @@ def _get_draft_items_nested(draft_id: int) -> List[Dict[str, Any]]:
     return [items_map[iid] for iid in ordered_ids]
 
 
+# ------------------------------------------------------------
+# Day 153: item tree cache
+# ------------------------------------------------------------
+# The editor, wizard, export and validation routes each read the same
+# draft's items several times per request.  Two layers sit in front of
+# the queries below:
+#
+#   - process LRU keyed by (db path, draft id, revision, shape).  The
+#     revision lives in draft_revisions and is moved by triggers on
+#     draft_items / draft_item_variants / draft_modifier_groups, so raw
+#     SQL writers and other processes invalidate it too.  A hit costs one
+#     primary-key read and no materialisation.
+#   - request scope (item_read_scope(); portal/app.py opens one per
+#     request): repeat reads of an unchanged draft do no SQL at all.  An
+#     entry is dropped as soon as any pooled connection in this process
+#     writes (db_pool.write_generation()).
+#
+# Callers get their own copies; mutating a returned item never touches
+# the cache.  SERVLINE_ITEM_CACHE=0 turns both layers off.
+ITEM_CACHE_MAX_ENTRIES = 32
+
+_item_cache: "OrderedDict[Tuple[str, int, int, str], List[Dict[str, Any]]]" = OrderedDict()
+_item_cache_lock = threading.Lock()
+_item_cache_counts: Dict[str, int] = {"hits": 0, "misses": 0, "scope_hits": 0}
+_item_scope: ContextVar[Optional[Dict[Tuple[str, int, str], Tuple[int, List[Dict[str, Any]]]]]] = (
+    ContextVar("servline_item_scope", default=None)
+)
+
+
+def _item_cache_enabled() -> bool:
+    return os.getenv("SERVLINE_ITEM_CACHE", "1").strip().lower() not in ("0", "false", "no")
+
+
+def _draft_revision(conn: sqlite3.Connection, draft_id: int) -> Optional[int]:
+    try:
+        row = conn.execute(
+            "SELECT rev FROM draft_revisions WHERE draft_id=?", (draft_id,)
+        ).fetchone()
+    except sqlite3.OperationalError:
+        return None  # database predates Day 153: no revisions, no caching
+    return int(row[0]) if row else None
+
+
+def get_draft_revision(draft_id: int) -> Optional[int]:
+    """Current item revision of a draft (None if never written since Day 153)."""
+    with db_connect() as conn:
+        return _draft_revision(conn, int(draft_id))
+
+
+def _clone_items(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    out = []
+    for it in items:
+        c = dict(it)
+        if "modifier_groups" in it:
+            c["modifier_groups"] = [
+                {**g, "modifiers": [dict(m) for m in g["modifiers"]]}
+                for g in it["modifier_groups"]
+            ]
+        if "ungrouped_variants" in it:
+            # nested shape: 'variants' aliases 'ungrouped_variants'
+            c["ungrouped_variants"] = c["variants"] = [dict(v) for v in it["ungrouped_variants"]]
+        elif "variants" in it:
+            c["variants"] = [dict(v) for v in it["variants"]]
+        out.append(c)
+    return out
+
+
+def start_item_read_scope() -> None:
+    """Begin request-scoped memoisation of get_draft_items (this context)."""
+    _item_scope.set({})
+
+
+def end_item_read_scope() -> None:
+    _item_scope.set(None)
+
+
+@contextmanager
+def item_read_scope() -> Iterator[None]:
+    token = _item_scope.set({})
+    try:
+        yield
+    finally:
+        _item_scope.reset(token)
+
+
+def clear_item_cache() -> None:
+    with _item_cache_lock:
+        _item_cache.clear()
+        for k in _item_cache_counts:
+            _item_cache_counts[k] = 0
+
+
+def item_cache_stats() -> Dict[str, int]:
+    with _item_cache_lock:
+        out = dict(_item_cache_counts)
+        out["entries"] = len(_item_cache)
+    return out
+
+
 def get_draft_items(
     draft_id: int,
     *,
@@ -991,9 +1225,58 @@ def get_draft_items(
       structure: modifier_groups[].modifiers[]) + 'ungrouped_variants' for
       any variants not attached to a group.  Mutually exclusive with the
       flat 'variants' key.
+
+    Day 153: served from the item cache when the draft is unchanged.
     """
+    draft_id = int(draft_id)
     if include_modifier_groups:
-        return _get_draft_items_nested(int(draft_id))
+        shape = "nested"
+    else:
+        shape = "variants" if include_variants else "flat"
+    if not _item_cache_enabled():
+        return _load_draft_items(draft_id, shape)
+
+    path = str(DB_PATH)
+    scope = _item_scope.get()
+    scope_key = (path, draft_id, shape)
+    gen = db_pool.write_generation()
+    if scope is not None:
+        hit = scope.get(scope_key)
+        if hit is not None and hit[0] == gen:
+            with _item_cache_lock:
+                _item_cache_counts["scope_hits"] += 1
+            return _clone_items(hit[1])
+
+    with db_connect() as conn:
+        rev = _draft_revision(conn, draft_id)
+        # write_generation() only sees pooled connections
+        pooled = isinstance(conn, db_pool.PooledConnection)
+    if rev is None:
+        return _load_draft_items(draft_id, shape)
+
+    key = (path, draft_id, rev, shape)
+    with _item_cache_lock:
+        items = _item_cache.get(key)
+        if items is not None:
+            _item_cache.move_to_end(key)
+            _item_cache_counts["hits"] += 1
+        else:
+            _item_cache_counts["misses"] += 1
+    if items is None:
+        items = _load_draft_items(draft_id, shape)
+        with _item_cache_lock:
+            _item_cache[key] = items
+            while len(_item_cache) > ITEM_CACHE_MAX_ENTRIES:
+                _item_cache.popitem(last=False)
+    if scope is not None and pooled:
+        scope[scope_key] = (gen, items)
+    return _clone_items(items)
+
+
+def _load_draft_items(draft_id: int, shape: str) -> List[Dict[str, Any]]:
+    if shape == "nested":
+        return _get_draft_items_nested(draft_id)
+    include_variants = shape == "variants"
 
     with db_connect() as conn:
         if not include_variants:
@@ -1070,6 +1353,203 @@ def get_draft_items(
     return [items_map[iid] for iid in ordered_ids]
 
 
+# ------------------------------------------------------------
+# Day 154: keyset pages for the REST API
+# ------------------------------------------------------------
+_NULL_POSITION = 1000000000  # NULL positions sort last, as in get_draft_items
+ITEM_PAGE_MAX = 500
+# Same keys get_draft_items(include_variants=True) returns
+_PAGE_ITEM_COLS = (
+    "id, draft_id, name, description, price_cents, category, subcategory, "
+    "position, confidence, kitchen_name, created_at, updated_at"
+)
+_PAGE_VARIANT_COLS = (
+    "id, item_id, label, price_cents, kind, position, modifier_group_id, "
+    "created_at, updated_at"
+)
+
+
+def get_draft_items_page(
+    draft_id: int,
+    *,
+    limit: int,
+    after: Optional[Tuple[int, int]] = None,
+    include_variants: bool = True,
+) -> Tuple[List[Dict[str, Any]], Optional[Tuple[int, int]]]:
+    """
+    One page of a draft's items in get_draft_items order.
+
+    after: the (sort position, id) key of the last item already seen;
+      None starts at the beginning.  Returns (items, next_key) where
+      next_key is None on the last page.  Each page is an index seek on
+      idx_items_order, however deep into the menu it starts.
+    """
+    shape = "variants" if include_variants else "flat"
+    with db_connect() as conn:
+        return _item_page(conn, int(draft_id), limit, after, shape)
+
+
+def _item_page(
+    conn: sqlite3.Connection,
+    draft_id: int,
+    limit: int,
+    after: Optional[Tuple[int, int]],
+    shape: str,
+) -> Tuple[List[Dict[str, Any]], Optional[Tuple[int, int]]]:
+    """One keyset page on an open connection; shape as in get_draft_items."""
+    limit = max(1, min(int(limit), ITEM_PAGE_MAX))
+    sql = f"SELECT {_PAGE_ITEM_COLS} FROM draft_items WHERE draft_id=?"
+    params: List[Any] = [draft_id]
+    if after is not None:
+        pos, last_id = int(after[0]), int(after[1])
+        sql += (
+            f" AND COALESCE(position, {_NULL_POSITION}) >= ?"
+            f" AND (COALESCE(position, {_NULL_POSITION}) > ? OR id > ?)"
+        )
+        params += [pos, pos, last_id]
+    sql += f" ORDER BY COALESCE(position, {_NULL_POSITION}), id LIMIT ?"
+    params.append(limit + 1)
+
+    rows = conn.execute(sql, params).fetchall()
+    more = len(rows) > limit
+    items = [_row_to_dict(r) for r in rows[:limit]]
+    if shape == "variants":
+        _attach_page_variants(conn, items)
+    elif shape == "nested":
+        _attach_page_groups(conn, items)
+
+    next_key = None
+    if more and items:
+        last = items[-1]
+        pos = last.get("position")
+        next_key = (_NULL_POSITION if pos is None else int(pos), int(last["id"]))
+    return items, next_key
+
+
+def _page_rows(conn: sqlite3.Connection, table: str, cols: str, item_ids: List[int]):
+    """Rows of a child table for a page of items, in (item, position, id) order."""
+    for chunk in _chunks(item_ids):
+        marks = ",".join("?" * len(chunk))
+        yield from conn.execute(
+            f"SELECT {cols} FROM {table} WHERE item_id IN ({marks}) "
+            f"ORDER BY item_id, COALESCE(position, {_NULL_POSITION}), id",
+            chunk,
+        ).fetchall()
+
+
+def _attach_page_variants(conn: sqlite3.Connection, items: List[Dict[str, Any]]) -> None:
+    by_item: Dict[int, List[Dict[str, Any]]] = {it["id"]: [] for it in items}
+    for v in _page_rows(conn, "draft_item_variants", _PAGE_VARIANT_COLS, list(by_item)):
+        by_item[v["item_id"]].append(_row_to_dict(v))
+    for it in items:
+        it["variants"] = by_item[it["id"]]
+
+
+def _attach_page_groups(conn: sqlite3.Connection, items: List[Dict[str, Any]]) -> None:
+    """Same keys and ordering as _get_draft_items_nested, for one page."""
+    by_id = {it["id"]: it for it in items}
+    groups: Dict[int, Dict[str, Any]] = {}
+    for it in items:
+        it["modifier_groups"] = []
+        it["ungrouped_variants"] = []
+    for g in _page_rows(
+        conn, "draft_modifier_groups",
+        "id, item_id, name, required, min_select, max_select, position", list(by_id),
+    ):
+        group = {
+            "id": g["id"],
+            "name": g["name"],
+            "required": g["required"],
+            "min_select": g["min_select"],
+            "max_select": g["max_select"],
+            "position": g["position"],
+            "modifiers": [],
+        }
+        groups[g["id"]] = group
+        by_id[g["item_id"]]["modifier_groups"].append(group)
+    for v in _page_rows(conn, "draft_item_variants", _PAGE_VARIANT_COLS, list(by_id)):
+        gid = v["modifier_group_id"]
+        if gid is None:
+            by_id[v["item_id"]]["ungrouped_variants"].append(_row_to_dict(v))
+        elif gid in groups and groups[gid] in by_id[v["item_id"]]["modifier_groups"]:
+            # the nested join only keeps variants whose group is the item's own
+            groups[gid]["modifiers"].append({
+                "id": v["id"],
+                "label": v["label"],
+                "price_cents": v["price_cents"],
+                "kind": v["kind"],
+                "position": v["position"],
+            })
+    for it in items:
+        it["variants"] = it["ungrouped_variants"]
+
+
+# ------------------------------------------------------------
+# Day 155: item iterator for streaming exports
+# ------------------------------------------------------------
+@contextmanager
+def read_snapshot() -> Iterator[Any]:
+    """
+    One read transaction over the drafts DB, for callers that make several
+    passes over a draft (iter_draft_items(conn=...)) and need them to agree.
+    The connection stays checked out until the block exits.
+    """
+    with db_connect() as conn:
+        began = not conn.in_transaction
+        if began:
+            conn.execute("BEGIN")
+        try:
+            yield conn
+        finally:
+            if began and conn.in_transaction:
+                conn.execute("COMMIT")
+
+
+def iter_draft_items(
+    draft_id: int,
+    *,
+    include_modifier_groups: bool = False,
+    page_size: int = ITEM_PAGE_MAX,
+    conn: Any = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yield a draft's items one at a time, in get_draft_items order and
+    shape (variants, or the nested modifier-group shape), holding at most
+    one page in memory.
+
+    The pages are read inside a single transaction, so a write landing
+    mid-export cannot tear the result; the connection stays checked out
+    until the iterator is exhausted or closed.  Pass conn (from
+    read_snapshot()) to read inside the caller's transaction instead.
+    """
+    draft_id = int(draft_id)
+    shape = "nested" if include_modifier_groups else "variants"
+    if conn is None:
+        with read_snapshot() as snap:
+            yield from iter_draft_items(draft_id, include_modifier_groups=include_modifier_groups,
+                                        page_size=page_size, conn=snap)
+        return
+    after: Optional[Tuple[int, int]] = None
+    while True:
+        items, after = _item_page(conn, draft_id, page_size, after, shape)
+        yield from items
+        if after is None:
+            break
+
+
+def get_draft_item_categories(draft_id: int, *, conn: Any = None) -> List[Optional[str]]:
+    """Distinct raw category values on a draft's items (unordered, may hold None).
+
+    Pass conn (from read_snapshot()) to read inside the caller's transaction.
+    """
+    if conn is None:
+        with db_connect() as conn:
+            return get_draft_item_categories(draft_id, conn=conn)
+    rows = conn.execute(
+        "SELECT DISTINCT category FROM draft_items WHERE draft_id=?", (int(draft_id),)
+    ).fetchall()
+    return [r["category"] for r in rows]
+
 def save_draft_metadata(
     draft_id: int,
     *,
@@ -1445,172 +1925,273 @@ def _insert_draft(
         return int(cur.lastrowid)
 
 
-def _insert_modifier_groups_with_cursor(
-    cur: Any,
-    item_id: int,
-    raw_groups: List[Dict[str, Any]],
-    replace: bool = False,
-) -> None:
-    """Insert _modifier_groups for an item using an existing cursor.
+# ------------------------------------------------------------
+# Day 148: set-based write engine for items / variants / groups
+# ------------------------------------------------------------
+# Rows are normalized up front, then each table is written with one
+# executemany() inside a single write transaction.  New row ids come
+# back through a position key: under BEGIN IMMEDIATE nobody else can
+# insert, and AUTOINCREMENT ids only grow, so the rows with
+# id > MAX(id)-before-insert, in id order, are exactly ours in input order.
+
+_ITEM_INSERT_SQL = """
+    INSERT INTO draft_items (
+        draft_id, name, description, price_cents, category, subcategory,
+        position, confidence, kitchen_name, created_at, updated_at
+    )
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# COALESCE so partial updates (e.g. wizard item save with no position
+# field) don't blow away existing values. Without this, editing any item
+# nulls its position and sends it to the bottom.
+_ITEM_UPDATE_SQL = """
+    UPDATE draft_items
+    SET name=?,
+        description=?,
+        price_cents=?,
+        category=COALESCE(?, category),
+        subcategory=COALESCE(?, subcategory),
+        position=COALESCE(?, position),
+        confidence=COALESCE(?, confidence),
+        kitchen_name=COALESCE(?, kitchen_name),
+        updated_at=?
+    WHERE id=? AND draft_id=?
+"""
+
+_VARIANT_INSERT_SQL = """
+    INSERT INTO draft_item_variants
+        (item_id, label, price_cents, kind, position,
+         modifier_group_id, created_at, updated_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_GROUP_INSERT_SQL = """
+    INSERT INTO draft_modifier_groups
+        (item_id, name, required, min_select, max_select, position,
+         created_at, updated_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Max bound parameters per IN (...) chunk (SQLite's default limit is 999+)
+_IN_CHUNK = 500
+
+
+def _chunks(seq: List[Any], size: int = _IN_CHUNK) -> Iterable[List[Any]]:
+    for i in range(0, len(seq), size):
+        yield seq[i:i + size]
+
+
+def _begin_write(conn: sqlite3.Connection) -> None:
+    """Take the write lock now, so id reads and inserts see one snapshot."""
+    if not conn.in_transaction:
+        conn.execute("BEGIN IMMEDIATE")
+
+
+def _insert_many_returning_ids(
+    conn: sqlite3.Connection, table: str, sql: str, rows: List[Tuple[Any, ...]]
+) -> List[int]:
+    """executemany() INSERT; returns new ids in row order (see note above)."""
+    if not rows:
+        return []
+    before = conn.execute(f"SELECT COALESCE(MAX(id), 0) FROM {table}").fetchone()[0]
+    conn.executemany(sql, rows)
+    ids = [
+        int(r[0])
+        for r in conn.execute(f"SELECT id FROM {table} WHERE id > ? ORDER BY id", (before,))
+    ]
+    if len(ids) != len(rows):
+        raise sqlite3.IntegrityError(
+            f"{table}: expected {len(rows)} new ids, found {len(ids)}"
+        )
+    return ids
 
-    Each group dict must have: name, required, min_select, max_select,
-    position, and _modifiers list.
 
-    If replace=True, deletes existing groups+variants for the item first.
-    Variants in each group are inserted into draft_item_variants with
-    modifier_group_id set to the newly created group row.
+def _normalize_group_for_db(g: Any) -> Optional[Tuple[str, int, int, int, int]]:
+    """(name, required, min_select, max_select, position) or None."""
+    if not isinstance(g, dict):
+        return None
+    gname = (g.get("name") or "").strip()
+    if not gname:
+        return None
+    try:
+        required = 1 if g.get("required") else 0
+        min_select = int(g.get("min_select") or 0)
+        max_select = int(g.get("max_select") or 0)
+        gpos = int(g.get("position") or 0)
+    except (ValueError, TypeError):
+        required, min_select, max_select, gpos = 0, 0, 0, 0
+    return gname, required, min_select, max_select, gpos
+
+
+def _variant_rows(
+    item_id: int, raw_variants: Iterable[Any], now: str, group_id: Optional[int] = None
+) -> List[Tuple[Any, ...]]:
+    rows = []
+    for v in raw_variants:
+        vnorm = _normalize_variant_for_db(v)
+        if not vnorm:
+            continue
+        rows.append((
+            item_id, vnorm["label"], vnorm["price_cents"], vnorm["kind"],
+            vnorm["position"], group_id, now, now,
+        ))
+    return rows
+
+
+def _item_row(draft_id: int, norm: Dict[str, Any], now: str) -> Tuple[Any, ...]:
+    return (
+        int(draft_id), norm["name"], norm["description"], norm["price_cents"],
+        norm["category"], norm["subcategory"], norm["position"],
+        norm["confidence"], norm["kitchen_name"], now, now,
+    )
+
+
+def _existing_item_ids(
+    conn: sqlite3.Connection, draft_id: int, ids: Iterable[int]
+) -> set:
+    found: set = set()
+    for chunk in _chunks(sorted(set(ids))):
+        qmarks = ",".join(["?"] * len(chunk))
+        found.update(
+            int(r[0]) for r in conn.execute(
+                f"SELECT id FROM draft_items WHERE draft_id=? AND id IN ({qmarks})",
+                (int(draft_id), *chunk),
+            )
+        )
+    return found
+
+
+def _write_item_children(
+    conn: sqlite3.Connection, plans: List[Dict[str, Any]], now: str
+) -> None:
+    """Variants + modifier groups for already-written items.
+
+    Each plan carries effective_id, is_update, raw variants and groups.
+    For updated items, non-empty variant / group payloads replace what is
+    stored (the last payload wins when one id appears twice).
     """
-    if replace:
+    last: Dict[int, Dict[str, Any]] = {}
+    for p in plans:
+        last[p["effective_id"]] = p
+    plans = [p for p in plans if last[p["effective_id"]] is p]
+
+    replace_variants = [p["effective_id"] for p in plans if p["is_update"] and p["variants"]]
+    for chunk in _chunks(replace_variants):
+        qmarks = ",".join(["?"] * len(chunk))
+        conn.execute(f"DELETE FROM draft_item_variants WHERE item_id IN ({qmarks})", chunk)
+
+    variant_rows: List[Tuple[Any, ...]] = []
+    for p in plans:
+        if p["variants"]:
+            variant_rows.extend(_variant_rows(p["effective_id"], p["variants"], now))
+    if variant_rows:
+        conn.executemany(_VARIANT_INSERT_SQL, variant_rows)
+
+    replace_groups = [p["effective_id"] for p in plans if p["is_update"] and p["groups"]]
+    for chunk in _chunks(replace_groups):
+        qmarks = ",".join(["?"] * len(chunk))
         # Nullify variants that reference our groups so cascade doesn't
         # remove them; then delete the groups themselves.
-        cur.execute(
+        conn.execute(
             "UPDATE draft_item_variants SET modifier_group_id=NULL "
-            "WHERE item_id=? AND modifier_group_id IS NOT NULL",
-            (item_id,),
-        )
-        cur.execute(
-            "DELETE FROM draft_modifier_groups WHERE item_id=?",
-            (item_id,),
+            f"WHERE item_id IN ({qmarks}) AND modifier_group_id IS NOT NULL",
+            chunk,
         )
+        conn.execute(f"DELETE FROM draft_modifier_groups WHERE item_id IN ({qmarks})", chunk)
+
+    group_rows: List[Tuple[Any, ...]] = []
+    group_mods: List[Tuple[int, List[Any]]] = []
+    for p in plans:
+        for g in (p["groups"] or []):
+            gnorm = _normalize_group_for_db(g)
+            if not gnorm:
+                continue
+            group_rows.append((p["effective_id"], *gnorm, now, now))
+            group_mods.append((p["effective_id"], g.get("_modifiers") or []))
+    group_ids = _insert_many_returning_ids(conn, "draft_modifier_groups", _GROUP_INSERT_SQL, group_rows)
+
+    mod_rows: List[Tuple[Any, ...]] = []
+    for gid, (item_id, mods) in zip(group_ids, group_mods):
+        mod_rows.extend(_variant_rows(item_id, mods, now, group_id=gid))
+    if mod_rows:
+        conn.executemany(_VARIANT_INSERT_SQL, mod_rows)
 
-    for g in raw_groups:
-        if not isinstance(g, dict):
+
+def _write_items(
+    conn: sqlite3.Connection,
+    draft_id: int,
+    items: Iterable[Dict[str, Any]],
+    *,
+    allow_update: bool,
+) -> Dict[str, List[int]]:
+    """Bulk upsert on an open connection (caller commits)."""
+    now = _now()
+    plans: List[Dict[str, Any]] = []
+    for it in items:
+        # Defensive: non-dicts are ignored
+        if not isinstance(it, dict):
             continue
-        gname = (g.get("name") or "").strip()
-        if not gname:
+        norm = _normalize_item_for_db(it)
+        if not norm:
+            # Skip nameless or completely invalid rows
             continue
-        try:
-            required = 1 if g.get("required") else 0
-            min_select = int(g.get("min_select") or 0)
-            max_select = int(g.get("max_select") or 0)
-            gpos = int(g.get("position") or 0)
-        except (ValueError, TypeError):
-            required, min_select, max_select, gpos = 0, 0, 0, 0
+        item_id: Optional[int] = None
+        raw_id = it.get("id")
+        if allow_update and raw_id is not None and str(raw_id).isdigit():
+            item_id = int(raw_id)
+        plans.append({
+            "id": item_id,
+            "norm": norm,
+            "variants": it.get("_variants") or [],
+            "groups": it.get("_modifier_groups") or [],
+        })
+    if not plans:
+        return {"inserted_ids": [], "updated_ids": []}
 
-        cur.execute(
-            """
-            INSERT INTO draft_modifier_groups
-                (item_id, name, required, min_select, max_select, position,
-                 created_at, updated_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (item_id, gname, required, min_select, max_select, gpos,
-             _now(), _now()),
-        )
-        group_id = int(cur.lastrowid)
+    _begin_write(conn)
+    existing = _existing_item_ids(
+        conn, draft_id, [p["id"] for p in plans if p["id"] is not None]
+    )
 
-        for m in (g.get("_modifiers") or []):
-            if not isinstance(m, dict):
-                continue
-            vnorm = _normalize_variant_for_db(m)
-            if not vnorm:
-                continue
-            cur.execute(
-                """
-                INSERT INTO draft_item_variants
-                    (item_id, label, price_cents, kind, position,
-                     modifier_group_id, created_at, updated_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    item_id,
-                    vnorm["label"],
-                    vnorm["price_cents"],
-                    vnorm["kind"],
-                    vnorm["position"],
-                    group_id,
-                    _now(),
-                    _now(),
-                ),
-            )
+    update_rows: List[Tuple[Any, ...]] = []
+    insert_rows: List[Tuple[Any, ...]] = []
+    to_insert: List[Dict[str, Any]] = []
+    updated: List[int] = []
+    for p in plans:
+        n = p["norm"]
+        if p["id"] in existing:
+            update_rows.append((
+                n["name"], n["description"], n["price_cents"], n["category"],
+                n["subcategory"], n["position"], n["confidence"],
+                n["kitchen_name"], now, p["id"], int(draft_id),
+            ))
+            p["effective_id"] = p["id"]
+            p["is_update"] = True
+            updated.append(p["id"])
+        else:
+            # also covers an id that doesn't belong to this draft (safety)
+            insert_rows.append(_item_row(draft_id, n, now))
+            to_insert.append(p)
+            p["is_update"] = False
+
+    if update_rows:
+        conn.executemany(_ITEM_UPDATE_SQL, update_rows)
+    inserted = _insert_many_returning_ids(conn, "draft_items", _ITEM_INSERT_SQL, insert_rows)
+    for p, new_id in zip(to_insert, inserted):
+        p["effective_id"] = new_id
+
+    _write_item_children(conn, plans, now)
+    return {"inserted_ids": inserted, "updated_ids": updated}
 
 
 def _insert_items_bulk(
     draft_id: int, items: Iterable[Dict[str, Any]]
 ) -> List[int]:
-    ids: List[int] = []
     with db_connect() as conn:
-        cur = conn.cursor()
-        for it in items:
-            norm = _normalize_item_for_db(it)
-            if not norm:
-                # Skip rows with no valid name or totally malformed payloads
-                continue
-
-            name = norm["name"]
-            desc = norm["description"]
-            price_cents = norm["price_cents"]
-            category = norm["category"]
-            subcategory = norm["subcategory"]
-            position = norm["position"]
-            confidence = norm["confidence"]
-            kitchen_name = norm["kitchen_name"]
-
-            cur.execute(
-                """
-                INSERT INTO draft_items (
-                    draft_id,
-                    name,
-                    description,
-                    price_cents,
-                    category,
-                    subcategory,
-                    position,
-                    confidence,
-                    kitchen_name,
-                    created_at,
-                    updated_at
-                )
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    int(draft_id),
-                    name,
-                    desc,
-                    price_cents,
-                    category,
-                    subcategory,
-                    position,
-                    confidence,
-                    kitchen_name,
-                    _now(),
-                    _now(),
-                ),
-            )
-            item_id = int(cur.lastrowid)
-            ids.append(item_id)
-
-            # Day 72: insert child variant rows if present
-            raw_variants = it.get("_variants") or []
-            for v in raw_variants:
-                vnorm = _normalize_variant_for_db(v)
-                if not vnorm:
-                    continue
-                cur.execute(
-                    """
-                    INSERT INTO draft_item_variants
-                        (item_id, label, price_cents, kind, position,
-                         created_at, updated_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                    """,
-                    (
-                        item_id,
-                        vnorm["label"],
-                        vnorm["price_cents"],
-                        vnorm["kind"],
-                        vnorm["position"],
-                        _now(),
-                        _now(),
-                    ),
-                )
-
-            # Day 112: insert modifier groups if present
-            raw_groups = it.get("_modifier_groups") or []
-            if raw_groups:
-                _insert_modifier_groups_with_cursor(cur, item_id, raw_groups)
-
+        res = _write_items(conn, draft_id, items, allow_update=False)
         conn.commit()
-    return ids
+    return res["inserted_ids"]
 
 
 def upsert_draft_items(
@@ -1625,205 +2206,144 @@ def upsert_draft_items(
     Day 72: If an item dict contains '_variants' (list of variant dicts),
     those are inserted as child rows in draft_item_variants.  For updates,
     existing variants are replaced (delete-all + re-insert).
+
+    Day 148: written set-based (executemany per table, one transaction).
     """
-    inserted: List[int] = []
-    updated: List[int] = []
     with db_connect() as conn:
-        cur = conn.cursor()
-        for it in items:
-            # Defensive: non-dicts are ignored
-            if not isinstance(it, dict):
-                continue
+        res = _write_items(conn, draft_id, items, allow_update=True)
+        conn.commit()
+    return res
 
-            raw_id = it.get("id")
-            has_int_id = False
-            try:
-                if raw_id is not None and str(raw_id).isdigit():
-                    item_id = int(raw_id)
-                    has_int_id = True
-                else:
-                    item_id = None
-            except Exception:
-                item_id = None
 
-            norm = _normalize_item_for_db(it)
-            if not norm:
-                # Skip nameless or completely invalid rows
-                continue
+def delete_draft_items(draft_id: int, item_ids: Iterable[int]) -> int:
+    ids = [int(i) for i in item_ids if str(i).isdigit()]
+    if not ids:
+        return 0
+    # Day 149: chunked IN (...) deletes in one transaction
+    with db_connect() as conn:
+        _begin_write(conn)
+        deleted = 0
+        for chunk in _chunks(sorted(set(ids))):
+            qmarks = ",".join(["?"] * len(chunk))
+            cur = conn.execute(
+                f"DELETE FROM draft_items WHERE draft_id=? AND id IN ({qmarks})",
+                (int(draft_id), *chunk),
+            )
+            deleted += int(cur.rowcount)
+        conn.commit()
+        return deleted
 
-            name = norm["name"]
-            desc = norm["description"]
-            price_cents = norm["price_cents"]
-            category = norm["category"]
-            subcategory = norm["subcategory"]
-            position = norm["position"]
-            confidence = norm["confidence"]
-            kitchen_name = norm["kitchen_name"]
-
-            effective_id: Optional[int] = None
-
-            if has_int_id:
-                # Use COALESCE so partial updates (e.g. wizard item save with no
-                # position field) don't blow away existing values. Without this,
-                # editing any item nulls its position and sends it to the bottom.
-                cur.execute(
-                    """
-                    UPDATE draft_items
-                    SET name=?,
-                        description=?,
-                        price_cents=?,
-                        category=COALESCE(?, category),
-                        subcategory=COALESCE(?, subcategory),
-                        position=COALESCE(?, position),
-                        confidence=COALESCE(?, confidence),
-                        kitchen_name=COALESCE(?, kitchen_name),
-                        updated_at=?
-                    WHERE id=? AND draft_id=?
-                    """,
-                    (
-                        name,
-                        desc,
-                        price_cents,
-                        category,
-                        subcategory,
-                        position,
-                        confidence,
-                        kitchen_name,
-                        _now(),
-                        item_id,
-                        int(draft_id),
-                    ),
-                )
-                if cur.rowcount > 0:
-                    updated.append(item_id)
-                    effective_id = item_id
-                else:
-                    # if the id doesn't belong to this draft, insert instead (safety)
-                    cur.execute(
-                        """
-                        INSERT INTO draft_items (
-                            draft_id,
-                            name,
-                            description,
-                            price_cents,
-                            category,
-                            subcategory,
-                            position,
-                            confidence,
-                            kitchen_name,
-                            created_at,
-                            updated_at
-                        )
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                        """,
-                        (
-                            int(draft_id),
-                            name,
-                            desc,
-                            price_cents,
-                            category,
-                            subcategory,
-                            position,
-                            confidence,
-                            kitchen_name,
-                            _now(),
-                            _now(),
-                        ),
-                    )
-                    effective_id = int(cur.lastrowid)
-                    inserted.append(effective_id)
-            else:
-                cur.execute(
-                    """
-                    INSERT INTO draft_items (
-                        draft_id,
-                        name,
-                        description,
-                        price_cents,
-                        category,
-                        subcategory,
-                        position,
-                        confidence,
-                        kitchen_name,
-                        created_at,
-                        updated_at
-                    )
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """,
-                    (
-                        int(draft_id),
-                        name,
-                        desc,
-                        price_cents,
-                        category,
-                        subcategory,
-                        position,
-                        confidence,
-                        kitchen_name,
-                        _now(),
-                        _now(),
-                    ),
-                )
-                effective_id = int(cur.lastrowid)
-                inserted.append(effective_id)
-
-            # Day 72: insert child variant rows if present
-            raw_variants = it.get("_variants") or []
-            if raw_variants and effective_id is not None:
-                # For updates, replace existing variants
-                if has_int_id and item_id in updated:
-                    cur.execute(
-                        "DELETE FROM draft_item_variants WHERE item_id=?",
-                        (effective_id,),
-                    )
-                for v in raw_variants:
-                    vnorm = _normalize_variant_for_db(v)
-                    if not vnorm:
-                        continue
-                    cur.execute(
-                        """
-                        INSERT INTO draft_item_variants
-                            (item_id, label, price_cents, kind, position,
-                             created_at, updated_at)
-                        VALUES (?, ?, ?, ?, ?, ?, ?)
-                        """,
-                        (
-                            effective_id,
-                            vnorm["label"],
-                            vnorm["price_cents"],
-                            vnorm["kind"],
-                            vnorm["position"],
-                            _now(),
-                            _now(),
-                        ),
-                    )
 
-            # Day 112: insert/replace modifier groups if present
-            raw_groups = it.get("_modifier_groups") or []
-            if raw_groups and effective_id is not None:
-                is_update = has_int_id and item_id in updated
-                _insert_modifier_groups_with_cursor(
-                    cur, effective_id, raw_groups, replace=is_update
-                )
+# ------------------------------------------------------------
+# Day 149: set-based bulk mutations by id
+# ------------------------------------------------------------
+# Every helper below is one statement per chunk of ids (IN (...) for
+# plain updates, CASE id WHEN ... for per-row positions), run inside
+# the caller's transaction, and returns the number of rows affected.
 
-        conn.commit()
+# Columns bulk_update_items() may set
+_BULK_ITEM_FIELDS = ("category", "subcategory", "position", "kitchen_name", "confidence")
 
-    return {"inserted_ids": inserted, "updated_ids": updated}
+# ids per CASE statement: 3 bound params per id (WHEN ?, THEN ?, IN ?)
+_CASE_CHUNK = 250
 
 
-def delete_draft_items(draft_id: int, item_ids: Iterable[int]) -> int:
-    ids = [int(i) for i in item_ids if str(i).isdigit()]
-    if not ids:
+def _update_where_ids(
+    conn: sqlite3.Connection,
+    table: str,
+    set_sql: str,
+    set_params: Tuple[Any, ...],
+    parent_col: str,
+    parent_id: int,
+    ids: List[int],
+) -> int:
+    """UPDATE table SET ... WHERE parent_col=? AND id IN (chunk) for each chunk."""
+    affected = 0
+    for chunk in _chunks(ids):
+        qmarks = ",".join(["?"] * len(chunk))
+        cur = conn.execute(
+            f"UPDATE {table} SET {set_sql} WHERE {parent_col}=? AND id IN ({qmarks})",
+            (*set_params, int(parent_id), *chunk),
+        )
+        affected += int(cur.rowcount)
+    return affected
+
+
+def _set_positions(
+    conn: sqlite3.Connection,
+    table: str,
+    parent_col: str,
+    parent_id: int,
+    positions: Dict[int, int],
+    now: str,
+) -> int:
+    """Write {id: position} with one CASE-based UPDATE per chunk of ids."""
+    affected = 0
+    pairs = list(positions.items())
+    for chunk in _chunks(pairs, _CASE_CHUNK):
+        whens = " ".join(["WHEN ? THEN ?"] * len(chunk))
+        qmarks = ",".join(["?"] * len(chunk))
+        params: List[Any] = []
+        for rid, pos in chunk:
+            params.extend((rid, pos))
+        params.extend((now, int(parent_id)))
+        params.extend(rid for rid, _ in chunk)
+        cur = conn.execute(
+            f"UPDATE {table} SET position = CASE id {whens} END, updated_at=? "
+            f"WHERE {parent_col}=? AND id IN ({qmarks})",
+            params,
+        )
+        affected += int(cur.rowcount)
+    return affected
+
+
+def bulk_update_items(draft_id: int, item_ids: Iterable[int], fields: Dict[str, Any]) -> int:
+    """
+    Set the same *fields* on every item in *item_ids* that belongs to
+    *draft_id*.  Only columns in _BULK_ITEM_FIELDS are accepted.
+
+    Returns the number of rows updated.
+    """
+    bad = [k for k in fields if k not in _BULK_ITEM_FIELDS]
+    if bad:
+        raise ValueError(f"bulk_update_items: unsupported field(s): {', '.join(bad)}")
+    ids = sorted({int(i) for i in item_ids})
+    if not ids or not fields:
         return 0
+    cols = list(fields)
+    set_sql = ", ".join(f"{c}=?" for c in cols) + ", updated_at=?"
+    set_params = (*(fields[c] for c in cols), _now())
     with db_connect() as conn:
-        cur = conn.cursor()
-        qmarks = ",".join(["?"] * len(ids))
-        cur.execute(
-            f"DELETE FROM draft_items WHERE draft_id=? AND id IN ({qmarks})",
-            (int(draft_id), *ids),
+        _begin_write(conn)
+        updated = _update_where_ids(
+            conn, "draft_items", set_sql, set_params, "draft_id", int(draft_id), ids
         )
         conn.commit()
-        return int(cur.rowcount)
+        return updated
+
+
+def backfill_item_positions(draft_id: int, items: List[Dict[str, Any]]) -> int:
+    """
+    Give every item in *items* whose position is None the next position
+    after the current maximum, in list order.  *items* are updated in place.
+
+    Returns the number of rows updated.
+    """
+    missing = [it for it in items if it.get("position") is None and it.get("id") is not None]
+    if not missing:
+        return 0
+    max_pos = max((it.get("position") or 0) for it in items)
+    positions: Dict[int, int] = {}
+    for it in missing:
+        max_pos += 1
+        positions[int(it["id"])] = max_pos
+    with db_connect() as conn:
+        _begin_write(conn)
+        updated = _set_positions(conn, "draft_items", "draft_id", int(draft_id), positions, _now())
+        conn.commit()
+    for it in missing:
+        it["position"] = positions[int(it["id"])]
+    return updated
 
 
 # ------------------------------------------------------------
@@ -1883,31 +2403,12 @@ def insert_variants(
     Returns list of inserted variant IDs.
     Silently skips invalid rows (no label).
     """
-    ids: List[int] = []
     with db_connect() as conn:
-        cur = conn.cursor()
-        for v in variants:
-            norm = _normalize_variant_for_db(v)
-            if not norm:
-                continue
-            cur.execute(
-                """
-                INSERT INTO draft_item_variants
-                    (item_id, label, price_cents, kind, position,
-                     created_at, updated_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    int(item_id),
-                    norm["label"],
-                    norm["price_cents"],
-                    norm["kind"],
-                    norm["position"],
-                    _now(),
-                    _now(),
-                ),
-            )
-            ids.append(int(cur.lastrowid))
+        _begin_write(conn)
+        ids = _insert_many_returning_ids(
+            conn, "draft_item_variants", _VARIANT_INSERT_SQL,
+            _variant_rows(int(item_id), variants, _now()),
+        )
         conn.commit()
     return ids
 
@@ -2795,37 +3296,30 @@ def clone_draft(draft_id: int) -> Dict[str, Any]:
     )
 
     items = get_draft_items(int(draft_id), include_variants=True)
-    for it in items:
-        # Insert item into new draft
-        inserted_ids = _insert_items_bulk(
-            new_id,
-            [
-                {
-                    "name": it.get("name"),
-                    "description": it.get("description"),
-                    "price_cents": _coerce_int(it.get("price_cents"), 0),
-                    "category": it.get("category"),
-                    "position": it.get("position"),
-                    "confidence": _coerce_opt_int(it.get("confidence")),
-                }
-            ],
-        )
-        # Clone variants if present
-        variants = it.get("variants") or []
-        if inserted_ids and variants:
-            new_item_id = inserted_ids[0]
-            insert_variants(
-                new_item_id,
-                [
+    # Day 148: one bulk write for all items + their variants
+    _insert_items_bulk(
+        new_id,
+        [
+            {
+                "name": it.get("name"),
+                "description": it.get("description"),
+                "price_cents": _coerce_int(it.get("price_cents"), 0),
+                "category": it.get("category"),
+                "position": it.get("position"),
+                "confidence": _coerce_opt_int(it.get("confidence")),
+                "_variants": [
                     {
                         "label": v.get("label"),
                         "price_cents": v.get("price_cents", 0),
                         "kind": v.get("kind", "size"),
                         "position": v.get("position", 0),
                     }
-                    for v in variants
+                    for v in (it.get("variants") or [])
                 ],
-            )
+            }
+            for it in items
+        ],
+    )
 
     return {"id": new_id, "draft_id": new_id}
 
@@ -3376,15 +3870,14 @@ def _bulk_reorder_by_position(
     """
     if not ordered_ids:
         return 0
-    now = _now()
-    rows = [(pos, now, int(gid), int(parent_id)) for pos, gid in enumerate(ordered_ids, start=1)]
+    # Day 149: one CASE-based UPDATE (per 250 ids) instead of one per row;
+    # a repeated id takes its last index, as the per-row loop did
+    positions = {int(gid): pos for pos, gid in enumerate(ordered_ids, start=1)}
     with db_connect() as conn:
-        cur = conn.executemany(
-            f"UPDATE {table} SET position=?, updated_at=? WHERE id=? AND {parent_col}=?",
-            rows,
-        )
+        _begin_write(conn)
+        updated = _set_positions(conn, table, parent_col, int(parent_id), positions, _now())
         conn.commit()
-        return cur.rowcount
+        return updated
 
 
 def reorder_modifier_groups(item_id: int, ordered_ids: List[int]) -> int:
@@ -3745,5 +4238,11 @@ def delete_draft(draft_id: int) -> bool:
         conn.execute("DELETE FROM draft_items WHERE draft_id = ?", (draft_id,))
         # Delete the draft itself
         n = conn.execute("DELETE FROM drafts WHERE id = ?", (draft_id,)).rowcount
+        # Day 156: a reused draft id must not inherit the old revision
+        try:
+            conn.execute("DELETE FROM draft_revisions WHERE draft_id = ?", (draft_id,))
+        except sqlite3.OperationalError:
+            pass
         conn.commit()
+    export_cache.invalidate(DB_PATH, draft_id)
     return n > 0
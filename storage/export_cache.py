@@ -0,0 +1,258 @@
+# storage/export_cache.py
+"""
+On-disk export artifact cache — Day 156.
+
+POS exports (Square / Toast CSV, generic POS JSON, XLSX), the export
+preview / validate / metrics reports and the approve-export payload were
+rebuilt from the database on every hit.  They are pure functions of the
+draft's items (plus, for some formats, a few draft fields), and the items
+already carry a revision (drafts.draft_revisions, Day 153) that moves on
+every write.  So each built artifact is stored once under
+
+    <db>-<draft_id>-<format>-<revision>-<exporter version>[-<extra>]
+
+and served from disk until the draft changes:
+
+  - invalidation: a write moves the revision, so the old key can never be
+    asked for again; storing a newer artifact removes the draft's older
+    files for that format straight away
+  - eviction: least recently used files go once the directory exceeds
+    MAX_BYTES (hits touch the file's mtime)
+  - tee(): a streamed export is written to the cache while it is being
+    sent; only a fully sent body is kept
+
+Drafts without a revision (legacy databases, handcrafted test schemas) are
+never cached.
+
+Env:
+  SERVLINE_EXPORT_CACHE=0            disable
+  SERVLINE_EXPORT_CACHE_DIR=<path>   default storage/.export_cache
+  SERVLINE_EXPORT_CACHE_MAX_MB=<n>   default 256
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import IO, Any, Dict, Iterable, Iterator, Optional, Union
+
+ROOT = Path(__file__).resolve().parents[1]
+CACHE_DIR = Path(os.getenv("SERVLINE_EXPORT_CACHE_DIR") or ROOT / "storage" / ".export_cache")
+MAX_BYTES = int(float(os.getenv("SERVLINE_EXPORT_CACHE_MAX_MB", "256")) * 1024 * 1024)
+
+_SUFFIX = ".art"
+_lock = threading.Lock()
+_counts: Dict[str, int] = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+
+def enabled() -> bool:
+    return os.getenv("SERVLINE_EXPORT_CACHE", "1").strip().lower() not in ("0", "false", "no")
+
+
+def _tag(value: Any) -> str:
+    return hashlib.sha1(str(value).encode("utf-8")).hexdigest()[:10]
+
+
+def _draft_prefix(db_path: Union[str, "os.PathLike[str]"], draft_id: int) -> str:
+    return f"{_tag(os.path.abspath(os.fspath(db_path)))}-{int(draft_id)}-"
+
+
+def entry_path(
+    db_path: Union[str, "os.PathLike[str]"],
+    draft_id: int,
+    fmt: str,
+    revision: Optional[int],
+    version: Union[int, str],
+    extra: Any = None,
+) -> Optional[Path]:
+    """Cache file for one artifact, or None when it must not be cached.
+
+    fmt: short name without dashes ("square_csv", "validate", ...).
+    extra: anything else the artifact depends on (e.g. the draft title);
+      hashed into the name.
+    """
+    if revision is None or not enabled():
+        return None
+    name = f"{_draft_prefix(db_path, draft_id)}{fmt}-{int(revision) & 0xFFFFFFFFFFFFFFFF:016x}-v{version}"
+    if extra is not None:
+        name += f"-{_tag(json.dumps(extra, sort_keys=True, default=str))}"
+    return CACHE_DIR / (name + _SUFFIX)
+
+
+# ---------------------------------------------------------------------------
+# Read
+# ---------------------------------------------------------------------------
+def open_artifact(path: Optional[Path]) -> Optional[IO[bytes]]:
+    """Open a cached artifact for reading (and mark it used); None on a miss."""
+    if path is None:
+        return None
+    try:
+        fh = open(path, "rb")
+    except OSError:
+        _count("misses")
+        return None
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+    _count("hits")
+    return fh
+
+
+def get_json(path: Optional[Path]) -> Optional[Any]:
+    fh = open_artifact(path)
+    if fh is None:
+        return None
+    with fh:
+        try:
+            return json.loads(fh.read().decode("utf-8"))
+        except ValueError:
+            return None
+
+
+# ---------------------------------------------------------------------------
+# Write
+# ---------------------------------------------------------------------------
+def _tmp_file() -> IO[bytes]:
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    return tempfile.NamedTemporaryFile(dir=CACHE_DIR, prefix=".tmp-", delete=False)
+
+
+def _commit(tmp_name: str, path: Path) -> None:
+    os.replace(tmp_name, path)
+    _count("stores")
+    # older revisions of the same (db, draft, format) are unreachable now
+    head = "-".join(path.name.split("-", 3)[:3]) + "-"
+    for old in CACHE_DIR.glob(head + "*" + _SUFFIX):
+        if old != path:
+            _unlink(old)
+    _evict()
+
+
+def put_bytes(path: Optional[Path], data: bytes) -> None:
+    if path is None:
+        return
+    try:
+        fh = _tmp_file()
+    except OSError:
+        return
+    try:
+        with fh:
+            fh.write(data)
+        _commit(fh.name, path)
+    except OSError:
+        _unlink(Path(fh.name))
+
+
+def put_json(path: Optional[Path], obj: Any) -> None:
+    if path is None:
+        return
+    put_bytes(path, json.dumps(obj, separators=(",", ":")).encode("utf-8"))
+
+
+def tee(path: Optional[Path], chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """Yield *chunks* unchanged, storing them at *path* once all were sent.
+
+    A client that disconnects (generator closed early) or an exporter
+    error leaves nothing behind.
+    """
+    if path is None:
+        yield from chunks
+        return
+    try:
+        fh = _tmp_file()
+    except OSError:
+        yield from chunks
+        return
+    done = False
+    try:
+        for chunk in chunks:
+            fh.write(chunk)
+            yield chunk
+        done = True
+    finally:
+        fh.close()
+        if done:
+            try:
+                _commit(fh.name, path)
+            except OSError:
+                _unlink(Path(fh.name))
+        else:
+            _unlink(Path(fh.name))
+
+
+# ---------------------------------------------------------------------------
+# Housekeeping
+# ---------------------------------------------------------------------------
+def _unlink(path: Path) -> None:
+    try:
+        path.unlink()
+    except OSError:
+        pass
+
+
+def _entries():
+    try:
+        return [p for p in CACHE_DIR.iterdir() if p.suffix == _SUFFIX]
+    except OSError:
+        return []
+
+
+def _evict() -> None:
+    with _lock:
+        entries = []
+        for p in _entries():
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, p))
+        total = sum(size for _, size, _ in entries)
+        for _, size, p in sorted(entries, key=lambda e: e[0]):
+            if total <= MAX_BYTES:
+                break
+            _unlink(p)
+            total -= size
+            _counts["evictions"] += 1
+
+
+def invalidate(db_path: Union[str, "os.PathLike[str]"], draft_id: int) -> int:
+    """Drop every artifact of one draft; returns the number of files removed."""
+    removed = 0
+    prefix = _draft_prefix(db_path, draft_id)
+    for p in _entries():
+        if p.name.startswith(prefix):
+            _unlink(p)
+            removed += 1
+    return removed
+
+
+def clear() -> None:
+    for p in _entries():
+        _unlink(p)
+    with _lock:
+        for k in _counts:
+            _counts[k] = 0
+
+
+def stats() -> Dict[str, int]:
+    entries = _entries()
+    with _lock:
+        out = dict(_counts)
+    out["entries"] = len(entries)
+    out["bytes"] = 0
+    for p in entries:
+        try:
+            out["bytes"] += p.stat().st_size
+        except OSError:
+            pass
+    return out
+
+
+def _count(name: str) -> None:
+    with _lock:
+        _counts[name] += 1
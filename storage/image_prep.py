@@ -0,0 +1,363 @@
+# storage/image_prep.py
+"""
+Image preparation for vision calls — Day 146.
+
+Every vision caller (Claude extraction/verification, the VLM scraper, the
+browser screenshot scraper, Google Vision OCR) used to ship whatever bytes
+were on disk, or brute-force JPEG quality by re-saving to a temp file.
+This module is the one place that turns a menu image into request-ready
+payloads:
+
+  1. target_size()  — pick output pixels from the model's *effective*
+                      resolution.  Claude downsamples anything whose long
+                      edge exceeds ~1568px (or ~1.15MP) before the model
+                      sees it, so pixels beyond that are pure upload cost.
+  2. plan_tiles()   — split tall images (long screenshots, receipt-style
+                      menus) into overlapping tiles so each tile keeps a
+                      readable width after that downsampling.
+  3. encode_jpeg()  — binary-search JPEG quality in memory against the
+                      byte cap (no temp files, ~6 encodes worst case).
+  4. prepare_image() — all of the above; returns PreparedImage tiles.
+
+Small images that already fit the profile are passed through untouched,
+so nothing that was legible before gets re-encoded.
+
+Pillow is optional: without it prepare_image() passes raw bytes through
+(the pre-Day-146 behavior) and callers keep working.
+
+Usage:
+    from storage import image_prep
+
+    blocks = [t.to_block() for t in image_prep.prepare_image(path)]
+    # blocks = [{"media_type": "image/jpeg", "data": "<base64>"}, ...]
+"""
+
+from __future__ import annotations
+
+import base64
+import io
+import logging
+import math
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, List, Optional, Tuple, Union
+
+log = logging.getLogger(__name__)
+
+
+# ---------------------------------------------------------------------------
+# Model profiles
+# ---------------------------------------------------------------------------
+@dataclass(frozen=True)
+class VisionProfile:
+    """What a vision endpoint will actually use, and what it will accept."""
+    name: str
+    long_edge: int            # model downsamples past this long edge
+    max_pixels: int           # ...or past this many pixels
+    max_bytes: int            # raw-byte cap (payload caps apply after base64)
+    max_dim: int = 8000       # hard reject above this on any side
+    tile_aspect: float = 2.0  # h/w above which tall images are tiled
+    tile_overlap: float = 0.06  # overlap between tiles, fraction of tile height
+    max_tiles: int = 8
+    max_width_tiles: int = 20   # tile cap when bands keep the source width
+
+
+# Claude: 5MB cap on the BASE64 payload (~1.33x raw) → 3.75MB raw.
+CLAUDE_VISION = VisionProfile(
+    name="claude",
+    long_edge=1568,
+    max_pixels=1_150_000,
+    max_bytes=3_750_000,
+)
+
+# Google Vision DOCUMENT_TEXT_DETECTION: OCR accuracy keeps improving with
+# pixels, so only the 10MB JSON request cap (~7.5MB raw) really binds.
+GOOGLE_VISION_OCR = VisionProfile(
+    name="google_vision",
+    long_edge=4096,
+    max_pixels=16_000_000,
+    max_bytes=7_000_000,
+    max_dim=12000,
+    tile_aspect=100.0,
+)
+
+# JPEG quality search bounds.  Below ~40 ringing starts eating thin
+# strokes in small menu text; above ~92 the bytes buy nothing visible.
+JPEG_Q_MIN = 40
+JPEG_Q_MAX = 92
+
+# Shrink step when even JPEG_Q_MIN is over the byte cap
+_SHRINK_STEP = 0.85
+_MAX_SHRINKS = 8
+
+_PASSTHROUGH_FORMATS = {
+    "JPEG": "image/jpeg",
+    "PNG": "image/png",
+    "GIF": "image/gif",
+    "WEBP": "image/webp",
+}
+
+
+# ---------------------------------------------------------------------------
+# Result type
+# ---------------------------------------------------------------------------
+@dataclass
+class PreparedImage:
+    data: bytes
+    media_type: str
+    width: int
+    height: int
+    quality: Optional[int] = None      # None = passed through untouched
+    source_box: Optional[Tuple[int, int]] = None  # (top, bottom) rows in source
+
+    def b64(self) -> str:
+        return base64.standard_b64encode(self.data).decode("ascii")
+
+    def to_block(self) -> dict:
+        """{media_type, data} dict in the shape the Claude callers use."""
+        return {"media_type": self.media_type, "data": self.b64()}
+
+
+# ---------------------------------------------------------------------------
+# Planning (pure — no Pillow needed)
+# ---------------------------------------------------------------------------
+def target_size(width: int, height: int,
+                profile: VisionProfile = CLAUDE_VISION) -> Tuple[int, int]:
+    """Largest size <= (width, height) the model will actually look at.
+
+    Never upscales; keeps aspect ratio.
+    """
+    if width <= 0 or height <= 0:
+        return (max(width, 0), max(height, 0))
+    scale = min(
+        1.0,
+        profile.long_edge / max(width, height),
+        math.sqrt(profile.max_pixels / float(width * height)),
+        profile.max_dim / max(width, height),
+    )
+    if scale >= 1.0:
+        return (width, height)
+    return (max(1, int(width * scale)), max(1, int(height * scale)))
+
+
+def _keeps_width(width: int, profile: VisionProfile) -> bool:
+    """Whether the model can see an image of this width without narrowing it."""
+    return width <= profile.long_edge
+
+
+def plan_tiles(width: int, height: int,
+               profile: VisionProfile = CLAUDE_VISION, *,
+               keep_width: bool = False) -> List[Tuple[int, int]]:
+    """Split a tall image into overlapping horizontal bands.
+
+    Returns (top, bottom) row ranges covering the full height.  Images no
+    taller than tile_aspect × width come back as a single band.  Tiles are
+    spread evenly, so neighbours overlap by at least tile_overlap.  When
+    the image needs more than max_tiles bands, bands grow taller instead.
+
+    keep_width=True (screenshots, where small text is only readable at the
+    captured width) cuts bands short enough to fit the model's pixel
+    budget at the source width, up to max_width_tiles of them, so no band
+    has to be narrowed.  Images wider than the model's long edge are
+    narrowed anyway and get the default bands.
+    """
+    if width <= 0 or height <= 0:
+        return []
+    tile_h = int(width * profile.tile_aspect)
+    max_tiles = profile.max_tiles
+    if keep_width and _keeps_width(width, profile):
+        tile_h = max(1, min(tile_h, profile.max_pixels // width))
+        max_tiles = profile.max_width_tiles
+    if height <= tile_h:
+        return [(0, height)]
+    overlap = int(tile_h * profile.tile_overlap)
+    step = max(1, tile_h - overlap)
+    n = math.ceil((height - overlap) / step)
+    if n > max_tiles:
+        n = max_tiles
+        tile_h = math.ceil((height + (n - 1) * overlap) / n)
+    if n <= 1:
+        return [(0, height)]
+    span = height - tile_h
+    tops = [round(i * span / (n - 1)) for i in range(n)]
+    return [(t, min(height, t + tile_h)) for t in tops]
+
+
+# ---------------------------------------------------------------------------
+# Encoding
+# ---------------------------------------------------------------------------
+def _pillow():
+    try:
+        from PIL import Image, ImageOps
+        return Image, ImageOps
+    except ImportError:
+        return None, None
+
+
+def available() -> bool:
+    return _pillow()[0] is not None
+
+
+def _flatten(img: Any) -> Any:
+    """JPEG-safe mode: alpha composited onto white, palettes expanded."""
+    Image, _ = _pillow()
+    if img.mode in ("RGB", "L"):
+        return img
+    if img.mode == "P":
+        img = img.convert("RGBA")
+    if img.mode in ("RGBA", "LA"):
+        bg = Image.new("RGB", img.size, (255, 255, 255))
+        bg.paste(img.convert("RGBA"), mask=img.convert("RGBA").split()[-1])
+        return bg
+    if img.mode == "1":
+        return img.convert("L")
+    return img.convert("RGB")
+
+
+def _jpeg_bytes(img: Any, quality: int) -> bytes:
+    buf = io.BytesIO()
+    img.save(buf, format="JPEG", quality=quality, optimize=True)
+    return buf.getvalue()
+
+
+def encode_jpeg(img: Any, max_bytes: int, *,
+                q_min: int = JPEG_Q_MIN, q_max: int = JPEG_Q_MAX) -> Tuple[bytes, int]:
+    """Highest JPEG quality in [q_min, q_max] that fits max_bytes.
+
+    Binary search in memory.  If even q_min is too big, returns the q_min
+    encoding anyway — the caller decides whether to shrink or crop.
+    """
+    img = _flatten(img)
+    lo, hi = q_min, q_max
+    best: Optional[Tuple[bytes, int]] = None
+    smallest: Optional[Tuple[bytes, int]] = None
+    while lo <= hi:
+        mid = (lo + hi) // 2
+        data = _jpeg_bytes(img, mid)
+        if len(data) <= max_bytes:
+            best = (data, mid)
+            lo = mid + 1
+        else:
+            if smallest is None or mid < smallest[1]:
+                smallest = (data, mid)
+            hi = mid - 1
+    if best is not None:
+        return best
+    if smallest is None or smallest[1] != q_min:
+        smallest = (_jpeg_bytes(img, q_min), q_min)
+    return smallest
+
+
+def fit_jpeg(img: Any, max_bytes: int, *, min_width: int = 0) -> Tuple[bytes, int, Any]:
+    """encode_jpeg(), shrinking the image in steps if quality alone can't fit.
+
+    Never shrinks below min_width.  Returns (data, quality, final image).
+    """
+    Image, _ = _pillow()
+    data, q = encode_jpeg(img, max_bytes)
+    shrinks = 0
+    while len(data) > max_bytes and shrinks < _MAX_SHRINKS:
+        w, h = img.size
+        nw = int(w * _SHRINK_STEP)
+        if nw < max(1, min_width):
+            break
+        img = img.resize((nw, max(1, int(h * _SHRINK_STEP))), Image.LANCZOS)
+        data, q = encode_jpeg(img, max_bytes)
+        shrinks += 1
+    return data, q, img
+
+
+# ---------------------------------------------------------------------------
+# Public entry point
+# ---------------------------------------------------------------------------
+def _sniff_media_type(raw: bytes) -> Optional[str]:
+    if raw[:8] == b"\x89PNG\r\n\x1a\n":
+        return "image/png"
+    if raw[:3] == b"\xff\xd8\xff":
+        return "image/jpeg"
+    if raw[:6] in (b"GIF87a", b"GIF89a"):
+        return "image/gif"
+    if raw[:4] == b"RIFF" and raw[8:12] == b"WEBP":
+        return "image/webp"
+    return None
+
+
+ImageSource = Union[str, Path, bytes, Any]
+
+
+def prepare_image(src: ImageSource, profile: VisionProfile = CLAUDE_VISION, *,
+                  tile: bool = False, keep_width: bool = False) -> List[PreparedImage]:
+    """Turn a path, raw bytes or PIL image into request-ready payloads.
+
+    tile=False returns exactly one image (page-level callers that ask for
+    bbox percentages need one image per page).  tile=True splits tall
+    images per plan_tiles().  keep_width=True never narrows an image the
+    model can see at full width: bands come from plan_tiles(keep_width=
+    True), only max_dim forces a resize, and the byte cap is met by JPEG
+    quality alone.  Returns [] if the source can't be read.
+    """
+    raw: Optional[bytes] = None
+    if isinstance(src, (str, Path)):
+        try:
+            raw = Path(src).read_bytes()
+        except Exception as e:
+            log.warning("image_prep: failed to read %s: %s", src, e)
+            return []
+    elif isinstance(src, (bytes, bytearray)):
+        raw = bytes(src)
+
+    Image, ImageOps = _pillow()
+    if Image is None:
+        if raw is None:
+            return []
+        mt = _sniff_media_type(raw)
+        if not mt:
+            return []
+        return [PreparedImage(raw, mt, 0, 0)]
+
+    if raw is not None:
+        try:
+            img = Image.open(io.BytesIO(raw))
+            img.load()
+        except Exception as e:
+            log.warning("image_prep: unreadable image (%d bytes): %s", len(raw), e)
+            return []
+    else:
+        img = src
+
+    fmt = getattr(img, "format", None)
+    try:
+        rotated = img.getexif().get(0x0112, 1) not in (0, 1)
+        if rotated:
+            img = ImageOps.exif_transpose(img)
+    except Exception:
+        rotated = False
+    w, h = img.size
+    bands = plan_tiles(w, h, profile, keep_width=keep_width) if tile else [(0, h)]
+    keep = keep_width and _keeps_width(w, profile)
+
+    def _band_size(bw: int, bh: int) -> Tuple[int, int]:
+        if not keep:
+            return target_size(bw, bh, profile)
+        scale = min(1.0, profile.max_dim / max(bw, bh))
+        return (bw, bh) if scale >= 1.0 else (max(1, int(bw * scale)), max(1, int(bh * scale)))
+
+    # Passthrough: already small enough in bytes and pixels, upright, one band
+    if (raw is not None and not rotated and len(bands) == 1
+            and fmt in _PASSTHROUGH_FORMATS and len(raw) <= profile.max_bytes
+            and _band_size(w, h) == (w, h)):
+        return [PreparedImage(raw, _PASSTHROUGH_FORMATS[fmt], w, h, None, (0, h))]
+
+    out: List[PreparedImage] = []
+    for top, bottom in bands:
+        band = img if (top, bottom) == (0, h) else img.crop((0, top, w, bottom))
+        tw, th = _band_size(band.size[0], band.size[1])
+        if (tw, th) != band.size:
+            band = band.resize((tw, th), Image.LANCZOS)
+        data, q, band = fit_jpeg(band, profile.max_bytes,
+                                 min_width=band.size[0] if keep else 0)
+        out.append(PreparedImage(data, "image/jpeg", band.size[0], band.size[1],
+                                 q, (top, bottom)))
+    log.info("image_prep[%s]: %dx%d -> %d image(s), %d bytes total",
+             profile.name, w, h, len(out), sum(len(p.data) for p in out))
+    return out
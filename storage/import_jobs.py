@@ -5,6 +5,9 @@ import sqlite3
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Set, Tuple
 
+from . import db_pool
+from . import migrate
+
 # Optional XLSX support (Phase 6 pt.3 — structured_xlsx ingestion)
 try:
     import openpyxl  # type: ignore[import]
@@ -20,9 +23,31 @@ DB_PATH = ROOT / "storage" / "servline.db"
 # ---------------------------------------------------------------------------
 
 def db_connect() -> sqlite3.Connection:
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
+    return db_pool.connect(DB_PATH, foreign_keys=False)
+
+
+# Day 136: pipeline_stage column; moved here from portal/app.py on Day 150
+def _ensure_import_jobs_columns() -> None:
+    """Add missing columns to import_jobs (idempotent; no-op until schema.sql
+    has created the table)."""
+    if not Path(DB_PATH).exists():
+        return
+    try:
+        with db_connect() as conn:
+            cols = {r[1] for r in conn.execute("PRAGMA table_info(import_jobs)").fetchall()}
+            if not cols:
+                return
+            if "pipeline_stage" not in cols:
+                conn.execute("ALTER TABLE import_jobs ADD COLUMN pipeline_stage TEXT")
+            # Day 141: store extra page filenames (JSON array) for multi-page menus
+            if "extra_filenames" not in cols:
+                conn.execute("ALTER TABLE import_jobs ADD COLUMN extra_filenames TEXT")
+            # Day 142: live count of items streamed out of the detection call
+            if "items_extracted" not in cols:
+                conn.execute("ALTER TABLE import_jobs ADD COLUMN items_extracted INTEGER")
+            conn.commit()
+    except sqlite3.Error as e:
+        print(f"[import_jobs] column backfill: {e}")
 
 
 def _get_import_jobs_columns() -> Set[str]:
@@ -833,3 +858,7 @@ def rebuild_structured_items_from_header_map(
             conn.commit()
 
     return clean_items, errors, summary_counts, header_map, sample_rows
+
+
+# Day 150: schema steps run via storage/migrate.py; import only checks the version
+migrate.on_import(DB_PATH, __name__)
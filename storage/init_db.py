@@ -73,6 +73,15 @@ def apply_migration(conn: sqlite3.Connection, path: Path) -> None:
     run_sql_path(conn, path)
     conn.execute("INSERT OR IGNORE INTO schema_migrations(filename) VALUES (?)", (path.name,))
 
+def run_schema_steps() -> None:
+    """Day 150: apply the storage modules' schema steps and stamp the version."""
+    import sys
+    if str(ROOT) not in sys.path:
+        sys.path.insert(0, str(ROOT))
+    from storage import migrate
+    applied = migrate.run(DB_PATH)
+    print(f"[ServLine] Schema steps applied: {len(applied)} (version {migrate.SCHEMA_VERSION})")
+
 def run_pending_migrations(conn: sqlite3.Connection) -> None:
     ensure_migrations_table(conn)
     applied = get_applied_migrations(conn)
@@ -99,6 +108,7 @@ def build_fresh_db() -> None:
         conn.commit()
     finally:
         conn.close()
+    run_schema_steps()
 
 def migrate_existing_db() -> None:
     """Run any pending migrations against an existing DB."""
@@ -111,6 +121,7 @@ def migrate_existing_db() -> None:
         conn.commit()
     finally:
         conn.close()
+    run_schema_steps()
 
 # ----------------------------
 # CLI entry
@@ -0,0 +1,76 @@
+# storage/keyword_automaton.py
+"""
+Multi-pattern substring matcher (Aho-Corasick) — Day 159.
+
+Category inference asks one question many times per item: which of a few
+hundred keywords / phrases occur in this text (plain substring test, the
+same as `kw in text`)?  Looping over the keyword lists costs one scan of
+the text per keyword.  KeywordAutomaton answers it in a single left-to-
+right pass: the patterns are compiled once into a trie whose failure links
+are folded into every state's transition table (a DFA), so each character
+is one dict lookup, and every state carries the patterns ending there.
+
+    matcher = KeywordAutomaton(["pizza", "cheese pizza", "pie"])
+    matcher.find("cheese pizza pie")  # {"pizza", "cheese pizza", "pie"}
+
+Pure Python, no dependencies.  Matching is case-sensitive; callers
+normalise text first, as the loops they replace did.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from typing import Dict, FrozenSet, Iterable, List, Tuple
+
+
+class KeywordAutomaton:
+    """Compiled set of patterns; find() returns the distinct ones present."""
+
+    __slots__ = ("_delta", "_out", "patterns")
+
+    def __init__(self, patterns: Iterable[str]) -> None:
+        self.patterns: FrozenSet[str] = frozenset(p for p in patterns if p)
+        goto: List[Dict[str, int]] = [{}]
+        out: List[List[str]] = [[]]
+        for pattern in sorted(self.patterns):
+            state = 0
+            for ch in pattern:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto.append({})
+                    out.append([])
+                    goto[state][ch] = nxt
+                state = nxt
+            out[state].append(pattern)
+
+        # Breadth-first: a state's failure target is always shallower, so its
+        # transitions and outputs are final by the time the state is reached.
+        fail = [0] * len(goto)
+        delta: List[Dict[str, int]] = [dict(goto[0])]
+        delta.extend({} for _ in range(len(goto) - 1))
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            f = fail[state]
+            delta[state] = {**delta[f], **goto[state]}
+            out[state].extend(out[f])
+            for ch, child in goto[state].items():
+                fail[child] = delta[f].get(ch, 0)
+                queue.append(child)
+
+        self._delta = delta
+        self._out: Tuple[Tuple[str, ...], ...] = tuple(tuple(o) for o in out)
+
+    def find(self, text: str) -> FrozenSet[str]:
+        """Distinct patterns occurring in *text* as substrings."""
+        if not text:
+            return frozenset()
+        delta, out = self._delta, self._out
+        state = 0
+        found: List[str] = []
+        for ch in text:
+            state = delta[state].get(ch, 0)
+            if out[state]:
+                found.extend(out[state])
+        return frozenset(found)
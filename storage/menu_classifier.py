@@ -18,6 +18,12 @@ Cost: ~$0.01-0.02 per competitor menu. Cached as part of competitor_menus
 so each ZIP pays once per 30-day cache cycle.
 
 Used by storage.price_intel after scrape_competitor_menu() produces items.
+
+Day 162: when the trained category model (storage.category_model) is
+available, the whole menu is scored locally in one batch first.  Items it
+is sure are drinks or desserts get their role without the paid call;
+only the rest are sent to Haiku.  An uncalibrated model never skips the
+call: its raw probabilities don't mean what the threshold assumes.
 """
 
 from __future__ import annotations
@@ -70,6 +76,49 @@ def _chunk(items: List[Dict[str, Any]], size: int) -> List[List[Dict[str, Any]]]
     return [items[i:i + size] for i in range(0, len(items), size)]
 
 
+# Model categories whose role needs no LLM call (Day 162).
+_MODEL_CATEGORY_ROLES = {"Beverages": "drink", "Desserts": "dessert"}
+
+
+def _model_classifications(items: List[Dict[str, Any]]) -> Dict[int, Dict[str, str]]:
+    """Roles the local category model is confident about, by item index."""
+    try:
+        from .category_model import MODEL_SKIP_LLM_PROBABILITY, get_category_model
+        model = get_category_model()
+        if model is None or not model.calibrated:
+            return {}
+        preds = model.predict([it.get("name") or "" for it in items])
+    except Exception as e:
+        log.warning("menu_classifier: category model failed: %s", e)
+        return {}
+    out: Dict[int, Dict[str, str]] = {}
+    for idx, (it, pred) in enumerate(zip(items, preds)):
+        role = _MODEL_CATEGORY_ROLES.get(pred.category or "")
+        name = (it.get("name") or "").strip()
+        if role and name and pred.probability >= MODEL_SKIP_LLM_PROBABILITY:
+            out[idx] = {"role": role, "canonical_name": name}
+    return out
+
+
+def _apply_classifications(
+    items: List[Dict[str, Any]],
+    classifications: Dict[int, Dict[str, str]],
+) -> List[Dict[str, Any]]:
+    out: List[Dict[str, Any]] = []
+    for idx, it in enumerate(items):
+        new = dict(it)
+        tag = classifications.get(idx)
+        if tag:
+            new["role"] = tag["role"]
+            new["canonical_name"] = tag["canonical_name"]
+        else:
+            # Unclassified: keep item, let consumers decide what to do.
+            new.setdefault("role", None)
+            new.setdefault("canonical_name", it.get("name"))
+        out.append(new)
+    return out
+
+
 def classify_menu_items(
     place_name: str,
     items: List[Dict[str, Any]],
@@ -78,14 +127,22 @@ def classify_menu_items(
     """
     Return the input `items` with `role` and `canonical_name` attached.
 
+    Items the local category model classifies confidently skip the LLM.
     Falls back to returning items unchanged (role=None) if the API is
     unavailable or the classification call fails. Never raises.
     """
     if not items:
         return items
+
+    classifications = _model_classifications(items)
+    if len(classifications) == len(items):
+        return _apply_classifications(items, classifications)
+
     client = _get_client()
     if not client:
         log.info("menu_classifier: no API key, returning items unclassified")
+        if classifications:
+            return _apply_classifications(items, classifications)
         return items
 
     # Build compact input: just what Haiku needs to classify.
@@ -98,10 +155,9 @@ def classify_menu_items(
             "price_cents": it.get("price_cents", 0),
         }
         for idx, it in enumerate(items)
+        if idx not in classifications
     ]
 
-    classifications: Dict[int, Dict[str, str]] = {}
-
     for batch_idx, batch in enumerate(_chunk(compact, batch_size)):
         prompt = (
             f"Restaurant: {place_name}\n\n"
@@ -137,24 +193,12 @@ def classify_menu_items(
             log.info(
                 "menu_classifier: batch %d/%d, %d items, %d classified",
                 batch_idx + 1, (len(compact) + batch_size - 1) // batch_size,
-                len(batch), sum(1 for i in range(len(batch)) if (batch_idx * batch_size + i) in classifications),
+                len(batch), sum(1 for row in batch if row["i"] in classifications),
             )
         except Exception as e:
             log.warning("menu_classifier: batch %d failed: %s", batch_idx + 1, e)
 
-    out: List[Dict[str, Any]] = []
-    for idx, it in enumerate(items):
-        new = dict(it)
-        tag = classifications.get(idx)
-        if tag:
-            new["role"] = tag["role"]
-            new["canonical_name"] = tag["canonical_name"]
-        else:
-            # Unclassified: keep item, let consumers decide what to do.
-            new.setdefault("role", None)
-            new.setdefault("canonical_name", it.get("name"))
-        out.append(new)
-    return out
+    return _apply_classifications(items, classifications)
 
 
 _VALID_ROLES = {"dish", "side", "drink", "dessert", "modifier", "variant"}
@@ -23,8 +23,9 @@ Based on research from:
 """
 
 from difflib import SequenceMatcher
-from typing import Optional, Dict, List, Tuple
+from typing import Optional, Dict, Iterable, List, Tuple
 import re
+import threading
 
 # =============================================================================
 # LAYER 1: Direct OCR Error → Correction Dictionary
@@ -373,7 +374,32 @@ OCR_CORRECTIONS: Dict[str, str] = {
 # =============================================================================
 # Used when dictionary lookup fails - find closest valid food word
 
-FOOD_VOCABULARY: set = {
+class _VocabularySet(set):
+    """set that counts its edits, so the fuzzy index knows when it is stale."""
+
+    version = 0
+
+
+def _counts_edit(name: str):
+    base = getattr(set, name)
+
+    def method(self, *args):
+        result = base(self, *args)
+        self.version += 1
+        return result
+
+    method.__name__ = name
+    return method
+
+
+for _name in ("add", "discard", "remove", "pop", "clear", "update",
+              "difference_update", "intersection_update",
+              "symmetric_difference_update",
+              "__ior__", "__iand__", "__isub__", "__ixor__"):
+    setattr(_VocabularySet, _name, _counts_edit(_name))
+
+
+FOOD_VOCABULARY: set = _VocabularySet({
     # Proteins
     'chicken', 'beef', 'pork', 'fish', 'shrimp', 'lobster', 'crab', 'salmon',
     'tuna', 'cod', 'tilapia', 'turkey', 'duck', 'lamb', 'veal', 'bacon',
@@ -444,7 +470,7 @@ FOOD_VOCABULARY: set = {
     # Desserts
     'cake', 'pie', 'ice cream', 'gelato', 'sorbet', 'brownie', 'cookie',
     'cheesecake', 'tiramisu', 'mousse', 'pudding', 'cobbler', 'sundae',
-}
+})
 
 # =============================================================================
 # CHARACTER CONFUSION PATTERNS
@@ -481,6 +507,109 @@ CHAR_CONFUSIONS: Dict[str, List[str]] = {
 }
 
 
+# =============================================================================
+# FUZZY INDEX (Day 158)
+# =============================================================================
+# fuzzy_match_food used to run SequenceMatcher against every vocabulary word
+# within 3 characters of the token's length, once per word of every OCR line.
+# ratio() is 2*M / (len(a) + len(b)) and the matched count M can never exceed
+# the letters both words share (counted with repeats), so the vocabulary is
+# bucketed by length with each word's letter counts; candidates are ranked
+# by that upper bound and the scan stops as soon as no remaining word can
+# beat the best ratio found.  The winner is the one the full scan would pick;
+# words with exactly equal ratios now resolve alphabetically instead of by
+# set iteration order (which changed with the hash seed).
+
+_FUZZY_MAX_LEN_DIFF = 3
+_FUZZY_MEMO_MAX = 4096
+
+
+def _letter_counts(word: str) -> Dict[str, int]:
+    counts: Dict[str, int] = {}
+    for ch in word:
+        counts[ch] = counts.get(ch, 0) + 1
+    return counts
+
+
+def _vocabulary_stamp(vocab) -> int:
+    """Changes whenever vocab's contents do.
+
+    The module's own _VocabularySet counts its edits; a plain set assigned
+    in its place is hashed instead (slower, but never stale).
+    """
+    if isinstance(vocab, _VocabularySet):
+        return vocab.version
+    return hash(frozenset(vocab))
+
+
+class _FoodIndex:
+    """Length-bucketed FOOD_VOCABULARY with per-word letter counts."""
+
+    def __init__(self, words) -> None:
+        self.by_len: Dict[int, List[Tuple[str, Dict[str, int]]]] = {}
+        self.size = 0
+        # which set (and which state of it) this index was built from
+        self.vocab = words
+        self.stamp = _vocabulary_stamp(words)
+        for word in sorted(words):
+            self.add(word)
+
+    def current(self, vocab) -> bool:
+        return self.vocab is vocab and self.stamp == _vocabulary_stamp(vocab)
+
+    def add(self, word: str) -> None:
+        self.by_len.setdefault(len(word), []).append((word, _letter_counts(word)))
+        self.size += 1
+
+    def best_match(self, lower: str, threshold: float) -> Optional[str]:
+        la = len(lower)
+        query = _letter_counts(lower)
+        ranked: List[Tuple[float, str]] = []
+        for lb in range(la - _FUZZY_MAX_LEN_DIFF, la + _FUZZY_MAX_LEN_DIFF + 1):
+            for word, counts in self.by_len.get(lb, ()):
+                shared = 0
+                for ch, n in counts.items():
+                    q = query.get(ch)
+                    if q:
+                        shared += n if n < q else q
+                bound = 2.0 * shared / (la + lb)
+                if bound > threshold:
+                    ranked.append((-bound, word))
+        ranked.sort()
+
+        best_match = None
+        best_ratio = threshold
+        for neg_bound, word in ranked:
+            if -neg_bound < best_ratio or (best_match is None and -neg_bound <= best_ratio):
+                break
+            ratio = SequenceMatcher(None, lower, word).ratio()
+            if ratio > best_ratio or (ratio == best_ratio and best_match is not None
+                                      and word < best_match):
+                best_ratio = ratio
+                best_match = word
+        return best_match
+
+
+_food_index: Optional[_FoodIndex] = None
+_fuzzy_memo: Dict[Tuple[str, float], Optional[str]] = {}
+_index_lock = threading.Lock()
+
+
+def _get_food_index() -> _FoodIndex:
+    """The process-wide index; rebuilt (and the memo dropped) if FOOD_VOCABULARY
+    was edited directly or replaced."""
+    global _food_index
+    index = _food_index
+    if index is None or not index.current(FOOD_VOCABULARY):
+        with _index_lock:
+            index = _food_index
+            if index is None or not index.current(FOOD_VOCABULARY):
+                index = _FoodIndex(FOOD_VOCABULARY)
+                _food_index = index
+                _fuzzy_memo.clear()
+    return index
+
+
 # =============================================================================
 # CORE FUNCTIONS
 # =============================================================================
@@ -532,29 +661,91 @@ def fuzzy_match_food(text: str, threshold: float = 0.75) -> Optional[str]:
     if lower in FOOD_VOCABULARY:
         return None
     
-    best_match = None
-    best_ratio = threshold
-    
-    for word in FOOD_VOCABULARY:
-        # Only compare words of similar length
-        if abs(len(word) - len(lower)) > 3:
-            continue
-            
-        ratio = SequenceMatcher(None, lower, word).ratio()
-        if ratio > best_ratio:
-            best_ratio = ratio
-            best_match = word
+    # Day 158: indexed lookup, memoized per (word, threshold)
+    index = _get_food_index()
+    key = (lower, threshold)
+    if key in _fuzzy_memo:
+        return _fuzzy_memo[key]
     
+    best_match = index.best_match(lower, threshold)
+    if len(_fuzzy_memo) >= _FUZZY_MEMO_MAX:
+        _fuzzy_memo.clear()
+    _fuzzy_memo[key] = best_match
     return best_match
 
 
-def correct_menu_item(text: str, use_fuzzy: bool = True) -> str:
+_WORD_TOKEN_RE = re.compile(r'\b\w+\b|\S')
+
+
+def correct_word(word: str, use_fuzzy: bool = True) -> str:
+    """
+    Correct one alphabetic word: dictionary lookup, then fuzzy matching.
+
+    Args:
+        word: A single alphabetic token (e.g., "Chlcken")
+        use_fuzzy: Whether to use fuzzy matching for unknown words
+
+    Returns:
+        Corrected word (case pattern preserved), or the word unchanged
+    """
+    # Layer 1: Dictionary lookup
+    fixed = correct_ocr_text(word)
+    if fixed != word:
+        return fixed
+
+    # Layer 2: Fuzzy matching (optional)
+    if use_fuzzy:
+        fuzzy = fuzzy_match_food(word)
+        if fuzzy:
+            # Preserve case
+            if word.isupper():
+                return fuzzy.upper()
+            elif word[0].isupper():
+                return fuzzy.capitalize()
+            return fuzzy
+
+    # No correction found
+    return word
+
+
+def correction_table(texts: Iterable[str], use_fuzzy: bool = True) -> Dict[str, str]:
+    """
+    Correct every distinct word of many texts once (Day 166).
+
+    A menu repeats the same garbled tokens across items; the table maps
+    each distinct alphabetic token to correct_word(token) so that
+    correct_menu_item(text, table=...) only does lookups.
+
+    Args:
+        texts: Menu item strings
+        use_fuzzy: Whether to use fuzzy matching for unknown words
+
+    Returns:
+        {token: corrected token} for every alphabetic token in texts
+    """
+    table: Dict[str, str] = {}
+    for text in texts:
+        if not text:
+            continue
+        for word in _WORD_TOKEN_RE.findall(text):
+            if word not in table and word.isalpha():
+                table[word] = correct_word(word, use_fuzzy)
+    return table
+
+
+def correct_menu_item(
+    text: str,
+    use_fuzzy: bool = True,
+    table: Optional[Dict[str, str]] = None,
+) -> str:
     """
     Correct an entire menu item string (multiple words).
     
     Args:
         text: Full menu item text (e.g., "Grllled Chlcken Sandwlch")
         use_fuzzy: Whether to use fuzzy matching for unknown words
+        table: Optional correction_table() built with the same use_fuzzy;
+            words found in it are not corrected again
         
     Returns:
         Corrected text
@@ -563,7 +754,7 @@ def correct_menu_item(text: str, use_fuzzy: bool = True) -> str:
         return text
     
     # Split into words, preserving punctuation
-    words = re.findall(r'\b\w+\b|\S', text)
+    words = _WORD_TOKEN_RE.findall(text)
     corrected = []
     
     for word in words:
@@ -572,27 +763,10 @@ def correct_menu_item(text: str, use_fuzzy: bool = True) -> str:
             corrected.append(word)
             continue
         
-        # Layer 1: Dictionary lookup
-        fixed = correct_ocr_text(word)
-        if fixed != word:
-            corrected.append(fixed)
-            continue
-        
-        # Layer 2: Fuzzy matching (optional)
-        if use_fuzzy:
-            fuzzy = fuzzy_match_food(word)
-            if fuzzy:
-                # Preserve case
-                if word.isupper():
-                    corrected.append(fuzzy.upper())
-                elif word[0].isupper():
-                    corrected.append(fuzzy.capitalize())
-                else:
-                    corrected.append(fuzzy)
-                continue
-        
-        # No correction found
-        corrected.append(word)
+        if table is not None and word in table:
+            corrected.append(table[word])
+        else:
+            corrected.append(correct_word(word, use_fuzzy))
     
     # Reconstruct with proper spacing
     result = []
@@ -615,8 +789,9 @@ def batch_correct(items: List[str]) -> List[Tuple[str, str, bool]]:
         List of (original, corrected, was_changed) tuples
     """
     results = []
+    table = correction_table(items)
     for item in items:
-        corrected = correct_menu_item(item)
+        corrected = correct_menu_item(item, table=table)
         changed = corrected != item
         results.append((item, corrected, changed))
     return results
@@ -640,7 +815,17 @@ def add_food_word(word: str) -> None:
     Args:
         word: Food word to add
     """
-    FOOD_VOCABULARY.add(word.lower())
+    word = word.lower()
+    with _index_lock:
+        if word in FOOD_VOCABULARY:
+            return
+        index = _food_index
+        in_step = index is not None and index.current(FOOD_VOCABULARY)
+        FOOD_VOCABULARY.add(word)
+        if in_step:
+            index.add(word)
+            index.stamp = _vocabulary_stamp(FOOD_VOCABULARY)
+        _fuzzy_memo.clear()
 
 
 def get_stats() -> Dict[str, int]:
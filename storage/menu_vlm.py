@@ -23,11 +23,12 @@ from pathlib import Path
 from typing import Any, Dict, List, Optional
 from urllib.parse import urlparse, urlunparse
 
+from . import image_prep
+
 log = logging.getLogger(__name__)
 
 CLAUDE_MODEL = "claude-opus-4-7"
-MAX_IMAGE_BYTES = 4_500_000   # Anthropic limit is 5MB; leave headroom
-MAX_IMAGE_DIM = 7500          # Anthropic rejects > 8000px any dim
+MAX_IMAGE_BYTES = 3_750_000   # Anthropic 5MB limit applies after base64
 
 
 _EXTRACTION_PROMPT = """This is one or more screenshots of a restaurant's
@@ -993,42 +994,26 @@ def _find_menu_link(page) -> Optional[str]:
 # Image chunking for vision API
 # ---------------------------------------------------------------------------
 
+_CHUNK_EXT = {"image/jpeg": ".jpg", "image/png": ".png"}
+
+
 def _chunk_image_for_vision(path: Path) -> List[Path]:
-    """Anthropic vision rejects > 5MB or any dimension > 8000px. For
-    tall menu screenshots, chunk vertically with overlap. Convert to
-    JPEG for size headroom. Returns list of chunk paths."""
-    try:
-        from PIL import Image
-    except ImportError:
+    """Anthropic vision rejects > 5MB or any dimension > 8000px, and
+    downsamples anything past ~1.15MP anyway. Day 146: tiles are planned
+    by image_prep — tall screenshots split by height only into overlapping
+    bands that fit the model's pixel budget at the captured width (small
+    menu text is unreadable once the width is crushed), JPEG quality
+    searched in memory. Returns list of chunk paths."""
+    if not image_prep.available():
         log.warning("Pillow missing — can't chunk image. Install: pip install pillow")
         return [path] if path.stat().st_size <= MAX_IMAGE_BYTES else []
 
-    img = Image.open(path)
-    w, h = img.size
-
-    # Width handling: scale uniformly if too wide (rare)
-    if w > MAX_IMAGE_DIM:
-        s = MAX_IMAGE_DIM / w
-        img = img.resize((int(w * s), int(h * s)), Image.LANCZOS)
-        w, h = img.size
-
+    tiles = image_prep.prepare_image(path, tile=True, keep_width=True)
     chunks: List[Path] = []
-    chunk_h = MAX_IMAGE_DIM - 150  # 150px overlap between chunks
-    y = 0
-    idx = 0
-    while y < h:
-        bottom = min(y + MAX_IMAGE_DIM, h)
-        crop = img.crop((0, y, w, bottom))
-        out = path.with_name(f"{path.stem}_c{idx}.jpg")
-        for q in (85, 75, 65, 55):
-            crop.convert("RGB").save(out, "JPEG", quality=q, optimize=True)
-            if out.stat().st_size <= MAX_IMAGE_BYTES:
-                break
+    for idx, t in enumerate(tiles):
+        out = path.with_name(f"{path.stem}_c{idx}{_CHUNK_EXT.get(t.media_type, '.jpg')}")
+        out.write_bytes(t.data)
         chunks.append(out)
-        idx += 1
-        if bottom >= h:
-            break
-        y += chunk_h
 
     # Free the source PNG once we've chunked it
     try:
@@ -1036,7 +1021,7 @@ def _chunk_image_for_vision(path: Path) -> List[Path]:
     except Exception:
         pass
 
-    log.info("VLM: %d chunk(s), source %dx%d", len(chunks), w, h)
+    log.info("VLM: %d chunk(s), %d bytes", len(chunks), sum(len(t.data) for t in tiles))
     return chunks
 
 
@@ -1057,7 +1042,7 @@ def _extract_with_claude(chunks: List[Path], place_name: str = "") -> List[Dict[
 
     content: List[Any] = []
     for c in chunks:
-        media_type = "image/jpeg" if c.suffix.lower() == ".jpg" else "image/png"
+        media_type = "image/png" if c.suffix.lower() == ".png" else "image/jpeg"
         img_b64 = base64.standard_b64encode(c.read_bytes()).decode()
         content.append({
             "type": "image",
@@ -5,7 +5,8 @@ import re
 import sqlite3
 from typing import Any, Dict, List, Optional
 
-from .drafts import db_connect, _now
+from . import migrate
+from .drafts import DB_PATH as _DB_PATH, db_connect, _now
 
 
 # ------------------------------------------------------------
@@ -177,7 +178,8 @@ def _ensure_menu_schema() -> None:
         conn.commit()
 
 
-_ensure_menu_schema()
+# Day 150: schema steps run via storage/migrate.py; import only checks the version
+migrate.on_import(_DB_PATH, __name__)
 
 
 # ====================================================================
@@ -801,7 +803,7 @@ def restore_version_to_draft(version_id: int) -> Optional[Dict[str, Any]]:
     ``variant_count``, and ``version_label``.  Returns None if the
     version is not found.
     """
-    from .drafts import _insert_draft, _insert_items_bulk, insert_variants
+    from .drafts import _insert_draft, _insert_items_bulk, _normalize_item_for_db
 
     version = get_menu_version(version_id, include_items=True)
     if version is None:
@@ -824,37 +826,30 @@ def restore_version_to_draft(version_id: int) -> Optional[Dict[str, Any]]:
     item_count = 0
     variant_count = 0
 
+    # Day 148: one bulk write for all items + their variants
+    rows = []
     for it in items:
-        inserted_ids = _insert_items_bulk(
-            draft_id,
-            [
+        row = {
+            "name": it.get("name"),
+            "description": it.get("description"),
+            "price_cents": it.get("price_cents", 0),
+            "category": it.get("category"),
+            "position": it.get("position"),
+            "_variants": [
                 {
-                    "name": it.get("name"),
-                    "description": it.get("description"),
-                    "price_cents": it.get("price_cents", 0),
-                    "category": it.get("category"),
-                    "position": it.get("position"),
+                    "label": v.get("label"),
+                    "price_cents": v.get("price_cents", 0),
+                    "kind": v.get("kind", "size"),
+                    "position": v.get("position", 0),
                 }
+                for v in (it.get("variants") or [])
             ],
-        )
+        }
+        rows.append(row)
         item_count += 1
-
-        variants = it.get("variants") or []
-        if inserted_ids and variants:
-            new_item_id = inserted_ids[0]
-            insert_variants(
-                new_item_id,
-                [
-                    {
-                        "label": v.get("label"),
-                        "price_cents": v.get("price_cents", 0),
-                        "kind": v.get("kind", "size"),
-                        "position": v.get("position", 0),
-                    }
-                    for v in variants
-                ],
-            )
-            variant_count += len(variants)
+        if _normalize_item_for_db(row):
+            variant_count += len(row["_variants"])
+    _insert_items_bulk(draft_id, rows)
 
     return {
         "draft_id": draft_id,
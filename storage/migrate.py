@@ -0,0 +1,163 @@
+# storage/migrate.py
+"""
+Day 150: versioned schema bootstrap.
+
+Every storage module used to run its `_ensure_*schema()` functions at
+import time: dozens of CREATE TABLE IF NOT EXISTS / PRAGMA table_info /
+ALTER TABLE probes on every process start and in every test module.
+
+Those functions are now registered here as ordered STEPS.  The database
+records the schema version it is at in `PRAGMA user_version`:
+
+  - `python storage/init_db.py` (run once per deploy) applies schema.sql,
+    the SQL files in storage/migrations/, then every step, and stamps
+    SCHEMA_VERSION.
+  - Module import calls on_import(), which reads user_version once per
+    process.  A current database costs that one PRAGMA and nothing else.
+    A stale one (fresh dev checkout, no init_db run yet) runs the
+    importing module's own steps, exactly as before; once every step has
+    run in this process the database is stamped current.
+
+Bump SCHEMA_VERSION whenever a step gains a table, column or index, so
+existing databases pick it up on their next start.
+"""
+
+from __future__ import annotations
+
+import importlib
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Set, Tuple, Union
+
+from . import db_pool
+
+# Bump whenever any step below changes what it creates.
+SCHEMA_VERSION = 3  # Day 154: idx_items_order (keyset pages)
+
+# (module, function) in dependency order.  Each function is idempotent.
+STEPS: Tuple[Tuple[str, str], ...] = (
+    ("storage.import_jobs", "_ensure_import_jobs_columns"),
+    ("storage.drafts", "_ensure_schema"),
+    ("storage.menus", "_ensure_menu_schema"),
+    ("storage.users", "_ensure_users_schema"),
+    ("storage.users", "_ensure_restaurant_columns"),
+    ("storage.users", "_ensure_tier_column"),
+    ("storage.price_intel", "_ensure_schema"),
+    ("storage.price_intel", "_ensure_menu_scrape_schema"),
+    ("storage.price_intel", "_ensure_anchor_tier_schema"),
+    ("storage.ai_price_intel", "_ensure_schema"),
+    ("storage.ai_price_intel", "_ensure_gemini_log_schema"),
+    ("storage.ai_price_intel", "_ensure_comparison_schema"),
+)
+
+PathLike = Union[str, Path]
+
+_lock = threading.Lock()
+_current: Set[Tuple[str, Tuple[int, int]]] = set()   # (path, file id) known current
+_ran: Dict[str, Set[Tuple[str, str]]] = {}          # path -> steps run this process
+
+
+def _key(db_path: PathLike) -> str:
+    return str(Path(db_path).resolve())
+
+
+def _file_id(path: str) -> Tuple[int, int]:
+    st = os.stat(path)
+    return (st.st_dev, st.st_ino)
+
+
+def schema_version(db_path: PathLike) -> int:
+    """The database's recorded schema version (0 if missing or never stamped)."""
+    path = _key(db_path)
+    if not os.path.exists(path):
+        return 0
+    with db_pool.connection(path) as conn:
+        return int(conn.execute("PRAGMA user_version").fetchone()[0])
+
+
+def is_current(db_path: PathLike) -> bool:
+    """Cheap check: one PRAGMA per database file per process."""
+    path = _key(db_path)
+    try:
+        fid = _file_id(path)
+    except OSError:
+        return False
+    if (path, fid) in _current:
+        return True
+    if schema_version(path) >= SCHEMA_VERSION:
+        with _lock:
+            _current.add((path, fid))
+        return True
+    return False
+
+
+def _stamp(path: str) -> None:
+    with db_pool.connection(path) as conn:
+        conn.execute(f"PRAGMA user_version = {int(SCHEMA_VERSION)}")
+    with _lock:
+        _current.add((path, _file_id(path)))
+        _ran.pop(path, None)
+
+
+def _run_step(module_name: str, func_name: str) -> None:
+    module = importlib.import_module(module_name)
+    getattr(module, func_name)()
+
+
+def on_import(db_path: PathLike, module_name: str) -> bool:
+    """
+    Import-time hook for storage modules.
+
+    Returns False when the database is already current (nothing run).
+    Otherwise runs *module_name*'s steps and returns True; if that
+    completes the full set for this database, it is stamped current.
+    Step errors propagate, as the old import-time calls did.
+    """
+    if is_current(db_path):
+        return False
+    path = _key(db_path)
+    mine = [s for s in STEPS if s[0] == module_name]
+    for step in mine:
+        _run_step(*step)
+    with _lock:
+        done = _ran.setdefault(path, set())
+        done.update(mine)
+        complete = done >= set(STEPS)
+    if complete and os.path.exists(path):
+        _stamp(path)
+    return True
+
+
+def run(db_path: PathLike) -> List[str]:
+    """
+    Apply every step to *db_path* and stamp it current (the deploy path;
+    see storage/init_db.py).  Steps always run here, even on a current
+    database, since they are idempotent and schema.sql may have just
+    created tables they extend.  Returns the steps run as "module:function".
+    """
+    path = _key(db_path)
+    modules = [importlib.import_module(m) for m in dict.fromkeys(m for m, _ in STEPS)]
+    # Steps connect through their module's DB_PATH (menus/users go through
+    # storage.drafts); point them all at *db_path* for the duration.
+    saved = [(m, m.DB_PATH) for m in modules if hasattr(m, "DB_PATH")]
+    applied = []
+    try:
+        for m, _ in saved:
+            m.DB_PATH = Path(path)
+        for module_name, func_name in STEPS:
+            _run_step(module_name, func_name)
+            applied.append(f"{module_name}:{func_name}")
+    finally:
+        for m, old in saved:
+            m.DB_PATH = old
+    _stamp(path)
+    return applied
+
+
+def reset_cache() -> None:
+    """Forget which databases were seen current (tests; after replacing a DB file)."""
+    with _lock:
+        _current.clear()
+        _ran.clear()
+
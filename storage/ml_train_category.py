@@ -6,7 +6,8 @@ Purpose
 -------
 Train a lightweight text classifier to label menu text blocks with canonical categories
 (e.g., Pizzas, Burgers, Wings, Salads, etc.). The model complements the rule-based
-heuristics and is fused at runtime in `ocr_pipeline.infer_categories_on_text_blocks`.
+heuristics and is fused at runtime in `ocr_pipeline.infer_categories_on_text_blocks`
+(loaded and batch-scored by `storage/category_model.py`, Day 162).
 
 Outputs
 -------
@@ -30,6 +31,9 @@ Notes
 -----
 - Requires scikit-learn and joblib. (Install: pip install "scikit-learn>=1.3,<2" joblib)
 - Uses TF-IDF (word bigrams) + LogisticRegression. Falls back to MultinomialNB if LR fails.
+- The chosen classifier is wrapped in CalibratedClassifierCV (sigmoid) so its
+  probabilities can be compared against category_model's fixed thresholds;
+  the bundle records "calibrated" (False only if a label has <2 examples).
 - Weak labeling uses the same heuristics defined here (kept in sync with ocr_pipeline).
 """
 
@@ -270,6 +274,28 @@ class TrainConfig:
     ngram_max: int = 2
     test_size: float = 0.2
     random_state: int = 17
+    calibration_folds: int = 3
+
+def _calibrate(clf, X, y, cfg: TrainConfig):
+    """
+    Refit clf inside CalibratedClassifierCV so predict_proba is calibrated.
+
+    Raw MultinomialNB (and, less so, LogisticRegression) probabilities are
+    overconfident, and category_model applies fixed thresholds to them.
+    Returns (classifier, calibrated); the fitted clf is returned unchanged
+    when a label has too few examples for cross-validation.
+    """
+    from collections import Counter
+    from sklearn.calibration import CalibratedClassifierCV
+
+    folds = min(cfg.calibration_folds, min(Counter(y).values()))
+    if folds < 2:
+        print("[WARN] Too few examples per label to calibrate; saving raw probabilities.")
+        return clf, False
+    calibrated = CalibratedClassifierCV(estimator=clf, method="sigmoid", cv=folds)
+    calibrated.fit(X, y)
+    return calibrated, True
+
 
 def train_and_save(rows: List[Tuple[str, str]], cfg: TrainConfig) -> Dict[str, object]:
     from sklearn.feature_extraction.text import TfidfVectorizer
@@ -311,6 +337,7 @@ def train_and_save(rows: List[Tuple[str, str]], cfg: TrainConfig) -> Dict[str, o
         used = "MultinomialNB"
         clf = MultinomialNB()
         clf.fit(Xtr, y_train)
+    clf, calibrated = _calibrate(clf, Xtr, y_train, cfg)
 
     y_pred = clf.predict(Xte)
     acc = float(accuracy_score(y_test, y_pred))
@@ -322,6 +349,7 @@ def train_and_save(rows: List[Tuple[str, str]], cfg: TrainConfig) -> Dict[str, o
         "clf": clf,
         "labels": sorted(list(set(labels))),
         "algo": used,
+        "calibrated": calibrated,
         "created_at": int(time.time()),
         "config": cfg.__dict__,
     }
@@ -337,6 +365,7 @@ def train_and_save(rows: List[Tuple[str, str]], cfg: TrainConfig) -> Dict[str, o
         json.dump(
             {
                 "algo": used,
+                "calibrated": calibrated,
                 "accuracy": acc,
                 "report": report,
                 "labels": bundle["labels"],
@@ -350,7 +379,7 @@ def train_and_save(rows: List[Tuple[str, str]], cfg: TrainConfig) -> Dict[str, o
     print(f"[OK] Saved model → {out_path}")
     print(f"[OK] Saved report → {report_path}")
     print(f"[METRICS] accuracy={acc:.3f}")
-    return {"accuracy": acc, "algo": used, "labels": bundle["labels"]}
+    return {"accuracy": acc, "algo": used, "calibrated": calibrated, "labels": bundle["labels"]}
 
 
 # ----------------------------
@@ -83,6 +83,7 @@ import pytesseract
 
 from . import ocr_utils
 from . import category_infer
+from . import category_model
 from . import variant_engine
 from . import cross_item
 from . import semantic_confidence
@@ -1724,7 +1725,25 @@ def infer_categories_on_text_blocks(text_blocks: List[Dict[str, Any]]) -> None:
 
     This is a thin wrapper around storage/category_infer.infer_category_for_text
     so all category logic lives in one place.
+
+    Day 162: when the trained classifier (storage/category_model) is
+    available, all blocks are scored in one batch first, and a model
+    category at MODEL_ACCEPT_PROBABILITY or above replaces the keyword
+    guess.  Without a model file, or if scoring raises, the keyword path
+    runs alone, as before.
     """
+    predictions = None
+    try:
+        model = category_model.get_category_model()
+        if model is not None:
+            predictions = model.predict(
+                [tb.get("merged_text") or tb.get("text") or "" for tb in text_blocks]
+            )
+    except Exception as e:
+        # A model that loads but cannot score must not sink the OCR run.
+        print(f"[Category] (warn) category model failed, using keywords: {e}")
+        predictions = None
+
     for idx, tb in enumerate(text_blocks):
         merged = tb.get("merged_text") or tb.get("text") or ""
         if not merged:
@@ -1752,6 +1771,17 @@ def infer_categories_on_text_blocks(text_blocks: List[Dict[str, Any]]) -> None:
             if next_cat:
                 neighbors.append(next_cat)
 
+        pred = predictions[idx] if predictions is not None else None
+        if pred is not None and pred.category and \
+                pred.probability >= category_model.MODEL_ACCEPT_PROBABILITY:
+            reason = f"category model p={pred.probability:.2f}"
+            if heading_like:
+                reason = reason + "; heading_like"
+            tb["category"] = pred.category
+            tb["category_confidence"] = int(round(pred.probability * 100))
+            tb["rule_trace"] = reason
+            continue
+
         guess = category_infer.infer_category_for_text(
             name=merged,
             description=None,
@@ -2224,9 +2254,9 @@ def segment_document(
         # ----- Sprint 8.4 Day 69: auto-repair execution
         semantic_confidence.apply_auto_repairs(page_text_blocks)
 
-        # ----- Re-score after repairs (reflect improved quality)
-        semantic_confidence.score_semantic_confidence(page_text_blocks)
-        semantic_confidence.classify_confidence_tiers(page_text_blocks)
+        # ----- Re-score after repairs (reflect improved quality; Day 160:
+        #       only the blocks the repairs changed)
+        semantic_confidence.rescore_repaired_items(page_text_blocks)
 
         # Compact preview records (xyxy coords), annotate page/column for overlay UI
         pblocks = ocr_utils.blocks_for_preview(page_text_blocks)
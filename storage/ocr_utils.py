@@ -36,7 +36,9 @@ from typing import Any, Dict, Iterable, List, Optional, Tuple, TYPE_CHECKING, Ty
 
 from PIL import Image, ImageEnhance, ImageFilter, ImageOps
 from pdf2image import convert_from_bytes, convert_from_path
-import pytesseract
+
+# Day 151: pytesseract is imported on the first OCR call (see _tesseract),
+# so importing this module (storage.drafts does) stays cheap at app start.
 
 # Optional deps
 try:
@@ -108,16 +110,21 @@ def check_poppler() -> dict:
 # Tesseract
 # =============================
 
+def _tesseract():
+    import pytesseract
+    return pytesseract
+
+
 def configure_tesseract_from_env() -> None:
     cmd = os.environ.get("TESSERACT_CMD")
     if cmd and os.path.isfile(cmd):
-        pytesseract.pytesseract.tesseract_cmd = cmd
+        _tesseract().pytesseract.tesseract_cmd = cmd
 
 
 def check_tesseract() -> dict:
     try:
         configure_tesseract_from_env()
-        ver = pytesseract.get_tesseract_version()
+        ver = _tesseract().get_tesseract_version()
         return {"found_on_disk": True, "version": str(ver)}
     except Exception as e:
         return {"found_on_disk": False, "version": None, "error": str(e)}
@@ -174,7 +181,7 @@ def detect_orientation_osd(img: Image.Image) -> Optional[int]:
     Ask Tesseract OSD for the rotation. Returns 0/90/180/270 or None.
     """
     try:
-        osd = pytesseract.image_to_osd(img, config="--psm 0")
+        osd = _tesseract().image_to_osd(img, config="--psm 0")
         m = re.search(r"Rotate:\s*(\d+)", osd or "")
         if not m:
             return None
@@ -198,7 +205,7 @@ def _quick_score(img: Image.Image) -> float:
     - Dictionary-ish words (3+ letters, has vowels)
     """
     try:
-        txt = pytesseract.image_to_string(
+        txt = _tesseract().image_to_string(
             img,
             config="--oem 3 --psm 6 -c preserve_interword_spaces=1",
         )
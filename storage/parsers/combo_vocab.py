@@ -14,6 +14,8 @@ from __future__ import annotations
 import re
 from typing import List, Set
 
+from .regex_trie import trie_alternation
+
 # ── Combo food vocabulary ────────────────────────────
 
 COMBO_FOODS: Set[str] = {
@@ -45,11 +47,10 @@ COMBO_FOODS: Set[str] = {
 
 # ── Pattern detection ────────────────────────────────
 
-# Build regex: "w/" or "with" followed by a combo food.
-# Sort longest-first so "french fries" matches before "fries".
-_COMBO_ALTS = "|".join(
-    re.escape(f) for f in sorted(COMBO_FOODS, key=len, reverse=True)
-)
+# Build regex: "w/" or "with" followed by a combo food.  Day 165: the
+# foods are a prefix-factored trie, which still tries "french fries"
+# before "fries" and "fries" before "frie".
+_COMBO_ALTS = trie_alternation(COMBO_FOODS)
 
 COMBO_PATTERN_RE = re.compile(
     r"\b(?:w/|with)\s+(" + _COMBO_ALTS + r")\b",
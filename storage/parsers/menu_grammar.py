@@ -51,13 +51,20 @@ Day 55 additions:
 Day 58 additions:
   - Combo modifier detection: "W/FRIES", "with CHEESE" → combo_hints
   - No-space OCR normalization: WIFRIES → with FRIES
+
+Day 161 additions:
+  - Bounded LRU parse cache keyed by line text (parse_menu_line returns
+    copies; clear_parse_cache / parse_cache_stats)
+  - Single pre-compiled trigger scans gate the OCR typo and W/ rules
 """
 
 from __future__ import annotations
 
-from dataclasses import dataclass, field
+from collections import OrderedDict
+from dataclasses import dataclass, field, replace
 from typing import Any, Dict, List, Optional, Tuple
 import re
+import threading
 
 from .combo_vocab import COMBO_FOODS, extract_combo_hints
 
@@ -91,22 +98,10 @@ class ParsedMenuItem:
 
 # ── Price regex ──────────────────────────────────────
 
-_PRICE_RE = re.compile(
-    r"""
-    \$?\s*                    # optional dollar sign
-    (\d{1,3}[.,]\d{2})        # digits.cents  (e.g. 12.99 or 12,99)
-    """,
-    re.VERBOSE,
-)
-
-# Trailing price: price at end of line, possibly with whitespace/dots
-_TRAILING_PRICE_RE = re.compile(
-    r"""
-    [\s.·…]*                  # dot leaders / whitespace before price
-    \$?\s*(\d{1,3}[.,]\d{2})  # the price
-    \s*$                      # end of line
-    """,
-    re.VERBOSE,
+# Day 165: compiled once in the shared vocabulary bundle.
+from .vocab import (
+    PRICE_RE as _PRICE_RE,
+    TRAILING_PRICE_RE as _TRAILING_PRICE_RE,
 )
 
 
@@ -232,18 +227,28 @@ def _strip_short_noise(text: str) -> str:
 
 # ── W/ and Wi OCR normalization ─────────────────────
 
+_W_SLASH_RE = re.compile(r'\bW/\s*', re.IGNORECASE)
+_WI_SLASH_RE = re.compile(r'\bWI/\s*', re.IGNORECASE)
+_WI_SPACE_RE = re.compile(r'\bWi\s+(?=[BCDFGHJKLMNPQRSTVWXYZbcdfghjklmnpqrstvwxyz])')
+# Day 161: every rule below starts with a word-initial "w/" or "wi"; lines
+# without one (most of them) skip the four substitutions.
+_W_SLASH_HINT_RE = re.compile(r'\bw[/i]', re.IGNORECASE)
+
+
 def _normalize_w_slash(text: str) -> str:
     """Normalize OCR variants of 'w/' (with) — 'W/', 'w/', 'Wi ', 'WIFOOD' → 'with'.
 
     'W/ FRIES' → 'with FRIES', 'Wi CHEESE' → 'with CHEESE'
     Day 58: 'WIFRIES' → 'with FRIES' (no-space OCR pattern)
     """
+    if not _W_SLASH_HINT_RE.search(text):
+        return text
     # W/ or w/ followed by a word
-    text = re.sub(r'\bW/\s*', 'with ', text, flags=re.IGNORECASE)
+    text = _W_SLASH_RE.sub('with ', text)
     # 'WI/' — OCR often reads 'W/' as 'WI/' (extra I before slash)
-    text = re.sub(r'\bWI/\s*', 'with ', text, flags=re.IGNORECASE)
+    text = _WI_SLASH_RE.sub('with ', text)
     # 'Wi ' before a consonant word — common OCR misread of 'W/'
-    text = re.sub(r'\bWi\s+(?=[BCDFGHJKLMNPQRSTVWXYZbcdfghjklmnpqrstvwxyz])', 'with ', text)
+    text = _WI_SPACE_RE.sub('with ', text)
     # Day 58: No-space pattern — WIFRIES, WICHEESE, etc.
     text = _WI_NOSPACE_RE.sub(_wi_nospace_repl, text)
     return text
@@ -293,8 +298,22 @@ _OCR_TYPO_PATTERNS = [
 ]
 
 
+# Day 161: one pre-compiled scan that finds any trigger of the rules above.
+# Each alternative is a necessary condition of one rule (the literal typo,
+# or the rule's pattern without its \b anchors), so a line with no hit is
+# returned untouched and a line with a hit takes the rules in their
+# original order — same output, one regex pass for clean lines.
+_OCR_TYPO_TRIGGER_RE = re.compile("|".join(
+    [re.escape(typo) for typo in _OCR_TYPO_MAP]
+    + ["piZzA", "Smt", r"^\[", "WI/"]
+))
+
+
 def _normalize_ocr_typos(text: str) -> str:
     """Fix common OCR misreads found in fallback/degraded Tesseract output."""
+    if not _OCR_TYPO_TRIGGER_RE.search(text):
+        return text
+
     # Dict-based replacements (word boundaries)
     for typo, fix in _OCR_TYPO_MAP.items():
         if typo in text:
@@ -311,8 +330,8 @@ def _normalize_ocr_typos(text: str) -> str:
 from .size_vocab import (
     SIZE_WORDS as _SIZE_WORDS,
     SIZE_WORD_RE as _SIZE_WORD_RE,
-    NUMERIC_SIZE_RE as _NUMERIC_SIZE_RE,
 )
+from .vocab import scan_size_mentions
 
 
 # ── Modifier patterns ────────────────────────────────
@@ -412,14 +431,7 @@ def _is_heading(text: str) -> bool:
 
 # ── Size grid header detection ──────────────────────
 
-_SIZE_HEADER_TOKEN_RE = re.compile(
-    r"""
-    \d{1,2}\s*["\u201d°]\s*\w*   |   # 10"Mini, 12"Sml, 16"lrg
-    \b(?:mini|small|sml|sm|medium|med|large|lrg|lg|family|party|personal|regular|deluxe)\b  |
-    \b\d+\s*(?:slices?|pieces?|pcs?|cuts?)\b
-    """,
-    re.VERBOSE | re.IGNORECASE,
-)
+from .vocab import SIZE_HEADER_TOKEN_RE as _SIZE_HEADER_TOKEN_RE
 
 
 def _is_size_header(text: str) -> bool:
@@ -796,6 +808,46 @@ def detect_column_merge(text: str) -> Optional[List[str]]:
     return None
 
 
+# ── Line parse cache (Day 161) ───────────────────────
+# parse_menu_line is a pure function of the line text, and menus repeat
+# lines heavily: size headers, "add cheese" modifiers, the same text from
+# several OCR passes, re-runs on an unchanged draft.  Results are kept in
+# a bounded LRU keyed by the exact text.  Callers get their own copies
+# (classify_menu_lines rewrites line_type / confidence in place), so
+# mutating a returned item never touches the cache.
+PARSE_CACHE_MAX_ENTRIES = 4096
+
+_parse_cache: "OrderedDict[str, ParsedMenuItem]" = OrderedDict()
+_parse_cache_lock = threading.Lock()
+_parse_cache_counts: Dict[str, int] = {"hits": 0, "misses": 0}
+
+
+def _clone_parsed(p: ParsedMenuItem) -> ParsedMenuItem:
+    c = p.components
+    return replace(
+        p,
+        modifiers=list(p.modifiers),
+        combo_hints=list(p.combo_hints),
+        size_mentions=list(p.size_mentions),
+        price_mentions=list(p.price_mentions),
+        components=None if c is None else replace(
+            c, toppings=list(c.toppings), flavor_options=list(c.flavor_options)),
+        column_segments=None if p.column_segments is None else list(p.column_segments),
+    )
+
+
+def clear_parse_cache() -> None:
+    """Drop every cached line parse (tests, vocabulary reloads)."""
+    with _parse_cache_lock:
+        _parse_cache.clear()
+        _parse_cache_counts["hits"] = _parse_cache_counts["misses"] = 0
+
+
+def parse_cache_stats() -> Dict[str, int]:
+    with _parse_cache_lock:
+        return {**_parse_cache_counts, "entries": len(_parse_cache)}
+
+
 # ── Core parser ──────────────────────────────────────
 
 def parse_menu_line(text: str) -> ParsedMenuItem:
@@ -804,7 +856,28 @@ def parse_menu_line(text: str) -> ParsedMenuItem:
 
     This is the primary entrypoint for the grammar parser.
     Works on raw OCR text (pre- or post-cleanup).
+    Repeated lines are served from the Day 161 parse cache.
     """
+    if not isinstance(text, str):
+        return _parse_menu_line_uncached(text)
+    with _parse_cache_lock:
+        cached = _parse_cache.get(text)
+        if cached is not None:
+            _parse_cache.move_to_end(text)
+            _parse_cache_counts["hits"] += 1
+            return _clone_parsed(cached)
+        _parse_cache_counts["misses"] += 1
+
+    result = _parse_menu_line_uncached(text)
+    with _parse_cache_lock:
+        _parse_cache[text] = _clone_parsed(result)
+        _parse_cache.move_to_end(text)
+        while len(_parse_cache) > PARSE_CACHE_MAX_ENTRIES:
+            _parse_cache.popitem(last=False)
+    return result
+
+
+def _parse_menu_line_uncached(text: str) -> ParsedMenuItem:
     result = ParsedMenuItem(raw_text=text)
 
     if not text or not text.strip():
@@ -857,10 +930,9 @@ def parse_menu_line(text: str) -> ParsedMenuItem:
         result.item_name = working
         result.line_type = "size_header"
         result.confidence = 0.80
-        for m in _SIZE_WORD_RE.finditer(working):
-            result.size_mentions.append(m.group(1))
-        for m in _NUMERIC_SIZE_RE.finditer(working):
-            result.size_mentions.append(m.group(0))
+        words, numerics = scan_size_mentions(working)
+        result.size_mentions.extend(words)
+        result.size_mentions.extend(full for full, _ in numerics)
         return result
 
     # ── Step 1.7: Orphaned price-only line detection ──
@@ -894,12 +966,10 @@ def parse_menu_line(text: str) -> ParsedMenuItem:
         text_no_price = working
 
     # ── Step 3: Extract size mentions ──
-    sizes = []
-    for m in _SIZE_WORD_RE.finditer(text_no_price):
-        sizes.append(m.group(1))
-    for m in _NUMERIC_SIZE_RE.finditer(text_no_price):
-        num = m.group(1)
-        suffix = m.group(0)[len(num):].strip().lower()
+    # Day 165: size words and numeric sizes in one scan (words first, as before)
+    sizes, numerics = scan_size_mentions(text_no_price)
+    for full, num in numerics:
+        suffix = full[len(num):].strip().lower()
         if "pc" in suffix or "piece" in suffix or "ct" in suffix:
             sizes.append(f"{num}pc")
         else:
@@ -3,13 +3,15 @@ Price Parser — Day 20 (Phase A)
 Extracts and normalizes price expressions from text lines.
 """
 
-import re
-
-PRICE_RE = re.compile(r"\$?\d{1,3}(?:\.\d{2})?")
-DELTA_RE = re.compile(r"\+\$?\d+(?:\.\d{2})?")
-RANGE_RE = re.compile(r"(\d{1,3}\.\d{2})\s*[-–]\s*(\d{1,3}\.\d{2})")
-DEAL_RE = re.compile(r"\b\d+\s*for\s*\$?\d+(?:\.\d{2})?\b", re.I)
-MARKET_RE = re.compile(r"\\b(MP|Market)\\b", re.I)
+# Day 165: patterns precompiled in the shared vocabulary bundle.
+from .vocab import (
+    PHASE_A_PRICE_RE as PRICE_RE,
+    PHASE_A_DELTA_RE as DELTA_RE,
+    PHASE_A_RANGE_RE as RANGE_RE,
+    PHASE_A_DEAL_RE as DEAL_RE,
+    PHASE_A_MARKET_RE as MARKET_RE,
+    PHASE_A_NON_NUMERIC_RE as _NON_NUMERIC_RE,
+)
 
 def parse_prices(text):
     """Return a list of price dicts with normalized structure."""
@@ -20,7 +22,7 @@ def parse_prices(text):
         except ValueError:
             pass
     for match in DELTA_RE.findall(text):
-        val = float(re.sub(r"[^0-9.]", "", match))
+        val = float(_NON_NUMERIC_RE.sub("", match))
         prices.append({"value": val, "type": "delta"})
     for m in RANGE_RE.findall(text):
         prices.append({"value": None, "range": [float(m[0]), float(m[1])], "type": "range"})
@@ -0,0 +1,51 @@
+# storage/parsers/regex_trie.py
+"""
+Trie-factored regex alternations — Day 165.
+
+A longest-first alternation ("small|large|sml|lg|...") makes the regex
+engine try every word at every start position.  trie_alternation() emits
+the same word set with shared prefixes factored out:
+
+    trie_alternation(["s", "sm", "sml", "small"])  ->  's(?:m(?:all|l)?)?'
+
+so each position costs one branch per character instead of one attempt
+per word.  Matching is unchanged: along the single branch that can match
+the text, longer words are tried before the shorter words they extend —
+the order the longest-first alternation tries them in — including when a
+following \\b or lookahead forces a backtrack to a shorter word.
+
+Words are matched as given (callers pass lowercase words and compile with
+re.IGNORECASE where needed).
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Dict, Iterable
+
+_END = ""   # marks "a word ends here" in a trie node (never a character)
+
+
+def trie_alternation(words: Iterable[str]) -> str:
+    """Regex source matching any of *words*, prefix-factored, no capture groups."""
+    root: Dict[str, dict] = {}
+    for word in words:
+        node = root
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[_END] = {}
+    return _emit(root)
+
+
+def _emit(node: Dict[str, dict]) -> str:
+    branches = [re.escape(ch) + _emit(node[ch]) for ch in sorted(node) if ch != _END]
+    if not branches:
+        return ""
+    if len(branches) > 1:
+        body = "(?:" + "|".join(branches) + ")"
+    elif _END in node and len(branches[0]) > 1:
+        body = "(?:" + branches[0] + ")"
+    else:
+        body = branches[0]
+    # a shorter word ends here: try the longer ones first (greedy ?), then stop
+    return body + "?" if _END in node else body
@@ -8,9 +8,12 @@ Used by both menu_grammar.py (parsing) and variant_engine.py (enrichment).
 
 from __future__ import annotations
 
+from functools import lru_cache
 from typing import Dict, Optional, Set
 import re
 
+from .regex_trie import trie_alternation
+
 
 # Canonical mapping: lowercase token -> normalized display label
 # Merges grammar parser's _SIZE_WORDS with variant_engine's _SIZE_WORD_MAP.
@@ -64,11 +67,11 @@ SIZE_WORD_MAP: Dict[str, str] = {
 # Flat set of all recognized size words (for regex building)
 SIZE_WORDS: Set[str] = set(SIZE_WORD_MAP.keys())
 
-# Pre-built regex matching any size word (longest-first for greedy correctness)
+# Pre-built regex matching any size word.  Day 165: prefix-factored trie
+# alternation — same matches as the longest-first word list, far fewer
+# attempts per position.
 SIZE_WORD_RE = re.compile(
-    r"\b(" + "|".join(
-        re.escape(w) for w in sorted(SIZE_WORDS, key=len, reverse=True)
-    ) + r")\b",
+    r"\b(" + trie_alternation(SIZE_WORDS) + r")\b",
     re.IGNORECASE,
 )
 
@@ -146,6 +149,10 @@ PORTION_CHAIN: list[str] = ["Slice", "Half", "Whole", "Family", "Party"]
 MULTIPLICITY_CHAIN: list[str] = ["Single", "Double", "Triple"]
 
 
+# Day 163: size_ordinal / size_track are pure lookups over a handful of
+# distinct labels, asked for every size variant by each validation pass
+# (variant_engine price order + gaps, cross_item price steps).
+@lru_cache(maxsize=512)
 def size_ordinal(normalized_size: str) -> Optional[int]:
     """Return an ordinal position for a normalized_size value.
 
@@ -179,6 +186,7 @@ def size_ordinal(normalized_size: str) -> Optional[int]:
     return None
 
 
+@lru_cache(maxsize=512)
 def size_track(normalized_size: str) -> Optional[str]:
     """Determine which ordering track a normalized_size belongs to.
 
@@ -3,17 +3,15 @@ Variant Parser — Day 20 (Phase A)
 Parses sizes and portion variants from text lines.
 """
 
-import re
-
-VARIANT_PATTERNS = [
-    r"\\b(Small|Medium|Large|XL|XXL)\\b",
-    r"\\b(\\d{1,2}\\\")\\b",
-    r"\\b(Slice|Pie|Half|Whole)\\b"
-]
+# Day 165: patterns precompiled in the shared vocabulary bundle.
+from .vocab import (
+    PHASE_A_VARIANT_PATTERNS as VARIANT_PATTERNS,
+    PHASE_A_VARIANT_RES as _VARIANT_RES,
+)
 
 def parse_variants(text):
     variants = []
-    for pat in VARIANT_PATTERNS:
-        for match in re.findall(pat, text, re.I):
+    for rx in _VARIANT_RES:
+        for match in rx.findall(text):
             variants.append({"name": match, "confidence": 0.8})
     return variants
@@ -0,0 +1,260 @@
+# storage/parsers/vocab.py
+"""
+Shared Vocabulary Patterns — Day 165
+
+One place for the compiled patterns the parsers use to recognise sizes,
+flavors / styles, combo sides and prices.  Every pattern is built once at
+import; word lists are compiled as prefix-factored trie alternations
+(regex_trie) instead of longest-first word lists.
+
+Where one consumer asked several questions of the same text, the
+questions are folded into one scan:
+
+  scan_size_mentions()   size words and numeric sizes on a menu line
+                         (menu_grammar steps 1.5 and 3)
+  label_size()           inch / piece / size word / bare number on a
+                         variant label (variant_engine)
+
+Flavor and style words are deliberately not folded into the size scans:
+the vocabularies overlap ("medium" is both a size and a wing flavor), and
+the label rules are prioritised (size beats combo beats style beats
+flavor), so each keeps its own one-pass search.
+
+The word data itself stays in size_vocab / combo_vocab; the label token
+sets below moved here from variant_engine.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import List, Optional, Tuple
+
+from .combo_vocab import is_combo_food
+from .regex_trie import trie_alternation
+from .size_vocab import NUMERIC_SIZE_RE, SIZE_WORD_MAP, SIZE_WORD_RE
+
+
+# ── Prices (menu_grammar) ────────────────────────────
+
+PRICE_RE = re.compile(
+    r"""
+    \$?\s*                    # optional dollar sign
+    (\d{1,3}[.,]\d{2})        # digits.cents  (e.g. 12.99 or 12,99)
+    """,
+    re.VERBOSE,
+)
+
+# Trailing price: price at end of line, possibly with whitespace/dots
+TRAILING_PRICE_RE = re.compile(
+    r"""
+    [\s.·…]*                  # dot leaders / whitespace before price
+    \$?\s*(\d{1,3}[.,]\d{2})  # the price
+    \s*$                      # end of line
+    """,
+    re.VERBOSE,
+)
+
+
+# ── Phase A parsers (price_parser / variant_parser, Day 20) ──
+# Kept exactly as those modules wrote them: PHASE_A_MARKET_RE and the
+# variant patterns spell word boundaries as a literal backslash + "b", and
+# parse_prices / parse_variants output depends on it.
+
+PHASE_A_PRICE_RE = re.compile(r"\$?\d{1,3}(?:\.\d{2})?")
+PHASE_A_DELTA_RE = re.compile(r"\+\$?\d+(?:\.\d{2})?")
+PHASE_A_RANGE_RE = re.compile(r"(\d{1,3}\.\d{2})\s*[-–]\s*(\d{1,3}\.\d{2})")
+PHASE_A_DEAL_RE = re.compile(r"\b\d+\s*for\s*\$?\d+(?:\.\d{2})?\b", re.I)
+PHASE_A_MARKET_RE = re.compile(r"\\b(MP|Market)\\b", re.I)
+PHASE_A_NON_NUMERIC_RE = re.compile(r"[^0-9.]")
+
+PHASE_A_VARIANT_PATTERNS = [
+    r"\\b(Small|Medium|Large|XL|XXL)\\b",
+    r"\\b(\\d{1,2}\\\")\\b",
+    r"\\b(Slice|Pie|Half|Whole)\\b"
+]
+PHASE_A_VARIANT_RES = [re.compile(p, re.I) for p in PHASE_A_VARIANT_PATTERNS]
+
+
+# ── Size grid headers ────────────────────────────────
+# menu_grammar detects header lines, variant_engine splits them into
+# columns; the two patterns differ in grouping but share the word list.
+
+HEADER_SIZE_WORDS = (
+    "mini", "small", "sml", "sm", "medium", "med", "large", "lrg", "lg",
+    "family", "party", "personal", "regular", "deluxe",
+)
+_HEADER_WORDS = trie_alternation(HEADER_SIZE_WORDS)
+
+SIZE_HEADER_TOKEN_RE = re.compile(
+    r"""
+    \d{1,2}\s*["\u201d°]\s*\w*   |   # 10"Mini, 12"Sml, 16"lrg
+    \b(?:""" + _HEADER_WORDS + r""")\b  |
+    \b\d+\s*(?:slices?|pieces?|pcs?|cuts?)\b
+    """,
+    re.VERBOSE | re.IGNORECASE,
+)
+
+GRID_TOKEN_RE = re.compile(
+    r"""
+    (\d{1,2})\s*(["\u201d\u00b0])([a-zA-Z]*)   |   # numeric inch + optional word: 10"Mini
+    \b(""" + _HEADER_WORDS + r""")\b  |
+    \b(\d+)\s*(slices?|pieces?|pcs?|cuts?)\b
+    """,
+    re.VERBOSE | re.IGNORECASE,
+)
+
+
+# ── Size mentions on a menu line ─────────────────────
+# SIZE_WORD_RE | NUMERIC_SIZE_RE in one pass.  A match of one can never
+# start inside a match of the other (size words hold no digits; numeric
+# sizes start with one), so the single scan finds exactly the matches of
+# the two separate scans.
+
+SIZE_MENTION_RE = re.compile(
+    SIZE_WORD_RE.pattern + "|" + NUMERIC_SIZE_RE.pattern,
+    re.IGNORECASE,
+)
+
+
+def scan_size_mentions(text: str) -> Tuple[List[str], List[Tuple[str, str]]]:
+    """Size words and numeric sizes in *text*, left to right.
+
+    Returns (words, numerics): the matched size words, and for each
+    numeric size its (full match, number) pair.
+
+    >>> scan_size_mentions("Large 14in or 6 pc small")
+    (['Large', 'small'], [('14in', '14'), ('6 pc', '6')])
+    """
+    words: List[str] = []
+    numerics: List[Tuple[str, str]] = []
+    for m in SIZE_MENTION_RE.finditer(text):
+        if m.lastindex == 1:
+            words.append(m.group(1))
+        else:
+            numerics.append((m.group(0), m.group(2)))
+    return words, numerics
+
+
+# ── Variant labels (variant_engine) ──────────────────
+
+# Flavor words – these usually indicate sauce / taste rather than geometry.
+FLAVOR_TOKENS = {
+    "hot", "mild", "medium", "honey", "bbq", "barbecue", "honey bbq",
+    "garlic", "parm", "parmesan", "garlic parm", "teriyaki",
+    "buffalo", "spicy", "sweet", "sour", "honey mustard",
+    "lemon", "pepper", "lemon pepper",
+    # Phase 8: expanded wing/sauce flavors
+    "mango habanero", "carolina gold", "thai chili", "sweet chili",
+    "old bay", "cajun", "ranch", "blue cheese",
+    "asian zing", "korean bbq", "sriracha",
+    "plain", "naked", "original",
+}
+
+# Style / preparation – crust types, bone-in vs boneless, etc.
+STYLE_TOKENS = {
+    "bone-in", "bone in", "boneless",
+    "thin", "thin crust", "thick", "thick crust", "deep dish", "stuffed crust",
+    "white", "red", "red sauce", "alfredo", "pesto",
+    # Phase 8: expanded pizza crust vocabulary
+    "pan", "pan crust",
+    "hand tossed", "hand-tossed",
+    "brooklyn", "brooklyn style",
+    "sicilian", "sicilian style",
+    "neapolitan", "neapolitan style",
+    "detroit", "detroit style",
+    "new york", "ny style",
+    "flatbread",
+    "gluten free", "gluten-free", "cauliflower crust",
+    "crispy", "extra crispy",
+    # Phase 8: wing preparation styles
+    "fried", "grilled", "baked",
+    "breaded", "naked",
+    "dry rub", "tossed",
+}
+
+# Substring tests ("is any token inside the lowercased label?") as one
+# search each; matched case-sensitively against lowercased text.
+FLAVOR_RE = re.compile(trie_alternation(FLAVOR_TOKENS))
+STYLE_RE = re.compile(trie_alternation(STYLE_TOKENS))
+
+_STRIP_CHARS = ".,;:-"
+
+# Size words that can stand alone as a whitespace-separated token, after
+# stripping surrounding punctuation.
+_LABEL_SIZE_WORDS = [
+    w for w in SIZE_WORD_MAP
+    if w == w.strip(_STRIP_CHARS) and not any(ch.isspace() for ch in w)
+]
+
+# Every size cue on a label in one scan.  Branch order settles which cue
+# wins at a given position; label_size() applies the priority across
+# positions.  The size word branch is case-sensitive, like the dict
+# lookup it replaces.
+LABEL_SIZE_RE = re.compile(
+    r"""
+    (?P<inch>\d{1,2})\s*(?:["]|in(?:ch(?:es)?)?)\b                     # 10", 14 inch
+    | (?P<piece>\d{1,2})\s*(?:pc|pcs|piece|pieces|ct)\b                # 6pc, 12 pcs
+    | (?<!\S)[.,;:\-]*(?-i:(?P<word>""" + trie_alternation(_LABEL_SIZE_WORDS) + r"""))[.,;:\-]*(?!\S)
+    | \b(?P<number>\d{1,2})\b                                          # bare 10, 14
+    """,
+    re.VERBOSE | re.IGNORECASE,
+)
+
+# "W/Fries", "with Cheese"
+COMBO_LABEL_RE = re.compile(r'^(?:w/\s*|with\s+)(.+)$', re.IGNORECASE)
+
+
+def label_size(label: str) -> Optional[str]:
+    """Normalized size for a variant label, or None.
+
+    Priority: inch size ('10"', '10 in') anywhere, then piece count
+    ("6pc", "12 pcs"), then the first size-word token ("Sm", "Large"),
+    then the first bare number in 6–30 (taken as inches).
+
+    >>> label_size("Large 14 inch"), label_size("12 pcs"), label_size("Sm.")
+    ('14in', '12pc', 'S')
+    """
+    if not label:
+        return None
+
+    low = label.strip().lower()
+    piece = word = number = None
+    for m in LABEL_SIZE_RE.finditer(low):
+        kind = m.lastgroup
+        if kind == "inch":
+            return f"{int(m.group('inch'))}in"
+        if kind == "piece":
+            if piece is None:
+                piece = m.group("piece")
+        elif kind == "word":
+            if word is None:
+                word = SIZE_WORD_MAP[m.group("word")]
+        elif number is None and 6 <= int(m.group("number")) <= 30:
+            number = int(m.group("number"))
+
+    if piece is not None:
+        return f"{int(piece)}pc"
+    if word is not None:
+        return word
+    if number is not None:
+        return f"{number}in"
+    return None
+
+
+def label_flavor_or_style(label: str) -> Optional[str]:
+    """"style" if the label holds a style token, else "flavor" for a flavor token, else None."""
+    low = label.lower()
+    if STYLE_RE.search(low):
+        return "style"
+    if FLAVOR_RE.search(low):
+        return "flavor"
+    return None
+
+
+def label_is_combo(label: str) -> bool:
+    """True for "W/Fries" / "with Cheese" style labels and bare combo sides ("Fries")."""
+    stripped = label.strip()
+    m = COMBO_LABEL_RE.match(stripped)
+    if m and is_combo_food(m.group(1).strip()):
+        return True
+    return is_combo_food(stripped)
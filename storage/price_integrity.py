@@ -2,9 +2,10 @@
 from __future__ import annotations
 
 from typing import Any, Dict, List, Optional, Tuple
-import statistics
 import re
 
+from .price_stats import GroupPriceStats, PriceColumns
+
 Number = int  # we treat prices as cents
 
 
@@ -62,9 +63,27 @@ def analyze_prices(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
             else:
                 item["price_role"] = "primary"
 
+    # Day 164: every group's median / IQR in one columnar pass over all
+    # items (stats from each group's basis prices), plus the IQR outlier
+    # mask, instead of per-group lists and sorts.
+    row_keys: List[Tuple[Optional[str], Optional[str]]] = []
+    row_prices: List[Number] = []
+    row_basis: List[bool] = []
+    for group_key, group_items in groups.items():
+        prices, basis = _group_columns(group_items)
+        row_keys.extend([group_key] * len(group_items))
+        row_prices.extend(prices)
+        row_basis.extend(basis)
+
+    columns = PriceColumns(row_keys, row_prices, row_basis)
+    outliers = columns.iqr_outlier_mask(k=4.0, min_count=3)
+
     # Process each group independently.
+    pos = 0
     for group_key, group_items in groups.items():
-        _analyze_group(group_items)
+        end = pos + len(group_items)
+        _analyze_group(group_items, columns.stats.get(group_key), outliers[pos:end])
+        pos = end
 
     return items
 
@@ -184,7 +203,29 @@ def _is_coupon_or_deal_item(item: Dict[str, Any]) -> bool:
 # Core group analysis
 # ---------------------------------------------------------------------------
 
-def _analyze_group(items: List[Dict[str, Any]]) -> None:
+def _group_columns(items: List[Dict[str, Any]]) -> Tuple[List[Number], List[bool]]:
+    """
+    Per-item price (0 when missing / not an int) and whether it feeds the
+    group stats: positive prices of primary items, or of all items if the
+    group has no primaries.
+    """
+    prices: List[Number] = [
+        it.get("price_cents") if isinstance(it.get("price_cents"), int) else 0
+        for it in items
+    ]
+    primary = [(it.get("price_role") or "primary") == "primary" for it in items]
+    # Fallback: if somehow no primaries, use the whole group.
+    if not any(primary):
+        primary = [True] * len(items)
+    basis = [is_primary and price > 0 for is_primary, price in zip(primary, prices)]
+    return prices, basis
+
+
+def _analyze_group(
+    items: List[Dict[str, Any]],
+    stats: Optional[GroupPriceStats] = None,
+    outliers: Optional[List[bool]] = None,
+) -> None:
     """
     Analyze a single (category, family) group of items whose prices should be
     broadly comparable. Mutates items in-place.
@@ -193,59 +234,46 @@ def _analyze_group(items: List[Dict[str, Any]]) -> None:
       - Compute stats primarily from "primary" items (not sides/coupons).
       - Attach group median/IQR into price_meta for all items.
       - Retain existing decimal-shift correction + outlier detection.
+
+    Day 164: analyze_prices passes the group's stats and per-item outlier
+    mask from its columnar pass; called alone, both are computed here.
     """
     if not items:
         return
 
-    primary_items = [
-        it for it in items
-        if (it.get("price_role") or "primary") == "primary"
-    ]
-    # Fallback: if somehow no primaries, use the whole group.
-    basis_items = primary_items or items
-
-    prices: List[Number] = [
-        it.get("price_cents", 0)
-        for it in basis_items
-        if isinstance(it.get("price_cents"), int) and it.get("price_cents", 0) > 0
-    ]
+    if outliers is None:
+        prices, basis = _group_columns(items)
+        columns = PriceColumns([0] * len(items), prices, basis)
+        stats = columns.stats.get(0)
+        outliers = columns.iqr_outlier_mask(k=4.0, min_count=3)
 
     # If we don't have enough signal, we still flag zeros but skip heavy stats.
-    if len(prices) < 3:
-        for it in items:
-            _attach_group_meta(it, None, None)
-            _flag_zero_price_if_needed(it, None)
-            _flag_side_or_coupon(it)
-        return
-
-    # Basic stats: median is robust for skewed menus.
-    median_price = statistics.median(prices)
-    if median_price <= 0:
+    # Median is robust for skewed menus; IQR is the 25th–75th percentile band.
+    if stats is None or stats.count < 3 or stats.median <= 0:
         for it in items:
             _attach_group_meta(it, None, None)
             _flag_zero_price_if_needed(it, None)
             _flag_side_or_coupon(it)
         return
 
-    # Also compute a rough "typical band" (25th–75th percentile).
-    prices_sorted = sorted(prices)
-    q1 = statistics.median(prices_sorted[: len(prices_sorted) // 2])
-    q3 = statistics.median(prices_sorted[len(prices_sorted) // 2 :])
-    iqr = max(q3 - q1, 1)  # avoid division by zero
+    median_price = stats.median
+    iqr = stats.iqr  # floored at 1 to avoid division by zero
 
     # Attach common group meta and run per-item checks.
-    for it in items:
+    for it, is_outlier in zip(items, outliers):
         _attach_group_meta(it, median_price, iqr)
         _flag_zero_price_if_needed(it, median_price)
         _flag_side_or_coupon(it)
 
         # We still want to catch insane numbers on sides/coupons,
-        # but primary lines are the main concern.
-        _check_and_fix_price(
-            it,
-            median_price=median_price,
-            iqr=iqr,
-        )
+        # but primary lines are the main concern.  Items inside ~4 IQRs
+        # are already cleared by the outlier mask.
+        if is_outlier:
+            _check_and_fix_price(
+                it,
+                median_price=median_price,
+                iqr=iqr,
+            )
 
 
 def _attach_group_meta(item: Dict[str, Any], median_price: Optional[Number], iqr: Optional[Number]) -> None:
@@ -28,6 +28,9 @@ from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
+from . import db_pool
+from . import migrate
+
 log = logging.getLogger(__name__)
 
 # -------------------------------------------------------------------
@@ -73,10 +76,7 @@ PRICE_LEVEL_LABELS = {
 # DB helpers (same pattern as drafts.py)
 # -------------------------------------------------------------------
 def db_connect() -> sqlite3.Connection:
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA foreign_keys = ON;")
-    return conn
+    return db_pool.connect(DB_PATH)
 
 
 def _now() -> str:
@@ -119,10 +119,6 @@ def _ensure_schema() -> None:
         conn.commit()
 
 
-# Run on import so the tables exist
-_ensure_schema()
-
-
 # -------------------------------------------------------------------
 # Rate limiting
 # -------------------------------------------------------------------
@@ -699,8 +695,6 @@ def _ensure_menu_scrape_schema() -> None:
 
 _MENU_CACHE_TTL_DAYS = 30
 
-_ensure_menu_scrape_schema()
-
 
 # ---------------------------------------------------------------------------
 # Anchor URL tiering (Day 141.9)
@@ -778,9 +772,6 @@ def _ensure_anchor_tier_schema() -> None:
         conn.commit()
 
 
-_ensure_anchor_tier_schema()
-
-
 def _normalize_tier_url(url: str) -> str:
     """Cache key: strip query string + fragment so equivalent URLs
     share one entry."""
@@ -1786,4 +1777,8 @@ def _get_cached_menu(place_id: str) -> Optional[Dict[str, Any]]:
             "from_cache": True,
         }
     except Exception:
-        return None
\ No newline at end of file
+        return None
+
+
+# Day 150: schema steps run via storage/migrate.py; import only checks the version
+migrate.on_import(DB_PATH, __name__)
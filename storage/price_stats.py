@@ -0,0 +1,247 @@
+# storage/price_stats.py
+"""
+Columnar per-group price statistics — Day 164.
+
+cross_item (category price outliers) and price_integrity (category/family
+price bands) both need, for every price group on a menu, the median, the
+quartiles and the MAD (median absolute deviation), and then the items that
+sit too far from the median.  Each used to build a Python list per group
+and sort it again for every statistic.  Here the whole menu goes in as
+columns — a group key and a price per row — and every group's statistics
+and the row-aligned outlier masks come out of one pass:
+
+    cols = PriceColumns(keys, prices)
+    cols.stats["Pizza"].median, cols.stats["Pizza"].q1, cols.stats["Pizza"].mad
+    cols.mad_outlier_mask()    # cross_item rule
+    cols.iqr_outlier_mask()    # price_integrity rule
+
+An optional `basis` column restricts which rows feed the statistics
+(price_integrity: positive prices of primary items) while the masks still
+cover every row.
+
+With NumPy available and at least NUMPY_MIN_ROWS rows, all groups are
+sorted in one argsort and every quantile / mask is gathered with index
+arithmetic over group offsets — no per-group Python loop.  Smaller inputs
+(the common single-location menu) and installs without NumPy use the
+pure-Python path, which sorts each group once.
+
+Both paths reproduce the statistics module exactly: median is
+statistics.median of the group, q1 / q3 the median of the lower / upper
+half of the sorted group (price_integrity's definition; the middle value
+of an odd group belongs to the upper half), mad the median of
+|price - median|.  Prices are cents, so every value is exact in float64.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, Hashable, List, Optional, Sequence, Union
+
+# Optional deps
+try:
+    import numpy as np  # type: ignore
+except Exception:  # pragma: no cover
+    np = None  # type: ignore
+
+Number = Union[int, float]
+
+# Below this many rows the NumPy setup costs more than it saves.
+NUMPY_MIN_ROWS = 512
+
+
+@dataclass(frozen=True)
+class GroupPriceStats:
+    count: int
+    median: Number
+    q1: Number
+    q3: Number
+    mad: Number
+
+    @property
+    def iqr(self) -> Number:
+        """q3 - q1, floored at 1 cent so it can be divided by."""
+        return max(self.q3 - self.q1, 1)
+
+
+def _sorted_median(values: Sequence[Number], start: int, length: int) -> Number:
+    """statistics.median of the already-sorted slice values[start:start+length]."""
+    mid = start + length // 2
+    if length % 2:
+        return values[mid]
+    return (values[mid - 1] + values[mid]) / 2
+
+
+def _np_medians(values, starts, lengths):
+    """Median of each sorted segment values[start:start+length]; 0 where empty."""
+    if not values.size:
+        return np.zeros(len(starts))
+    last = values.size - 1
+    lo = np.clip(starts + (lengths - 1) // 2, 0, last)
+    hi = np.clip(starts + lengths // 2, 0, last)
+    return np.where(lengths > 0, (values[lo] + values[hi]) / 2, 0.0)
+
+
+def _np_group_order(values, g):
+    """Indices sorting rows by group id, then value."""
+    if values.dtype.kind in "iu" and values.size:
+        # Integer cents: one argsort of group * span + value is much
+        # cheaper than a two-key lexsort.
+        lo, hi = int(values.min()), int(values.max())
+        span = hi - lo + 1
+        if span * (int(g.max()) + 1) < 2 ** 62:
+            return np.argsort(g * span + (values - lo), kind="stable")
+    return np.lexsort((values, g))
+
+
+class PriceColumns:
+    """
+    Prices as columns: keys[i] is the group of prices[i].
+
+    stats holds a GroupPriceStats for every group with at least one basis
+    row, in order of first appearance.  basis (default: every row) picks
+    the rows the statistics are computed from.
+    """
+
+    def __init__(
+        self,
+        keys: Sequence[Hashable],
+        prices: Sequence[Number],
+        basis: Optional[Sequence[bool]] = None,
+    ) -> None:
+        if len(keys) != len(prices) or (basis is not None and len(basis) != len(prices)):
+            raise ValueError("keys, prices and basis must have the same length")
+        ids: Dict[Hashable, int] = {}
+        self.gids: List[int] = [ids.setdefault(k, len(ids)) for k in keys]
+        self.groups: List[Hashable] = list(ids)
+        self.prices = prices
+        self.basis = basis
+        self.use_numpy = np is not None and len(prices) >= NUMPY_MIN_ROWS
+        if self.use_numpy:
+            self._numpy_stats()
+        else:
+            self._python_stats()
+
+    # ------------------------------------------------------------------
+    # Statistics
+    # ------------------------------------------------------------------
+
+    def _python_stats(self) -> None:
+        values: List[List[Number]] = [[] for _ in self.groups]
+        if self.basis is None:
+            for g, price in zip(self.gids, self.prices):
+                values[g].append(price)
+        else:
+            for g, price, use in zip(self.gids, self.prices, self.basis):
+                if use:
+                    values[g].append(price)
+
+        self._by_gid: List[Optional[GroupPriceStats]] = []
+        for vals in values:
+            n = len(vals)
+            if not n:
+                self._by_gid.append(None)
+                continue
+            vals.sort()
+            half = n // 2
+            median = _sorted_median(vals, 0, n)
+            q1 = _sorted_median(vals, 0, half) if half else median
+            q3 = _sorted_median(vals, half, n - half)
+            deviations = sorted([abs(p - median) for p in vals])
+            self._by_gid.append(GroupPriceStats(n, median, q1, q3, _sorted_median(deviations, 0, n)))
+        self.stats: Dict[Hashable, GroupPriceStats] = {
+            key: s for key, s in zip(self.groups, self._by_gid) if s is not None
+        }
+
+    def _numpy_stats(self) -> None:
+        self._g = np.asarray(self.gids, dtype=np.int64)
+        raw = np.asarray(self.prices)
+        self._x = raw.astype(np.float64)
+        g, x = self._g, self._x
+        if self.basis is not None:
+            sel = np.asarray(self.basis, dtype=bool)
+            g, raw, x = g[sel], raw[sel], x[sel]
+
+        # One sort for every group: by group id, then price.
+        order = _np_group_order(raw, g)
+        xs, gs = x[order], g[order]
+        counts = np.bincount(g, minlength=len(self.groups))
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        half = counts // 2
+
+        median = _np_medians(xs, starts, counts)
+        q1 = np.where(half > 0, _np_medians(xs, starts, half), median)
+        q3 = _np_medians(xs, starts + half, counts - half)
+
+        # Absolute deviations, re-sorted within each group for the MAD.  The
+        # median is a whole or half cent, so 2 × deviation is integral for
+        # integer prices.
+        dev = np.abs(xs - median[gs])
+        dev_key = (dev * 2).astype(np.int64) if raw.dtype.kind in "iu" else dev
+        mad = _np_medians(dev[_np_group_order(dev_key, gs)], starts, counts)
+
+        self._counts, self._median, self._q1, self._q3, self._mad = counts, median, q1, q3, mad
+        self.stats = {
+            key: GroupPriceStats(n, m, a, b, d)
+            for key, n, m, a, b, d in zip(
+                self.groups, counts.tolist(), median.tolist(), q1.tolist(), q3.tolist(), mad.tolist(),
+            )
+            if n
+        }
+
+    # ------------------------------------------------------------------
+    # Outlier masks (one bool per row)
+    # ------------------------------------------------------------------
+
+    def _usable(self, min_count: int):
+        if self.use_numpy:
+            return (self._counts >= min_count) & (self._median > 0)
+        return [s is not None and s.count >= min_count and s.median > 0 for s in self._by_gid]
+
+    def mad_outlier_mask(self, *, k: float = 3.0, floor_ratio: float = 0.10, min_count: int = 3) -> List[bool]:
+        """
+        True where |price - median| > k × max(MAD, floor_ratio × median).
+
+        The floor keeps a group of identical prices (MAD 0) from flagging
+        every other price.  Rows whose group has fewer than min_count basis
+        prices or a non-positive median are never outliers.
+        """
+        usable = self._usable(min_count)
+        if self.use_numpy:
+            threshold = k * np.maximum(self._mad, self._median * floor_ratio)
+            g = self._g
+            return (usable[g] & (np.abs(self._x - self._median[g]) > threshold[g])).tolist()
+
+        rules = [
+            (s.median, k * max(s.mad, s.median * floor_ratio)) if ok else None
+            for s, ok in zip(self._by_gid, usable)
+        ]
+        return [
+            r is not None and abs(price - r[0]) > r[1]
+            for r, price in zip(map(rules.__getitem__, self.gids), self.prices)
+        ]
+
+    def iqr_outlier_mask(self, *, k: float = 4.0, min_count: int = 3) -> List[bool]:
+        """
+        True where a positive price is more than k IQRs from its group median.
+
+        Same guards as mad_outlier_mask; zero / negative prices are never
+        outliers (they are flagged separately as missing prices).
+        """
+        usable = self._usable(min_count)
+        if self.use_numpy:
+            iqr = np.maximum(self._q3 - self._q1, 1)
+            g, x = self._g, self._x
+            return (usable[g] & (x > 0) & (np.abs(x - self._median[g]) / iqr[g] > k)).tolist()
+
+        rules = [(s.median, s.iqr) if ok else None for s, ok in zip(self._by_gid, usable)]
+        return [
+            r is not None and price > 0 and abs(price - r[0]) / r[1] > k
+            for r, price in zip(map(rules.__getitem__, self.gids), self.prices)
+        ]
+
+
+def group_price_stats(
+    keys: Sequence[Hashable], prices: Sequence[Number],
+) -> Dict[Hashable, GroupPriceStats]:
+    """Median / quartiles / MAD for every group, keyed like `keys`."""
+    return PriceColumns(keys, prices).stats
@@ -88,19 +88,20 @@ CREATE UNIQUE INDEX IF NOT EXISTS uidx_drafts_source_job
   ON drafts(source_job_id)
   WHERE source_job_id IS NOT NULL;
 
--- Draft Items
-CREATE TABLE IF NOT EXISTS drafts (
+-- Draft Items (Day 150: this block re-declared `drafts`, so a fresh DB
+-- failed on the indexes below; later columns come from storage/migrate.py)
+CREATE TABLE IF NOT EXISTS draft_items (
   id INTEGER PRIMARY KEY AUTOINCREMENT,
-  restaurant_id INTEGER,
-  title TEXT NOT NULL DEFAULT 'Untitled Draft',
-  status TEXT NOT NULL DEFAULT 'editing',       -- editing|submitted|approved|rejected|archived
-  source_job_id INTEGER,                        -- provenance link to import_jobs.id
-  source TEXT,                                  -- JSON blob (file + ocr_engine)
-  source_file_path TEXT,                        -- NEW: original uploaded file path for debug OCR
+  draft_id INTEGER NOT NULL,
+  name TEXT NOT NULL,
+  description TEXT,
+  price_cents INTEGER NOT NULL DEFAULT 0,
+  category TEXT,
+  position INTEGER,
+  confidence INTEGER,                           -- OCR confidence (nullable)
   created_at TEXT NOT NULL DEFAULT (datetime('now')),
   updated_at TEXT NOT NULL DEFAULT (datetime('now')),
-  FOREIGN KEY (restaurant_id) REFERENCES restaurants(id) ON DELETE SET NULL,
-  FOREIGN KEY (source_job_id) REFERENCES import_jobs(id) ON DELETE SET NULL
+  FOREIGN KEY (draft_id) REFERENCES drafts(id) ON DELETE CASCADE
 );
 
 CREATE INDEX IF NOT EXISTS idx_draft_items_draft ON draft_items(draft_id);
@@ -147,7 +147,7 @@ def run_semantic_pipeline(
       4. Confidence tier classification (Step 9.3)
       5. Repair recommendations (Step 9.4)
       6. Auto-repair execution (Step 9.5)
-      7. Re-score + re-classify after repairs
+      7. Re-score + re-classify the repaired items
       8. Generate semantic report (Step 9.6)
 
     Returns dict with:
@@ -177,9 +177,9 @@ def run_semantic_pipeline(
     from .semantic_confidence import (
         score_semantic_confidence,
         classify_confidence_tiers,
-        compute_menu_confidence_summary,
         generate_repair_recommendations,
         apply_auto_repairs,
+        rescore_repaired_items,
         generate_semantic_report,
     )
 
@@ -201,9 +201,8 @@ def run_semantic_pipeline(
     # Step 9.5: Auto-repair execution
     repair_results = apply_auto_repairs(items)
 
-    # Re-score after repairs
-    score_semantic_confidence(items)
-    classify_confidence_tiers(items)
+    # Re-score after repairs (Day 160: only the items the repairs changed)
+    rescore_repaired_items(items)
 
     # Step 9.6: Semantic report
     semantic_report = generate_semantic_report(items, repair_results)
@@ -211,8 +210,9 @@ def run_semantic_pipeline(
     # Apply repairs back to original draft items
     repairs_applied = apply_repairs_to_draft_items(draft_items, items)
 
-    # Extract summary
-    summary = compute_menu_confidence_summary(items)
+    # Extract summary (Day 160: the report already computed it over the
+    # same items; apply_repairs_to_draft_items only writes draft_items)
+    summary = semantic_report.get("menu_confidence") or {}
 
     # Per-item metadata for debug payload
     items_metadata = extract_semantic_metadata(items)
@@ -222,7 +222,7 @@ def run_semantic_pipeline(
         "repair_results": repair_results,
         "items": items,
         "items_metadata": items_metadata,
-        "tier_counts": summary.get("tier_counts", {}),
+        "tier_counts": dict(summary.get("tier_counts", {})),
         "mean_confidence": summary.get("mean_confidence", 0.0),
         "quality_grade": summary.get("quality_grade", "D"),
         "repairs_applied": repairs_applied,
@@ -31,6 +31,16 @@ Day 70: Semantic quality report (Phase 8 capstone):
     combining menu confidence, repair summary, pipeline coverage,
     issue digest, category health ranking, and quality narrative
 
+Day 160: Incremental re-scoring after auto-repair:
+  - rescore_repaired_items(items): re-score + re-tier only the items
+    apply_auto_repairs changed (their auto_repairs_applied trail is
+    non-empty); same result as running Steps 9.2-9.3 over every item
+
+Day 166: Batched OCR name corrections:
+  - generate_repair_recommendations corrects each distinct token of the
+    flagged names once (menu_corrections.correction_table) instead of
+    re-correcting every item's name; garble verdicts are memoized
+
 Polymorphic: works with both Path A (text_block dicts from ocr_pipeline)
 and Path B (flat item dicts from ai_ocr_helper).
 
@@ -39,6 +49,7 @@ Entry functions:
   classify_confidence_tiers(items)        — Step 9.3
   generate_repair_recommendations(items)  — Step 9.4
   apply_auto_repairs(items)              — Step 9.5
+  rescore_repaired_items(items)          — Steps 9.2-9.3 again, repaired items only
   generate_semantic_report(items)        — Step 9.6
 
 Pipeline placement: Steps 9.2-9.6, after check_cross_item_consistency (9.1).
@@ -48,7 +59,8 @@ from __future__ import annotations
 
 import re
 import statistics
-from typing import Any, Dict, List, Optional
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Sequence
 
 
 # ---------------------------------------------------------------------------
@@ -168,6 +180,9 @@ def _score_grammar(item: Dict[str, Any]) -> float:
     return _DEFAULT_GRAMMAR_SCORE
 
 
+# Day 166: the verdict is a pure function of the name; scoring, repair
+# recommendations and re-scoring all ask it about the same names.
+@lru_cache(maxsize=4096)
 def _is_name_garbled(name: str) -> bool:
     """Check if a name looks like OCR garble (not a real menu item name)."""
     alpha = [c for c in name if c.isalpha()]
@@ -332,63 +347,68 @@ def score_semantic_confidence(items: list) -> None:
     Mutates items in place.
     """
     for item in items:
-        grammar_raw = _score_grammar(item)
-        name_raw = _score_name_quality(item)
-        price_raw = _score_price_presence(item)
-        variant_raw = _score_variant_quality(item)
-        flag_raw = _score_flag_penalty(item)
-
-        has_claude = "claude_confidence" in item
-
-        if has_claude:
-            # 6-signal formula
-            claude_raw = _score_claude_confidence(item)
-            weighted_grammar = grammar_raw * _W6_GRAMMAR
-            weighted_name = name_raw * _W6_NAME
-            weighted_price = price_raw * _W6_PRICE
-            weighted_variant = variant_raw * _W6_VARIANT
-            weighted_flags = flag_raw * _W6_FLAGS
-            weighted_claude = claude_raw * _W6_CLAUDE
-            raw_score = (weighted_grammar + weighted_name + weighted_price
-                         + weighted_variant + weighted_flags + weighted_claude)
-        else:
-            # Original 5-signal formula (unchanged)
-            claude_raw = None
-            weighted_grammar = grammar_raw * _W_GRAMMAR
-            weighted_name = name_raw * _W_NAME
-            weighted_price = price_raw * _W_PRICE
-            weighted_variant = variant_raw * _W_VARIANT
-            weighted_flags = flag_raw * _W_FLAGS
-            weighted_claude = None
-            raw_score = (weighted_grammar + weighted_name + weighted_price
-                         + weighted_variant + weighted_flags)
-
-        final = max(0.0, min(1.0, round(raw_score, 4)))
-
-        item["semantic_confidence"] = final
-        details: Dict[str, Any] = {
-            "grammar_score": round(grammar_raw, 4),
-            "grammar_weight": _W6_GRAMMAR if has_claude else _W_GRAMMAR,
-            "grammar_weighted": round(weighted_grammar, 4),
-            "name_quality_score": round(name_raw, 4),
-            "name_quality_weight": _W6_NAME if has_claude else _W_NAME,
-            "name_quality_weighted": round(weighted_name, 4),
-            "price_score": round(price_raw, 4),
-            "price_weight": _W6_PRICE if has_claude else _W_PRICE,
-            "price_weighted": round(weighted_price, 4),
-            "variant_score": round(variant_raw, 4),
-            "variant_weight": _W6_VARIANT if has_claude else _W_VARIANT,
-            "variant_weighted": round(weighted_variant, 4),
-            "flag_penalty_score": round(flag_raw, 4),
-            "flag_penalty_weight": _W6_FLAGS if has_claude else _W_FLAGS,
-            "flag_penalty_weighted": round(weighted_flags, 4),
-            "final": final,
-        }
-        if has_claude:
-            details["claude_confidence_score"] = round(claude_raw, 4)
-            details["claude_confidence_weight"] = _W6_CLAUDE
-            details["claude_confidence_weighted"] = round(weighted_claude, 4)
-        item["semantic_confidence_details"] = details
+        _score_item(item)
+
+
+def _score_item(item: Dict[str, Any]) -> None:
+    """score_semantic_confidence for one item."""
+    grammar_raw = _score_grammar(item)
+    name_raw = _score_name_quality(item)
+    price_raw = _score_price_presence(item)
+    variant_raw = _score_variant_quality(item)
+    flag_raw = _score_flag_penalty(item)
+
+    has_claude = "claude_confidence" in item
+
+    if has_claude:
+        # 6-signal formula
+        claude_raw = _score_claude_confidence(item)
+        weighted_grammar = grammar_raw * _W6_GRAMMAR
+        weighted_name = name_raw * _W6_NAME
+        weighted_price = price_raw * _W6_PRICE
+        weighted_variant = variant_raw * _W6_VARIANT
+        weighted_flags = flag_raw * _W6_FLAGS
+        weighted_claude = claude_raw * _W6_CLAUDE
+        raw_score = (weighted_grammar + weighted_name + weighted_price
+                     + weighted_variant + weighted_flags + weighted_claude)
+    else:
+        # Original 5-signal formula (unchanged)
+        claude_raw = None
+        weighted_grammar = grammar_raw * _W_GRAMMAR
+        weighted_name = name_raw * _W_NAME
+        weighted_price = price_raw * _W_PRICE
+        weighted_variant = variant_raw * _W_VARIANT
+        weighted_flags = flag_raw * _W_FLAGS
+        weighted_claude = None
+        raw_score = (weighted_grammar + weighted_name + weighted_price
+                     + weighted_variant + weighted_flags)
+
+    final = max(0.0, min(1.0, round(raw_score, 4)))
+
+    item["semantic_confidence"] = final
+    details: Dict[str, Any] = {
+        "grammar_score": round(grammar_raw, 4),
+        "grammar_weight": _W6_GRAMMAR if has_claude else _W_GRAMMAR,
+        "grammar_weighted": round(weighted_grammar, 4),
+        "name_quality_score": round(name_raw, 4),
+        "name_quality_weight": _W6_NAME if has_claude else _W_NAME,
+        "name_quality_weighted": round(weighted_name, 4),
+        "price_score": round(price_raw, 4),
+        "price_weight": _W6_PRICE if has_claude else _W_PRICE,
+        "price_weighted": round(weighted_price, 4),
+        "variant_score": round(variant_raw, 4),
+        "variant_weight": _W6_VARIANT if has_claude else _W_VARIANT,
+        "variant_weighted": round(weighted_variant, 4),
+        "flag_penalty_score": round(flag_raw, 4),
+        "flag_penalty_weight": _W6_FLAGS if has_claude else _W_FLAGS,
+        "flag_penalty_weighted": round(weighted_flags, 4),
+        "final": final,
+    }
+    if has_claude:
+        details["claude_confidence_score"] = round(claude_raw, 4)
+        details["claude_confidence_weight"] = _W6_CLAUDE
+        details["claude_confidence_weighted"] = round(weighted_claude, 4)
+    item["semantic_confidence_details"] = details
 
 
 # ---------------------------------------------------------------------------
@@ -418,15 +438,20 @@ def classify_confidence_tiers(items: list) -> None:
     Mutates items in place.
     """
     for item in items:
-        sc = item.get("semantic_confidence")
-        if sc is None:
-            # Defensive: score wasn't computed yet
-            item["semantic_tier"] = "reject"
-            item["needs_review"] = True
-            continue
-        tier = _tier_for_score(float(sc))
-        item["semantic_tier"] = tier
-        item["needs_review"] = tier != "high"
+        _classify_item(item)
+
+
+def _classify_item(item: Dict[str, Any]) -> None:
+    """classify_confidence_tiers for one item."""
+    sc = item.get("semantic_confidence")
+    if sc is None:
+        # Defensive: score wasn't computed yet
+        item["semantic_tier"] = "reject"
+        item["needs_review"] = True
+        return
+    tier = _tier_for_score(float(sc))
+    item["semantic_tier"] = tier
+    item["needs_review"] = tier != "high"
 
 
 # ---------------------------------------------------------------------------
@@ -537,8 +562,17 @@ def compute_menu_confidence_summary(items: list) -> Dict[str, Any]:
 # Day 68: Confidence-driven auto-repair recommendations
 # ---------------------------------------------------------------------------
 
-def _try_ocr_correction(name: str) -> Optional[str]:
-    """Attempt OCR correction via menu_corrections; return corrected or None."""
+def _try_ocr_correction(
+    name: str,
+    candidates: Optional[Dict[str, Optional[str]]] = None,
+) -> Optional[str]:
+    """Attempt OCR correction via menu_corrections; return corrected or None.
+
+    Names found in *candidates* (see _ocr_correction_candidates) are not
+    corrected again.
+    """
+    if candidates is not None and name in candidates:
+        return candidates[name]
     try:
         from .menu_corrections import correct_menu_item
         corrected = correct_menu_item(name)
@@ -549,20 +583,87 @@ def _try_ocr_correction(name: str) -> Optional[str]:
     return None
 
 
+def _ocr_correction_candidates(names: Iterable[str]) -> Dict[str, Optional[str]]:
+    """OCR correction (or None) for each distinct name, from one token table.
+
+    Day 166: the same garbled tokens recur across a menu's names, so every
+    distinct word is corrected once (menu_corrections.correction_table)
+    and each name is rebuilt from table lookups.  Same result per name as
+    _try_ocr_correction(name); names that fail are left out and take the
+    per-name path.
+    """
+    unique = list(dict.fromkeys(n for n in names if n))
+    try:
+        from .menu_corrections import correct_menu_item, correction_table
+        table = correction_table(unique)
+    except Exception:
+        return {}
+
+    candidates: Dict[str, Optional[str]] = {}
+    for name in unique:
+        try:
+            corrected = correct_menu_item(name, table=table)
+        except Exception:
+            continue
+        candidates[name] = corrected if corrected and corrected != name else None
+    return candidates
+
+
+def _name_repair_kind(name: str, details: Dict[str, Any]) -> Optional[str]:
+    """Which name-quality repair applies, or None if the name scored fine.
+
+    "missing" (no name), "garbled", "style" (very short and/or all-caps;
+    no OCR correction attempted) or "ocr" (low score, nothing specific:
+    try an OCR correction).  Shared by _build_name_recommendations and
+    _name_to_correct so the up-front corrections match what is built.
+    """
+    if details.get("name_quality_score", 1.0) >= _REPAIR_THRESHOLD_NAME_QUALITY:
+        return None
+    if not name:
+        return "missing"
+    if _is_name_garbled(name):
+        return "garbled"
+    if _is_name_short(name) or _is_name_all_caps(name):
+        return "style"
+    return "ocr"
+
+
+def _is_name_short(name: str) -> bool:
+    return len(name) < _NAME_SHORT_THRESHOLD
+
+
+def _is_name_all_caps(name: str) -> bool:
+    return name == name.upper() and len(name) > 2
+
+
+def _name_to_correct(item: Dict[str, Any]) -> Optional[str]:
+    """The name _build_name_recommendations would try to OCR-correct, or None."""
+    if _TIER_TO_PRIORITY.get(item.get("semantic_tier", "reject")) is None:
+        return None
+    name = _extract_name(item)
+    kind = _name_repair_kind(name, item.get("semantic_confidence_details") or {})
+    return name if kind in ("garbled", "ocr") else None
+
+
 def _build_name_recommendations(
     item: Dict[str, Any],
     priority: str,
     details: Dict[str, Any],
+    candidates: Optional[Dict[str, Optional[str]]] = None,
 ) -> List[Dict[str, Any]]:
-    """Build name-quality repair recommendations."""
-    name_score = details.get("name_quality_score", 1.0)
-    if name_score >= _REPAIR_THRESHOLD_NAME_QUALITY:
-        return []
+    """Build name-quality repair recommendations.
 
+    candidates: optional per-run OCR corrections by name
+    (_ocr_correction_candidates); missing names are corrected on demand.
+    """
     name = _extract_name(item)
+    kind = _name_repair_kind(name, details)
+    if kind is None:
+        return []
+
     recs: List[Dict[str, Any]] = []
 
-    if not name:
+    if kind == "missing":
         recs.append({
             "type": "garbled_name",
             "priority": priority,
@@ -573,9 +674,9 @@ def _build_name_recommendations(
         return recs
 
     # Check garble first (most severe)
-    if _is_name_garbled(name):
+    if kind == "garbled":
         # Try OCR correction
-        corrected = _try_ocr_correction(name)
+        corrected = _try_ocr_correction(name, candidates)
         if corrected:
             recs.append({
                 "type": "garbled_name",
@@ -596,7 +697,7 @@ def _build_name_recommendations(
         return recs
 
     # Short name
-    if len(name) < _NAME_SHORT_THRESHOLD:
+    if _is_name_short(name):
         recs.append({
             "type": "name_quality",
             "priority": priority,
@@ -606,7 +707,7 @@ def _build_name_recommendations(
         })
 
     # All-caps (less severe — downgrade priority one step)
-    if name == name.upper() and len(name) > 2:
+    if _is_name_all_caps(name):
         downgraded = "suggested" if priority in ("critical", "important") else priority
         recs.append({
             "type": "name_quality",
@@ -618,8 +719,8 @@ def _build_name_recommendations(
         })
 
     # If nothing specific but score is still low, try OCR correction
-    if not recs:
-        corrected = _try_ocr_correction(name)
+    if kind == "ocr":
+        corrected = _try_ocr_correction(name, candidates)
         if corrected:
             recs.append({
                 "type": "name_quality",
@@ -791,7 +892,12 @@ def generate_repair_recommendations(items: list) -> None:
 
     Pipeline placement: Step 9.4, after classify_confidence_tiers (9.3).
     Mutates items in place.
+
+    Day 166: OCR corrections for every flagged name are computed up front
+    from the distinct tokens of those names, so the cost follows the
+    number of distinct tokens rather than the number of items.
     """
+    candidates = _ocr_correction_candidates(_name_to_correct(item) for item in items)
     for item in items:
         tier = item.get("semantic_tier", "reject")
         priority = _TIER_TO_PRIORITY.get(tier)
@@ -805,7 +911,7 @@ def generate_repair_recommendations(items: list) -> None:
         recommendations: List[Dict[str, Any]] = []
 
         # 1. Name quality
-        recommendations.extend(_build_name_recommendations(item, priority, details))
+        recommendations.extend(_build_name_recommendations(item, priority, details, candidates))
 
         # 2. Price missing
         price_rec = _build_price_recommendation(item, priority, details)
@@ -1023,6 +1129,43 @@ def apply_auto_repairs(items: list) -> Dict[str, Any]:
     }
 
 
+def repaired_item_indices(items: list) -> List[int]:
+    """Positions of the items apply_auto_repairs() changed.
+
+    Every item leaves Step 9.5 with an ``auto_repairs_applied`` audit
+    trail; a non-empty trail marks the item as changed.
+    """
+    return [i for i, item in enumerate(items) if item.get("auto_repairs_applied")]
+
+
+def rescore_repaired_items(
+    items: list,
+    changed: Optional[Sequence[int]] = None,
+) -> List[int]:
+    """Re-run Steps 9.2 + 9.3 on the items auto-repair touched.
+
+    Day 160: the scores and tiers of every other item are a function of
+    fields Steps 9.4-9.5 never write (grammar, confidence, variants,
+    price_flags, claude_confidence; the name only changes through a
+    repair), so re-scoring them reproduces their current values exactly.
+    Only the repaired items are recomputed; the result is identical to
+    calling score_semantic_confidence() + classify_confidence_tiers() on
+    the whole list.
+
+    Args:
+        items:   Item dicts after apply_auto_repairs() (modified in place).
+        changed: Positions to recompute; defaults to repaired_item_indices().
+
+    Returns the positions that were recomputed.
+    """
+    if changed is None:
+        changed = repaired_item_indices(items)
+    for i in changed:
+        _score_item(items[i])
+        _classify_item(items[i])
+    return list(changed)
+
+
 # ---------------------------------------------------------------------------
 # Day 70: Semantic Quality Report (Phase 8 Capstone)
 # ---------------------------------------------------------------------------
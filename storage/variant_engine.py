@@ -29,6 +29,7 @@ from __future__ import annotations
 
 from collections import Counter
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Any, Dict, List, Optional, Tuple, Union
 import re
 
@@ -42,7 +43,14 @@ from .parsers.size_vocab import (
     PORTION_CHAIN,
     MULTIPLICITY_CHAIN,
 )
-from .parsers.combo_vocab import is_combo_food
+from .parsers.vocab import (
+    FLAVOR_TOKENS as _FLAVOR_TOKENS,
+    STYLE_TOKENS as _STYLE_TOKENS,
+    GRID_TOKEN_RE as _GRID_TOKEN_RE,
+    label_flavor_or_style,
+    label_is_combo,
+    label_size,
+)
 
 
 PriceLike = Union[int, float]
@@ -57,44 +65,8 @@ PriceLike = Union[int, float]
 # Wing counts / piece counts, etc.
 _PIECE_SUFFIXES = ("pc", "pcs", "piece", "pieces", "ct")
 
-# Flavor words – these usually indicate sauce / taste rather than geometry.
-_FLAVOR_TOKENS = {
-    "hot", "mild", "medium", "honey", "bbq", "barbecue", "honey bbq",
-    "garlic", "parm", "parmesan", "garlic parm", "teriyaki",
-    "buffalo", "spicy", "sweet", "sour", "honey mustard",
-    "lemon", "pepper", "lemon pepper",
-    # Phase 8: expanded wing/sauce flavors
-    "mango habanero", "carolina gold", "thai chili", "sweet chili",
-    "old bay", "cajun", "ranch", "blue cheese",
-    "asian zing", "korean bbq", "sriracha",
-    "plain", "naked", "original",
-}
-
-# Style / preparation – crust types, bone-in vs boneless, etc.
-_STYLE_TOKENS = {
-    "bone-in", "bone in", "boneless",
-    "thin", "thin crust", "thick", "thick crust", "deep dish", "stuffed crust",
-    "white", "red", "red sauce", "alfredo", "pesto",
-    # Phase 8: expanded pizza crust vocabulary
-    "pan", "pan crust",
-    "hand tossed", "hand-tossed",
-    "brooklyn", "brooklyn style",
-    "sicilian", "sicilian style",
-    "neapolitan", "neapolitan style",
-    "detroit", "detroit style",
-    "new york", "ny style",
-    "flatbread",
-    "gluten free", "gluten-free", "cauliflower crust",
-    "crispy", "extra crispy",
-    # Phase 8: wing preparation styles
-    "fried", "grilled", "baked",
-    "breaded", "naked",
-    "dry rub", "tossed",
-}
-
-
-_INCH_RE = re.compile(r'(\d{1,2})\s*(?:["]|in(?:ch(?:es)?)?)\b', re.IGNORECASE)
-_PIECE_RE = re.compile(r'(\d{1,2})\s*(?:pc|pcs|piece|pieces|ct)\b', re.IGNORECASE)
+# Flavor / style tokens and the label patterns live in the shared
+# vocabulary bundle (Day 165): _FLAVOR_TOKENS, _STYLE_TOKENS.
 
 
 # -----------------------------
@@ -107,42 +79,11 @@ def _normalize_size_from_label(label: str) -> Tuple[Optional[str], Optional[str]
 
     Returns (kind, normalized_size) where kind is "size" or None.
     """
-    if not label:
+    # Day 165: inch / piece / size word / bare number in one scan
+    size = label_size(label)
+    if size is None:
         return None, None
-
-    raw = label.strip()
-    low = raw.lower()
-
-    # 1) Numeric inch patterns: 10", 10 in, 10 inch, etc.
-    m = _INCH_RE.search(low)
-    if m:
-        inches = m.group(1)
-        return "size", f"{int(inches)}in"
-
-    # 2) Piece / count patterns: 6pc, 12 pcs, 24ct
-    m = _PIECE_RE.search(low)
-    if m:
-        count = m.group(1)
-        return "size", f"{int(count)}pc"
-
-    # 3) S/M/L style words
-    tokens = re.split(r"\s+", low)
-    for t in tokens:
-        t_clean = t.strip(".,;:-")
-        if not t_clean:
-            continue
-        mapped = _SIZE_WORD_MAP.get(t_clean)
-        if mapped:
-            return "size", mapped
-
-    # 4) Bare numbers, e.g. "10", "14", "18" in a pizza context.
-    # We treat 6–30 as inches; anything smaller/larger is probably something else.
-    nums = [int(n) for n in re.findall(r"\b(\d{1,2})\b", low)]
-    for n in nums:
-        if 6 <= n <= 30:
-            return "size", f"{n}in"
-
-    return None, None
+    return "size", size
 
 
 def _infer_flavor_or_style(label: str) -> Optional[str]:
@@ -150,17 +91,13 @@ def _infer_flavor_or_style(label: str) -> Optional[str]:
     Decide whether this label looks more like a flavor or a style indicator.
     Returns "flavor", "style", or None.
     """
-    low = label.lower()
     # Style wins if we see crust/bone hints
-    for token in _STYLE_TOKENS:
-        if token in low:
-            return "style"
-    for token in _FLAVOR_TOKENS:
-        if token in low:
-            return "flavor"
-    return None
+    return label_flavor_or_style(label)
 
 
+# Day 165: a menu repeats the same few labels ("Small", "Large", "W/Fries")
+# across every item; classification is a pure function of the text.
+@lru_cache(maxsize=2048)
 def _infer_variant_kind_and_normalized_size(label: str) -> Tuple[str, Optional[str]]:
     """
     High-level classifier for a variant label.
@@ -173,16 +110,9 @@ def _infer_variant_kind_and_normalized_size(label: str) -> Tuple[str, Optional[s
     if kind == "size":
         return "size", norm_size
 
-    # Day 58: Check for combo pattern — "W/Fries", "with Cheese", etc.
-    stripped = label.strip()
-    combo_match = re.match(r'^(?:w/\s*|with\s+)(.+)$', stripped, re.IGNORECASE)
-    if combo_match:
-        food = combo_match.group(1).strip()
-        if is_combo_food(food):
-            return "combo", None
-
-    # Standalone combo food used as a variant label (e.g., "Fries")
-    if is_combo_food(stripped):
+    # Day 58: Check for combo pattern — "W/Fries", "with Cheese", etc.,
+    # or a standalone combo food used as a variant label (e.g., "Fries")
+    if label_is_combo(label):
         return "combo", None
 
     # Not clearly a size or combo; maybe flavor or style
@@ -362,16 +292,8 @@ class SizeGridContext:
         return None
 
 
-# Regex for scanning size header tokens left-to-right (mirrors menu_grammar's
-# _SIZE_HEADER_TOKEN_RE but we define our own to avoid import cycle concerns).
-_GRID_TOKEN_RE = re.compile(
-    r"""
-    (\d{1,2})\s*(["\u201d\u00b0])([a-zA-Z]*)   |   # numeric inch + optional word: 10"Mini
-    \b(mini|small|sml|sm|medium|med|large|lrg|lg|family|party|personal|regular|deluxe)\b  |
-    \b(\d+)\s*(slices?|pieces?|pcs?|cuts?)\b
-    """,
-    re.VERBOSE | re.IGNORECASE,
-)
+# _GRID_TOKEN_RE scans size header tokens left-to-right; it shares its word
+# list with menu_grammar's _SIZE_HEADER_TOKEN_RE in parsers/vocab (Day 165).
 
 
 def _parse_size_header_columns(text: str) -> List[SizeGridColumn]:
@@ -0,0 +1,34 @@
+# tests/conftest.py
+"""Shared pytest fixtures."""
+
+from __future__ import annotations
+
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+_SCHEMA = Path(__file__).resolve().parents[1] / "storage" / "schema.sql"
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """Temporary drafts database at tmp_path / "drafts.db"; yields a new draft id.
+
+    schema.sql supplies the restaurants/menus tables the drafts FKs point
+    at.  The connection pool and item cache are reset on both sides.
+    """
+    import storage.drafts as drafts
+    from storage import db_pool
+
+    db_pool.close_all()
+    drafts.clear_item_cache()
+    path = tmp_path / "drafts.db"
+    monkeypatch.setattr(drafts, "DB_PATH", path)
+    drafts._ensure_schema()
+    raw = sqlite3.connect(path)
+    raw.executescript(_SCHEMA.read_text(encoding="utf-8"))
+    raw.close()
+    yield drafts._insert_draft(title="Test", restaurant_id=None)
+    drafts.clear_item_cache()
+    db_pool.close_all()
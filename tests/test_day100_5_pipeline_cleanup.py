@@ -334,9 +334,9 @@ class TestPipelineDebugRoute:
 
         # Ensure no stale debug file exists for this draft_id
         import storage.drafts as ds
-        debug_path = Path(ds.__file__).parent / ".debug" / "drafts" / "9990.json"
-        if debug_path.exists():
-            debug_path.unlink()
+        for debug_path in (ds._debug_path(9990), ds._debug_pack_path(9990)):
+            if debug_path.exists():
+                debug_path.unlink()
 
         resp = client.get("/drafts/9990/pipeline-debug")
         assert resp.status_code == 200
@@ -0,0 +1,245 @@
+# tests/test_day142_streaming_detect.py
+"""
+Day 142 — Streaming detect_menu_elements with incremental assembly.
+
+Tests that:
+  1. _StreamingItemsParser emits each item as soon as its JSON object closes
+  2. Parser is robust to arbitrary chunk boundaries, fences, nested objects
+     and braces/quotes inside strings
+  3. detect_menu_elements(on_items=...) reports normalized items progressively
+  4. Streaming result is identical to the non-streaming result
+  5. Callback failures never abort detection
+  6. DraftRowAssembler matches elements_to_draft_rows() exactly
+  7. Portal wiring: items_extracted progress column + on_items callback
+"""
+from __future__ import annotations
+
+import json
+import os
+import sys
+import unittest
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from storage.ai_menu_extract import (  # noqa: E402
+    DraftRowAssembler,
+    _StreamingItemsParser,
+    detect_menu_elements,
+    elements_to_draft_rows,
+)
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+_ITEMS = [
+    {"name": "Margherita {Classic}", "description": "Tomato, \"fresh\" basil",
+     "price": 14.95, "category": "Pizza", "subcategory": None,
+     "sizes": [{"label": "Small", "price": 10.0}, {"label": "Large", "price": 14.95}],
+     "bbox": {"x_pct": 5, "y_pct": 10, "w_pct": 40, "h_pct": 3, "page": 1}},
+    {"name": "Caesar Salad", "description": None, "price": 9.5,
+     "category": "Salads", "sizes": [],
+     "bbox": {"x_pct": 5, "y_pct": 20, "w_pct": 40, "h_pct": 3, "page": 1}},
+    {"name": "Each Topping Add", "price": 1.5, "category": "Pizza", "sizes": []},
+    {"name": "Veggie Wrap", "description": "with bacon", "price": 8.0,
+     "category": "Wraps", "sizes": []},
+    {"name": "_INHERIT_TOPPINGS", "category": "Calzones",
+     "_inherits_from": {"category": "Pizza"}},
+]
+_RESPONSE = "```json\n" + json.dumps({"items": _ITEMS, "notes": [{"a": 1}]}, indent=1) + "\n```"
+
+
+def _chunks(text: str, size: int):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def _make_response(text: str) -> MagicMock:
+    block = MagicMock()
+    block.type = "text"
+    block.text = text
+    resp = MagicMock()
+    resp.content = [block]
+    resp.stop_reason = "end_turn"
+    resp.usage.input_tokens = 100
+    resp.usage.output_tokens = 200
+    return resp
+
+
+def _make_stream_cm(text: str, chunk_size: int = 7) -> MagicMock:
+    stream = MagicMock()
+    stream.text_stream = iter(_chunks(text, chunk_size))
+    stream.get_final_message.return_value = _make_response(text)
+    stream.__enter__ = MagicMock(return_value=stream)
+    stream.__exit__ = MagicMock(return_value=False)
+    return stream
+
+
+def _client_for(text: str, chunk_size: int = 7) -> MagicMock:
+    client = MagicMock()
+    client.messages.stream.side_effect = lambda **kw: _make_stream_cm(text, chunk_size)
+    return client
+
+
+# ---------------------------------------------------------------------------
+# 1-2. Incremental parser
+# ---------------------------------------------------------------------------
+class TestStreamingItemsParser(unittest.TestCase):
+
+    def _parse_all(self, text: str, chunk_size: int):
+        parser = _StreamingItemsParser()
+        out = []
+        for c in _chunks(text, chunk_size):
+            out.extend(parser.feed(c))
+        return out
+
+    def test_whole_response_at_once(self):
+        self.assertEqual(self._parse_all(_RESPONSE, len(_RESPONSE)), _ITEMS)
+
+    def test_every_chunk_size_yields_same_items(self):
+        for size in (1, 2, 3, 5, 13, 64):
+            with self.subTest(size=size):
+                self.assertEqual(self._parse_all(_RESPONSE, size), _ITEMS)
+
+    def test_items_emitted_before_stream_ends(self):
+        parser = _StreamingItemsParser()
+        # Feed only the first item plus the start of the second
+        prefix = '{"items": [' + json.dumps(_ITEMS[0]) + ', {"name": "Cae'
+        emitted = parser.feed(prefix)
+        self.assertEqual(len(emitted), 1)
+        self.assertEqual(emitted[0]["name"], "Margherita {Classic}")
+
+    def test_other_arrays_ignored(self):
+        text = json.dumps({"notes": [{"name": "x"}], "items": [{"name": "y"}]})
+        self.assertEqual(self._parse_all(text, 4), [{"name": "y"}])
+
+    def test_empty_and_garbage(self):
+        parser = _StreamingItemsParser()
+        self.assertEqual(parser.feed(""), [])
+        self.assertEqual(parser.feed("I cannot read this menu."), [])
+        self.assertEqual(parser.count, 0)
+
+    def test_count_tracks_emitted(self):
+        parser = _StreamingItemsParser()
+        for c in _chunks(_RESPONSE, 9):
+            parser.feed(c)
+        self.assertEqual(parser.count, len(_ITEMS))
+
+
+# ---------------------------------------------------------------------------
+# 3-5. detect_menu_elements streaming mode
+# ---------------------------------------------------------------------------
+class TestDetectStreaming(unittest.TestCase):
+
+    def _detect(self, text: str, **kwargs):
+        with patch("storage.ai_menu_extract._get_client", return_value=_client_for(text)), \
+                patch("storage.ai_menu_extract._write_debug_log"):
+            return detect_menu_elements("PIZZA 14.95", **kwargs)
+
+    def test_on_items_receives_every_item(self):
+        batches = []
+        result = self._detect(_RESPONSE, on_items=batches.append)
+        streamed = [it for b in batches for it in b]
+        self.assertEqual(streamed, result)
+        self.assertGreater(len(batches), 1)
+
+    def test_streaming_output_identical_to_non_streaming(self):
+        plain = self._detect(_RESPONSE)
+        streamed = self._detect(_RESPONSE, on_items=lambda b: None)
+        self.assertEqual(plain, streamed)
+
+    def test_streamed_items_are_normalized_and_validated(self):
+        batches = []
+        self._detect(_RESPONSE, on_items=batches.append)
+        streamed = {it["name"]: it for b in batches for it in b}
+        self.assertIn("bbox", streamed["Caesar Salad"])
+        self.assertEqual(streamed["Caesar Salad"]["bbox"]["page"], 1)
+        # Day 139 description validator ran on the streamed batch too
+        self.assertIsNone(streamed["Veggie Wrap"]["description"])
+
+    def test_callback_error_does_not_abort(self):
+        def _boom(batch):
+            raise RuntimeError("progress sink down")
+        result = self._detect(_RESPONSE, on_items=_boom)
+        self.assertEqual(len(result), len(_ITEMS))
+
+    def test_non_streaming_path_single_call(self):
+        client = _client_for(_RESPONSE)
+        with patch("storage.ai_menu_extract._get_client", return_value=client), \
+                patch("storage.ai_menu_extract._write_debug_log"):
+            detect_menu_elements("PIZZA 14.95")
+        self.assertEqual(client.messages.stream.call_count, 1)
+
+
+# ---------------------------------------------------------------------------
+# 6. Incremental assembly
+# ---------------------------------------------------------------------------
+class TestDraftRowAssembler(unittest.TestCase):
+
+    def _detected(self):
+        from storage.ai_menu_extract import _normalize_detected_items
+        return _normalize_detected_items(json.loads(json.dumps(_ITEMS)))
+
+    def test_matches_elements_to_draft_rows(self):
+        expected = elements_to_draft_rows(self._detected(), ocr_text="Margherita 10.00 14.95")
+        asm = DraftRowAssembler("Margherita 10.00 14.95")
+        for it in self._detected():
+            asm.add(it)
+        self.assertEqual(asm.finish(), expected)
+
+    def test_positions_count_skipped_items(self):
+        asm = DraftRowAssembler()
+        asm.extend(self._detected())
+        positions = [r["position"] for r in asm.draft_rows]
+        self.assertEqual(positions, [1, 2, 4])
+
+    def test_rows_available_before_finish(self):
+        asm = DraftRowAssembler()
+        row = asm.add(self._detected()[0])
+        self.assertEqual(row["name"], "Margherita {Classic}")
+        self.assertEqual(len(asm.coord_data), 1)
+
+    def test_inheritance_expanded_on_finish(self):
+        asm = DraftRowAssembler()
+        asm.extend(self._detected())
+        self.assertEqual(len(asm.inheritance_markers), 1)
+        rows, _ = asm.finish()
+        self.assertTrue(any(r["category"] == "Calzones" for r in rows))
+
+    def test_extend_returns_row_count(self):
+        asm = DraftRowAssembler()
+        self.assertEqual(asm.extend(self._detected()), 3)
+
+
+# ---------------------------------------------------------------------------
+# 7. Portal wiring (source-level, Flask not required)
+# ---------------------------------------------------------------------------
+class TestPortalWiring(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        path = os.path.join(os.path.dirname(__file__), "..", "portal", "app.py")
+        with open(path, encoding="utf-8") as f:
+            cls.src = f.read()
+
+    def test_items_extracted_column_backfill(self):
+        # Day 150: the import_jobs column backfill moved to storage/import_jobs.py
+        path = os.path.join(os.path.dirname(__file__), "..", "storage", "import_jobs.py")
+        with open(path, encoding="utf-8") as f:
+            self.assertIn("ADD COLUMN items_extracted INTEGER", f.read())
+
+    def test_detect_called_with_on_items(self):
+        self.assertIn("on_items=_on_detected_items", self.src)
+
+    def test_progress_updates_throttled(self):
+        self.assertIn("STREAM_PROGRESS_INTERVAL_S", self.src)
+
+    def test_template_shows_live_count(self):
+        path = os.path.join(os.path.dirname(__file__), "..", "portal", "templates", "import_view.html")
+        with open(path, encoding="utf-8") as f:
+            html = f.read()
+        self.assertIn("data.items_extracted", html)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,278 @@
+# tests/test_day143_price_batch_planner.py
+"""
+Day 143 — Token-aware batch packing for price intelligence requests.
+
+Deliverables:
+  1. _estimate_item_tokens() — per-item prompt estimate incl. variants
+  2. _plan_batches() — first-fit-decreasing bin-packing under a token
+     budget + item cap, categories kept whole when they fit
+  3. _make_batches() routed through the planner
+  4. _run_batches() — concurrent execution, results in batch order, one
+     failing batch never sinks the others
+  5. _LLM_CALL_SLOTS — shared cap on in-flight LLM calls
+  6. Planner estimates vs reported input / output tokens
+     (token_estimate_accuracy), category estimates included
+  7. _estimate_item_market_rates uses packed batches
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+import storage.ai_price_intel as api
+
+
+def _item(iid, name, cat, sizes=()):
+    return {
+        "item_id": iid,
+        "item_name": name,
+        "category": cat,
+        "variants": [{"label": s} for s in sizes],
+    }
+
+
+@pytest.fixture(autouse=True)
+def _clear_usage():
+    api._TOKEN_USAGE.clear()
+    yield
+    api._TOKEN_USAGE.clear()
+
+
+# ===========================================================================
+# 1. Token estimates
+# ===========================================================================
+class TestEstimates:
+    def test_variants_increase_estimate(self):
+        plain = api._estimate_item_tokens(_item(1, "Cheese Pizza", "Pizza"))
+        sized = api._estimate_item_tokens(
+            _item(1, "Cheese Pizza", "Pizza", ['10" Mini', '12" Sml', '16" Lrg']))
+        assert sized > plain
+
+    def test_accepts_draft_item_shape(self):
+        est = api._estimate_item_tokens({"name": "Wings", "category": "Apps", "subcategory": "Hot"})
+        assert est > api._ITEM_LINE_OVERHEAD_TOKENS
+
+    def test_text_tokens_round_up(self):
+        assert api._estimate_text_tokens("abcde") == 2
+        assert api._estimate_text_tokens("") == 0
+
+    def test_extraction_estimate_counts_search_text(self):
+        small = api._estimate_extraction_tokens({"item_name": "x", "searches": {"_base": "a" * 100}})
+        big = api._estimate_extraction_tokens({"item_name": "x", "searches": {"_base": "a" * 2400}})
+        capped = api._estimate_extraction_tokens({"item_name": "x", "searches": {"_base": "a" * 9000}})
+        assert small < big <= capped
+        assert capped == api._estimate_extraction_tokens(
+            {"item_name": "x", "searches": {"_base": "a" * 2500}})
+
+
+# ===========================================================================
+# 2. Planner
+# ===========================================================================
+class TestPlanBatches:
+    def test_empty(self):
+        assert api._plan_batches([]) == []
+
+    def test_small_categories_share_a_batch(self):
+        items = [_item(i, f"Item {i}", f"Cat {i % 6}") for i in range(18)]
+        batches = api._plan_batches(items)
+        assert len(batches) == 1
+        assert sorted(it["item_id"] for it in batches[0]) == list(range(18))
+
+    def test_every_item_exactly_once(self):
+        items = [_item(i, f"Item number {i}", f"Cat {i % 7}", ["S", "M", "L"] * (i % 3))
+                 for i in range(300)]
+        batches = api._plan_batches(items, token_budget=400, max_items=20)
+        ids = [it["item_id"] for b in batches for it in b]
+        assert sorted(ids) == list(range(300))
+
+    def test_budget_and_cap_respected(self):
+        items = [_item(i, "Supreme Deluxe Pizza " * 3, f"Cat {i % 4}", ["Small", "Large"])
+                 for i in range(120)]
+        batches = api._plan_batches(items, token_budget=300, max_items=15)
+        for b in batches:
+            assert len(b) <= 15
+            assert sum(api._estimate_item_tokens(it) for it in b) <= 300
+
+    def test_fewer_batches_than_fixed_slicing_by_category(self):
+        # 10 categories of 3 items — old category split made 10 calls
+        items = [_item(i, f"Item {i}", f"Cat {i // 3}") for i in range(30)]
+        assert len(api._plan_batches(items, max_items=20)) == 2
+
+    def test_category_kept_whole_when_it_fits(self):
+        items = ([_item(i, f"A{i}", "Pizza") for i in range(12)]
+                 + [_item(100 + i, f"B{i}", "Wings") for i in range(12)])
+        batches = api._plan_batches(items, max_items=20)
+        for cat in ("Pizza", "Wings"):
+            holders = [bi for bi, b in enumerate(batches) if any(it["category"] == cat for it in b)]
+            assert len(holders) == 1
+
+    def test_category_order_preserved_inside_batch(self):
+        items = [_item(1, "a", "Pizza"), _item(2, "b", "Wings"), _item(3, "c", "Pizza")]
+        batch = api._plan_batches(items)[0]
+        assert [it["category"] for it in batch] == ["Pizza", "Pizza", "Wings"]
+
+    def test_heavy_variants_split_earlier(self):
+        light = [_item(i, "Soda", "Drinks") for i in range(20)]
+        heavy = [_item(i, "Soda", "Drinks", [f"Size option {n}" for n in range(12)]) for i in range(20)]
+        assert len(api._plan_batches(heavy, token_budget=500)) > len(api._plan_batches(light, token_budget=500))
+
+    def test_deterministic(self):
+        items = [_item(i, f"Item {i}" * (i % 4 + 1), f"Cat {i % 5}") for i in range(80)]
+        a = api._plan_batches(items, token_budget=350, max_items=12)
+        b = api._plan_batches(items, token_budget=350, max_items=12)
+        assert a == b
+
+    def test_make_batches_uses_planner(self):
+        items = [{"name": f"Item {i}", "category": f"C{i % 3}"} for i in range(10)]
+        assert api._make_batches(items) == [api._plan_batches(items)[0]]
+
+
+# ===========================================================================
+# 3. Concurrent execution + shared call limit
+# ===========================================================================
+class TestRunBatches:
+    def test_results_in_order(self):
+        def fn(b):
+            time.sleep(0.01 * (3 - b))
+            return b * 10
+        assert api._run_batches(fn, [0, 1, 2]) == [0, 10, 20]
+
+    def test_failure_isolated(self):
+        def fn(b):
+            if b == 1:
+                raise RuntimeError("boom")
+            return b
+        assert api._run_batches(fn, [0, 1, 2]) == [0, None, 2]
+
+    def test_runs_concurrently(self):
+        barrier = threading.Barrier(3, timeout=2)
+
+        def fn(b):
+            barrier.wait()
+            return b
+        assert api._run_batches(fn, [1, 2, 3], max_workers=3) == [1, 2, 3]
+
+    def test_shared_slots_bound_in_flight_calls(self):
+        assert isinstance(api._LLM_CALL_SLOTS, type(threading.BoundedSemaphore(1)))
+        peak = {"now": 0, "max": 0}
+        lock = threading.Lock()
+
+        def fn(_):
+            with api._LLM_CALL_SLOTS:
+                with lock:
+                    peak["now"] += 1
+                    peak["max"] = max(peak["max"], peak["now"])
+                time.sleep(0.02)
+                with lock:
+                    peak["now"] -= 1
+        api._run_batches(fn, list(range(12)), max_workers=12)
+        assert peak["max"] <= api._MAX_CONCURRENT_LLM_CALLS
+
+
+# ===========================================================================
+# 4. Estimate vs recorded usage
+# ===========================================================================
+class TestTokenUsage:
+    def test_no_samples(self):
+        assert api.token_estimate_accuracy()["samples"] == 0
+
+    def test_ratio_summary(self):
+        api._record_token_usage("m", 100, 110)
+        api._record_token_usage("m", 200, 180)
+        acc = api.token_estimate_accuracy("m")
+        assert acc["samples"] == 2
+        assert acc["max_ratio"] == 1.1
+        assert acc["min_ratio"] == 0.9
+
+    def test_overhead_excluded_from_ratio(self):
+        api._record_token_usage("m", 100, 400, overhead=300, output=900)
+        api._record_token_usage("m", 100, 420, overhead=300, output=1200)
+        acc = api.token_estimate_accuracy("m")
+        assert (acc["min_ratio"], acc["max_ratio"]) == (1.0, 1.2)
+        assert acc["max_output"] == 1200
+
+    def test_unknown_actual_ignored(self):
+        api._record_token_usage("m", 100, None)
+        api._record_token_usage("m", 100, 0)
+        assert api.token_estimate_accuracy()["samples"] == 0
+
+    def test_usage_reader_claude_and_gemini(self):
+        claude = MagicMock()
+        claude.usage.input_tokens = 321
+        claude.usage.output_tokens = 45
+        assert api._usage_tokens(claude) == (321, 45)
+        gemini = MagicMock(spec=["usage_metadata", "text"])
+        gemini.usage_metadata.prompt_token_count = 654
+        gemini.usage_metadata.candidates_token_count = 78
+        assert api._usage_tokens(gemini) == (654, 78)
+        assert api._usage_tokens(MagicMock(spec=["text"])) == (None, None)
+
+    def test_bounded(self):
+        for i in range(api._TOKEN_USAGE_MAX + 50):
+            api._record_token_usage("m", 10, 10)
+        assert len(api._TOKEN_USAGE) == api._TOKEN_USAGE_MAX
+
+
+# ===========================================================================
+# 5. _estimate_item_market_rates wiring
+# ===========================================================================
+class TestItemMarketRates:
+    def _client(self, calls):
+        client = MagicMock()
+
+        def create(**kw):
+            calls.append(kw["messages"][0]["content"])
+            resp = MagicMock()
+            resp.content = [MagicMock(text="[]")]
+            resp.usage.input_tokens = 400
+            resp.usage.output_tokens = 120
+            return resp
+        client.messages.create.side_effect = create
+        return client
+
+    def test_packs_small_menu_into_one_call(self):
+        calls = []
+        items = [_item(i, f"Item {i}", f"Cat {i % 8}") for i in range(24)]
+        with patch.object(api, "_get_client", return_value=self._client(calls)):
+            api._estimate_item_market_rates(items, "Town", "NJ", "08210", "pizza")
+        assert len(calls) == 1  # 8 categories, one call
+        assert api.token_estimate_accuracy()["samples"] == 1
+        row = api._TOKEN_USAGE[0]
+        assert row["planned"] == sum(api._estimate_item_tokens(it) for it in items)
+        block = "".join(line + "\n" for line in calls[0].splitlines() if line.startswith("- #"))
+        assert row["overhead"] == (api._estimate_text_tokens(calls[0])
+                                   - api._estimate_text_tokens(block))
+        assert row["output"] == 120
+
+    def test_category_estimates_recorded(self):
+        calls = []
+        with patch.object(api, "_get_client", return_value=self._client(calls)):
+            api._estimate_category_market_rates(["Pizza", "Wings"], "Town", "NJ", "08210",
+                                                "pizza", size_categories={"Pizza": ["S", "L"]})
+        assert len(calls) == 1
+        assert api._TOKEN_USAGE[0]["planned"] == (
+            api._estimate_item_tokens({"name": "Pizza", "variants": [{"label": "S"}, {"label": "L"}]})
+            + api._estimate_item_tokens({"name": "Wings"}))
+
+    def test_batches_capped_at_25_items(self):
+        # Short sized names fit the prompt budget 40 at a time, but their
+        # per-size JSON answer would overrun max_tokens.
+        calls = []
+        items = [_item(i, f"Pie {i}", "Pizza", ("S", "M", "L", "XL")) for i in range(30)]
+        with patch.object(api, "_get_client", return_value=self._client(calls)):
+            api._estimate_item_market_rates(items, "Town", "NJ", "08210", "pizza")
+        assert len(calls) == 2
+        assert all(c.count("- #") <= 25 for c in calls)
+
+    def test_every_item_sent(self):
+        calls = []
+        items = [_item(i, f"Item {i}", f"Cat {i % 3}") for i in range(95)]
+        with patch.object(api, "_get_client", return_value=self._client(calls)):
+            api._estimate_item_market_rates(items, "Town", "NJ", "08210", "pizza")
+        sent = "".join(calls)
+        for i in range(95):
+            assert f"#{i} " in sent
@@ -0,0 +1,306 @@
+# tests/test_day144_price_fanout.py
+"""
+Day 144 — Async fan-out for price intelligence searches.
+
+Deliverables:
+  1. _fan_out() / _run_fan_out() — asyncio execution layer with bounded
+     concurrency, results in unit order, per-unit completion hook run
+     off the loop thread
+  2. Run cancellation — a rerun (or cancel_price_analysis) stops the
+     in-flight run; stale runs return {"cancelled": True}
+  3. Cancel token reaches nested fan-outs (_run_batches) via contextvar
+  4. Partial results persisted as anchor menus land (_write_item_ranges
+     final=False, summary status 'partial' → 'complete')
+  5. get_price_intelligence() / get_price_intelligence_progress() serve
+     incremental results mid-run
+  6. Portal wiring: rerun cancels, status endpoint reports progress
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+import storage.ai_price_intel as api
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.setattr(api, "DB_PATH", tmp_path / "price_intel.db")
+    with api._db_connect() as conn:
+        conn.execute("CREATE TABLE drafts (id INTEGER PRIMARY KEY)")
+        conn.executemany("INSERT INTO drafts (id) VALUES (?)", [(1,), (2,)])
+    api._ensure_schema()
+    return tmp_path / "price_intel.db"
+
+
+def _seed(draft_id=1, n=4):
+    items = [
+        {"id": 100 + i, "name": f"Item {i}", "category": "Pizza", "price_cents": 1000 + i * 100}
+        for i in range(n)
+    ]
+    api._stub_price_intelligence(
+        draft_id=draft_id, restaurant_id=7, items=items,
+        cuisine_type="pizza", zip_code="08210", competitor_count=0,
+    )
+    with api._db_connect() as conn:
+        return conn.execute(
+            "SELECT item_id, item_name, item_category, current_price, "
+            "NULL AS subcategory FROM price_intelligence_results WHERE draft_id = ?",
+            (draft_id,),
+        ).fetchall()
+
+
+def _range(low, high):
+    return {"low": low, "high": high, "median": (low + high) // 2, "sources": [], "sizes": {}}
+
+
+@pytest.fixture(autouse=True)
+def _clear_runs():
+    api._ACTIVE_RUNS.clear()
+    yield
+    api._ACTIVE_RUNS.clear()
+
+
+# ===========================================================================
+# 1. Fan-out
+# ===========================================================================
+class TestFanOut:
+    def test_results_in_unit_order(self):
+        def fn(u):
+            time.sleep(0.01 * (4 - u))
+            return u * 2
+        assert api._run_fan_out(fn, [0, 1, 2, 3], limit=4) == [0, 2, 4, 6]
+
+    def test_empty(self):
+        assert api._run_fan_out(lambda u: u, [], limit=2) == []
+
+    def test_concurrency_bounded(self):
+        peak = {"now": 0, "max": 0}
+        lock = threading.Lock()
+
+        def fn(_):
+            with lock:
+                peak["now"] += 1
+                peak["max"] = max(peak["max"], peak["now"])
+            time.sleep(0.02)
+            with lock:
+                peak["now"] -= 1
+        api._run_fan_out(fn, list(range(10)), limit=3)
+        assert 1 < peak["max"] <= 3
+
+    def test_failure_isolated(self):
+        def fn(u):
+            if u == 1:
+                raise ValueError("bad unit")
+            return u
+        assert api._run_fan_out(fn, [0, 1, 2], limit=2) == [0, None, 2]
+
+    def test_on_result_fires_as_units_land(self):
+        seen = []
+
+        def fn(u):
+            time.sleep(0.05 if u == 0 else 0.0)
+            return u
+        api._run_fan_out(fn, [0, 1, 2], limit=3, on_result=lambda i, r: seen.append(i))
+        assert sorted(seen) == [0, 1, 2]
+        assert seen[-1] == 0  # slowest unit reported last, not first
+
+    def test_slow_hook_does_not_stall_other_units(self):
+        # The hook for unit 0 blocks until unit 1 has started; run on the
+        # loop thread it would hold the only slot's next dispatch forever.
+        second_started = threading.Event()
+        hook_threads = []
+
+        def fn(u):
+            if u == 1:
+                second_started.set()
+            return u
+
+        def hook(i, r):
+            hook_threads.append(threading.get_ident())
+            if i == 0:
+                assert second_started.wait(2.0)
+        assert api._run_fan_out(fn, [0, 1, 2], limit=1, on_result=hook) == [0, 1, 2]
+        assert threading.get_ident() not in hook_threads
+
+    def test_on_result_true_stops_early(self):
+        started = []
+
+        def fn(u):
+            started.append(u)
+            return u
+        out = api._run_fan_out(fn, list(range(20)), limit=1,
+                               on_result=lambda i, r: r >= 2)
+        assert out[:3] == [0, 1, 2]
+        assert len(started) < 20
+
+    def test_works_inside_running_loop(self):
+        async def caller():
+            return api._run_fan_out(lambda u: u + 1, [1, 2], limit=2)
+        assert asyncio.run(caller()) == [2, 3]
+
+
+# ===========================================================================
+# 2-3. Cancellation
+# ===========================================================================
+class TestCancellation:
+    def test_cancel_mid_run_raises_and_stops_scheduling(self):
+        cancel = threading.Event()
+        started = []
+
+        def fn(u):
+            started.append(u)
+            if u == 1:
+                cancel.set()
+            time.sleep(0.01)
+            return u
+        with pytest.raises(api.PriceAnalysisCancelled):
+            api._run_fan_out(fn, list(range(30)), limit=2, cancel=cancel)
+        assert len(started) < 30
+
+    def test_already_cancelled_runs_nothing(self):
+        cancel = threading.Event()
+        cancel.set()
+        calls = []
+        with pytest.raises(api.PriceAnalysisCancelled):
+            api._run_fan_out(calls.append, [1, 2], limit=2, cancel=cancel)
+        assert calls == []
+
+    def test_new_run_cancels_previous(self):
+        first = api._begin_price_run(5)
+        second = api._begin_price_run(5)
+        assert first.is_set() and not second.is_set()
+        api._end_price_run(5, first)  # stale end must not drop the new run
+        assert api._ACTIVE_RUNS[5] is second
+
+    def test_cancel_price_analysis(self):
+        assert api.cancel_price_analysis(9) is False
+        ev = api._begin_price_run(9)
+        assert api.cancel_price_analysis(9) is True
+        assert ev.is_set()
+
+    def test_run_batches_sees_context_cancel(self):
+        cancel = threading.Event()
+        cancel.set()
+        token = api._CURRENT_CANCEL.set(cancel)
+        try:
+            with pytest.raises(api.PriceAnalysisCancelled):
+                api._run_batches(lambda b: b, [[1], [2]])
+        finally:
+            api._CURRENT_CANCEL.reset(token)
+
+    def test_rerun_cancels_in_flight_analysis(self):
+        entered = threading.Event()
+
+        def slow_analysis(draft_id, restaurant_id, **kw):
+            def unit(u):
+                entered.set()
+                time.sleep(0.05)
+                return u
+            api._run_fan_out(unit, list(range(200)), limit=2)
+            return {"assessments": [], "skipped": False}
+
+        results = {}
+        with patch.object(api, "_analyze_menu_prices", side_effect=slow_analysis):
+            t = threading.Thread(
+                target=lambda: results.setdefault("r", api.analyze_menu_prices(3, 7)))
+            t.start()
+            assert entered.wait(2)
+            assert api.cancel_price_analysis(3) is True
+            t.join(5)
+        assert results["r"]["cancelled"] is True
+        assert 3 not in api._ACTIVE_RUNS
+
+
+# ===========================================================================
+# 4-5. Partial persistence + incremental reads
+# ===========================================================================
+class TestPartialResults:
+    def test_stub_starts_running(self, db):
+        _seed()
+        intel = api.get_price_intelligence(1)
+        assert intel["status"] == "running"
+        assert intel["partial"] is True
+
+    def test_partial_write_keeps_unpriced_stubs(self, db):
+        rows = _seed()
+        with api._db_connect() as conn:
+            api._write_item_ranges(conn, 1, rows, {100: _range(900, 1300)},
+                                   city="Town", state="NJ", zip_code="08210", final=False)
+            conn.commit()
+        intel = api.get_price_intelligence(1)
+        assert intel["status"] == "partial"
+        priced = [a for a in intel["assessments"] if a["suggested_low"] is not None]
+        assert [a["item_id"] for a in priced] == [100]
+        progress = api.get_price_intelligence_progress(1)
+        assert progress == {"status": "partial", "total_items": 4, "items_priced": 1}
+
+    def test_final_write_marks_complete(self, db):
+        rows = _seed()
+        with api._db_connect() as conn:
+            api._write_item_ranges(conn, 1, rows, {101: _range(900, 1300)},
+                                   city="Town", state="NJ", zip_code="08210", final=True)
+            conn.commit()
+        intel = api.get_price_intelligence(1)
+        assert intel["status"] == "complete" and intel["partial"] is False
+        assert intel["items_assessed"] == 1
+
+    def test_progress_none_without_run(self, db):
+        assert api.get_price_intelligence_progress(42) is None
+
+    def test_anchor_menus_report_partials(self):
+        rows = [{"item_id": 1, "item_name": "Cheese Pizza", "item_category": "Pizza",
+                 "current_price": 1500, "subcategory": None}]
+        anchors = [{"place_id": f"p{i}", "name": f"Shop {i}", "address": ""} for i in range(3)]
+
+        def scrape(place_id, name, force_refresh=False):
+            return {"items": [
+                {"name": "Cheese Pizza", "category": "Pizza", "price_cents": 1400 + n * 100}
+                for n in range(2)
+            ]}
+        partials = []
+        with patch("storage.price_intel.get_place_details", return_value={"website": "https://x"}), \
+                patch("storage.price_intel.classify_anchor_url", return_value={"tier": "A"}), \
+                patch("storage.price_intel.scrape_competitor_menu", side_effect=scrape):
+            final = api._aggregate_from_anchor_menus(
+                rows, {}, anchors, target_anchor_count=3,
+                on_partial=partials.append)
+        assert len(partials) == 2  # after menus 1 and 2; the 3rd hits target
+        assert 1 in final and final[1]["low"] == 1400
+
+    def test_partial_run_not_served_as_cache(self, db):
+        pytest.importorskip("werkzeug")
+        _seed()
+        with patch("storage.users.get_restaurant", return_value=None, create=True):
+            out = api._analyze_menu_prices(1, 7, model="m", force_refresh=False)
+        # Falls through to a fresh run (restaurant lookup) instead of the stubs
+        assert out.get("error") == "Restaurant not found"
+
+
+# ===========================================================================
+# 6. Portal wiring (source-level, Flask not required)
+# ===========================================================================
+class TestPortalWiring:
+    @classmethod
+    def setup_class(cls):
+        path = os.path.join(os.path.dirname(__file__), "..", "portal", "app.py")
+        with open(path, encoding="utf-8") as f:
+            cls.src = f.read()
+
+    def test_rerun_cancels_in_flight_run(self):
+        assert "ai_price_intel.cancel_price_analysis(draft_id)" in self.src
+
+    def test_cancelled_job_leaves_status_alone(self):
+        assert 'result.get("cancelled")' in self.src
+
+    def test_status_endpoint_reports_progress(self):
+        assert "get_price_intelligence_progress(draft_id)" in self.src
@@ -0,0 +1,339 @@
+# tests/test_day145_ai_replay.py
+"""
+Day 145 — Record/replay harness for AI calls + offline pipeline benchmark.
+
+Tests that:
+  1. Request keys are stable, dict-order independent, content sensitive
+  2. Anthropic messages.create / messages.stream record and replay
+  3. Replay streams feed text_stream chunks (streaming detect still works)
+  4. Gemini generate_content and Google Vision annotate record/replay
+  5. Missing fixture raises ReplayMiss; off mode is a pass-through
+  6. Simulated latency: fixed, recorded, scaled
+  7. _get_client() serves fixtures without ANTHROPIC_API_KEY
+  8. detect_menu_elements gives identical output live vs replayed
+  9. Benchmark helpers fold tracker + call log into per-stage timings;
+     overlapping AI calls counted once in the AI wait
+"""
+from __future__ import annotations
+
+import importlib.util
+import json
+import os
+import sys
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from storage import ai_replay  # noqa: E402
+import storage.ai_menu_extract as ame  # noqa: E402
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+class _Model:
+    """Minimal pydantic-like SDK object."""
+
+    def __init__(self, data):
+        self._data = data
+        for k, v in data.items():
+            setattr(self, k, _wrap(v))
+
+    def model_dump(self, **kw):
+        return json.loads(json.dumps(self._data))
+
+
+def _wrap(v):
+    if isinstance(v, dict):
+        return _Model(v)
+    if isinstance(v, list):
+        return [_wrap(x) for x in v]
+    return v
+
+
+def _message(text, in_tok=100):
+    return _Model({
+        "id": "msg_1",
+        "type": "message",
+        "stop_reason": "end_turn",
+        "content": [{"type": "thinking", "thinking": "hmm"},
+                    {"type": "text", "text": text}],
+        "usage": {"input_tokens": in_tok, "output_tokens": 50},
+    })
+
+
+class _LiveStream:
+    def __init__(self, message, chunks):
+        self._message = message
+        self.text_stream = iter(chunks)
+        self.exited = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.exited = True
+        return False
+
+    def get_final_message(self):
+        return self._message
+
+
+@pytest.fixture(autouse=True)
+def fixtures(tmp_path):
+    ai_replay.reset()
+    ai_replay.configure(fixtures_dir=tmp_path / "fx")
+    yield tmp_path / "fx"
+    ai_replay.reset()
+    ame._client = None
+
+
+def _live_anthropic(text='{"items": []}'):
+    live = MagicMock()
+    live.messages.create.side_effect = lambda **kw: _message(text)
+    live.messages.stream.side_effect = lambda **kw: _LiveStream(
+        _message(text), [text[i:i + 5] for i in range(0, len(text), 5)])
+    return live
+
+
+# ===========================================================================
+# 1. Keys
+# ===========================================================================
+class TestRequestKey:
+    def test_dict_order_independent(self):
+        a = ai_replay.request_key("anthropic", "m", {"model": "x", "max_tokens": 5})
+        b = ai_replay.request_key("anthropic", "m", {"max_tokens": 5, "model": "x"})
+        assert a == b
+
+    def test_content_sensitive(self):
+        a = ai_replay.request_key("anthropic", "m", {"messages": [{"content": "a"}]})
+        b = ai_replay.request_key("anthropic", "m", {"messages": [{"content": "b"}]})
+        assert a != b
+
+    def test_bytes_and_sdk_objects(self):
+        k1 = ai_replay.request_key("g", "m", {"img": b"\x00\x01", "cfg": _Model({"t": 0.1})})
+        k2 = ai_replay.request_key("g", "m", {"img": b"\x00\x01", "cfg": _Model({"t": 0.1})})
+        k3 = ai_replay.request_key("g", "m", {"img": b"\x00\x02", "cfg": _Model({"t": 0.1})})
+        assert k1 == k2 != k3
+
+
+# ===========================================================================
+# 2-3. Anthropic
+# ===========================================================================
+class TestAnthropic:
+    def test_create_record_then_replay(self, fixtures):
+        ai_replay.configure(mode="record")
+        rec = ai_replay.wrap_anthropic(_live_anthropic("hello"))
+        live_msg = rec.messages.create(model="m", messages=[{"role": "user", "content": "hi"}])
+        assert live_msg.content[1].text == "hello"
+        assert list((fixtures / "anthropic").glob("messages.create__*.json"))
+
+        ai_replay.configure(mode="replay")
+        client = ai_replay.anthropic_client()
+        msg = client.messages.create(model="m", messages=[{"role": "user", "content": "hi"}])
+        assert msg.content[1].text == "hello"
+        assert msg.usage.input_tokens == 100
+        assert not hasattr(msg.content[0], "text")  # thinking block stays text-less
+
+    def test_stream_record_then_replay(self, fixtures):
+        ai_replay.configure(mode="record")
+        rec = ai_replay.wrap_anthropic(_live_anthropic("streamed text body"))
+        with rec.messages.stream(model="m", max_tokens=10) as s:
+            seen = "".join(s.text_stream)
+        assert seen == "streamed text body"
+
+        ai_replay.configure(mode="replay")
+        client = ai_replay.anthropic_client()
+        with client.messages.stream(model="m", max_tokens=10) as s:
+            replayed = "".join(s.text_stream)
+            final = s.get_final_message()
+        assert replayed == "streamed text body"
+        assert final.stop_reason == "end_turn"
+
+    def test_stream_recorded_without_get_final_message(self, fixtures):
+        ai_replay.configure(mode="record")
+        rec = ai_replay.wrap_anthropic(_live_anthropic("x"))
+        with rec.messages.stream(model="m"):
+            pass
+        assert list((fixtures / "anthropic").glob("messages.stream__*.json"))
+
+    def test_replay_miss(self):
+        ai_replay.configure(mode="replay")
+        with pytest.raises(ai_replay.ReplayMiss):
+            ai_replay.anthropic_client().messages.create(model="never-recorded")
+
+    def test_off_is_passthrough(self):
+        live = _live_anthropic()
+        assert ai_replay.wrap_anthropic(live) is live
+
+    def test_call_log(self, fixtures):
+        ai_replay.configure(mode="record")
+        ai_replay.wrap_anthropic(_live_anthropic()).messages.create(model="m")
+        log = ai_replay.call_log()
+        assert len(log) == 1 and log[0]["provider"] == "anthropic"
+        assert log[0]["started"] <= log[0]["at"]
+
+
+# ===========================================================================
+# 4. Gemini + Vision
+# ===========================================================================
+class TestGeminiAndVision:
+    def test_gemini_text_survives_round_trip(self):
+        resp = _Model({"candidates": [{"content": {"parts": [{"text": "[1]"}]}}],
+                       "usage_metadata": {"prompt_token_count": 42}})
+        resp.text = "[1]"
+        live = MagicMock()
+        live.models.generate_content.return_value = resp
+
+        ai_replay.configure(mode="record")
+        ai_replay.wrap_gemini(live).models.generate_content(model="g", contents="p")
+        ai_replay.configure(mode="replay")
+        out = ai_replay.gemini_client().models.generate_content(model="g", contents="p")
+        assert out.text == "[1]"
+        assert out.usage_metadata.prompt_token_count == 42
+
+    def test_vision_keyed_by_image_not_key(self):
+        calls = []
+
+        def live(b64):
+            calls.append(b64)
+            return {"responses": [{"fullTextAnnotation": {"text": "PIZZA 9.99"}}]}
+
+        ai_replay.configure(mode="record")
+        ai_replay.vision_annotate(b"img-bytes", live)
+        ai_replay.configure(mode="replay")
+        data = ai_replay.vision_annotate(b"img-bytes", live)
+        assert data["responses"][0]["fullTextAnnotation"]["text"] == "PIZZA 9.99"
+        assert len(calls) == 1
+        with pytest.raises(ai_replay.ReplayMiss):
+            ai_replay.vision_annotate(b"other", live)
+
+
+# ===========================================================================
+# 6. Latency
+# ===========================================================================
+class TestLatency:
+    def test_defaults_to_zero(self):
+        assert ai_replay._simulated_latency(12.0) == 0.0
+
+    def test_recorded_and_scaled(self):
+        ai_replay.configure(latency="recorded", scale=0.5)
+        assert ai_replay._simulated_latency(12.0) == 6.0
+
+    def test_fixed(self, monkeypatch):
+        monkeypatch.setenv("SERVLINE_AI_REPLAY_LATENCY", "0.25")
+        assert ai_replay._simulated_latency(12.0) == 0.25
+
+    def test_replay_sleeps(self, fixtures):
+        ai_replay.configure(mode="record")
+        ai_replay.wrap_anthropic(_live_anthropic()).messages.create(model="m")
+        ai_replay.configure(mode="replay", latency="0.3")
+        with patch.object(ai_replay.time, "sleep") as sleep:
+            ai_replay.anthropic_client().messages.create(model="m")
+        sleep.assert_called_once_with(0.3)
+
+    def test_bad_mode_rejected(self):
+        with pytest.raises(ValueError):
+            ai_replay.configure(mode="live")
+
+
+# ===========================================================================
+# 7-8. Pipeline integration
+# ===========================================================================
+class TestPipelineIntegration:
+    def test_get_client_replays_without_key(self, monkeypatch):
+        monkeypatch.delenv("ANTHROPIC_API_KEY", raising=False)
+        ame._client = None
+        assert ame._get_client() is None
+        ai_replay.configure(mode="replay")
+        assert ame._get_client() is not None
+
+    def test_detect_menu_elements_identical_live_vs_replay(self, monkeypatch):
+        body = json.dumps({"items": [
+            {"name": "Cheese Pizza", "price": 12.5, "category": "Pizza", "sizes": []},
+            {"name": "Garden Salad", "price": 8.0, "category": "Salads", "sizes": []},
+        ]})
+        ai_replay.configure(mode="record")
+        monkeypatch.setattr(ame, "_write_debug_log", lambda *a, **k: None)
+        with patch.object(ame, "_get_client",
+                          return_value=ai_replay.wrap_anthropic(_live_anthropic(body))):
+            live = ame.detect_menu_elements("CHEESE PIZZA 12.50\nGARDEN SALAD 8.00")
+
+        ai_replay.configure(mode="replay")
+        streamed = []
+        with patch.object(ame, "_get_client", return_value=ai_replay.anthropic_client()):
+            replayed = ame.detect_menu_elements(
+                "CHEESE PIZZA 12.50\nGARDEN SALAD 8.00", on_items=streamed.extend)
+        assert replayed == live
+        assert [it["name"] for it in streamed] == ["Cheese Pizza", "Garden Salad"]
+
+    def test_portal_vision_routed_through_shim(self):
+        path = os.path.join(os.path.dirname(__file__), "..", "portal", "app.py")
+        with open(path, encoding="utf-8") as f:
+            src = f.read()
+        assert "ai_replay.vision_annotate(img_bytes, _annotate)" in src
+
+    def test_price_intel_gemini_client_replay(self):
+        import storage.ai_price_intel as api
+        ai_replay.configure(mode="replay")
+        client = api._gemini_client("")
+        assert hasattr(client.models, "generate_content")
+
+
+# ===========================================================================
+# 9. Benchmark helpers
+# ===========================================================================
+def _bench_module():
+    path = os.path.join(os.path.dirname(__file__), "..", "tools", "bench_pipeline.py")
+    spec = importlib.util.spec_from_file_location("bench_pipeline", path)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+class TestBenchmark:
+    def test_stage_timings_split_ai_vs_local(self):
+        bench = _bench_module()
+        metrics = {
+            "steps": {
+                "ocr_text_extraction": {"status": "success", "duration_ms": 400, "items": 0},
+                "call_1_claude_extraction": {"status": "success", "duration_ms": 1500, "items": 30},
+            },
+            "bottleneck": "call_1_claude_extraction",
+        }
+        calls = [{"provider": "anthropic", "elapsed_s": 1.2},
+                 {"provider": "google_vision", "elapsed_s": 0.3}]
+        row = bench.stage_timings(metrics, calls, wall_s=2.0)
+        assert row["wall_ms"] == 2000
+        assert row["ai_wait_ms"] == 1500
+        assert row["local_ms"] == 500
+        assert row["ai_calls_by_provider"] == {"anthropic": 1, "google_vision": 1}
+        assert [s["stage"] for s in row["stages"]] == [
+            "ocr_text_extraction", "call_1_claude_extraction"]
+
+    def test_overlapping_calls_counted_once(self):
+        bench = _bench_module()
+        calls = [{"provider": "anthropic", "elapsed_s": 1.0, "started": 10.0},
+                 {"provider": "anthropic", "elapsed_s": 1.0, "started": 10.5},
+                 {"provider": "google_vision", "elapsed_s": 0.25, "started": 12.0}]
+        row = bench.stage_timings(None, calls, wall_s=2.0)
+        assert row["ai_wait_ms"] == 1750
+        assert row["ai_call_ms"] == 2250
+        assert row["local_ms"] == 250
+
+    def test_report_lists_every_stage(self):
+        bench = _bench_module()
+        row = bench.stage_timings(
+            {"steps": {"semantic_pipeline": {"status": "success", "duration_ms": 80, "items": 12}}},
+            [], wall_s=0.1)
+        row.update({"menu": "pizza.pdf", "run": 1, "status": "done"})
+        text = bench.format_report([row])
+        assert "pizza.pdf" in text and "semantic_pipeline" in text
+
+    def test_missing_metrics_tolerated(self):
+        bench = _bench_module()
+        row = bench.stage_timings(None, [], wall_s=0.0)
+        assert row["stages"] == [] and row["bottleneck"] is None
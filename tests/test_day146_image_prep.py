@@ -0,0 +1,370 @@
+# tests/test_day146_image_prep.py
+"""
+Day 146 — Shared image preparation for vision calls.
+
+Deliverables:
+  1. target_size() — output pixels from the model's effective resolution
+  2. plan_tiles() — tall images split into overlapping bands; keep_width
+     bands fit the model's pixel budget at the source width
+  3. encode_jpeg() — in-memory binary search for the highest JPEG quality
+     under the byte cap
+  4. prepare_image() — passthrough for small images, resize + encode for
+     large ones, tiling on request, raw passthrough without Pillow
+  5. Legibility fixture: rendered menu text keeps readable glyph height
+     and separable lines after preparation
+  6. Callers wired through image_prep (vision verify, VLM chunker,
+     browser screenshot compressor)
+"""
+
+from __future__ import annotations
+
+import io
+import os
+
+import pytest
+
+from storage import image_prep
+from storage.image_prep import CLAUDE_VISION, GOOGLE_VISION_OCR
+
+
+# Minimum rendered text height (px) we treat as legible to the model/OCR
+_MIN_GLYPH_PX = 8
+
+_MENU_LINES = [
+    "MARGHERITA PIZZA ........ 12.95",
+    "PEPPERONI PIZZA ......... 14.50",
+    "CHICKEN PARM SUB ........ 11.25",
+    "GARDEN SALAD ............  8.75",
+    "BUFFALO WINGS (10) ...... 13.99",
+    "GARLIC KNOTS (6) ........  5.50",
+]
+
+
+# ---------------------------------------------------------------------------
+# Fixtures
+# ---------------------------------------------------------------------------
+@pytest.fixture(scope="module")
+def PIL():
+    return pytest.importorskip("PIL.Image")
+
+
+def _render_menu(PIL, width, height, *, zoom, lines=None, repeat=1, noise=True):
+    """Draw menu text small, blow it up NEAREST (crisp glyphs ~11*zoom px),
+    then add sensor-like noise so the PNG is photo-sized."""
+    from PIL import ImageDraw
+    lines = (lines or _MENU_LINES) * repeat
+    small = PIL.new("L", (width // zoom, height // zoom), 235)
+    draw = ImageDraw.Draw(small)
+    for i, line in enumerate(lines):
+        draw.text((8, 10 + i * 30), line, fill=20)
+    img = small.resize((width, height), PIL.NEAREST)
+    if noise:
+        grain = PIL.effect_noise((width, height), 12)
+        img = PIL.blend(img, grain.point(lambda v: 200 + v // 8), 0.15)
+    return img.convert("RGB"), len(lines)
+
+
+def _text_rows(img):
+    """Heights of horizontal runs that contain dark (ink) pixels."""
+    bw = img.convert("L").point(lambda v: 255 if v < 110 else 0)
+    w, h = bw.size
+    runs, start = [], None
+    for y in range(h):
+        dark = bw.crop((0, y, w, y + 1)).getbbox() is not None
+        if dark and start is None:
+            start = y
+        elif not dark and start is not None:
+            runs.append(y - start)
+            start = None
+    if start is not None:
+        runs.append(h - start)
+    return runs
+
+
+def _open(prepared):
+    from PIL import Image
+    return Image.open(io.BytesIO(prepared.data))
+
+
+@pytest.fixture(scope="module")
+def phone_photo(PIL, tmp_path_factory):
+    """4000x3000 noisy menu photo saved as PNG (well over the byte cap)."""
+    img, n = _render_menu(PIL, 4000, 3000, zoom=4)
+    path = tmp_path_factory.mktemp("photo") / "phone_menu.png"
+    img.save(path, format="PNG")
+    return path, n
+
+
+@pytest.fixture(scope="module")
+def tall_screenshot(PIL, tmp_path_factory):
+    """1280x12000 full-page screenshot, ~22px text."""
+    img, n = _render_menu(PIL, 1280, 12000, zoom=2, repeat=34, noise=False)
+    path = tmp_path_factory.mktemp("shot") / "screenshot.png"
+    img.save(path, format="PNG")
+    return path, n
+
+
+# ===========================================================================
+# 1. target_size
+# ===========================================================================
+class TestTargetSize:
+    def test_phone_photo_fits_model_resolution(self):
+        w, h = image_prep.target_size(4032, 3024)
+        assert max(w, h) <= CLAUDE_VISION.long_edge
+        assert w * h <= CLAUDE_VISION.max_pixels
+        assert abs(w / h - 4032 / 3024) < 0.01
+
+    def test_small_image_unchanged(self):
+        assert image_prep.target_size(800, 600) == (800, 600)
+
+    def test_never_upscales(self):
+        w, h = image_prep.target_size(100, 50)
+        assert (w, h) == (100, 50)
+
+    def test_ocr_profile_keeps_more_pixels(self):
+        claude = image_prep.target_size(4032, 3024, CLAUDE_VISION)
+        ocr = image_prep.target_size(4032, 3024, GOOGLE_VISION_OCR)
+        assert ocr[0] * ocr[1] > claude[0] * claude[1]
+        assert ocr == (4032, 3024)
+
+    def test_degenerate(self):
+        assert image_prep.target_size(0, 10) == (0, 10)
+
+
+# ===========================================================================
+# 2. plan_tiles
+# ===========================================================================
+class TestPlanTiles:
+    def test_normal_aspect_single_band(self):
+        assert image_prep.plan_tiles(3000, 4000) == [(0, 4000)]
+
+    def test_tall_image_bands_cover_and_overlap(self):
+        bands = image_prep.plan_tiles(1280, 12000)
+        assert len(bands) > 1
+        assert bands[0][0] == 0 and bands[-1][1] == 12000
+        min_overlap = int(1280 * CLAUDE_VISION.tile_aspect * CLAUDE_VISION.tile_overlap)
+        for (t0, b0), (t1, b1) in zip(bands, bands[1:]):
+            assert t1 < b0                       # no gaps
+            assert b0 - t1 >= min_overlap        # overlap kept
+        for top, bottom in bands:
+            assert bottom - top <= 1280 * CLAUDE_VISION.tile_aspect
+
+    def test_tile_count_capped(self):
+        bands = image_prep.plan_tiles(1000, 60000)
+        assert len(bands) == CLAUDE_VISION.max_tiles
+        assert bands[0][0] == 0 and bands[-1][1] == 60000
+        for (_t0, b0), (t1, _b1) in zip(bands, bands[1:]):
+            assert t1 < b0
+
+    def test_empty(self):
+        assert image_prep.plan_tiles(0, 0) == []
+
+    def test_keep_width_bands_fit_pixel_budget(self):
+        bands = image_prep.plan_tiles(1280, 12000, keep_width=True)
+        assert len(bands) > len(image_prep.plan_tiles(1280, 12000))
+        assert bands[0][0] == 0 and bands[-1][1] == 12000
+        for (_t0, b0), (t1, _b1) in zip(bands, bands[1:]):
+            assert t1 < b0
+        for top, bottom in bands:
+            assert 1280 * (bottom - top) <= CLAUDE_VISION.max_pixels
+
+    def test_keep_width_ignored_past_long_edge(self):
+        assert (image_prep.plan_tiles(3000, 9000, keep_width=True)
+                == image_prep.plan_tiles(3000, 9000))
+
+
+# ===========================================================================
+# 3. encode_jpeg
+# ===========================================================================
+class TestEncodeJpeg:
+    def test_highest_quality_that_fits(self, PIL):
+        img, _ = _render_menu(PIL, 1600, 1200, zoom=2)
+        cap = len(image_prep._jpeg_bytes(img, 70)) + 1
+        data, q = image_prep.encode_jpeg(img, cap)
+        assert len(data) <= cap
+        assert q >= 60      # size is only roughly monotonic in quality
+        if q < image_prep.JPEG_Q_MAX:
+            assert len(image_prep._jpeg_bytes(img, q + 1)) > cap
+
+    def test_returns_min_quality_when_nothing_fits(self, PIL):
+        img, _ = _render_menu(PIL, 800, 600, zoom=2)
+        data, q = image_prep.encode_jpeg(img, 100)
+        assert q == image_prep.JPEG_Q_MIN
+        assert data[:3] == b"\xff\xd8\xff"
+
+    def test_alpha_flattened(self, PIL):
+        img = PIL.new("RGBA", (64, 64), (0, 0, 0, 0))
+        data, _q = image_prep.encode_jpeg(img, 1_000_000)
+        out = PIL.open(io.BytesIO(data))
+        assert out.mode == "RGB"
+        assert out.getpixel((10, 10))[0] > 240   # transparent → white
+
+    def test_fit_jpeg_shrinks_but_respects_min_width(self, PIL):
+        img, _ = _render_menu(PIL, 1600, 1200, zoom=2)
+        data, _q, out = image_prep.fit_jpeg(img, 5_000)
+        assert len(data) <= 5_000 and out.size[0] < 1600
+        _d, _q, kept = image_prep.fit_jpeg(img, 5_000, min_width=1600)
+        assert kept.size[0] == 1600
+
+
+# ===========================================================================
+# 4. prepare_image
+# ===========================================================================
+class TestPrepareImage:
+    def test_phone_photo_shrinks_payload(self, phone_photo):
+        path, _ = phone_photo
+        raw = path.stat().st_size
+        [p] = image_prep.prepare_image(path)
+        assert p.media_type == "image/jpeg"
+        assert len(p.data) <= CLAUDE_VISION.max_bytes
+        assert len(p.data) < raw / 4
+        assert max(p.width, p.height) <= CLAUDE_VISION.long_edge
+        assert (p.width, p.height) == _open(p).size
+
+    def test_small_image_passes_through(self, PIL, tmp_path):
+        path = tmp_path / "small.png"
+        PIL.new("RGB", (400, 300), (250, 250, 250)).save(path)
+        [p] = image_prep.prepare_image(path)
+        assert p.data == path.read_bytes()
+        assert p.media_type == "image/png" and p.quality is None
+
+    def test_exif_rotation_applied(self, PIL, tmp_path):
+        img = PIL.new("RGB", (400, 200), (250, 250, 250))
+        exif = PIL.Exif()
+        exif[0x0112] = 6  # rotate 90 CW on display
+        path = tmp_path / "rotated.jpg"
+        img.save(path, format="JPEG", exif=exif)
+        [p] = image_prep.prepare_image(path)
+        assert (p.width, p.height) == (200, 400)
+
+    def test_tile_false_returns_one_image_for_tall(self, tall_screenshot):
+        path, _ = tall_screenshot
+        assert len(image_prep.prepare_image(path)) == 1
+
+    def test_tiles_sized_to_model(self, tall_screenshot):
+        path, _ = tall_screenshot
+        tiles = image_prep.prepare_image(path, tile=True)
+        assert len(tiles) == len(image_prep.plan_tiles(1280, 12000))
+        for t in tiles:
+            assert len(t.data) <= CLAUDE_VISION.max_bytes
+            assert t.width * t.height <= CLAUDE_VISION.max_pixels
+        assert tiles[-1].source_box[1] == 12000
+
+    def test_keep_width_tiles_never_narrowed(self, tall_screenshot):
+        path, _ = tall_screenshot
+        tiles = image_prep.prepare_image(path, tile=True, keep_width=True)
+        assert len(tiles) == len(image_prep.plan_tiles(1280, 12000, keep_width=True))
+        for t in tiles:
+            assert t.width == 1280
+            assert t.height == t.source_box[1] - t.source_box[0]
+            assert len(t.data) <= CLAUDE_VISION.max_bytes
+
+    def test_accepts_bytes_and_pil(self, PIL, phone_photo):
+        path, _ = phone_photo
+        from_bytes = image_prep.prepare_image(path.read_bytes())
+        from_pil = image_prep.prepare_image(PIL.open(path))
+        assert (from_bytes[0].width, from_bytes[0].height) == (from_pil[0].width, from_pil[0].height)
+
+    def test_unreadable(self, tmp_path):
+        bad = tmp_path / "bad.png"
+        bad.write_bytes(b"not an image")
+        assert image_prep.prepare_image(bad) == []
+        assert image_prep.prepare_image(tmp_path / "missing.png") == []
+
+    def test_without_pillow_passes_raw(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(image_prep, "_pillow", lambda: (None, None))
+        raw = b"\x89PNG\r\n\x1a\n" + b"\x00" * 32
+        path = tmp_path / "x.png"
+        path.write_bytes(raw)
+        [p] = image_prep.prepare_image(path)
+        assert p.data == raw and p.media_type == "image/png"
+        assert not image_prep.available()
+        assert image_prep.prepare_image(b"garbage") == []
+
+    def test_to_block_shape(self, PIL):
+        [p] = image_prep.prepare_image(PIL.new("RGB", (50, 50)))
+        block = p.to_block()
+        assert set(block) == {"media_type", "data"}
+        assert isinstance(block["data"], str)
+
+
+# ===========================================================================
+# 5. Legibility
+# ===========================================================================
+class TestLegibility:
+    def test_phone_photo_text_stays_legible(self, phone_photo):
+        path, n_lines = phone_photo
+        [p] = image_prep.prepare_image(path)
+        rows = _text_rows(_open(p))
+        assert len(rows) == n_lines                 # lines still separable
+        assert min(rows) >= _MIN_GLYPH_PX
+
+    def test_tiling_keeps_tall_screenshot_legible(self, tall_screenshot):
+        path, n_lines = tall_screenshot
+        tiles = image_prep.prepare_image(path, tile=True)
+        seen = 0
+        for t in tiles:
+            rows = _text_rows(_open(t))
+            # first/last run may be a line cut by the band edge
+            full = rows[1:-1] or rows
+            assert min(full) >= _MIN_GLYPH_PX
+            seen += len(rows)
+        assert seen >= n_lines                      # overlap may double-count
+
+    def test_single_downscale_would_not_be_legible(self, tall_screenshot):
+        # What the model would see if the whole screenshot were sent as one
+        # image — the reason tall images are tiled.
+        path, _ = tall_screenshot
+        [p] = image_prep.prepare_image(path)
+        rows = _text_rows(_open(p))
+        assert not rows or max(rows) < _MIN_GLYPH_PX
+
+    def test_ocr_reads_prepared_text(self, phone_photo):
+        pytesseract = pytest.importorskip("pytesseract")
+        try:
+            pytesseract.get_tesseract_version()
+        except Exception:
+            pytest.skip("tesseract binary not installed")
+        path, _ = phone_photo
+        [p] = image_prep.prepare_image(path)
+        text = pytesseract.image_to_string(_open(p)).upper()
+        assert "MARGHERITA" in text and "12.95" in text
+
+
+# ===========================================================================
+# 6. Caller wiring
+# ===========================================================================
+class TestCallers:
+    def test_vision_verify_encodes_through_prep(self, phone_photo, tmp_path):
+        import base64
+        from storage.ai_vision_verify import _encode_image_file
+        path, _ = phone_photo
+        block = _encode_image_file(str(path))
+        assert block["media_type"] == "image/jpeg"
+        assert len(base64.b64decode(block["data"])) <= CLAUDE_VISION.max_bytes
+
+    def test_vlm_chunks_tall_screenshot(self, tall_screenshot, tmp_path):
+        import shutil
+        from storage import menu_vlm
+        path = tmp_path / "vlm_source.png"
+        shutil.copy(tall_screenshot[0], path)
+        chunks = menu_vlm._chunk_image_for_vision(path)
+        assert len(chunks) == len(image_prep.plan_tiles(1280, 12000, keep_width=True))
+        assert all(c.exists() and c.suffix == ".jpg" for c in chunks)
+        from PIL import Image
+        for c in chunks:
+            with Image.open(c) as img:
+                assert img.size[0] == 1280      # width is never crushed
+        assert not path.exists()
+
+    def test_screenshot_compressor_keeps_width(self, PIL, tmp_path, monkeypatch):
+        from storage import browser_menu_scraper as bms
+        img, _ = _render_menu(PIL, 1280, 6000, zoom=2)
+        src = tmp_path / "shot.png"
+        img.save(src)
+        monkeypatch.setattr(bms, "SCREENSHOT_MAX_BYTES", 400_000)
+        out = bms._do_compress(str(src))
+        assert out.endswith(".jpg")
+        with PIL.open(out) as o:
+            assert o.size[0] == 1280
+        assert os.path.getsize(out) <= 400_000
@@ -0,0 +1,267 @@
+# tests/test_day147_db_pool.py
+"""
+Day 147 — Pooled, WAL-mode SQLite connection layer.
+
+Deliverables:
+  1. db_pool.connect() — per-thread pooled connections, pragmas applied
+     once (WAL, synchronous, busy_timeout, cache_size, mmap_size)
+  2. PooledConnection — `with conn:` commits/rolls back then releases;
+     close() rolls back then releases; nested checkouts never share
+  3. Safety: file replaced under the pool, close_all(), :memory:,
+     per-thread isolation, idle caps
+  4. Storage modules (drafts, price_intel, ai_price_intel, import_jobs)
+     route through the pool and honor a monkeypatched DB_PATH
+  5. WAL: a reader is not blocked by a writer's open transaction
+  6. tools/bench_db_concurrency.py runs end to end
+"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from storage import db_pool
+
+
+@pytest.fixture(autouse=True)
+def _fresh_pool():
+    db_pool.close_all()
+    yield
+    db_pool.close_all()
+
+
+@pytest.fixture
+def db(tmp_path):
+    path = tmp_path / "pool.db"
+    with db_pool.connection(path) as conn:
+        conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, v TEXT)")
+    return path
+
+
+# ===========================================================================
+# 1. Pragmas + reuse
+# ===========================================================================
+class TestConnect:
+    def test_pragmas_applied(self, db):
+        with db_pool.connection(db) as conn:
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+            assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+            assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == db_pool.BUSY_TIMEOUT_MS
+            assert conn.execute("PRAGMA cache_size").fetchone()[0] == -db_pool.CACHE_SIZE_KIB
+            assert conn.execute("PRAGMA foreign_keys").fetchone()[0] == 1
+
+    def test_rows_are_sqlite_rows(self, db):
+        with db_pool.connection(db) as conn:
+            conn.execute("INSERT INTO t (v) VALUES ('a')")
+            row = conn.execute("SELECT v FROM t").fetchone()
+        assert row["v"] == "a"
+
+    def test_connection_reused(self, db):
+        with db_pool.connect(db) as first:
+            pass
+        opened = db_pool.stats()["opened"]
+        with db_pool.connect(db) as second:
+            pass
+        assert second is first
+        assert db_pool.stats()["opened"] == opened
+
+    def test_row_factory_reset_on_checkout(self, db):
+        with db_pool.connect(db) as conn:
+            conn.row_factory = None
+        with db_pool.connect(db) as conn:
+            assert conn.row_factory is sqlite3.Row
+
+    def test_foreign_keys_per_checkout(self, db):
+        with db_pool.connect(db, foreign_keys=False) as conn:
+            assert conn.execute("PRAGMA foreign_keys").fetchone()[0] == 0
+        with db_pool.connect(db) as conn:
+            assert conn.execute("PRAGMA foreign_keys").fetchone()[0] == 1
+
+    def test_pool_can_be_disabled(self, db, monkeypatch):
+        monkeypatch.setenv("SERVLINE_DB_POOL", "0")
+        with db_pool.connect(db) as a:
+            pass
+        with db_pool.connect(db) as b:
+            pass
+        assert a is not b
+
+
+# ===========================================================================
+# 2. Transaction + release semantics
+# ===========================================================================
+class TestRelease:
+    def test_with_commits(self, db):
+        with db_pool.connect(db) as conn:
+            conn.execute("INSERT INTO t (v) VALUES ('x')")
+        raw = sqlite3.connect(db)
+        assert raw.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 1
+        raw.close()
+
+    def test_exception_rolls_back_and_releases(self, db):
+        with pytest.raises(RuntimeError):
+            with db_pool.connect(db) as conn:
+                conn.execute("INSERT INTO t (v) VALUES ('x')")
+                raise RuntimeError("boom")
+        with db_pool.connect(db) as again:
+            assert again is conn
+            assert again.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
+
+    def test_close_rolls_back_and_keeps_connection(self, db):
+        conn = db_pool.connect(db)
+        conn.execute("INSERT INTO t (v) VALUES ('x')")
+        conn.close()
+        with db_pool.connect(db) as again:
+            assert again is conn
+            assert again.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
+
+    def test_nested_checkout_gets_own_connection(self, db):
+        with db_pool.connect(db) as outer:
+            outer.execute("INSERT INTO t (v) VALUES ('outer')")
+            with db_pool.connect(db) as inner:
+                assert inner is not outer
+                # outer's write is still uncommitted: inner cannot see it
+                assert inner.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
+            assert outer.in_transaction
+
+    def test_double_release_is_harmless(self, db):
+        conn = db_pool.connect(db)
+        conn.close()
+        conn.close()
+        assert db_pool.stats()["idle_here"] == 1
+
+    def test_memory_db_not_pooled(self):
+        with db_pool.connect(":memory:") as a:
+            a.execute("CREATE TABLE x (id INTEGER)")
+        a.close()
+        with db_pool.connect(":memory:") as b:
+            tables = b.execute("SELECT name FROM sqlite_master").fetchall()
+        assert b is not a and tables == []
+
+
+# ===========================================================================
+# 3. Safety
+# ===========================================================================
+class TestSafety:
+    def test_replaced_file_not_reused(self, db):
+        with db_pool.connect(db) as first:
+            pass
+        for suffix in ("", "-wal", "-shm"):
+            try:
+                os.remove(f"{db}{suffix}")
+            except FileNotFoundError:
+                pass
+        with db_pool.connect(db) as second:
+            assert second is not first
+            assert second.execute("SELECT name FROM sqlite_master").fetchall() == []
+
+    def test_close_all_retires_connections(self, db):
+        with db_pool.connect(db) as first:
+            pass
+        db_pool.close_all()
+        with db_pool.connect(db) as second:
+            pass
+        assert second is not first
+
+    def test_threads_do_not_share(self, db):
+        with db_pool.connect(db) as mine:
+            pass
+        seen = {}
+
+        def worker():
+            with db_pool.connect(db) as c:
+                seen["conn"] = c
+                seen["count"] = c.execute("SELECT COUNT(*) FROM t").fetchone()[0]
+        t = threading.Thread(target=worker)
+        t.start()
+        t.join()
+        assert seen["conn"] is not mine and seen["count"] == 0
+
+    def test_idle_caps(self, tmp_path):
+        conns = [db_pool.connect(tmp_path / "cap.db") for _ in range(db_pool.MAX_IDLE_PER_PATH + 2)]
+        for c in conns:
+            c.close()
+        assert db_pool.stats()["idle_here"] == db_pool.MAX_IDLE_PER_PATH
+        for i in range(db_pool.MAX_PATHS_PER_THREAD + 3):
+            db_pool.connect(tmp_path / f"p{i}.db").close()
+        assert len(db_pool._idle()) <= db_pool.MAX_PATHS_PER_THREAD
+
+
+# ===========================================================================
+# 4. Storage modules
+# ===========================================================================
+class TestStorageModules:
+    def test_drafts_honors_patched_path(self, tmp_path, monkeypatch):
+        import storage.drafts as drafts
+        monkeypatch.setattr(drafts, "DB_PATH", tmp_path / "drafts.db")
+        with drafts.db_connect() as conn:
+            assert isinstance(conn, db_pool.PooledConnection)
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert (tmp_path / "drafts.db").exists()
+
+    def test_import_jobs_keeps_foreign_keys_off(self, tmp_path, monkeypatch):
+        import storage.import_jobs as ij
+        monkeypatch.setattr(ij, "DB_PATH", tmp_path / "jobs.db")
+        with ij.db_connect() as conn:
+            assert conn.execute("PRAGMA foreign_keys").fetchone()[0] == 0
+
+    def test_price_modules_pooled(self, tmp_path, monkeypatch):
+        import storage.ai_price_intel as api
+        import storage.price_intel as pi
+        monkeypatch.setattr(api, "DB_PATH", tmp_path / "p.db")
+        monkeypatch.setattr(pi, "DB_PATH", tmp_path / "p.db")
+        with api._db_connect() as a:
+            pass
+        with pi.db_connect() as b:
+            pass
+        assert a is b
+
+
+# ===========================================================================
+# 5. WAL concurrency
+# ===========================================================================
+class TestConcurrency:
+    def test_reader_not_blocked_by_open_write(self, db):
+        writer_ready = threading.Event()
+        release_writer = threading.Event()
+
+        def writer():
+            with db_pool.connect(db) as w:
+                # rollback-journal mode would lock readers out here
+                w.execute("BEGIN EXCLUSIVE")
+                w.execute("INSERT INTO t (v) VALUES ('pending')")
+                writer_ready.set()
+                release_writer.wait(5)
+        t = threading.Thread(target=writer)
+        t.start()
+        try:
+            assert writer_ready.wait(5)
+            t0 = time.monotonic()
+            with db_pool.connect(db) as r:
+                assert r.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
+            assert time.monotonic() - t0 < 1.0
+        finally:
+            release_writer.set()
+            t.join(5)
+        with db_pool.connect(db) as r:
+            assert r.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 1
+
+
+# ===========================================================================
+# 6. Benchmark
+# ===========================================================================
+class TestBenchmark:
+    def test_runs_both_modes(self, tmp_path):
+        import importlib.util
+        path = os.path.join(os.path.dirname(__file__), "..", "tools", "bench_db_concurrency.py")
+        spec = importlib.util.spec_from_file_location("bench_db_concurrency", path)
+        bench = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(bench)
+        for mode in ("legacy", "pooled"):
+            r = bench.run(mode, tmp_path / f"{mode}.db", seconds=0.3, readers=2, seed_items=200)
+            assert r["mode"] == mode
+            assert r["reads"] > 0 and r["rows_written"] > 0
+            assert r["read_ms"]["p50"] <= r["read_ms"]["max"]
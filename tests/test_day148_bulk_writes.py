@@ -0,0 +1,245 @@
+# tests/test_day148_bulk_writes.py
+"""
+Day 148 — Set-based bulk write path for draft items, variants and
+modifier groups.
+
+Deliverables:
+  1. _write_items() — rows normalized first, one executemany() per table,
+     one transaction, new ids mapped back in input order
+  2. upsert_draft_items() / _insert_items_bulk() keep their return shapes
+     ({"inserted_ids","updated_ids"} / [ids]) and update/insert semantics
+  3. Variant + modifier-group replace on update, set-based
+  4. Statement count independent of item count; all-or-nothing on error
+  5. insert_variants(), clone_draft(), restore path use the bulk engine
+  6. tools/bench_draft_writes.py runs end to end
+"""
+
+from __future__ import annotations
+
+import os
+
+import pytest
+
+import storage.drafts as drafts
+from storage import db_pool
+
+
+def _item(name, price=1000, **extra):
+    return {"name": name, "price_cents": price, "category": "Pizza", **extra}
+
+
+def _sizes(*labels):
+    return [{"label": lbl, "price_cents": 1000 + i * 200, "kind": "size", "position": i}
+            for i, lbl in enumerate(labels)]
+
+
+def _rows(sql, *args):
+    with drafts.db_connect() as conn:
+        return [dict(r) for r in conn.execute(sql, args).fetchall()]
+
+
+class _StatementCounter:
+    """Counts execute()/executemany() calls on pooled connections.
+
+    sqlite3's trace callback fires once per executemany() row, so it can't
+    tell a set-based write from a per-row loop; counting calls can.
+    """
+
+    def __init__(self, monkeypatch):
+        self.calls = []
+        for name in ("execute", "executemany"):
+            orig = getattr(db_pool.PooledConnection, name)
+
+            def wrapped(conn, sql, *args, _orig=orig):
+                self.calls.append(sql)
+                return _orig(conn, sql, *args)
+            monkeypatch.setattr(db_pool.PooledConnection, name, wrapped)
+
+    @property
+    def writes(self):
+        return [s for s in self.calls
+                if s.lstrip().split(None, 1)[0].upper() in ("INSERT", "UPDATE", "DELETE")]
+
+
+# ===========================================================================
+# 1-2. Insert / upsert semantics
+# ===========================================================================
+class TestInsert:
+    def test_ids_in_input_order(self, db):
+        ids = drafts._insert_items_bulk(db, [_item(f"Item {i}") for i in range(25)])
+        assert len(ids) == 25 and ids == sorted(ids)
+        names = {r["id"]: r["name"] for r in _rows("SELECT id, name FROM draft_items")}
+        assert [names[i] for i in ids] == [f"Item {i}" for i in range(25)]
+
+    def test_invalid_rows_skipped(self, db):
+        ids = drafts._insert_items_bulk(db, [_item("A"), "junk", None, _item("B")])
+        assert len(ids) == 2
+
+    def test_one_timestamp_per_call(self, db):
+        drafts._insert_items_bulk(db, [_item(f"I{i}", _variants=_sizes("S", "L")) for i in range(5)])
+        stamps = {r["created_at"] for r in _rows("SELECT created_at FROM draft_items")}
+        stamps |= {r["updated_at"] for r in _rows("SELECT updated_at FROM draft_item_variants")}
+        assert len(stamps) == 1
+
+    def test_variants_attached_to_right_items(self, db):
+        ids = drafts._insert_items_bulk(db, [
+            _item("Cheese", _variants=_sizes("Small", "Large")),
+            _item("Soda"),
+            _item("Wings", _variants=_sizes("6pc", "12pc", "24pc")),
+        ])
+        got = _rows("SELECT item_id, label FROM draft_item_variants ORDER BY id")
+        assert [(r["item_id"], r["label"]) for r in got] == [
+            (ids[0], "Small"), (ids[0], "Large"),
+            (ids[2], "6pc"), (ids[2], "12pc"), (ids[2], "24pc"),
+        ]
+
+
+class TestUpsert:
+    def test_return_shape_and_order(self, db):
+        existing = drafts._insert_items_bulk(db, [_item("Old A"), _item("Old B")])
+        other = drafts._insert_draft(title="Other", restaurant_id=None)
+        foreign = drafts._insert_items_bulk(other, [_item("Elsewhere")])[0]
+
+        res = drafts.upsert_draft_items(db, [
+            _item("New 1"),
+            {"id": existing[1], "name": "B renamed", "price_cents": 1500},
+            {"id": foreign, "name": "Not yours", "price_cents": 100},
+            {"id": str(existing[0]), "name": "A renamed", "price_cents": 1200},
+        ])
+        assert set(res) == {"inserted_ids", "updated_ids"}
+        assert res["updated_ids"] == [existing[1], existing[0]]
+        assert len(res["inserted_ids"]) == 2
+        names = {r["id"]: r["name"] for r in _rows(
+            "SELECT id, name FROM draft_items WHERE draft_id=?", db)}
+        assert [names[i] for i in res["inserted_ids"]] == ["New 1", "Not yours"]
+        assert names[existing[0]] == "A renamed"
+        # the other draft's row is untouched
+        assert _rows("SELECT name FROM draft_items WHERE id=?", foreign)[0]["name"] == "Elsewhere"
+
+    def test_partial_update_keeps_position(self, db):
+        [iid] = drafts._insert_items_bulk(db, [_item("A", position=7, kitchen_name="KA")])
+        drafts.upsert_draft_items(db, [{"id": iid, "name": "A2", "price_cents": 5}])
+        row = _rows("SELECT * FROM draft_items WHERE id=?", iid)[0]
+        assert (row["name"], row["position"], row["kitchen_name"]) == ("A2", 7, "KA")
+
+    def test_variants_replaced_only_when_sent(self, db):
+        [iid] = drafts._insert_items_bulk(db, [_item("A", _variants=_sizes("S", "M", "L"))])
+        drafts.upsert_draft_items(db, [{"id": iid, "name": "A", "price_cents": 1}])
+        assert len(_rows("SELECT id FROM draft_item_variants WHERE item_id=?", iid)) == 3
+        drafts.upsert_draft_items(db, [{"id": iid, "name": "A", "price_cents": 1,
+                                        "_variants": _sizes("Personal")}])
+        labels = [r["label"] for r in _rows(
+            "SELECT label FROM draft_item_variants WHERE item_id=?", iid)]
+        assert labels == ["Personal"]
+
+    def test_duplicate_id_last_payload_wins(self, db):
+        [iid] = drafts._insert_items_bulk(db, [_item("A")])
+        res = drafts.upsert_draft_items(db, [
+            {"id": iid, "name": "first", "_variants": _sizes("X")},
+            {"id": iid, "name": "second", "_variants": _sizes("Y", "Z")},
+        ])
+        assert res["updated_ids"] == [iid, iid]
+        assert _rows("SELECT name FROM draft_items WHERE id=?", iid)[0]["name"] == "second"
+        assert [r["label"] for r in _rows(
+            "SELECT label FROM draft_item_variants WHERE item_id=? ORDER BY id", iid)] == ["Y", "Z"]
+
+    def test_empty(self, db):
+        assert drafts.upsert_draft_items(db, []) == {"inserted_ids": [], "updated_ids": []}
+        assert drafts._insert_items_bulk(db, []) == []
+
+
+# ===========================================================================
+# 3. Modifier groups
+# ===========================================================================
+class TestModifierGroups:
+    def _groups(self, *names):
+        return [{"name": n, "required": True, "min_select": 1, "max_select": 1, "position": i,
+                 "_modifiers": [{"label": f"{n} opt {k}", "price_cents": k * 50, "kind": "other"}
+                                for k in range(2)]}
+                for i, n in enumerate(names)]
+
+    def test_groups_and_modifiers_linked(self, db):
+        ids = drafts._insert_items_bulk(db, [
+            _item("Pizza", _modifier_groups=self._groups("Crust", "Sauce")),
+            _item("Sub", _modifier_groups=self._groups("Bread")),
+        ])
+        groups = _rows("SELECT id, item_id, name FROM draft_modifier_groups ORDER BY id")
+        assert [(g["item_id"], g["name"]) for g in groups] == [
+            (ids[0], "Crust"), (ids[0], "Sauce"), (ids[1], "Bread")]
+        for g in groups:
+            mods = _rows("SELECT item_id, label FROM draft_item_variants "
+                         "WHERE modifier_group_id=? ORDER BY id", g["id"])
+            assert [m["label"] for m in mods] == [f"{g['name']} opt 0", f"{g['name']} opt 1"]
+            assert {m["item_id"] for m in mods} == {g["item_id"]}
+
+    def test_groups_replaced_on_update(self, db):
+        [iid] = drafts._insert_items_bulk(db, [_item("Pizza", _modifier_groups=self._groups("Crust"))])
+        drafts.upsert_draft_items(db, [{"id": iid, "name": "Pizza",
+                                        "_modifier_groups": self._groups("Cheese")}])
+        assert [g["name"] for g in _rows(
+            "SELECT name FROM draft_modifier_groups WHERE item_id=?", iid)] == ["Cheese"]
+
+
+# ===========================================================================
+# 4. Statement count + atomicity
+# ===========================================================================
+class TestSetBased:
+    def test_statement_count_independent_of_size(self, db, monkeypatch):
+        def count(n):
+            sc = _StatementCounter(monkeypatch)
+            drafts._insert_items_bulk(db, [
+                _item(f"I{i}", _variants=_sizes("S", "M", "L")) for i in range(n)])
+            return len(sc.writes)
+        assert count(10) == count(300) <= 3
+
+    def test_update_save_is_set_based(self, db, monkeypatch):
+        ids = drafts._insert_items_bulk(db, [_item(f"I{i}", _variants=_sizes("S")) for i in range(200)])
+        sc = _StatementCounter(monkeypatch)
+        drafts.upsert_draft_items(db, [
+            {"id": i, "name": f"R{i}", "_variants": _sizes("S", "L")} for i in ids])
+        assert len(sc.writes) <= 6
+        assert len(_rows("SELECT id FROM draft_item_variants")) == 400
+
+    def test_failure_rolls_back_everything(self, db):
+        with drafts.db_connect() as conn:
+            conn.execute(
+                "CREATE TRIGGER boom BEFORE INSERT ON draft_item_variants "
+                "WHEN NEW.label = 'BOOM' BEGIN SELECT RAISE(ABORT, 'boom'); END")
+        with pytest.raises(Exception):
+            drafts._insert_items_bulk(db, [
+                _item("A", _variants=_sizes("ok")), _item("B", _variants=_sizes("BOOM"))])
+        assert _rows("SELECT id FROM draft_items") == []
+
+
+# ===========================================================================
+# 5. Other callers
+# ===========================================================================
+class TestCallers:
+    def test_insert_variants_returns_ids(self, db):
+        [iid] = drafts._insert_items_bulk(db, [_item("A")])
+        vids = drafts.insert_variants(iid, _sizes("S", "M") + [{"label": ""}])
+        got = _rows("SELECT id, label FROM draft_item_variants ORDER BY id")
+        assert vids == [r["id"] for r in got]
+        assert [r["label"] for r in got] == ["S", "M"]
+
+    def test_clone_draft_copies_variants(self, db):
+        drafts._insert_items_bulk(db, [_item("A", _variants=_sizes("S", "L")), _item("B")])
+        new_id = drafts.clone_draft(db)["id"]
+        items = drafts.get_draft_items(new_id, include_variants=True)
+        assert sorted(it["name"] for it in items) == ["A", "B"]
+        a = next(it for it in items if it["name"] == "A")
+        assert [v["label"] for v in a["variants"]] == ["S", "L"]
+
+
+# ===========================================================================
+# 6. Benchmark
+# ===========================================================================
+def test_benchmark_runs(tmp_path):
+    import importlib.util
+    path = os.path.join(os.path.dirname(__file__), "..", "tools", "bench_draft_writes.py")
+    spec = importlib.util.spec_from_file_location("bench_draft_writes", path)
+    bench = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(bench)
+    rows = bench.run([50], tmp_path, variants=2)
+    assert {r["path"] for r in rows} == {"per_row", "bulk"}
+    assert all(r["insert_ms"] >= 0 and r["update_ms"] >= 0 for r in rows)
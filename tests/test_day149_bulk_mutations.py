@@ -0,0 +1,161 @@
+# tests/test_day149_bulk_mutations.py
+"""
+Day 149 — Set-based SQL for wizard / editor bulk operations.
+
+Deliverables:
+  1. bulk_update_items() — one IN (...) UPDATE per chunk, draft-scoped,
+     field whitelist, returns affected count
+  2. _bulk_reorder_by_position() — CASE-based positions: reordering a
+     200-item category is one statement, not 200
+  3. backfill_item_positions() — editor/wizard position backfill in one
+     statement, items updated in place
+  4. delete_draft_items() — chunked IN deletes in one transaction
+"""
+
+from __future__ import annotations
+
+
+import pytest
+
+import storage.drafts as drafts
+from storage import db_pool
+
+
+def _seed(draft_id, n, category="Pizza"):
+    return drafts._insert_items_bulk(draft_id, [
+        {"name": f"Item {i}", "price_cents": 100, "category": category, "position": i}
+        for i in range(n)])
+
+
+def _rows(sql, *args):
+    with drafts.db_connect() as conn:
+        return [dict(r) for r in conn.execute(sql, args).fetchall()]
+
+
+def _count_writes(monkeypatch):
+    calls = []
+    orig = db_pool.PooledConnection.execute
+
+    def wrapped(conn, sql, *args):
+        if sql.lstrip().split(None, 1)[0].upper() in ("UPDATE", "DELETE"):
+            calls.append(sql)
+        return orig(conn, sql, *args)
+    monkeypatch.setattr(db_pool.PooledConnection, "execute", wrapped)
+    return calls
+
+
+# ===========================================================================
+# 1. bulk_update_items
+# ===========================================================================
+class TestBulkUpdateItems:
+    def test_moves_only_this_drafts_items(self, db):
+        ids = _seed(db, 3)
+        other = drafts._insert_draft(title="Other", restaurant_id=None)
+        [foreign] = _seed(other, 1)
+        n = drafts.bulk_update_items(db, ids[:2] + [foreign, 99999],
+                                     {"category": "Sides", "subcategory": "Hot"})
+        assert n == 2
+        cats = {r["id"]: (r["category"], r["subcategory"]) for r in _rows(
+            "SELECT id, category, subcategory FROM draft_items")}
+        assert cats[ids[0]] == cats[ids[1]] == ("Sides", "Hot")
+        assert cats[ids[2]] == ("Pizza", None)
+        assert cats[foreign] == ("Pizza", None)
+
+    def test_chunked_large_id_list(self, db, monkeypatch):
+        ids = _seed(db, 1200)
+        writes = _count_writes(monkeypatch)
+        assert drafts.bulk_update_items(db, ids, {"category": "Moved"}) == 1200
+        assert len(writes) == 3  # 500-id chunks
+        assert _rows("SELECT COUNT(*) AS n FROM draft_items WHERE category='Moved'")[0]["n"] == 1200
+
+    def test_rejects_unknown_field(self, db):
+        ids = _seed(db, 1)
+        with pytest.raises(ValueError):
+            drafts.bulk_update_items(db, ids, {"name": "x; DROP TABLE drafts"})
+
+    def test_empty_inputs(self, db):
+        assert drafts.bulk_update_items(db, [], {"category": "A"}) == 0
+        assert drafts.bulk_update_items(db, _seed(db, 1), {}) == 0
+
+
+# ===========================================================================
+# 2. Reorder
+# ===========================================================================
+class TestReorder:
+    def test_200_items_one_statement(self, db, monkeypatch):
+        ids = _seed(db, 200)
+        order = list(reversed(ids))
+        writes = _count_writes(monkeypatch)
+        assert drafts.reorder_items(db, order) == 200
+        assert len(writes) == 1
+        got = [r["id"] for r in _rows(
+            "SELECT id FROM draft_items WHERE draft_id=? ORDER BY position", db)]
+        assert got == order
+
+    def test_positions_across_case_chunks(self, db):
+        ids = _seed(db, drafts._CASE_CHUNK * 2 + 7)
+        order = ids[1::2] + ids[0::2]
+        assert drafts.reorder_items(db, order) == len(ids)
+        pos = {r["id"]: r["position"] for r in _rows("SELECT id, position FROM draft_items")}
+        assert [pos[i] for i in order] == list(range(1, len(ids) + 1))
+
+    def test_foreign_and_unknown_ids_skipped(self, db):
+        a, b = _seed(db, 2)
+        other = drafts._insert_draft(title="Other", restaurant_id=None)
+        [foreign] = _seed(other, 1)
+        assert drafts.reorder_items(db, [foreign, 424242, b, a]) == 2
+        pos = {r["id"]: r["position"] for r in _rows("SELECT id, position FROM draft_items")}
+        assert (pos[b], pos[a], pos[foreign]) == (3, 4, 0)
+
+    def test_repeated_id_takes_last_index(self, db):
+        a, b = _seed(db, 2)
+        drafts.reorder_items(db, [a, b, a])
+        pos = {r["id"]: r["position"] for r in _rows("SELECT id, position FROM draft_items")}
+        assert (pos[a], pos[b]) == (3, 2)
+
+    def test_modifier_groups(self, db):
+        [iid] = _seed(db, 1)
+        g1 = drafts.insert_modifier_group(iid, "Size", position=0)
+        g2 = drafts.insert_modifier_group(iid, "Crust", position=1)
+        assert drafts.reorder_modifier_groups(iid, [g2, g1]) == 2
+        pos = {r["id"]: r["position"] for r in _rows(
+            "SELECT id, position FROM draft_modifier_groups")}
+        assert (pos[g2], pos[g1]) == (1, 2)
+
+
+# ===========================================================================
+# 3. Position backfill
+# ===========================================================================
+class TestBackfill:
+    def test_backfills_in_list_order(self, db, monkeypatch):
+        ids = _seed(db, 5)
+        with drafts.db_connect() as conn:
+            conn.execute("UPDATE draft_items SET position=NULL WHERE id IN (?, ?, ?)",
+                         (ids[1], ids[3], ids[4]))
+        items = drafts.get_draft_items(db)
+        writes = _count_writes(monkeypatch)
+        assert drafts.backfill_item_positions(db, items) == 3
+        assert len(writes) == 1
+        assert all(it["position"] is not None for it in items)
+        pos = {r["id"]: r["position"] for r in _rows("SELECT id, position FROM draft_items")}
+        assert [pos[i] for i in (ids[1], ids[3], ids[4])] == [3, 4, 5]  # after max (2)
+
+    def test_noop_when_complete(self, db, monkeypatch):
+        _seed(db, 3)
+        writes = _count_writes(monkeypatch)
+        assert drafts.backfill_item_positions(db, drafts.get_draft_items(db)) == 0
+        assert writes == []
+
+
+# ===========================================================================
+# 4. Delete
+# ===========================================================================
+class TestDelete:
+    def test_chunked_delete_counts(self, db, monkeypatch):
+        ids = _seed(db, 1100)
+        other = drafts._insert_draft(title="Other", restaurant_id=None)
+        [foreign] = _seed(other, 1)
+        writes = _count_writes(monkeypatch)
+        assert drafts.delete_draft_items(db, ids + [foreign, ids[0]]) == 1100
+        assert len(writes) == 3
+        assert [r["id"] for r in _rows("SELECT id FROM draft_items")] == [foreign]
@@ -0,0 +1,195 @@
+# tests/test_day150_migrate.py
+"""
+Day 150 — Versioned schema bootstrap (storage/migrate.py).
+
+Deliverables:
+  1. is_current() / schema_version() — one PRAGMA user_version check,
+     cached per database file
+  2. on_import() — no-op on a current DB; on a stale DB runs only the
+     importing module's steps, stamps once every step has run
+  3. run() — deploy path: every step against the given DB, then stamp
+  4. import_jobs column backfill moved out of portal/app.py
+  5. schema.sql builds a fresh database (draft_items block fixed)
+"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+from storage import db_pool, migrate
+
+_SCHEMA = Path(__file__).resolve().parents[1] / "storage" / "schema.sql"
+
+CALLS = []
+
+
+def _step_a():
+    CALLS.append("a")
+
+
+def _step_b():
+    CALLS.append("b")
+
+
+@pytest.fixture(autouse=True)
+def _clean(monkeypatch):
+    db_pool.close_all()
+    migrate.reset_cache()
+    CALLS.clear()
+    yield
+    migrate.reset_cache()
+    db_pool.close_all()
+
+
+@pytest.fixture
+def fake_steps(monkeypatch):
+    """Two steps in this module plus one in a second (fake) module name."""
+    me = sys.modules[__name__]
+    monkeypatch.setitem(sys.modules, "fake_other_module", me)
+    monkeypatch.setattr(migrate, "STEPS", (
+        (__name__, "_step_a"),
+        (__name__, "_step_b"),
+        ("fake_other_module", "_step_a"),
+    ))
+
+
+@pytest.fixture
+def db(tmp_path):
+    path = tmp_path / "m.db"
+    sqlite3.connect(path).close()
+    return path
+
+
+# ===========================================================================
+# 1. Version check
+# ===========================================================================
+class TestVersionCheck:
+    def test_missing_file(self, tmp_path):
+        assert migrate.schema_version(tmp_path / "nope.db") == 0
+        assert not migrate.is_current(tmp_path / "nope.db")
+        assert not (tmp_path / "nope.db").exists()
+
+    def test_stamped_db_is_current(self, db):
+        sqlite3.connect(db).execute(f"PRAGMA user_version = {migrate.SCHEMA_VERSION}").connection.close()
+        assert migrate.is_current(db)
+
+    def test_older_version_is_stale(self, db, monkeypatch):
+        sqlite3.connect(db).execute("PRAGMA user_version = 1").connection.close()
+        monkeypatch.setattr(migrate, "SCHEMA_VERSION", 2)
+        assert not migrate.is_current(db)
+
+    def test_replaced_file_rechecked(self, db):
+        sqlite3.connect(db).execute(f"PRAGMA user_version = {migrate.SCHEMA_VERSION}").connection.close()
+        assert migrate.is_current(db)
+        db_pool.close_all()
+        fresh = db.with_name("fresh.db")
+        sqlite3.connect(fresh).close()
+        os.replace(fresh, db)
+        assert not migrate.is_current(db)
+
+
+# ===========================================================================
+# 2. on_import
+# ===========================================================================
+class TestOnImport:
+    def test_stale_runs_own_steps_only(self, db, fake_steps):
+        assert migrate.on_import(db, __name__) is True
+        assert CALLS == ["a", "b"]
+        assert migrate.schema_version(db) == 0  # fake_other_module hasn't run
+
+    def test_stamps_when_all_steps_ran(self, db, fake_steps):
+        migrate.on_import(db, __name__)
+        migrate.on_import(db, "fake_other_module")
+        assert migrate.schema_version(db) == migrate.SCHEMA_VERSION
+        CALLS.clear()
+        assert migrate.on_import(db, __name__) is False
+        assert CALLS == []
+
+    def test_current_db_runs_nothing(self, db, fake_steps):
+        sqlite3.connect(db).execute(f"PRAGMA user_version = {migrate.SCHEMA_VERSION}").connection.close()
+        assert migrate.on_import(db, __name__) is False
+        assert CALLS == []
+
+    def test_step_errors_propagate(self, db, monkeypatch):
+        monkeypatch.setattr(migrate, "STEPS", ((__name__, "_missing_step"),))
+        with pytest.raises(AttributeError):
+            migrate.on_import(db, __name__)
+        assert migrate.schema_version(db) == 0
+
+
+# ===========================================================================
+# 3. run() — deploy path
+# ===========================================================================
+class TestRun:
+    def test_runs_all_and_stamps(self, db, fake_steps):
+        sqlite3.connect(db).execute(f"PRAGMA user_version = {migrate.SCHEMA_VERSION}").connection.close()
+        applied = migrate.run(db)
+        assert CALLS == ["a", "b", "a"]  # runs even when already current
+        assert applied[0] == f"{__name__}:_step_a"
+        assert migrate.schema_version(db) == migrate.SCHEMA_VERSION
+
+    def test_real_steps_target_given_db(self, tmp_path, monkeypatch):
+        import storage.drafts as drafts
+        import storage.import_jobs as ij
+        try:
+            import storage.menus  # noqa: F401
+        except sqlite3.OperationalError as e:
+            pytest.skip(f"local servline.db predates schema.sql: {e}")
+        # storage.users needs werkzeug; its steps are covered by the app tests
+        monkeypatch.setattr(migrate, "STEPS", tuple(
+            s for s in migrate.STEPS if s[0] != "storage.users"))
+        path = tmp_path / "deploy.db"
+        conn = sqlite3.connect(path)
+        conn.executescript(_SCHEMA.read_text(encoding="utf-8"))
+        conn.close()
+        before = (drafts.DB_PATH, ij.DB_PATH)
+
+        migrate.run(path)
+
+        assert (drafts.DB_PATH, ij.DB_PATH) == before
+        conn = sqlite3.connect(path)
+        tables = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+        cols = {r[1] for r in conn.execute("PRAGMA table_info(import_jobs)")}
+        conn.close()
+        assert {"draft_item_variants", "menu_versions", "price_comparison_cache",
+                "gemini_call_log", "competitor_comparisons"} <= tables
+        assert {"pipeline_stage", "extra_filenames", "items_extracted"} <= cols
+        assert migrate.is_current(path)
+
+
+# ===========================================================================
+# 4-5. import_jobs backfill + schema.sql
+# ===========================================================================
+class TestSchemaPieces:
+    def test_import_jobs_columns_noop_without_table(self, db, monkeypatch):
+        import storage.import_jobs as ij
+        monkeypatch.setattr(ij, "DB_PATH", db)
+        ij._ensure_import_jobs_columns()
+        conn = sqlite3.connect(db)
+        assert conn.execute("SELECT name FROM sqlite_master").fetchall() == []
+        conn.close()
+
+    def test_import_jobs_columns_added_once(self, db, monkeypatch):
+        import storage.import_jobs as ij
+        conn = sqlite3.connect(db)
+        conn.execute("CREATE TABLE import_jobs (id INTEGER PRIMARY KEY, filename TEXT)")
+        conn.close()
+        monkeypatch.setattr(ij, "DB_PATH", db)
+        ij._ensure_import_jobs_columns()
+        ij._ensure_import_jobs_columns()
+        conn = sqlite3.connect(db)
+        cols = [r[1] for r in conn.execute("PRAGMA table_info(import_jobs)")]
+        conn.close()
+        assert cols == ["id", "filename", "pipeline_stage", "extra_filenames", "items_extracted"]
+
+    def test_schema_sql_builds_fresh_db(self, tmp_path):
+        conn = sqlite3.connect(tmp_path / "fresh.db")
+        conn.executescript(_SCHEMA.read_text(encoding="utf-8"))
+        cols = {r[1] for r in conn.execute("PRAGMA table_info(draft_items)")}
+        conn.close()
+        assert {"draft_id", "name", "price_cents", "position"} <= cols
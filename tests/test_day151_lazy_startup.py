@@ -0,0 +1,177 @@
+# tests/test_day151_lazy_startup.py
+"""
+Day 151 — Portal cold start without the OCR stack.
+
+Deliverables:
+  1. portal/lazy_imports.py — LazyModule: import on first attribute
+     access, on_load hook once, attribute writes forwarded (monkeypatch)
+  2. portal/app.py, portal/routes_debug_preocr.py — no module-level
+     import of pytesseract / cv2 / openpyxl / the OCR worker, facade or
+     pipeline; storage/ocr_utils.py — pytesseract on first OCR call
+  3. Cold-start profile: `python -X importtime -c "import portal.app"`
+     loads none of the OCR / AI / export stacks and stays under a budget
+     (SERVLINE_COLD_START_BUDGET_MS, default 2500)
+"""
+
+from __future__ import annotations
+
+import ast
+import importlib.util
+import os
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+import pytest
+
+from portal.lazy_imports import LazyModule, is_loaded, lazy_module
+
+_ROOT = Path(__file__).resolve().parents[1]
+
+HEAVY = (
+    "cv2", "numpy", "pytesseract", "openpyxl", "anthropic", "playwright",
+    "storage.ocr_facade", "storage.ocr_pipeline", "portal.ocr_worker",
+)
+# storage.ocr_utils (imported by storage.drafts) still pulls in numpy/cv2
+# through its optional imports; only the rest must stay out of a cold start.
+COLD_START_ABSENT = tuple(m for m in HEAVY if m not in ("cv2", "numpy"))
+
+
+@pytest.fixture
+def fake_mod(tmp_path, monkeypatch):
+    """A throwaway module on sys.path that records how often it was imported."""
+    name = "servline_day151_fake"
+    (tmp_path / f"{name}.py").write_text(textwrap.dedent("""
+        import builtins
+        builtins._day151_imports = getattr(builtins, "_day151_imports", 0) + 1
+        VALUE = 42
+        def hello():
+            return "hi"
+    """), encoding="utf-8")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, name, raising=False)
+    import builtins
+    builtins._day151_imports = 0
+    yield name
+    sys.modules.pop(name, None)
+    del builtins._day151_imports
+
+
+# ===========================================================================
+# 1. LazyModule
+# ===========================================================================
+class TestLazyModule:
+    def test_no_import_until_attribute_access(self, fake_mod):
+        import builtins
+        mod = lazy_module(fake_mod)
+        assert isinstance(mod, LazyModule)
+        assert not is_loaded(mod)
+        assert fake_mod not in sys.modules
+        assert builtins._day151_imports == 0
+        assert mod.VALUE == 42
+        assert mod.hello() == "hi"
+        assert is_loaded(mod)
+        assert builtins._day151_imports == 1
+
+    def test_on_load_runs_once(self, fake_mod):
+        seen = []
+        mod = lazy_module(fake_mod, on_load=lambda m: seen.append(m.__name__))
+        mod.VALUE
+        mod.hello
+        assert seen == [fake_mod]
+
+    def test_setattr_forwards_to_real_module(self, fake_mod, monkeypatch):
+        mod = lazy_module(fake_mod)
+        monkeypatch.setattr(mod, "hello", lambda: "patched")
+        assert sys.modules[fake_mod].hello() == "patched"
+        assert mod.hello() == "patched"
+
+    def test_missing_module_fails_on_first_use(self):
+        mod = lazy_module("servline_day151_does_not_exist")
+        with pytest.raises(ImportError):
+            mod.anything
+        assert not is_loaded(mod)
+
+    def test_dunder_lookup_does_not_import(self, fake_mod):
+        mod = lazy_module(fake_mod)
+        assert not hasattr(mod, "__wrapped__")
+        assert "not loaded" in repr(mod)
+        assert fake_mod not in sys.modules
+
+    def test_is_loaded_plain_values(self):
+        assert is_loaded(os)
+        assert not is_loaded(None)
+
+
+# ===========================================================================
+# 2. No heavy module-level imports
+# ===========================================================================
+def _top_level_imports(path: Path):
+    tree = ast.parse(path.read_text(encoding="utf-8"))
+    names = set()
+
+    def visit(nodes):
+        for node in nodes:
+            if isinstance(node, ast.Import):
+                names.update(a.name for a in node.names)
+            elif isinstance(node, ast.ImportFrom) and node.module:
+                names.add(node.module)
+                names.update(f"{node.module}.{a.name}" for a in node.names)
+            elif isinstance(node, (ast.Try, ast.If)):
+                visit(node.body)
+                visit(getattr(node, "orelse", []))
+                for h in getattr(node, "handlers", []):
+                    visit(h.body)
+    visit(tree.body)
+    return names
+
+
+@pytest.mark.parametrize("rel,heavy", [
+    ("portal/app.py", HEAVY),
+    ("portal/routes_debug_preocr.py", HEAVY),
+    ("storage/ocr_utils.py", ("pytesseract",)),
+])
+def test_no_heavy_top_level_imports(rel, heavy):
+    names = _top_level_imports(_ROOT / rel)
+    bad = {n for n in names for h in heavy if n == h or n.startswith(h + ".")}
+    assert not bad, f"{rel} imports {sorted(bad)} at module level"
+
+
+# ===========================================================================
+# 3. Cold-start profile
+# ===========================================================================
+def _parse_importtime(stderr: str):
+    """{module: cumulative_us} from -X importtime output."""
+    out = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = [p.strip() for p in line[len("import time:"):].split("|")]
+        if len(parts) != 3 or not parts[1].isdigit():
+            continue
+        out[parts[2].strip()] = int(parts[1])
+    return out
+
+
+@pytest.mark.skipif(importlib.util.find_spec("flask") is None,
+                    reason="flask not installed")
+def test_cold_start_profile(tmp_path):
+    probe = (
+        "import sys, json, portal.app\n"
+        f"print(json.dumps([m for m in {list(COLD_START_ABSENT)!r} if m in sys.modules]))\n"
+    )
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", probe],
+        cwd=str(_ROOT), capture_output=True, text=True, timeout=120,
+    )
+    assert proc.returncode == 0, proc.stderr[-2000:]
+    assert proc.stdout.strip().splitlines()[-1] == "[]"
+
+    times = _parse_importtime(proc.stderr)
+    assert "portal.app" in times
+    budget_ms = float(os.environ.get("SERVLINE_COLD_START_BUDGET_MS", "2500"))
+    assert times["portal.app"] / 1000.0 < budget_ms, (
+        "slowest imports: " + ", ".join(
+            f"{m}={us // 1000}ms" for m, us in
+            sorted(times.items(), key=lambda kv: -kv[1])[:10]))
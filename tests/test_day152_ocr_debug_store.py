@@ -0,0 +1,124 @@
+# tests/test_day152_ocr_debug_store.py
+"""
+Day 152 — Sectioned, compressed OCR debug sidecars.
+
+Deliverables:
+  1. save_ocr_debug() writes <draft_id>.dbg: one zlib section per
+     top-level key plus an offset index; replaces a legacy .json sidecar
+  2. load_ocr_debug(sections=...) inflates only the requested sections
+  3. Legacy <draft_id>.json payloads still load (full and partial)
+  4. Large payloads take a fraction of the old indented-JSON size
+"""
+
+from __future__ import annotations
+
+import json
+import zlib
+
+import pytest
+
+import storage.drafts as drafts
+
+
+@pytest.fixture(autouse=True)
+def debug_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(drafts, "_DEBUG_BASE", tmp_path)
+    return tmp_path
+
+
+def _big_payload(n=2000):
+    blocks = [
+        {"id": i, "bbox": [i, i + 1, i + 40, i + 12], "text": f"Margherita Pizza {i} 12.99",
+         "lines": [{"text": "Margherita Pizza", "conf": 91.5}, {"text": "12.99", "conf": 88.0}]}
+        for i in range(n)
+    ]
+    return {
+        "extraction_strategy": "claude_api+vision",
+        "layout_debug": {"blocks": blocks[:200], "meta": {"orientation": {"1": 0}}},
+        "text_blocks": blocks,
+        "preview_blocks": blocks[: n // 2],
+        "raw_ocr_text": "\n".join(b["text"] for b in blocks),
+        "items": [{"name": "Margherita", "price": 12.99, "source": {"page": 1}}],
+    }
+
+
+# ===========================================================================
+# 1-2. Sectioned save / partial load
+# ===========================================================================
+class TestSectionedStore:
+    def test_round_trip(self, debug_dir):
+        payload = _big_payload(50)
+        drafts.save_ocr_debug(7, payload)
+        assert (debug_dir / "7.dbg").exists()
+        assert not (debug_dir / "7.json").exists()
+        assert drafts.load_ocr_debug(7) == payload
+
+    def test_key_order_and_odd_values(self):
+        from pathlib import Path
+        drafts.save_ocr_debug(1, {"b": Path("x/y"), "a": None, "c": []})
+        loaded = drafts.load_ocr_debug(1)
+        assert list(loaded) == ["b", "a", "c"]
+        assert loaded["b"] == str(Path("x/y"))
+
+    def test_partial_load_inflates_only_requested(self, monkeypatch):
+        drafts.save_ocr_debug(3, _big_payload(200))
+        sizes = []
+        real = zlib.decompress
+
+        def counting(data, *a, **kw):
+            out = real(data, *a, **kw)
+            sizes.append(len(out))
+            return out
+        monkeypatch.setattr(drafts.zlib, "decompress", counting)
+
+        got = drafts.load_ocr_debug(3, sections=["layout_debug", "missing"])
+        assert list(got) == ["layout_debug"]
+        assert len(sizes) == 1
+        assert got["layout_debug"]["meta"] == {"orientation": {"1": 0}}
+
+    def test_no_matching_sections_is_empty_not_none(self):
+        drafts.save_ocr_debug(4, {"items": []})
+        assert drafts.load_ocr_debug(4, sections=("assignments",)) == {}
+        assert drafts.load_ocr_debug(99) is None
+
+    def test_resave_replaces(self):
+        drafts.save_ocr_debug(5, {"a": 1, "b": 2})
+        drafts.save_ocr_debug(5, {"c": 3})
+        assert drafts.load_ocr_debug(5) == {"c": 3}
+
+    def test_corrupt_file_returns_none(self, debug_dir):
+        (debug_dir / "6.dbg").write_bytes(b"SLDBG1\n\x00\x00\x00\x05{bad")
+        assert drafts.load_ocr_debug(6) is None
+        (debug_dir / "6.dbg").write_bytes(b"not a debug pack")
+        assert drafts.load_ocr_debug(6) is None
+
+
+# ===========================================================================
+# 3. Legacy JSON sidecars
+# ===========================================================================
+class TestLegacyJson:
+    def test_full_and_partial(self, debug_dir):
+        payload = {"items": [{"name": "A"}], "raw_ocr_text": "A 1.00", "layout": {"x": 1}}
+        (debug_dir / "8.json").write_text(json.dumps(payload, indent=2), encoding="utf-8")
+        assert drafts.load_ocr_debug(8) == payload
+        assert drafts.load_ocr_debug(8, sections=("layout", "nope")) == {"layout": {"x": 1}}
+
+    def test_non_dict_legacy(self, debug_dir):
+        (debug_dir / "9.json").write_text("[1, 2]", encoding="utf-8")
+        assert drafts.load_ocr_debug(9) is None
+
+    def test_save_supersedes_legacy(self, debug_dir):
+        (debug_dir / "10.json").write_text('{"old": true}', encoding="utf-8")
+        drafts.save_ocr_debug(10, {"new": True})
+        assert not (debug_dir / "10.json").exists()
+        assert drafts.load_ocr_debug(10) == {"new": True}
+
+
+# ===========================================================================
+# 4. Disk usage
+# ===========================================================================
+def test_smaller_than_indented_json(debug_dir):
+    payload = _big_payload()
+    legacy_size = len(json.dumps(payload, ensure_ascii=False, indent=2).encode("utf-8"))
+    drafts.save_ocr_debug(11, payload)
+    assert (debug_dir / "11.dbg").stat().st_size < legacy_size / 5
@@ -0,0 +1,196 @@
+# tests/test_day153_item_cache.py
+"""
+Day 153 — Revision-versioned draft item cache.
+
+Deliverables:
+  1. draft_revisions + triggers: every item / variant / modifier-group
+     write moves the draft's revision, including raw SQL from another
+     connection
+  2. Process LRU keyed by (db, draft, revision, shape): an unchanged
+     draft costs one primary-key read, callers get private copies
+  3. item_read_scope(): repeat reads inside a request do no SQL; any
+     pooled write in the process drops the memo
+  4. Fallbacks: no draft_revisions table, SERVLINE_ITEM_CACHE=0
+"""
+
+from __future__ import annotations
+
+import sqlite3
+
+import pytest
+
+import storage.drafts as drafts
+from storage import db_pool
+
+
+def _seed(draft_id, n=3):
+    return drafts._insert_items_bulk(draft_id, [
+        {"name": f"Item {i}", "price_cents": 100 + i, "category": "Pizza", "position": i,
+         "_variants": [{"label": "Small", "price_cents": 100, "kind": "size"}]}
+        for i in range(n)])
+
+
+def _count_sql(monkeypatch):
+    calls = []
+    orig = db_pool.PooledConnection.execute
+
+    def wrapped(conn, sql, *args):
+        calls.append(sql)
+        return orig(conn, sql, *args)
+    monkeypatch.setattr(db_pool.PooledConnection, "execute", wrapped)
+    return calls
+
+
+# ===========================================================================
+# 1. Revisions
+# ===========================================================================
+class TestRevision:
+    def test_moves_on_every_write_path(self, db, tmp_path):
+        ids = _seed(db)
+        seen = [drafts.get_draft_revision(db)]
+        drafts.bulk_update_items(db, ids[:1], {"category": "Sides"})
+        seen.append(drafts.get_draft_revision(db))
+        gid = drafts.insert_modifier_group(ids[0], "Size", position=0)
+        seen.append(drafts.get_draft_revision(db))
+        drafts.update_modifier_group(gid, name="Sizes")
+        seen.append(drafts.get_draft_revision(db))
+        raw = sqlite3.connect(tmp_path / "drafts.db")
+        raw.execute("UPDATE draft_item_variants SET price_cents = 5")
+        raw.commit()
+        raw.close()
+        seen.append(drafts.get_draft_revision(db))
+        drafts.delete_draft_items(db, ids[1:2])
+        seen.append(drafts.get_draft_revision(db))
+        assert None not in seen
+        assert len(set(seen)) == len(seen)
+
+    def test_other_drafts_untouched(self, db):
+        _seed(db)
+        other = drafts._insert_draft(title="Other", restaurant_id=None)
+        [oid] = _seed(other, 1)
+        before = drafts.get_draft_revision(db)
+        drafts.bulk_update_items(other, [oid], {"category": "X"})
+        assert drafts.get_draft_revision(db) == before
+
+    def test_moving_item_bumps_both_drafts(self, db, tmp_path):
+        [iid] = _seed(db, 1)
+        other = drafts._insert_draft(title="Other", restaurant_id=None)
+        _seed(other, 1)
+        a, b = drafts.get_draft_revision(db), drafts.get_draft_revision(other)
+        with drafts.db_connect() as conn:
+            conn.execute("UPDATE draft_items SET draft_id=? WHERE id=?", (other, iid))
+        assert drafts.get_draft_revision(db) != a
+        assert drafts.get_draft_revision(other) != b
+
+    def test_never_written_draft_has_no_revision(self, db):
+        assert drafts.get_draft_revision(db) is None
+
+
+# ===========================================================================
+# 2. Process LRU
+# ===========================================================================
+class TestLru:
+    @pytest.mark.parametrize("kwargs", [
+        {}, {"include_variants": False}, {"include_modifier_groups": True}])
+    def test_hit_is_one_pk_read(self, db, monkeypatch, kwargs):
+        _seed(db)
+        first = drafts.get_draft_items(db, **kwargs)
+        calls = _count_sql(monkeypatch)
+        again = drafts.get_draft_items(db, **kwargs)
+        assert again == first
+        assert len(calls) == 1 and "draft_revisions" in calls[0]
+        assert drafts.item_cache_stats()["hits"] == 1
+
+    def test_callers_get_private_copies(self, db):
+        _seed(db, 1)
+        items = drafts.get_draft_items(db, include_modifier_groups=True)
+        items[0]["name"] = "mutated"
+        items[0]["variants"].append({"id": -1})
+        again = drafts.get_draft_items(db, include_modifier_groups=True)
+        assert again[0]["name"] == "Item 0"
+        assert len(again[0]["variants"]) == 1
+        assert again[0]["variants"] is again[0]["ungrouped_variants"]
+
+    def test_raw_write_from_other_connection_invalidates(self, db, tmp_path):
+        [iid] = _seed(db, 1)
+        drafts.get_draft_items(db)
+        raw = sqlite3.connect(tmp_path / "drafts.db")
+        raw.execute("UPDATE draft_items SET name='Renamed' WHERE id=?", (iid,))
+        raw.commit()
+        raw.close()
+        assert drafts.get_draft_items(db)[0]["name"] == "Renamed"
+
+    def test_bounded(self, db, monkeypatch):
+        monkeypatch.setattr(drafts, "ITEM_CACHE_MAX_ENTRIES", 2)
+        _seed(db, 1)
+        for kwargs in ({}, {"include_variants": False}, {"include_modifier_groups": True}):
+            drafts.get_draft_items(db, **kwargs)
+        assert drafts.item_cache_stats()["entries"] == 2
+
+
+# ===========================================================================
+# 3. Request scope
+# ===========================================================================
+class TestRequestScope:
+    def test_repeat_reads_do_no_sql(self, db, monkeypatch):
+        _seed(db)
+        with drafts.item_read_scope():
+            first = drafts.get_draft_items(db, include_modifier_groups=True)
+            calls = _count_sql(monkeypatch)
+            for _ in range(3):
+                assert drafts.get_draft_items(db, include_modifier_groups=True) == first
+            assert calls == []
+        assert drafts.item_cache_stats()["scope_hits"] == 3
+
+    def test_write_inside_scope_is_seen(self, db):
+        ids = _seed(db)
+        with drafts.item_read_scope():
+            drafts.get_draft_items(db)
+            drafts.bulk_update_items(db, ids, {"category": "Moved"})
+            assert {it["category"] for it in drafts.get_draft_items(db)} == {"Moved"}
+
+    def test_unpooled_connection_not_memoised(self, db, monkeypatch, tmp_path):
+        # tests (and tools) that swap db_connect for a plain connection write
+        # outside db_pool's write tracking, so the scope must not trust it
+        _seed(db, 1)
+
+        def plain():
+            conn = sqlite3.connect(tmp_path / "drafts.db")
+            conn.row_factory = sqlite3.Row
+            return conn
+        monkeypatch.setattr(drafts, "db_connect", plain)
+        with drafts.item_read_scope():
+            drafts.get_draft_items(db)
+            drafts.get_draft_items(db)
+        stats = drafts.item_cache_stats()
+        assert stats["scope_hits"] == 0 and stats["hits"] == 1
+
+    def test_scope_ends(self, db, monkeypatch):
+        _seed(db)
+        drafts.start_item_read_scope()
+        drafts.get_draft_items(db)
+        drafts.end_item_read_scope()
+        calls = _count_sql(monkeypatch)
+        drafts.get_draft_items(db)
+        assert len(calls) == 1  # back to the revision check
+
+
+# ===========================================================================
+# 4. Fallbacks
+# ===========================================================================
+class TestFallbacks:
+    def test_without_revision_table(self, db, tmp_path):
+        [iid] = _seed(db, 1)
+        raw = sqlite3.connect(tmp_path / "drafts.db")
+        raw.execute("DROP TABLE draft_revisions")
+        raw.commit()
+        raw.close()
+        assert drafts.get_draft_items(db)[0]["id"] == iid
+        assert drafts.item_cache_stats()["entries"] == 0
+
+    def test_disabled_by_env(self, db, monkeypatch):
+        _seed(db, 1)
+        monkeypatch.setenv("SERVLINE_ITEM_CACHE", "0")
+        drafts.get_draft_items(db)
+        drafts.get_draft_items(db)
+        assert drafts.item_cache_stats() == {"hits": 0, "misses": 0, "scope_hits": 0, "entries": 0}
@@ -0,0 +1,164 @@
+# tests/test_day154_items_api.py
+"""
+Day 154 — Keyset-paginated, ETag-aware GET /api/drafts/<id>/items.
+
+Deliverables:
+  1. drafts.get_draft_items_page() — (position, id) keyset pages in
+     get_draft_items order, NULL positions last, seek on idx_items_order
+  2. limit / cursor / fields query params; no params = full list as before
+  3. Strong ETag from the draft revision; If-None-Match -> 304 without
+     reading the item tables
+  4. Gzip above API_GZIP_MIN_BYTES when the client accepts it
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import sqlite3
+
+import pytest
+
+import storage.drafts as drafts
+
+
+def _seed(draft_id, positions):
+    return drafts._insert_items_bulk(draft_id, [
+        {"name": f"Item {i}", "price_cents": 100 + i, "category": "Mains", "position": p,
+         "_variants": [{"label": "Small", "price_cents": 90, "kind": "size", "position": 0},
+                       {"label": "Large", "price_cents": 150, "kind": "size", "position": 1}]}
+        for i, p in enumerate(positions)])
+
+
+def _walk(draft_id, limit, **kw):
+    pages, after = [], None
+    while True:
+        items, after = drafts.get_draft_items_page(draft_id, limit=limit, after=after, **kw)
+        pages.append(items)
+        if after is None:
+            return pages
+
+
+# ===========================================================================
+# 1. Storage: keyset pages
+# ===========================================================================
+class TestItemPages:
+    def test_pages_concatenate_to_full_list(self, db):
+        _seed(db, [3, None, 1, 1, 2, None, 0])
+        full = drafts.get_draft_items(db)
+        pages = _walk(db, 3)
+        assert [len(p) for p in pages] == [3, 3, 1]
+        flat = [it for p in pages for it in p]
+        assert [it["id"] for it in flat] == [it["id"] for it in full]
+        assert flat == full  # same keys, same variants, same order
+
+    def test_exact_multiple_has_no_empty_tail(self, db):
+        _seed(db, range(4))
+        pages = _walk(db, 2)
+        assert [len(p) for p in pages] == [2, 2]
+
+    def test_without_variants(self, db):
+        _seed(db, [0])
+        items, nxt = drafts.get_draft_items_page(db, limit=10, include_variants=False)
+        assert nxt is None and "variants" not in items[0]
+
+    def test_limit_clamped(self, db):
+        _seed(db, range(3))
+        items, _ = drafts.get_draft_items_page(db, limit=0)
+        assert len(items) == 1
+
+    def test_uses_order_index(self, db, tmp_path):
+        conn = sqlite3.connect(tmp_path / "drafts.db")
+        plan = " ".join(r[3] for r in conn.execute(
+            "EXPLAIN QUERY PLAN SELECT id FROM draft_items WHERE draft_id=? "
+            "AND COALESCE(position, 1000000000) >= ? "
+            "AND (COALESCE(position, 1000000000) > ? OR id > ?) "
+            "ORDER BY COALESCE(position, 1000000000), id LIMIT 5", (db, 1, 1, 1)))
+        conn.close()
+        assert "idx_items_order" in plan and "TEMP B-TREE" not in plan
+
+
+# ===========================================================================
+# 2-4. HTTP
+# ===========================================================================
+@pytest.fixture
+def client(db):
+    pytest.importorskip("flask")
+    from portal.app import app, _rate_limit_windows
+    app.config["TESTING"] = True
+    _rate_limit_windows.clear()
+    key = drafts.create_api_key(label="pos", rate_limit_rpm=1000)["raw_key"]
+    with app.test_client() as c:
+        c.environ_base["HTTP_X_API_KEY"] = key
+        yield c
+
+
+def _get(client, draft_id, query="", **headers):
+    return client.get(f"/api/drafts/{draft_id}/items{query}", headers=headers)
+
+
+class TestItemsApi:
+    def test_unpaged_shape_unchanged(self, client, db):
+        _seed(db, range(3))
+        data = _get(client, db).get_json()
+        assert data["count"] == 3 and len(data["items"]) == 3
+        assert "next_cursor" not in data
+
+    def test_cursor_walk(self, client, db):
+        ids = _seed(db, range(5))
+        seen, cursor = [], None
+        while True:
+            q = "?limit=2" + (f"&cursor={cursor}" if cursor else "")
+            data = _get(client, db, q).get_json()
+            seen += [it["id"] for it in data["items"]]
+            cursor = data["next_cursor"]
+            if cursor is None:
+                break
+        assert seen == ids
+
+    def test_projection(self, client, db):
+        _seed(db, [0])
+        item = _get(client, db, "?fields=name,price_cents").get_json()["items"][0]
+        assert set(item) == {"id", "name", "price_cents"}
+
+    @pytest.mark.parametrize("query", ["?limit=0", "?limit=9999", "?cursor=@@@", "?fields=secret"])
+    def test_bad_params_400(self, client, db, query):
+        assert _get(client, db, query).status_code == 400
+
+    def test_304_skips_item_tables(self, client, db, monkeypatch):
+        _seed(db, range(3))
+        first = _get(client, db)
+        etag = first.headers["ETag"]
+        assert etag.startswith('"items-')
+
+        def boom(*a, **k):
+            raise AssertionError("items read on a 304")
+        monkeypatch.setattr(drafts, "get_draft_items", boom)
+        monkeypatch.setattr(drafts, "get_draft_items_page", boom)
+        again = _get(client, db, **{"If-None-Match": etag})
+        assert again.status_code == 304
+        assert again.headers["ETag"] == etag
+
+    def test_etag_changes_on_write_and_per_query(self, client, db):
+        ids = _seed(db, range(2))
+        e1 = _get(client, db).headers["ETag"]
+        assert _get(client, db, "?limit=1").headers["ETag"] != e1
+        drafts.bulk_update_items(db, ids[:1], {"category": "Sides"})
+        e2 = _get(client, db).headers["ETag"]
+        assert e2 != e1
+        assert _get(client, db, **{"If-None-Match": e1}).status_code == 200
+
+    def test_gzip_above_threshold(self, client, db):
+        _seed(db, range(40))
+        resp = _get(client, db, **{"Accept-Encoding": "gzip"})
+        assert resp.headers["Content-Encoding"] == "gzip"
+        assert resp.headers["ETag"].endswith('-gz"')
+        data = json.loads(gzip.decompress(resp.get_data()))
+        assert data["count"] == 40
+        # the gzip ETag still revalidates
+        assert _get(client, db, **{"If-None-Match": resp.headers["ETag"]}).status_code == 304
+
+    def test_small_body_not_gzipped(self, client, db):
+        _seed(db, [0])
+        resp = _get(client, db, "?fields=name", **{"Accept-Encoding": "gzip"})
+        assert "Content-Encoding" not in resp.headers
@@ -0,0 +1,205 @@
+# tests/test_day156_export_cache.py
+"""
+Day 156 — Revision-keyed export artifact cache.
+
+Deliverables:
+  1. storage/export_cache.py — one file per (db, draft, format, revision,
+     exporter version[, extra]); streamed bodies kept only when complete;
+     a newer revision replaces the older file; LRU eviction by size
+  2. Square / Toast CSV, POS JSON, XLSX, preview, validate, metrics and
+     approve-export served from the cache until the draft's items change
+  3. exported_at stays per request; delete_draft drops the draft's
+     artifacts and revision
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+
+import pytest
+
+import storage.drafts as drafts
+from storage import export_cache
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    d = tmp_path / "cache"
+    monkeypatch.setattr(export_cache, "CACHE_DIR", d)
+    export_cache.clear()
+    yield d
+    export_cache.clear()
+
+
+def _seed(draft_id, n=3):
+    return drafts._insert_items_bulk(draft_id, [
+        {"name": f"Item {i}", "price_cents": 100 + i, "category": "Pizza", "position": i,
+         "_variants": [{"label": "Small", "price_cents": 90, "kind": "size"}]}
+        for i in range(n)])
+
+
+def _entry(fmt, rev=1, **kw):
+    return export_cache.entry_path("/x/servline.db", 7, fmt, rev, 1, **kw)
+
+
+# ===========================================================================
+# 1. Store
+# ===========================================================================
+class TestStore:
+    def test_no_revision_or_disabled_means_no_entry(self, monkeypatch):
+        assert _entry("square_csv", rev=None) is None
+        monkeypatch.setenv("SERVLINE_EXPORT_CACHE", "0")
+        assert _entry("square_csv") is None
+
+    def test_key_parts(self):
+        base = _entry("pos_json")
+        assert _entry("pos_json", rev=2) != base
+        assert _entry("pos_json", extra=["Title"]) != base
+        assert export_cache.entry_path("/x/servline.db", 7, "pos_json", 1, 2) != base
+        assert export_cache.entry_path("/y/servline.db", 7, "pos_json", 1, 1) != base
+        assert _entry("pos_json", rev=-5).name  # random() revisions can be negative
+
+    def test_json_round_trip_and_counts(self):
+        e = _entry("validate")
+        assert export_cache.get_json(e) is None
+        export_cache.put_json(e, {"warnings": [], "item_count": 2})
+        assert export_cache.get_json(e) == {"warnings": [], "item_count": 2}
+        st = export_cache.stats()
+        assert (st["hits"], st["misses"], st["stores"], st["entries"]) == (1, 1, 1, 1)
+
+    def test_tee_keeps_only_complete_bodies(self, cache_dir):
+        e = _entry("square_csv")
+        assert b"".join(export_cache.tee(e, iter([b"a", b"b"]))) == b"ab"
+        assert e.read_bytes() == b"ab"
+
+        e2 = _entry("toast_csv")
+        gen = export_cache.tee(e2, iter([b"a", b"b"]))
+        next(gen)
+        gen.close()  # client went away
+        assert not e2.exists()
+        assert [p.name for p in cache_dir.iterdir()] == [e.name]
+
+    def test_tee_exporter_error(self):
+        def broken():
+            yield b"a"
+            raise RuntimeError("boom")
+        e = _entry("square_csv")
+        with pytest.raises(RuntimeError):
+            list(export_cache.tee(e, broken()))
+        assert not e.exists()
+
+    def test_newer_revision_replaces_older(self):
+        old, new, other = _entry("metrics", rev=1), _entry("metrics", rev=2), _entry("validate")
+        export_cache.put_json(old, {})
+        export_cache.put_json(other, {})
+        export_cache.put_json(new, {})
+        assert not old.exists() and new.exists() and other.exists()
+
+    def test_lru_eviction(self, monkeypatch):
+        monkeypatch.setattr(export_cache, "MAX_BYTES", 250)
+        a, b, c = _entry("square_csv"), _entry("toast_csv"), _entry("pos_json")
+        export_cache.put_bytes(a, b"x" * 100)
+        export_cache.put_bytes(b, b"x" * 100)
+        past = time.time() - 60
+        os.utime(a, (past, past))
+        os.utime(b, (past - 60, past - 60))
+        export_cache.open_artifact(a).close()  # a is now most recently used
+        export_cache.put_bytes(c, b"x" * 100)
+        assert a.exists() and c.exists() and not b.exists()
+        assert export_cache.stats()["evictions"] == 1
+
+    def test_invalidate_draft(self):
+        export_cache.put_json(_entry("metrics"), {})
+        export_cache.put_json(export_cache.entry_path("/x/servline.db", 77, "metrics", 1, 1), {})
+        assert export_cache.invalidate("/x/servline.db", 7) == 1
+        assert export_cache.stats()["entries"] == 1
+
+
+def test_delete_draft_drops_artifacts_and_revision(db):
+    _seed(db)
+    rev = drafts.get_draft_revision(db)
+    e = export_cache.entry_path(drafts.DB_PATH, db, "metrics", rev, 1)
+    export_cache.put_json(e, {})
+    assert drafts.delete_draft(db)
+    assert not e.exists()
+    assert drafts.get_draft_revision(db) is None
+
+
+# ===========================================================================
+# 2-3. Routes
+# ===========================================================================
+@pytest.fixture
+def client(db):
+    pytest.importorskip("flask")
+    import portal.app as app_mod
+    app_mod.app.config["TESTING"] = True
+    with app_mod.app.test_client() as c:
+        with c.session_transaction() as sess:
+            sess["user"] = {"username": "tester"}
+        yield c
+
+
+def _no_item_reads(monkeypatch):
+    def boom(*a, **k):
+        raise AssertionError("items read on a cache hit")
+    monkeypatch.setattr(drafts, "get_draft_items", boom)
+    monkeypatch.setattr(drafts, "iter_draft_items", boom)
+
+
+class TestRoutes:
+    @pytest.mark.parametrize("url", [
+        "/drafts/{id}/export_square.csv",
+        "/drafts/{id}/export_toast.csv",
+        "/drafts/{id}/export/validate",
+        "/drafts/{id}/export/metrics",
+        "/drafts/{id}/export/preview?format=square",
+    ])
+    def test_repeat_is_served_from_cache(self, client, db, monkeypatch, url):
+        _seed(db)
+        first = client.get(url.format(id=db))
+        assert first.status_code == 200
+        first_body = first.get_data()
+        _no_item_reads(monkeypatch)
+        again = client.get(url.format(id=db))
+        assert again.status_code == 200 and again.get_data() == first_body
+
+    def test_write_invalidates(self, client, db):
+        ids = _seed(db)
+        url = f"/drafts/{db}/export/validate"
+        assert client.get(url).get_json()["item_count"] == 3
+        drafts.delete_draft_items(db, ids[:1])
+        assert client.get(url).get_json()["item_count"] == 2
+
+    def test_pos_json_restamped(self, client, db, monkeypatch):
+        _seed(db)
+        url = f"/drafts/{db}/export_pos.json"
+        first = json.loads(client.get(url).get_data())
+        _no_item_reads(monkeypatch)
+        again = json.loads(client.get(url).get_data())
+        assert again["menu"] == first["menu"]
+        assert "__servline" not in again["metadata"]["exported_at"]
+
+    def test_title_change_rebuilds_pos_json(self, client, db):
+        _seed(db)
+        url = f"/drafts/{db}/export_pos.json"
+        client.get(url)
+        drafts.save_draft_metadata(db, title="Renamed")
+        assert json.loads(client.get(url).get_data())["menu"]["title"] == "Renamed"
+
+    def test_approve_export_uses_cache(self, client, db, monkeypatch):
+        _seed(db)
+        first = client.post(f"/drafts/{db}/approve_export").get_json()
+        assert first["ok"] and first["item_count"] == 3
+        _no_item_reads(monkeypatch)
+        again = client.post(f"/drafts/{db}/approve_export").get_json()
+        assert again["ok"] and again["pos_json"]["menu"] == first["pos_json"]["menu"]
+        assert len(drafts.get_export_history(db)) == 2
+
+    def test_xlsx_cached(self, client, db, monkeypatch):
+        pytest.importorskip("openpyxl")
+        _seed(db)
+        first = client.get(f"/drafts/{db}/export.xlsx").get_data()
+        _no_item_reads(monkeypatch)
+        assert client.get(f"/drafts/{db}/export.xlsx").get_data() == first
@@ -0,0 +1,105 @@
+# tests/test_day157_duplicate_candidates.py
+"""
+Day 157 — Indexed candidate pairs for fuzzy duplicate names.
+
+Deliverables:
+  1. cross_item._fuzzy_candidate_pairs() — length / prefix / positional
+     filters over character tokens; never drops a pair whose similarity
+     reaches _FUZZY_THRESHOLD
+  2. _check_duplicate_names compares only those pairs; price_flags are
+     identical to the all-pairs loop, in the same order
+  3. tools/bench_cross_item_duplicates.py — all pairs vs. indexed
+"""
+
+from __future__ import annotations
+
+import copy
+import importlib.util
+import random
+from pathlib import Path
+
+import pytest
+
+from storage import cross_item
+
+_ROOT = Path(__file__).resolve().parents[1]
+
+
+def _load_bench():
+    spec = importlib.util.spec_from_file_location(
+        "bench_cross_item_duplicates", _ROOT / "tools" / "bench_cross_item_duplicates.py")
+    bench = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(bench)
+    return bench
+
+
+def _similar_pairs(names):
+    return {
+        (i, j)
+        for i in range(len(names)) for j in range(i + 1, len(names))
+        if cross_item._name_similarity(names[i], names[j]) >= cross_item._FUZZY_THRESHOLD
+    }
+
+
+# ===========================================================================
+# 1. Candidate pairs
+# ===========================================================================
+class TestCandidatePairs:
+    @pytest.mark.parametrize("seed", range(5))
+    def test_lossless_on_random_names(self, seed):
+        rng = random.Random(seed)
+        alphabet = "aabcdeeffg h"
+        names = ["".join(rng.choice(alphabet) for _ in range(rng.randint(3, 16)))
+                 for _ in range(80)]
+        got = cross_item._fuzzy_candidate_pairs(names)
+        assert got == sorted(set(got))
+        assert _similar_pairs(names) <= set(got)
+
+    def test_lossless_on_menu_corpus(self):
+        bench = _load_bench()
+        names = [cross_item._normalize_name(b["name"]) for b in bench.corpus(250, seed=3)]
+        got = set(cross_item._fuzzy_candidate_pairs(names))
+        assert _similar_pairs(names) <= got
+        assert len(got) < len(names) * (len(names) - 1) // 20
+
+    def test_threshold_boundary(self):
+        # 2*9/(10+12) = 0.818 < 0.82 <= 2*9/(10+11) = 0.857
+        names = ["abcdefghij", "abcdefghixyz", "abcdefghixy"]
+        got = set(cross_item._fuzzy_candidate_pairs(names))
+        assert (0, 2) in got and (0, 1) not in got
+
+    def test_unrelated_and_empty(self):
+        assert cross_item._fuzzy_candidate_pairs([]) == []
+        assert cross_item._fuzzy_candidate_pairs(["chicken wings", "lemonade"]) == []
+
+
+# ===========================================================================
+# 2. Flags unchanged
+# ===========================================================================
+def test_flags_match_all_pairs(monkeypatch):
+    bench = _load_bench()
+    blocks = bench.corpus(300, seed=11)
+    indexed = copy.deepcopy(blocks)
+    cross_item._check_duplicate_names(indexed)
+
+    monkeypatch.setattr(cross_item, "_fuzzy_candidate_pairs",
+                        lambda names: [(i, j) for i in range(len(names))
+                                       for j in range(i + 1, len(names))])
+    reference = copy.deepcopy(blocks)
+    cross_item._check_duplicate_names(reference)
+
+    assert [b["price_flags"] for b in indexed] == [b["price_flags"] for b in reference]
+    assert any(f["reason"].startswith("cross_item_fuzzy") for b in indexed for f in b["price_flags"])
+
+
+# ===========================================================================
+# 3. Benchmark
+# ===========================================================================
+def test_bench_smoke():
+    bench = _load_bench()
+    rows = bench.run([60, 120], seed=5)
+    assert [r["items"] for r in rows] == [60, 120]
+    for r in rows:
+        assert r["identical"]
+        assert r["indexed_compared"] < r["all_pairs_compared"]
+    assert "identical" in bench.format_report(rows)
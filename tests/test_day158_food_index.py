@@ -0,0 +1,171 @@
+# tests/test_day158_food_index.py
+"""
+Day 158 — Indexed fuzzy lookup for menu_corrections.fuzzy_match_food.
+
+Deliverables:
+  1. Length-bucketed vocabulary index with a letter-overlap bound; same
+     best match as scanning the whole vocabulary at any threshold (ties
+     resolve alphabetically)
+  2. Built once per process, memoized per (word, threshold); add_food_word
+     updates it in place, any direct FOOD_VOCABULARY edit (even a same-size
+     swap) or replacement rebuilds it and drops the memo
+  3. tools/bench_menu_corrections.py — linear vs. cold / warm index
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import random
+from difflib import SequenceMatcher
+from pathlib import Path
+
+import pytest
+
+from storage import menu_corrections as mc
+
+_ROOT = Path(__file__).resolve().parents[1]
+
+
+def _load_bench():
+    spec = importlib.util.spec_from_file_location(
+        "bench_menu_corrections", _ROOT / "tools" / "bench_menu_corrections.py")
+    bench = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(bench)
+    return bench
+
+
+@pytest.fixture
+def vocab(monkeypatch):
+    """Private copy of the vocabulary and a fresh index / memo."""
+    monkeypatch.setattr(mc, "FOOD_VOCABULARY", mc._VocabularySet(mc.FOOD_VOCABULARY))
+    monkeypatch.setattr(mc, "_food_index", None)
+    monkeypatch.setattr(mc, "_fuzzy_memo", {})
+    return mc.FOOD_VOCABULARY
+
+
+def _linear(text, threshold):
+    lower = text.lower()
+    if lower in mc.FOOD_VOCABULARY:
+        return None
+    best, best_ratio = None, threshold
+    for word in sorted(mc.FOOD_VOCABULARY):
+        if abs(len(word) - len(lower)) > 3:
+            continue
+        ratio = SequenceMatcher(None, lower, word).ratio()
+        if ratio > best_ratio:
+            best, best_ratio = word, ratio
+    return best
+
+
+# ===========================================================================
+# 1. Same match as the full scan
+# ===========================================================================
+class TestSameMatch:
+    @pytest.mark.parametrize("threshold", [0.5, 0.75, 0.9])
+    def test_random_typos(self, vocab, threshold):
+        rng = random.Random(int(threshold * 100))
+        words = sorted(vocab)
+        queries = []
+        for _ in range(300):
+            w = rng.choice(words)
+            i = rng.randrange(len(w))
+            queries.append(w[:i] + rng.choice("l1iormn") + w[i + 1:])
+            queries.append("".join(rng.choice("aeilnorst") for _ in range(rng.randint(3, 11))))
+        for q in queries:
+            assert mc.fuzzy_match_food(q, threshold) == _linear(q, threshold), q
+
+    def test_known_corrections(self, vocab):
+        assert mc.fuzzy_match_food("chickenn") == "chicken"
+        assert mc.fuzzy_match_food("Lasagma") == "lasagna"
+        assert mc.fuzzy_match_food("chicken") is None  # already a word
+        assert mc.fuzzy_match_food("ab") is None
+        assert mc.fuzzy_match_food("zzzzzz") is None
+
+    def test_ties_resolve_alphabetically(self, vocab):
+        vocab.clear()
+        vocab.update({"pasta", "basta"})
+        # both score 0.8 against "xasta"
+        assert mc.fuzzy_match_food("xasta") == "basta"
+
+    def test_correct_menu_item_unchanged(self, vocab):
+        assert mc.correct_menu_item("Grllled Chlcken Sandwlch") == "Grilled Chicken Sandwich"
+
+
+# ===========================================================================
+# 2. Index lifecycle
+# ===========================================================================
+class TestIndexLifecycle:
+    def test_built_once_and_memoized(self, vocab, monkeypatch):
+        mc.fuzzy_match_food("lasagma")
+        index = mc._food_index
+        calls = []
+        orig = mc._FoodIndex.best_match
+        monkeypatch.setattr(mc._FoodIndex, "best_match",
+                            lambda self, *a: calls.append(a) or orig(self, *a))
+        assert mc.fuzzy_match_food("lasagma") == "lasagna"
+        assert mc.fuzzy_match_food("Lasagma") == "lasagna"
+        assert calls == [] and mc._food_index is index
+        mc.fuzzy_match_food("lasagma", 0.6)
+        assert len(calls) == 1
+
+    def test_add_food_word_updates_in_place(self, vocab):
+        assert mc.fuzzy_match_food("birryani") is None
+        index = mc._food_index
+        mc.add_food_word("Biryani")
+        assert mc._food_index is index and index.size == len(vocab)
+        assert mc.fuzzy_match_food("birryani") == "biryani"
+        mc.add_food_word("biryani")  # already there: no double entry
+        assert index.size == len(vocab)
+
+    def test_direct_vocabulary_edit_rebuilds(self, vocab):
+        assert mc.fuzzy_match_food("khachapurri") is None
+        vocab.add("khachapuri")
+        assert mc.fuzzy_match_food("khachapurri") == "khachapuri"
+
+    def test_same_size_swap_rebuilds(self, vocab):
+        assert mc.fuzzy_match_food("lasagma") == "lasagna"
+        assert mc.fuzzy_match_food("khachapurri") is None
+        size = len(vocab)
+        vocab.discard("lasagna")
+        vocab.add("khachapuri")
+        assert len(vocab) == size
+        assert mc.fuzzy_match_food("khachapurri") == "khachapuri"
+        assert mc.fuzzy_match_food("lasagma") != "lasagna"  # memo dropped too
+
+    def test_in_place_operators_rebuild(self, vocab):
+        assert mc.fuzzy_match_food("khachapurri") is None
+        vocab |= {"khachapuri"}
+        assert mc.fuzzy_match_food("khachapurri") == "khachapuri"
+        vocab -= {"khachapuri"}
+        assert mc.fuzzy_match_food("khachapurri") is None
+
+    def test_replaced_with_plain_set(self, vocab, monkeypatch):
+        assert mc.fuzzy_match_food("lasagma") == "lasagna"
+        plain = set(vocab) - {"lasagna"} | {"khachapuri"}
+        monkeypatch.setattr(mc, "FOOD_VOCABULARY", plain)
+        assert mc.fuzzy_match_food("lasagma") != "lasagna"
+        assert mc.fuzzy_match_food("khachapurri") == "khachapuri"
+        plain.discard("khachapuri")
+        plain.add("lasagna")
+        assert mc.fuzzy_match_food("khachapurri") is None
+        assert mc.fuzzy_match_food("lasagma") == "lasagna"
+        mc.add_food_word("biryani")
+        assert mc._food_index.current(plain)
+        assert mc.fuzzy_match_food("birryani") == "biryani"
+
+    def test_add_correction_still_first(self, vocab):
+        mc.add_correction("chiklen", "chicken")
+        try:
+            assert mc.correct_menu_item("Chiklen") == "Chicken"
+        finally:
+            mc.OCR_CORRECTIONS.pop("chiklen", None)
+
+
+# ===========================================================================
+# 3. Benchmark
+# ===========================================================================
+def test_bench_smoke(vocab):
+    bench = _load_bench()
+    rows = bench.run([40], seed=3)
+    assert rows[0]["identical"] and rows[0]["lines"] == 40
+    assert "identical" in bench.format_report(rows)
@@ -0,0 +1,143 @@
+# tests/test_day159_keyword_automaton.py
+"""
+Day 159 — Single-pass multi-pattern keyword scoring.
+
+Deliverables:
+  1. storage/keyword_automaton.py — Aho-Corasick matcher; find() returns the
+     same set as testing every pattern with `in`
+  2. category_infer keyword / phrase scores from one pass per text, built on
+     first use; infer_category_for_text / apply_inference_to_items unchanged
+  3. cross_item._keyword_match_count and category_hierarchy subcategory
+     rules served by the same kind of matcher, results unchanged
+  4. tools/bench_category_infer.py — per-keyword scans vs. automaton
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import random
+from pathlib import Path
+
+import pytest
+
+from storage import category_hierarchy, category_infer, cross_item
+from storage.keyword_automaton import KeywordAutomaton
+
+_ROOT = Path(__file__).resolve().parents[1]
+
+
+def _load_bench():
+    spec = importlib.util.spec_from_file_location(
+        "bench_category_infer", _ROOT / "tools" / "bench_category_infer.py")
+    bench = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(bench)
+    return bench
+
+
+# ===========================================================================
+# 1. Automaton
+# ===========================================================================
+class TestKeywordAutomaton:
+    @pytest.mark.parametrize("seed", range(4))
+    def test_same_as_substring_tests(self, seed):
+        rng = random.Random(seed)
+        for _ in range(300):
+            patterns = ["".join(rng.choice("ab c") for _ in range(rng.randint(1, 5)))
+                        for _ in range(rng.randint(1, 15))]
+            text = "".join(rng.choice("abcd ") for _ in range(rng.randint(0, 40)))
+            expected = {p for p in patterns if p in text}
+            assert KeywordAutomaton(patterns).find(text) == expected
+
+    def test_overlapping_and_nested(self):
+        m = KeywordAutomaton(["pizza", "cheese pizza", "pie", "he", "she", "hers"])
+        assert m.find("ushers") == {"she", "he", "hers"}
+        assert m.find("cheese pizza pie") == {"pizza", "cheese pizza", "pie", "he"}
+        assert m.find("") == frozenset()
+        assert m.find("xyz") == frozenset()
+
+    def test_empty_patterns_ignored(self):
+        assert KeywordAutomaton(["", "a"]).patterns == {"a"}
+
+
+# ===========================================================================
+# 2. Category inference scores
+# ===========================================================================
+def _legacy_keyword_score(text, category):
+    return sum(1 for kw in category_infer.CATEGORY_KEYWORDS.get(category, ()) if kw in text)
+
+
+def _legacy_phrase_score(text, category):
+    return sum(w for p, w in category_infer.CATEGORY_PHRASES.get(category, ()) if p in text)
+
+
+class TestCategoryScores:
+    def test_keyword_and_phrase_scores_match_loops(self):
+        bench = _load_bench()
+        for it in bench.menu(400, seed=2):
+            for text in (category_infer._norm(it["name"]), category_infer._norm(it["description"])):
+                for category in list(category_infer.CATEGORY_KEYWORDS) + ["Nope"]:
+                    assert category_infer._keyword_score(text, category) == \
+                        _legacy_keyword_score(text, category)
+                    assert category_infer._phrase_score(text, category) == \
+                        _legacy_phrase_score(text, category)
+
+    def test_substring_semantics_kept(self):
+        # "pie" still matches inside "pierogi", "can" inside "pecan"
+        assert category_infer._keyword_score("pierogi", "Pizza") == 1
+        assert category_infer._keyword_score("pecan tart", "Beverages") == 1
+        assert category_infer._phrase_score("buffalo chicken pizza", "Pizza") == 4
+
+    def test_infer_examples(self):
+        g = category_infer.infer_category_for_text("Buffalo Chicken Pizza", price_cents=1599)
+        assert g.category == "Pizza"
+        assert category_infer.infer_category_for_text("Coke", price_cents=199).category == "Beverages"
+        assert category_infer.infer_category_for_text("", "").category == "Uncategorized"
+
+    def test_rebuild_picks_up_table_changes(self, monkeypatch):
+        monkeypatch.setitem(category_infer.CATEGORY_KEYWORDS, "Pasta",
+                            list(category_infer.CATEGORY_KEYWORDS["Pasta"]) + ["orzo"])
+        category_infer.rebuild_keyword_index()
+        try:
+            assert category_infer._keyword_score("lemon orzo", "Pasta") == 1
+        finally:
+            monkeypatch.undo()
+            category_infer.rebuild_keyword_index()
+        assert category_infer._keyword_score("lemon orzo", "Pasta") == 0
+
+
+# ===========================================================================
+# 3. Other callers
+# ===========================================================================
+def test_cross_item_keyword_match_count():
+    assert cross_item._keyword_match_count("buffalo wings", "Wings") == 3  # wing, wings, buffalo
+    assert cross_item._keyword_match_count("cheese pizza", "Pizza") == 1
+    assert cross_item._keyword_match_count("", "Pizza") == 0
+    assert cross_item._keyword_match_count("cheese pizza", "NonExistent") == 0
+
+
+@pytest.mark.parametrize("category,name,desc,expected", [
+    ("Pizza", "Calzone Slice", "", "Calzones"),           # first rule wins
+    ("Pizza", "Supreme", "by the slice", "Specialty Pizzas"),
+    ("Pizza", "Slice", "", "Pizza By The Slice"),
+    ("Pizza", "Cheese", "", None),
+    ("Wings", "Boneless", "bone-in also", "Boneless Wings"),
+    ("Burgers / Sandwiches", "Philly Cheesesteak", "", "Subs & Grinders"),
+    ("Salads", "Greek Chef", "", "Greek Salads"),
+    ("Sides / Apps", "Onion Rings", "", "Onion Rings"),
+    ("Beverages", "Pecan Iced Tea", "", "Canned Drinks"),  # substring "can"
+    ("Desserts", "Stromboli Bites", "", "Strombolis"),     # fallback rules
+    ("Pizza", "", "calzone", None),                        # no name
+])
+def test_subcategory_rules(category, name, desc, expected):
+    item = {"category": category, "name": name, "description": desc}
+    assert category_hierarchy._infer_subcategory_for_item(item) == expected
+
+
+# ===========================================================================
+# 4. Benchmark
+# ===========================================================================
+def test_bench_smoke():
+    bench = _load_bench()
+    rows = bench.run([150], seed=4)
+    assert rows[0]["identical"] and rows[0]["items"] == 150
+    assert "identical" in bench.format_report(rows)
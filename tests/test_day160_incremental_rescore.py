@@ -0,0 +1,151 @@
+# tests/test_day160_incremental_rescore.py
+"""
+Day 160 — Incremental semantic re-scoring after auto-repair.
+
+Deliverables:
+  1. semantic_confidence.rescore_repaired_items() — re-score + re-tier only
+     the items whose auto_repairs_applied trail is non-empty
+  2. run_semantic_pipeline / segment_document / ai_ocr_helper use it instead
+     of a second full pass; the bridge reuses the report's menu summary
+  3. Output identical to the full recompute
+"""
+
+from __future__ import annotations
+
+import copy
+import random
+
+import pytest
+
+from storage import semantic_bridge
+from storage import semantic_confidence as sc
+from storage.cross_item import check_cross_item_consistency
+
+_NAMES = ["Cheese Pizza", "Pepperoni Pizza", "Buffalo Wings", "Chlcken Parm Sub",
+          "Garden Salad", "Grllled Chlcken Wrap", "Coke", "Fries", "XXXRRR",
+          "Caesar Salad", "Brownie", "Sesfoco Sssalad", "Chlcken Sssseee", "Ham",
+          "Mozzarella Sticks"]
+_CATS = ["Pizza", "Wings", "Subs / Sandwiches", "Salads", "Beverages",
+         "Sides / Appetizers", "Desserts", None]
+
+
+def _draft_items(n, seed):
+    rng = random.Random(seed)
+    items = []
+    for i in range(n):
+        item = {
+            "name": rng.choice(_NAMES) + (f" {i}" if rng.random() < 0.4 else ""),
+            "price_cents": rng.choice([0, 199, 899, 1299, 2499]),
+            "category": rng.choice(_CATS),
+            "confidence": rng.randint(30, 99),
+        }
+        if rng.random() < 0.3:
+            item["_variants"] = [{"label": "Small", "price_cents": 899, "kind": "size"},
+                                 {"label": "Large", "price_cents": 1299, "kind": "size"}]
+        if rng.random() < 0.2:
+            item["claude_confidence"] = rng.choice([0.4, 0.9])
+        items.append(item)
+    return items
+
+
+def _full_recompute_pipeline(draft_items):
+    """run_semantic_pipeline as it was before Day 160 (two full passes)."""
+    items = semantic_bridge.prepare_items_for_semantic(draft_items)
+    check_cross_item_consistency(items)
+    sc.score_semantic_confidence(items)
+    sc.classify_confidence_tiers(items)
+    sc.generate_repair_recommendations(items)
+    repair_results = sc.apply_auto_repairs(items)
+    sc.score_semantic_confidence(items)
+    sc.classify_confidence_tiers(items)
+    report = sc.generate_semantic_report(items, repair_results)
+    repairs_applied = semantic_bridge.apply_repairs_to_draft_items(draft_items, items)
+    summary = sc.compute_menu_confidence_summary(items)
+    return {
+        "semantic_report": report,
+        "repair_results": repair_results,
+        "items": items,
+        "items_metadata": semantic_bridge.extract_semantic_metadata(items),
+        "tier_counts": summary.get("tier_counts", {}),
+        "mean_confidence": summary.get("mean_confidence", 0.0),
+        "quality_grade": summary.get("quality_grade", "D"),
+        "repairs_applied": repairs_applied,
+    }
+
+
+# ===========================================================================
+# 1. rescore_repaired_items
+# ===========================================================================
+class TestRescoreRepairedItems:
+    def _repaired(self, seed=1, n=120):
+        items = semantic_bridge.prepare_items_for_semantic(_draft_items(n, seed))
+        check_cross_item_consistency(items)
+        sc.score_semantic_confidence(items)
+        sc.classify_confidence_tiers(items)
+        sc.generate_repair_recommendations(items)
+        sc.apply_auto_repairs(items)
+        return items
+
+    def test_same_as_full_pass(self):
+        items = self._repaired()
+        full = copy.deepcopy(items)
+        sc.score_semantic_confidence(full)
+        sc.classify_confidence_tiers(full)
+        changed = sc.rescore_repaired_items(items)
+        assert changed and len(changed) < len(items)
+        assert items == full
+
+    def test_only_repaired_items_recomputed(self, monkeypatch):
+        items = self._repaired()
+        seen = []
+        orig = sc._score_item
+        monkeypatch.setattr(sc, "_score_item", lambda it: seen.append(id(it)) or orig(it))
+        changed = sc.rescore_repaired_items(items)
+        assert changed == sc.repaired_item_indices(items)
+        assert seen == [id(items[i]) for i in changed]
+        assert all(items[i]["auto_repairs_applied"] for i in changed)
+
+    def test_name_repair_moves_score(self):
+        items = self._repaired()
+        named = [it for it in items
+                 if any(r["type"] == "name" for r in it["auto_repairs_applied"])]
+        assert named
+        before = [it["semantic_confidence_details"]["name_quality_score"] for it in named]
+        sc.rescore_repaired_items(items)
+        after = [it["semantic_confidence_details"]["name_quality_score"] for it in named]
+        assert after != before or all(b == 1.0 for b in before)
+
+    def test_explicit_positions_and_empty(self):
+        assert sc.rescore_repaired_items([]) == []
+        items = [{"name": "Cheese Pizza", "price_cents": 999}]
+        assert sc.rescore_repaired_items(items, changed=[0]) == [0]
+        assert items[0]["semantic_tier"] in ("high", "medium", "low", "reject")
+
+
+# ===========================================================================
+# 2-3. Pipeline output unchanged
+# ===========================================================================
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_run_semantic_pipeline_identical(seed):
+    draft_a = _draft_items(150, seed)
+    draft_b = copy.deepcopy(draft_a)
+    got = semantic_bridge.run_semantic_pipeline(draft_a)
+    expected = _full_recompute_pipeline(draft_b)
+    assert got == expected
+    assert draft_a == draft_b
+    assert got["repair_results"]["total_items_repaired"] > 0
+
+
+def test_pipeline_rescore_is_partial(monkeypatch):
+    calls = []
+    orig = sc._score_item
+    monkeypatch.setattr(sc, "_score_item", lambda it: calls.append(1) or orig(it))
+    result = semantic_bridge.run_semantic_pipeline(_draft_items(100, 5))
+    repaired = result["repair_results"]["total_items_repaired"]
+    assert len(calls) == 100 + repaired
+
+
+def test_tier_counts_not_shared_with_report():
+    result = semantic_bridge.run_semantic_pipeline(_draft_items(20, 6))
+    result["tier_counts"]["high"] += 1
+    assert result["semantic_report"]["menu_confidence"]["tier_counts"] != result["tier_counts"]
@@ -0,0 +1,142 @@
+# tests/test_day161_parse_cache.py
+"""
+Day 161 — Memoised line parsing in menu_grammar.
+
+Deliverables:
+  1. parse_menu_line served from a bounded, content-keyed LRU cache;
+     callers get independent copies (classify_menu_lines mutates them)
+  2. Pre-compiled trigger scans gate the OCR typo and W/ rules; output
+     identical to applying every rule to every line
+  3. tools/bench_menu_grammar.py — parse benchmark over the fixture corpus
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import random
+from dataclasses import asdict
+from pathlib import Path
+
+import pytest
+
+from storage.parsers import menu_grammar as mg
+
+_ROOT = Path(__file__).resolve().parents[1]
+
+
+def _load_bench():
+    spec = importlib.util.spec_from_file_location(
+        "bench_menu_grammar", _ROOT / "tools" / "bench_menu_grammar.py")
+    bench = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(bench)
+    return bench
+
+
+@pytest.fixture(autouse=True)
+def _fresh_cache():
+    mg.clear_parse_cache()
+    yield
+    mg.clear_parse_cache()
+
+
+# ===========================================================================
+# 1. Parse cache
+# ===========================================================================
+class TestParseCache:
+    def test_repeat_is_a_hit_with_same_result(self):
+        first = mg.parse_menu_line("Cheese Pizza 12.99")
+        second = mg.parse_menu_line("Cheese Pizza 12.99")
+        assert first == second == mg._parse_menu_line_uncached("Cheese Pizza 12.99")
+        assert first is not second
+        stats = mg.parse_cache_stats()
+        assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+
+    def test_returned_copies_are_independent(self):
+        text = "BUFFALO CHICKEN PIZZA buffalo sauce, chicken, mozzarella 14.99"
+        first = mg.parse_menu_line(text)
+        assert first.components is not None
+        first.line_type = "heading"
+        first.modifiers.append("x")
+        first.price_mentions.clear()
+        first.components.toppings.append("x")
+        again = mg.parse_menu_line(text)
+        assert again == mg._parse_menu_line_uncached(text)
+
+    def test_classify_menu_lines_mutation_does_not_leak(self):
+        lines = ["PIZZA", "Cheese Pizza 10.99", "Small Medium Large",
+                 "Cheese Pizza 10.99     Garden Salad 7.99", "PIZZA"]
+        first = [asdict(p) for p in mg.classify_menu_lines(lines)]
+        second = [asdict(p) for p in mg.classify_menu_lines(lines)]
+        assert first == second
+        for line in lines:
+            assert mg.parse_menu_line(line) == mg._parse_menu_line_uncached(line)
+
+    def test_bounded_lru(self, monkeypatch):
+        monkeypatch.setattr(mg, "PARSE_CACHE_MAX_ENTRIES", 3)
+        for text in ("a 1.00", "b 2.00", "c 3.00"):
+            mg.parse_menu_line(text)
+        mg.parse_menu_line("a 1.00")        # refresh "a"
+        mg.parse_menu_line("d 4.00")        # evicts "b"
+        assert list(mg._parse_cache) == ["c 3.00", "a 1.00", "d 4.00"]
+
+    def test_blank_and_non_string(self):
+        assert mg.parse_menu_line("").line_type == "unknown"
+        assert mg.parse_menu_line(None).line_type == "unknown"
+        assert mg.parse_cache_stats()["entries"] == 1
+
+
+# ===========================================================================
+# 2. Typo / W/ trigger scans
+# ===========================================================================
+def _legacy_typos(text):
+    for typo, fix in mg._OCR_TYPO_MAP.items():
+        if typo in text:
+            text = text.replace(typo, fix)
+    for pattern, replacement in mg._OCR_TYPO_PATTERNS:
+        text = pattern.sub(replacement, text)
+    return text
+
+
+def _legacy_w_slash(text):
+    text = mg._W_SLASH_RE.sub("with ", text)
+    text = mg._WI_SLASH_RE.sub("with ", text)
+    text = mg._WI_SPACE_RE.sub("with ", text)
+    return mg._WI_NOSPACE_RE.sub(mg._wi_nospace_repl, text)
+
+
+@pytest.mark.parametrize("text,typos,w_slash", [
+    ("88Q Chicken W/ FRIES", "BBQ Chicken W/ FRIES", "88Q Chicken with FRIES"),
+    ("[a1] piZzA Smt", "PIZZA Sml", "[a1] piZzA Smt"),
+    ("Basi! Pesto WI/FRIES", "Basil Pesto W/FRIES", "Basi! Pesto with FRIES"),
+    ("Wi CHEESE", "Wi CHEESE", "with CHEESE"),
+    ("WICHEESE", "WICHEESE", "with CHEESE"),
+    ("Garden Salad 7.99", "Garden Salad 7.99", "Garden Salad 7.99"),
+])
+def test_normalisers_examples(text, typos, w_slash):
+    assert mg._normalize_ocr_typos(text) == typos
+    assert mg._normalize_w_slash(text) == w_slash
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_normalisers_match_every_rule_loops(seed):
+    rng = random.Random(seed)
+    tokens = ["88q", "88Q", "8BQ", "880", "B8Q", "Basi!", "basi!", "piZzA", "Smt",
+              "WI/", "W/", "w/", "Wi", "wi", "WIFRIES", "[a1]", "[", "8", "B", "Q",
+              "Pizza", "with", "/", " ", "!", "0"]
+    for _ in range(2000):
+        text = "".join(rng.choice(tokens) for _ in range(rng.randint(0, 8)))
+        assert mg._normalize_ocr_typos(text) == _legacy_typos(text)
+        assert mg._normalize_w_slash(text) == _legacy_w_slash(text)
+
+
+# ===========================================================================
+# 3. Benchmark
+# ===========================================================================
+def test_bench_smoke():
+    bench = _load_bench()
+    lines = bench.corpus()
+    assert lines
+    row = bench.run(2, lines[:80])
+    assert row["identical"] and row["lines"] == 80
+    assert row["cache_hits"] >= 80
+    assert "identical" in bench.format_report(row)
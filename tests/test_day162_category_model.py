@@ -0,0 +1,220 @@
+# tests/test_day162_category_model.py
+"""
+Day 162 — Runtime batch inference for the trained category classifier.
+
+Deliverables:
+  1. storage/category_model.py — lazily loaded, process-shared model;
+     one vectorizer / predict_proba call per batch; trained labels mapped
+     onto category_infer names
+  2. No model (callers keep their keyword path) when the file is missing
+     or fails to load
+  3. ocr_pipeline.infer_categories_on_text_blocks fuses confident model
+     categories; keywords only if scoring raises
+  4. menu_classifier skips the LLM for items the model is sure are
+     drinks / desserts — only when the bundle is calibrated
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from storage import category_model, menu_classifier
+
+_TABLE = {
+    "coke": {"Beverages": 0.95, "Desserts": 0.02, "Kids": 0.03},
+    "tiramisu": {"Desserts": 0.91, "Beverages": 0.09},
+    "pizza": {"Pizzas": 0.88, "Kids": 0.12},
+    "kids meal": {"Kids": 0.90, "Pizzas": 0.10},
+}
+
+
+class _Vectorizer:
+    def __init__(self):
+        self.calls = 0
+
+    def transform(self, texts):
+        self.calls += 1
+        return [t.lower() for t in texts]
+
+
+class _Clf:
+    classes_ = ["Beverages", "Desserts", "Kids", "Pizzas"]
+
+    def __init__(self):
+        self.calls = 0
+
+    def predict_proba(self, X):
+        self.calls += 1
+        rows = []
+        for text in X:
+            probs = next((v for k, v in _TABLE.items() if k in text), {"Kids": 0.5, "Pizzas": 0.5})
+            rows.append([probs.get(c, 0.0) for c in self.classes_])
+        return rows
+
+
+@pytest.fixture
+def bundle(tmp_path, monkeypatch):
+    path = tmp_path / "category_clf.pkl"
+    path.write_bytes(b"x")
+    b = {"vectorizer": _Vectorizer(), "clf": _Clf(), "labels": _Clf.classes_, "algo": "fake",
+         "calibrated": True}
+    loads = []
+    monkeypatch.setenv("SERVLINE_CATEGORY_MODEL", str(path))
+    monkeypatch.setattr(category_model, "_load_bundle", lambda p: loads.append(p) or b)
+    category_model.reset_category_model()
+    yield SimpleNamespace(bundle=b, path=path, loads=loads)
+    category_model.reset_category_model()
+
+
+@pytest.fixture
+def no_model(tmp_path, monkeypatch):
+    monkeypatch.setenv("SERVLINE_CATEGORY_MODEL", str(tmp_path / "missing.pkl"))
+    category_model.reset_category_model()
+    yield
+    category_model.reset_category_model()
+
+
+# ===========================================================================
+# 1. Model service
+# ===========================================================================
+class TestCategoryModel:
+    def test_one_batch_call_per_menu(self, bundle):
+        texts = ["Coke", "Tiramisu", "Cheese Pizza", "Kids Meal", "Mystery"] * 20
+        preds = category_model.get_category_model().predict(texts)
+        assert len(preds) == len(texts)
+        assert bundle.bundle["vectorizer"].calls == 1
+        assert bundle.bundle["clf"].calls == 1
+        assert {p.source for p in preds} == {"model"}
+
+    def test_labels_mapped_and_unmapped_mass_dropped(self, bundle):
+        coke, pizza, kids = category_model.get_category_model().predict(
+            ["Coke", "Pizza", "Kids Meal"])
+        assert (coke.category, coke.probability) == ("Beverages", pytest.approx(0.95))
+        assert pizza.category == "Pizza" and pizza.probability == pytest.approx(0.88)
+        assert "Kids" not in kids.probabilities
+        assert kids.category == "Pizza" and kids.probability == pytest.approx(0.10)
+
+    def test_loaded_once_and_reloaded_on_change(self, bundle):
+        m1 = category_model.get_category_model()
+        m2 = category_model.get_category_model()
+        assert m1 is m2 and len(bundle.loads) == 1
+        st = os.stat(bundle.path)
+        os.utime(bundle.path, (st.st_atime, st.st_mtime + 10))
+        assert category_model.get_category_model() is not m1
+        assert len(bundle.loads) == 2
+
+    def test_decision_function_softmax(self):
+        clf = SimpleNamespace(classes_=["Pizzas", "Wings"],
+                              decision_function=lambda X: [[2.0, 0.0] for _ in X])
+        model = category_model.CategoryModel({"vectorizer": _Vectorizer(), "clf": clf})
+        (pred,) = model.predict(["x"])
+        assert pred.category == "Pizza"
+        assert pred.probability == pytest.approx(1 / (1 + math.exp(-2)))
+        assert sum(pred.probabilities.values()) == pytest.approx(1.0)
+
+
+# ===========================================================================
+# 2. Fallback
+# ===========================================================================
+class TestFallback:
+    def test_missing_file_no_model(self, no_model):
+        assert category_model.get_category_model() is None
+
+    def test_unloadable_file_no_model(self, tmp_path, monkeypatch):
+        path = tmp_path / "broken.pkl"
+        path.write_bytes(b"not a pickle")
+        monkeypatch.setenv("SERVLINE_CATEGORY_MODEL", str(path))
+        category_model.reset_category_model()
+        try:
+            assert category_model.get_category_model() is None
+        finally:
+            category_model.reset_category_model()
+
+
+# ===========================================================================
+# 3. OCR block inference
+# ===========================================================================
+def test_text_blocks_fuse_confident_model(bundle):
+    pytest.importorskip("pytesseract")
+    from storage import ocr_pipeline
+    blocks = [{"merged_text": "Coke"}, {"merged_text": "Cheese Pizza"}, {"merged_text": "Kids Meal"}]
+    ocr_pipeline.infer_categories_on_text_blocks(blocks)
+    assert blocks[0]["category"] == "Beverages" and blocks[0]["category_confidence"] == 95
+    assert blocks[0]["rule_trace"].startswith("category model")
+    assert blocks[1]["category"] == "Pizza"
+    assert not blocks[2]["rule_trace"].startswith("category model")
+
+
+def test_text_blocks_survive_failing_model(bundle):
+    pytest.importorskip("pytesseract")
+    from storage import ocr_pipeline
+
+    def _boom(X):
+        raise ValueError("bad features")
+    bundle.bundle["clf"].predict_proba = _boom
+    blocks = [{"merged_text": "Coke"}, {"merged_text": "Cheese Pizza"}]
+    ocr_pipeline.infer_categories_on_text_blocks(blocks)
+    assert blocks[1]["category"] == "Pizza"
+    assert not any(b["rule_trace"].startswith("category model") for b in blocks)
+
+
+# ===========================================================================
+# 4. LLM role classification
+# ===========================================================================
+class _FakeClient:
+    def __init__(self):
+        self.sent = []
+        self.messages = self
+
+    def create(self, **kwargs):
+        prompt = kwargs["messages"][0]["content"]
+        batch = json.loads(prompt.split("Items:\n", 1)[1])
+        self.sent.extend(row["name"] for row in batch)
+        rows = [{"i": row["i"], "role": "dish", "canonical_name": row["name"]} for row in batch]
+        return SimpleNamespace(content=[SimpleNamespace(text=json.dumps(rows))])
+
+
+_MENU = [{"name": "Coke", "price_cents": 199}, {"name": "Cheese Pizza", "price_cents": 1299},
+         {"name": "Tiramisu", "price_cents": 699}, {"name": "Wings (10)", "price_cents": 1099}]
+
+
+def test_confident_items_skip_llm(bundle, monkeypatch):
+    client = _FakeClient()
+    monkeypatch.setattr(menu_classifier, "_get_client", lambda: client)
+    out = menu_classifier.classify_menu_items("Testaurant", _MENU)
+    assert client.sent == ["Cheese Pizza", "Wings (10)"]
+    assert [it["role"] for it in out] == ["drink", "dish", "dessert", "dish"]
+    assert out[0]["canonical_name"] == "Coke"
+
+
+def test_all_confident_makes_no_call(bundle, monkeypatch):
+    monkeypatch.setattr(menu_classifier, "_get_client",
+                        lambda: pytest.fail("LLM client requested"))
+    out = menu_classifier.classify_menu_items("Testaurant", [_MENU[0], _MENU[2]])
+    assert [it["role"] for it in out] == ["drink", "dessert"]
+
+
+@pytest.mark.parametrize("extra", [{"calibrated": False, "algo": "MultinomialNB"}, {"calibrated": None}])
+def test_uncalibrated_model_never_skips_llm(bundle, monkeypatch, extra):
+    # raw NB probabilities sit near 1.0 even when wrong; older bundles lack the flag
+    bundle.bundle.update(extra)
+    if extra["calibrated"] is None:
+        del bundle.bundle["calibrated"]
+    assert category_model.get_category_model().calibrated is False
+    client = _FakeClient()
+    monkeypatch.setattr(menu_classifier, "_get_client", lambda: client)
+    menu_classifier.classify_menu_items("Testaurant", _MENU)
+    assert client.sent == [it["name"] for it in _MENU]
+
+
+def test_without_model_everything_goes_to_llm(no_model, monkeypatch):
+    client = _FakeClient()
+    monkeypatch.setattr(menu_classifier, "_get_client", lambda: client)
+    out = menu_classifier.classify_menu_items("Testaurant", _MENU)
+    assert client.sent == [it["name"] for it in _MENU]
+    assert all(it["role"] == "dish" for it in out)
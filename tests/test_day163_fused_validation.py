@@ -0,0 +1,140 @@
+# tests/test_day163_fused_validation.py
+"""
+Day 163 — Shared per-block features for the cross-item checks.
+
+Deliverables:
+  1. cross_item._MenuFeatures — names, primary prices, categories and size
+     variants extracted once per run; category price groups and medians
+     aggregated once
+  2. check_cross_item_consistency hands it to every check; each check still
+     works on its own (features=None) with identical flags
+  3. size_vocab.size_ordinal / size_track memoised for every variant pass
+"""
+
+from __future__ import annotations
+
+import copy
+import random
+
+import pytest
+
+from storage import cross_item
+from storage.parsers import size_vocab
+
+_CATS = ["Pizza", "Wings", "Subs / Sandwiches", "Salads", "Beverages",
+         "Sides / Appetizers", "Desserts", "Pasta", None]
+_NAMES = ["Cheese Pizza", "Pepperoni Pizza", "Buffalo Wings", "Chicken Parm Sub",
+          "Garden Salad", "Coke", "Fries", "Caesar Salad", "Brownie", "Baked Ziti",
+          "Our Famous Meatball Sub", "Mozzarella Sticks", "Onion Rings", "BBQ Wings"]
+_SIZES = [["S", "M", "L"], ["S", "M", "L", "XL"], ["M", "L"], ["10in", "14in", "18in"],
+          ["6pc", "12pc"], ["Regular", "Deluxe"]]
+
+_CHECKS = [
+    cross_item._check_duplicate_names,
+    cross_item._check_category_price_outliers,
+    cross_item._check_category_isolation,
+    cross_item._check_category_suggestions,
+    cross_item._check_cross_category_coherence,
+    cross_item._check_variant_count_consistency,
+    cross_item._check_variant_label_consistency,
+    cross_item._check_variant_price_steps,
+]
+
+
+def _menu(n, seed):
+    rng = random.Random(seed)
+    blocks = []
+    cat = rng.choice(_CATS)
+    for i in range(n):
+        if rng.random() < 0.25:
+            cat = rng.choice(_CATS)
+        name = rng.choice(_NAMES) + (f" {i}" if rng.random() < 0.3 else "")
+        tb = {
+            "merged_text": f"{name} 12.99",
+            "category": cat,
+            "category_confidence": rng.randint(20, 95),
+            "grammar": {"parsed_name": name} if rng.random() < 0.7 else {},
+            "price_candidates": [{"price_cents": rng.choice([0, 199, 899, 1299, 2499, 8999])}],
+        }
+        if rng.random() < 0.1:
+            tb["price_candidates"] = [{"value": rng.choice([2.5, 14.0])}]
+        if rng.random() < 0.5:
+            base = rng.choice([799, 999, 1199])
+            tb["variants"] = [
+                {"label": s, "kind": "size", "normalized_size": s,
+                 "price_cents": base + k * rng.choice([200, 300, -100, 900])}
+                for k, s in enumerate(rng.choice(_SIZES))
+            ]
+        blocks.append(tb)
+    return blocks
+
+
+def _separately(blocks):
+    for tb in blocks:
+        tb.setdefault("price_flags", [])
+    for check in _CHECKS:
+        check(blocks)
+
+
+@pytest.mark.parametrize("seed", range(6))
+def test_fused_run_matches_checks_run_separately(seed):
+    blocks = _menu(120, seed)
+    fused, separate = copy.deepcopy(blocks), copy.deepcopy(blocks)
+    cross_item.check_cross_item_consistency(fused)
+    _separately(separate)
+    assert fused == separate
+    assert any(tb["price_flags"] for tb in fused)
+
+
+def test_features_extracted_once_per_block(monkeypatch):
+    blocks = _menu(60, 7)
+    calls = {"price": 0, "name": 0}
+    orig_price, orig_name = cross_item._extract_primary_price_cents, cross_item._extract_item_name
+
+    def price(tb):
+        calls["price"] += 1
+        return orig_price(tb)
+
+    def name(tb):
+        calls["name"] += 1
+        return orig_name(tb)
+
+    monkeypatch.setattr(cross_item, "_extract_primary_price_cents", price)
+    monkeypatch.setattr(cross_item, "_extract_item_name", name)
+    cross_item.check_cross_item_consistency(blocks)
+    assert calls == {"price": 60, "name": 60}
+
+
+def test_menu_features_aggregation():
+    blocks = [
+        {"category": "Pizza", "price_cents": 1000, "name": "Cheese Pizza"},
+        {"category": "Pizza", "price_cents": 1400, "name": "Our Classic Veggie Pizza."},
+        {"category": "Pizza", "price_cents": 0, "name": "Plain"},
+        {"category": "Beverages", "price_cents": 199, "name": "Coke"},
+        {"category": None, "price_cents": 500, "name": "Mystery"},
+        {"category": "Pizza", "price_cents": 1100, "variants": [
+            {"kind": "size", "normalized_size": "L", "price_cents": 1500},
+            {"kind": "size", "normalized_size": "S", "price_cents": 1100},
+            {"kind": "size", "normalized_size": "bogus", "price_cents": 900},
+            {"kind": "flavor", "normalized_size": "M", "price_cents": 1200},
+        ]},
+    ]
+    f = cross_item._MenuFeatures(blocks)
+    # primary price = lowest positive variant price (the "bogus" size here)
+    assert f.priced_by_category == {"Pizza": [(0, 1000), (1, 1400), (5, 900)],
+                                    "Beverages": [(3, 199)]}
+    assert f.category_medians == {"Pizza": 1000, "Beverages": 199}
+    assert f.blocks[1].norm_name == "veggie pizza"
+    assert sorted(f.blocks[5].sized) == [(size_vocab.size_ordinal("S"), 1100, "word"),
+                                         (size_vocab.size_ordinal("L"), 1500, "word")]
+
+
+def test_size_lookups_memoised():
+    size_vocab.size_ordinal.cache_clear()
+    for _ in range(5):
+        assert size_vocab.size_ordinal("14in") == 14
+        assert size_vocab.size_ordinal("6pc") == 306
+        assert size_vocab.size_track("14in") == "inch"
+    assert size_vocab.size_ordinal.cache_info().hits == 8
+    assert size_vocab.size_ordinal("") is None
+    assert size_vocab.size_track("nonsense") is None
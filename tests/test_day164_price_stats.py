@@ -0,0 +1,199 @@
+# tests/test_day164_price_stats.py
+"""
+Day 164 — Columnar per-group price statistics.
+
+Deliverables:
+  1. storage/price_stats.py — PriceColumns: median / quartiles / MAD for
+     every group in one pass (NumPy when installed), identical to the
+     statistics module; MAD and IQR outlier masks aligned with the rows
+  2. cross_item category price outliers and price_integrity group bands
+     read their stats and outlier masks from it; flags unchanged
+  3. tools/bench_price_stats.py — legacy vs columnar benchmark
+"""
+
+from __future__ import annotations
+
+import copy
+import importlib.util
+import random
+import statistics
+from pathlib import Path
+
+import pytest
+
+from storage import cross_item, price_integrity, price_stats
+from storage.price_stats import PriceColumns, group_price_stats
+
+_ROOT = Path(__file__).resolve().parents[1]
+
+
+def _load_bench():
+    spec = importlib.util.spec_from_file_location(
+        "bench_price_stats", _ROOT / "tools" / "bench_price_stats.py")
+    bench = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(bench)
+    return bench
+
+
+def _random_columns(seed, n=600, groups=12):
+    rng = random.Random(seed)
+    keys = [rng.choice([f"g{i}" for i in range(groups)] + [None]) for _ in range(n)]
+    prices = [rng.choice([0, rng.randint(1, 3000), rng.randint(1, 3000) * 100]) for _ in range(n)]
+    return keys, prices
+
+
+def _legacy_stats(prices):
+    ps = sorted(prices)
+    median = statistics.median(ps)
+    q1 = statistics.median(ps[: len(ps) // 2]) if len(ps) > 1 else median
+    q3 = statistics.median(ps[len(ps) // 2:])
+    mad = statistics.median([abs(p - median) for p in ps])
+    return (len(ps), median, q1, q3, mad)
+
+
+# ===========================================================================
+# 1. PriceColumns
+# ===========================================================================
+class TestGroupStats:
+    @pytest.mark.parametrize("seed", range(3))
+    def test_matches_statistics_module(self, seed):
+        keys, prices = _random_columns(seed, n=300)
+        stats = group_price_stats(keys, prices)
+        assert list(stats) == list(dict.fromkeys(keys))
+        for key, s in stats.items():
+            group = [p for k, p in zip(keys, prices) if k == key]
+            assert (s.count, s.median, s.q1, s.q3, s.mad) == _legacy_stats(group)
+
+    def test_small_groups(self):
+        stats = group_price_stats(["a", "b", "b", "c", "c", "c"], [500, 400, 600, 100, 900, 300])
+        assert (stats["a"].median, stats["a"].q1, stats["a"].q3, stats["a"].iqr) == (500, 500, 500, 1)
+        assert (stats["b"].median, stats["b"].q1, stats["b"].q3) == (500.0, 400, 600)
+        assert (stats["c"].median, stats["c"].q1, stats["c"].q3, stats["c"].mad) == (300, 100, 600.0, 200)
+        assert group_price_stats([], []) == {}
+
+    def test_basis_limits_stats_not_masks(self):
+        cols = PriceColumns(["x"] * 5, [1000, 1010, 990, 0, 99900], [True, True, True, False, False])
+        assert cols.stats["x"].count == 3 and cols.stats["x"].median == 1000
+        assert cols.iqr_outlier_mask() == [False, False, False, False, True]
+
+    def test_length_mismatch(self):
+        with pytest.raises(ValueError):
+            PriceColumns(["a"], [1, 2])
+
+
+class TestMasks:
+    def test_mad_floor_on_identical_prices(self):
+        cols = PriceColumns(["p"] * 6, [1000, 1000, 1000, 1000, 1250, 1400])
+        assert cols.stats["p"].mad == 0
+        # floor: 3 × 10% × 1000 = 300 cents
+        assert cols.mad_outlier_mask() == [False, False, False, False, False, True]
+
+    def test_small_and_nonpositive_groups_never_flag(self):
+        cols = PriceColumns(["a", "a", "b", "b", "b"], [100, 99999, 0, 0, 5])
+        assert cols.mad_outlier_mask() == [False] * 5
+        assert cols.iqr_outlier_mask() == [False] * 5
+
+    def test_iqr_mask_skips_zero_prices(self):
+        cols = PriceColumns(["p"] * 5, [1200, 1300, 1400, 0, 140000])
+        assert cols.iqr_outlier_mask() == [False, False, False, False, True]
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_numpy_path_identical(seed, monkeypatch):
+    pytest.importorskip("numpy")
+    keys, prices = _random_columns(seed)
+    basis = [p > 0 and random.Random(seed + i).random() < 0.8 for i, p in enumerate(prices)]
+    monkeypatch.setattr(price_stats, "NUMPY_MIN_ROWS", len(prices) + 1)
+    expected = PriceColumns(keys, prices, basis)
+    monkeypatch.setattr(price_stats, "NUMPY_MIN_ROWS", 0)
+    got = PriceColumns(keys, prices, basis)
+    assert got.use_numpy and not expected.use_numpy
+    assert got.stats == expected.stats
+    assert got.mad_outlier_mask() == expected.mad_outlier_mask()
+    assert got.iqr_outlier_mask() == expected.iqr_outlier_mask()
+
+
+# ===========================================================================
+# 2. Consumers
+# ===========================================================================
+def _legacy_category_outliers(blocks):
+    """cross_item._check_category_price_outliers before Day 164 (indices only)."""
+    by_cat = {}
+    for idx, tb in enumerate(blocks):
+        price = cross_item._extract_primary_price_cents(tb)
+        if tb.get("category") and price > 0:
+            by_cat.setdefault(tb["category"], []).append((idx, price))
+    flagged = set()
+    for members in by_cat.values():
+        if len(members) < 3:
+            continue
+        median = statistics.median([p for _, p in members])
+        if median <= 0:
+            continue
+        mad = statistics.median([abs(p - median) for _, p in members])
+        threshold = 3.0 * max(mad, median * 0.10)
+        flagged |= {idx for idx, p in members if abs(p - median) > threshold}
+    return flagged
+
+
+def _menu(seed, n=200):
+    rng = random.Random(seed)
+    blocks = []
+    for i in range(n):
+        base = rng.choice([899, 1299, 1599, 249])
+        price = base * rng.choice([1, 1, 1, 1, 10, 100]) + rng.choice([0, 50, -50])
+        blocks.append({
+            "merged_text": f"Item {i}",
+            "name": rng.choice(["Cheese Pizza", "Wings", "Add cheese", "Family combo deal"]),
+            "category": rng.choice(["Pizza", "Wings", "Beverages", None]),
+            "price_cents": price if rng.random() < 0.9 else 0,
+            "price_flags": [],
+        })
+    return blocks
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_cross_item_outliers_unchanged(seed):
+    blocks = _menu(seed)
+    cross_item._check_category_price_outliers(blocks)
+    flagged = {i for i, tb in enumerate(blocks)
+               if any(f["reason"] == "cross_item_category_price_outlier" for f in tb["price_flags"])}
+    assert flagged and flagged == _legacy_category_outliers(blocks)
+    details = next(f["details"] for tb in blocks for f in tb["price_flags"])
+    assert details["deviation_cents"] > details["threshold_cents"]
+
+
+def test_price_integrity_decimal_shift_and_standalone_group():
+    items = [{"name": f"Pizza {i}", "category": "Pizza", "price_cents": p}
+             for i, p in enumerate([1500, 1600, 1700, 1650, 160000, 0])]
+    standalone = copy.deepcopy(items)
+    price_integrity.analyze_prices(items)
+    assert items[4]["corrected_price_cents"] == 1600
+    assert items[4]["price_flags"][0]["reason"] == "decimal_shift_corrected"
+    assert items[5]["price_flags"][0]["reason"] == "zero_price_in_group"
+    assert items[0]["price_meta"] == {"group_median_cents": 1650, "group_iqr_cents": 150}
+
+    for it in standalone:
+        it.update(price_flags=[], price_meta={}, price_role="primary")
+    price_integrity._analyze_group(standalone)
+    assert standalone == items
+
+
+def test_price_integrity_stats_from_primary_items():
+    items = [{"name": f"Wings {i}", "category": "Wings", "price_cents": p}
+             for i, p in enumerate([1000, 1100, 1200])]
+    items.append({"name": "Add ranch", "category": "Wings", "price_cents": 99})
+    price_integrity.analyze_prices(items)
+    assert items[3]["price_role"] == "side"
+    assert items[3]["price_meta"]["group_median_cents"] == 1100
+
+
+# ===========================================================================
+# 3. Benchmark
+# ===========================================================================
+def test_bench_smoke():
+    bench = _load_bench()
+    row = bench.run(1, rows=800, groups=10)
+    assert row["identical"] and row["rows"] == 800
+    assert row["mad_outliers"] > 0 and row["iqr_outliers"] > 0
+    assert "identical" in bench.format_report(row)
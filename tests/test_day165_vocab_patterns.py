@@ -0,0 +1,178 @@
+# tests/test_day165_vocab_patterns.py
+"""
+Day 165 — Shared precompiled vocabulary patterns.
+
+Deliverables:
+  1. storage/parsers/regex_trie.py — trie_alternation(): prefix-factored
+     word alternations, same matches as longest-first word lists;
+     SIZE_WORD_RE / COMBO_PATTERN_RE built with it
+  2. storage/parsers/vocab.py — one bundle of compiled size / flavor /
+     style / combo / price patterns; single-scan label_size() and
+     scan_size_mentions(); menu_grammar, variant_engine, price_parser and
+     variant_parser read their patterns from it, output unchanged
+  3. tools/bench_variant_vocab.py — per-label legacy vs vocab benchmark
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import random
+import re
+from pathlib import Path
+
+import pytest
+
+from storage import variant_engine
+from storage.parsers import menu_grammar, vocab
+from storage.parsers.combo_vocab import COMBO_FOODS, COMBO_PATTERN_RE
+from storage.parsers.price_parser import parse_prices
+from storage.parsers.regex_trie import trie_alternation
+from storage.parsers.size_vocab import NUMERIC_SIZE_RE, SIZE_WORD_MAP, SIZE_WORD_RE
+from storage.parsers.variant_parser import parse_variants
+
+_ROOT = Path(__file__).resolve().parents[1]
+
+
+def _load_bench():
+    spec = importlib.util.spec_from_file_location(
+        "bench_variant_vocab", _ROOT / "tools" / "bench_variant_vocab.py")
+    bench = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(bench)
+    return bench
+
+
+_PARTS = (
+    sorted(SIZE_WORD_MAP) + sorted(vocab.STYLE_TOKENS) + sorted(vocab.FLAVOR_TOKENS)
+    + sorted(COMBO_FOODS)
+    + ["10", "6", "31", '5"', "12 in", "14inch", "6pc", "12 pcs", "123in", "7ct",
+       "W/", "with", "x-", "Sm.", "-lg-", "(L)", "12.99", "”", "\t"]
+)
+
+
+def _fuzz(seed, n=3000):
+    rng = random.Random(seed)
+    out = []
+    for _ in range(n):
+        text = "".join(rng.choice(_PARTS) + rng.choice(["", " ", "  ", "-", "/", ".", ", "])
+                       for _ in range(rng.randint(1, 5)))
+        out.append(text.upper() if rng.random() < 0.3 else text)
+    return out
+
+
+# ===========================================================================
+# 1. trie_alternation
+# ===========================================================================
+class TestTrieAlternation:
+    def test_factors_shared_prefixes(self):
+        assert trie_alternation(["s", "sm", "sml", "small"]) == "s(?:m(?:all|l)?)?"
+        assert trie_alternation(["x-large"]) == re.escape("x-large")
+        assert trie_alternation([]) == ""
+
+    def test_prefers_longer_word(self):
+        rx = re.compile(trie_alternation(["fries", "frie", "french fries"]))
+        assert rx.match("fries").group(0) == "fries"
+        assert rx.match("french fries").group(0) == "french fries"
+        # backtracks to the shorter word when a boundary forces it
+        assert re.match(r"(?:" + trie_alternation(["sm", "sml"]) + r")\b", "sm!").group(0) == "sm"
+
+    @pytest.mark.parametrize("seed", range(2))
+    def test_same_matches_as_longest_first(self, seed):
+        def flat(words):
+            return "|".join(re.escape(w) for w in sorted(words, key=len, reverse=True))
+
+        old_size = re.compile(r"\b(" + flat(SIZE_WORD_MAP) + r")\b", re.I)
+        old_combo = re.compile(r"\b(?:w/|with)\s+(" + flat(COMBO_FOODS) + r")\b", re.I)
+        for text in _fuzz(seed):
+            for old, new in ((old_size, SIZE_WORD_RE), (old_combo, COMBO_PATTERN_RE)):
+                assert ([(m.span(), m.group(1)) for m in old.finditer(text)]
+                        == [(m.span(), m.group(1)) for m in new.finditer(text)]), text
+
+
+# ===========================================================================
+# 2. Bundle + consumers
+# ===========================================================================
+class TestLabels:
+    @pytest.mark.parametrize("label, expected", [
+        ("Large 14 inch", ("size", "14in")),
+        ('Large 14"', ("size", "L")),    # no \b after a closing quote
+        ("12 pcs", ("size", "12pc")),
+        ("Sm.", ("size", "S")),
+        ("-lg-", ("size", "L")),
+        ("Party 16", ("size", "Party")),
+        ("Slice 5 18", ("size", "Slice")),
+        ("Combo 5 18", ("size", "18in")),
+        ("W/Fries", ("combo", None)),
+        ("with cheese", ("combo", None)),
+        ("Thin Crust Hot", ("style", None)),
+        ("Honey BBQ", ("flavor", None)),
+        ("Medium", ("size", "M")),
+        ("Pepperoni", ("flavor", None)),
+        ("Combo #2", ("other", None)),
+        ("", ("other", None)),
+    ])
+    def test_classification(self, label, expected):
+        assert variant_engine._infer_variant_kind_and_normalized_size(label) == expected
+
+    @pytest.mark.parametrize("seed", range(2))
+    def test_matches_legacy_rules(self, seed):
+        legacy = _load_bench()._legacy_classify
+        classify = variant_engine._infer_variant_kind_and_normalized_size.__wrapped__
+        for label in _fuzz(seed):
+            assert classify(label) == legacy(label), label
+
+    def test_label_cache(self):
+        classify = variant_engine._infer_variant_kind_and_normalized_size
+        classify.cache_clear()
+        for _ in range(3):
+            classify("Large")
+        assert classify.cache_info().hits == 2
+
+
+class TestMenuLines:
+    @pytest.mark.parametrize("seed", range(2))
+    def test_single_scan_matches_two_scans(self, seed):
+        for text in _fuzz(seed):
+            words, numerics = vocab.scan_size_mentions(text)
+            assert words == [m.group(1) for m in SIZE_WORD_RE.finditer(text)]
+            assert numerics == [(m.group(0), m.group(1)) for m in NUMERIC_SIZE_RE.finditer(text)]
+
+    def test_parse_menu_line_sizes(self):
+        item = menu_grammar.parse_menu_line('Large Pepperoni 6 pc 14in 12.99')
+        assert item.size_mentions == ["Large", "6pc", '14"']
+        header = menu_grammar.parse_menu_line('10" Mini  12" Sml  16" Lrg  Family Size')
+        assert header.line_type == "size_header"
+        assert header.size_mentions == ["Mini", "Sml", "Lrg", "Family Size"]
+
+    def test_grid_columns(self):
+        cols = variant_engine._parse_size_header_columns('10"Mini  12" Sml  Family')
+        assert [c.normalized for c in cols] == ['10" Mini', '12" S', "Family"]
+
+
+def test_phase_a_parsers_unchanged():
+    assert parse_prices("Pizza 12.99 +1.50 2 for $5 MP") == [
+        {"value": 12.99, "type": "base"}, {"value": 1.5, "type": "base"},
+        {"value": 2.0, "type": "base"}, {"value": 5.0, "type": "base"},
+        {"value": 1.5, "type": "delta"},
+        {"value": None, "text": "2 for $5", "type": "deal"},
+    ]
+    # the Day 20 variant patterns escape \b literally and never match plain text
+    assert parse_variants("Small Large Slice") == []
+    assert vocab.PHASE_A_VARIANT_PATTERNS[0] == r"\\b(Small|Medium|Large|XL|XXL)\\b"
+
+
+def test_header_patterns_share_word_list():
+    for word in vocab.HEADER_SIZE_WORDS:
+        assert vocab.SIZE_HEADER_TOKEN_RE.fullmatch(word.upper())
+        assert vocab.GRID_TOKEN_RE.fullmatch(word).group(4) == word
+    assert menu_grammar._SIZE_HEADER_TOKEN_RE is vocab.SIZE_HEADER_TOKEN_RE
+    assert variant_engine._GRID_TOKEN_RE is vocab.GRID_TOKEN_RE
+
+
+# ===========================================================================
+# 3. Benchmark
+# ===========================================================================
+def test_bench_smoke():
+    bench = _load_bench()
+    row = bench.run(1, labels=400)
+    assert row["identical"] and row["labels"] == 400
+    assert "identical" in bench.format_report(row)
@@ -0,0 +1,177 @@
+# tests/test_day166_repair_corrections.py
+"""
+Day 166 — Batched, cached OCR correction candidates for repairs.
+
+Deliverables:
+  1. storage/menu_corrections.py — correct_word() (one token) and
+     correction_table(): every distinct token of many texts corrected
+     once; correct_menu_item(text, table=...) and batch_correct() rebuild
+     names from table lookups, output unchanged
+  2. semantic_confidence — generate_repair_recommendations builds the
+     per-run name → correction candidates from the flagged names once;
+     _is_name_garbled verdicts memoized
+  3. tools/bench_repair_corrections.py — per-item vs token-table benchmark
+"""
+
+from __future__ import annotations
+
+import copy
+import importlib.util
+import random
+from pathlib import Path
+
+import pytest
+
+from storage import menu_corrections, semantic_confidence as sc
+from storage.menu_corrections import correct_menu_item, correct_word, correction_table
+
+_ROOT = Path(__file__).resolve().parents[1]
+
+
+def _load_bench():
+    spec = importlib.util.spec_from_file_location(
+        "bench_repair_corrections", _ROOT / "tools" / "bench_repair_corrections.py")
+    bench = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(bench)
+    return bench
+
+
+_TOKENS = ["Chlcken", "chiken", "PIZZA", "Wlngs", "Sandwlch", "sssseeeccc", "Salnon",
+           "Grllled", "Garden", "Salad", "12", "&", "-", "nnnoooccc", "Pepperonl"]
+
+
+def _names(seed, n=300):
+    rng = random.Random(seed)
+    out = []
+    for _ in range(n):
+        name = " ".join(rng.choice(_TOKENS) for _ in range(rng.randint(1, 4)))
+        out.append(name.upper() if rng.random() < 0.2 else name)
+    return out
+
+
+def _items(seed, n=400):
+    rng = random.Random(seed)
+    names = _names(seed, 60)
+    return [{
+        "name": rng.choice(names),
+        "semantic_tier": rng.choice(["high", "medium", "low", "reject"]),
+        "semantic_confidence_details": {
+            "name_quality_score": rng.choice([0.2, 0.5, 0.9]),
+            "price_score": 1.0, "variant_score": 1.0, "flag_penalty_score": 1.0,
+        },
+        "price_flags": [],
+    } for _ in range(n)]
+
+
+def _legacy_correction(name):
+    corrected = correct_menu_item(name)
+    return corrected if corrected and corrected != name else None
+
+
+# ===========================================================================
+# 1. menu_corrections
+# ===========================================================================
+class TestCorrectionTable:
+    def test_correct_word_layers_and_case(self):
+        assert correct_word("chlcken") == "chicken"
+        assert correct_word("CHLCKEN") == "CHICKEN"
+        assert correct_word("Chlcken") == "Chicken"
+        assert correct_word("Salad") == "Salad"
+
+    def test_table_holds_distinct_alpha_tokens(self):
+        table = correction_table(["Grllled Chlcken", "Chlcken & Wlngs 12", None, ""])
+        assert set(table) == {"Grllled", "Chlcken", "Wlngs"}
+        assert table["Chlcken"] == "Chicken"
+
+    @pytest.mark.parametrize("seed", range(2))
+    def test_lookups_match_per_name_correction(self, seed):
+        names = _names(seed)
+        expected = [correct_menu_item(n) for n in names]
+        table = correction_table(names)
+        assert [correct_menu_item(n, table=table) for n in names] == expected
+        assert menu_corrections.batch_correct(names) == [
+            (n, c, c != n) for n, c in zip(names, expected)]
+
+    def test_words_missing_from_table_still_corrected(self):
+        assert correct_menu_item("Chlcken Sandwlch", table={"Chlcken": "Chicken"}) == "Chicken Sandwich"
+
+
+# ===========================================================================
+# 2. semantic_confidence
+# ===========================================================================
+class TestRepairCandidates:
+    def test_candidates_match_per_name(self):
+        names = _names(5, 100)
+        candidates = sc._ocr_correction_candidates(names + [None, ""])
+        assert list(candidates) == list(dict.fromkeys(names))
+        assert all(candidates[n] == _legacy_correction(n) for n in names)
+
+    def test_name_to_correct_follows_builder_branches(self):
+        def item(name, score=0.2, tier="low"):
+            return {"name": name, "semantic_tier": tier,
+                    "semantic_confidence_details": {"name_quality_score": score}}
+        assert sc._name_to_correct(item("sssseeeccc")) == "sssseeeccc"       # garbled
+        assert sc._name_to_correct(item("Grllled Chlcken")) == "Grllled Chlcken"
+        assert sc._name_to_correct(item("GRLLLED CHLCKEN")) is None          # all-caps rec
+        assert sc._name_to_correct(item("Ab")) is None                       # short-name rec
+        assert sc._name_to_correct(item("Grllled Chlcken", score=0.9)) is None
+        assert sc._name_to_correct(item("Grllled Chlcken", tier="high")) is None
+
+    @pytest.mark.parametrize("seed", range(2))
+    def test_name_to_correct_is_what_builder_corrects(self, seed, monkeypatch):
+        # both read _name_repair_kind, so up-front and on-demand sets agree
+        tried = []
+        monkeypatch.setattr(sc, "_try_ocr_correction",
+                            lambda name, candidates=None: tried.append(name))
+        for it in _items(seed) + [dict(_items(seed, 1)[0], name="", semantic_tier="low")]:
+            tried.clear()
+            priority = sc._TIER_TO_PRIORITY.get(it.get("semantic_tier", "reject"))
+            if priority is not None:
+                sc._build_name_recommendations(
+                    it, priority, it.get("semantic_confidence_details") or {})
+            expected = sc._name_to_correct(it)
+            assert tried == ([expected] if expected else [])
+
+    @pytest.mark.parametrize("seed", range(2))
+    def test_recommendations_unchanged(self, seed, monkeypatch):
+        items = _items(seed)
+        legacy = copy.deepcopy(items)
+
+        sc.generate_repair_recommendations(items)
+        repaired = sc.apply_auto_repairs(items)
+
+        # Pre-Day-166 behaviour: no shared candidates, every name corrected on demand.
+        monkeypatch.setattr(sc, "_ocr_correction_candidates", lambda names: {})
+        sc.generate_repair_recommendations(legacy)
+        assert sc.apply_auto_repairs(legacy) == repaired
+        assert legacy == items
+        assert any(r.get("proposed_fix") for it in items for r in it["repair_recommendations"]
+                   if r["type"] == "garbled_name")
+
+    def test_corrections_once_per_distinct_token(self, monkeypatch):
+        calls = []
+        real = menu_corrections.correct_word
+        monkeypatch.setattr(menu_corrections, "correct_word",
+                            lambda w, use_fuzzy=True: calls.append(w) or real(w, use_fuzzy))
+        items = [{"name": "Grllled Chlcken Sandwlch", "semantic_tier": "low",
+                  "semantic_confidence_details": {"name_quality_score": 0.3}} for _ in range(50)]
+        sc.generate_repair_recommendations(items)
+        assert sorted(calls) == ["Chlcken", "Grllled", "Sandwlch"]
+        assert items[0]["repair_recommendations"][0]["proposed_fix"] == "Grilled Chicken Sandwich"
+
+    def test_garble_verdict_memoized(self):
+        sc._is_name_garbled.cache_clear()
+        for _ in range(3):
+            assert sc._is_name_garbled("ssseeecccc")
+        assert sc._is_name_garbled.cache_info().hits == 2
+
+
+# ===========================================================================
+# 3. Benchmark
+# ===========================================================================
+def test_bench_smoke():
+    bench = _load_bench()
+    row = bench.run(1, items=300, distinct=30)
+    assert row["identical"] and row["items"] == 300
+    assert row["corrections"] > 0
+    assert "identical" in bench.format_report(row)
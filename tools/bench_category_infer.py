@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""Benchmark category keyword scoring: per-keyword scans vs. the Day 159 automaton.
+
+Usage:
+    python tools/bench_category_infer.py               # 1000 / 5000 / 20000 items
+    python tools/bench_category_infer.py --items 2000 --seed 7
+
+Builds a synthetic pizzeria-style menu (names and descriptions drawn from
+the category keyword tables plus filler words) and times:
+
+  keyword scoring — the keyword + phrase part of infer_category_for_text
+                    for every item: one substring test per keyword per
+                    category (pre-Day-159) vs. one KeywordAutomaton pass
+                    over name and description
+  apply           — apply_inference_to_items end to end with either scorer
+
+Reports wall time per mode and whether both produce identical items.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, _ROOT)
+
+from storage import category_infer  # noqa: E402
+
+_FILLER = ["with", "and", "served", "fresh", "large", "small", "house", "classic",
+           "tomato", "onions", "peppers", "mozzarella", "sauce", "crispy", "topped",
+           "homemade", "side", "of", "our", "famous", "pecan", "apple", "pierogi"]
+
+
+def menu(n: int, seed: int = 159) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    keywords = sorted({kw for kws in category_infer.CATEGORY_KEYWORDS.values() for kw in kws})
+    phrases = sorted({p for ps in category_infer.CATEGORY_PHRASES.values() for p, _ in ps})
+    items = []
+    for _ in range(n):
+        name = [rng.choice(_FILLER)] if rng.random() < 0.5 else []
+        name.append(rng.choice(phrases) if rng.random() < 0.3 else rng.choice(keywords))
+        desc = [rng.choice(_FILLER + keywords) for _ in range(rng.randint(0, 12))]
+        items.append({
+            "name": " ".join(name).title(),
+            "description": " ".join(desc),
+            "price_cents": rng.choice((0, 199, 899, 1299, 1899, 2999)),
+            "category": rng.choice((None, None, "", "Uncategorized", "Pizza", "Wings")),
+        })
+    return items
+
+
+def _scan_text_scores(name_norm: str, desc_norm: str) -> Dict[str, int]:
+    """The pre-Day-159 loops: every keyword / phrase tested against both texts."""
+    scores: Dict[str, int] = {}
+    for category, keywords in category_infer.CATEGORY_KEYWORDS.items():
+        score = 0
+        for kw in keywords:
+            if kw in name_norm:
+                score += 4
+            if kw in desc_norm:
+                score += 2
+        for phrase, weight in category_infer.CATEGORY_PHRASES.get(category, ()):
+            if phrase in name_norm:
+                score += weight * 3
+            if phrase in desc_norm:
+                score += weight
+        if score:
+            scores[category] = score
+    return scores
+
+
+def _timed(fn) -> float:
+    t0 = time.perf_counter()
+    fn()
+    return (time.perf_counter() - t0) * 1000.0
+
+
+def run(sizes: List[int], *, seed: int = 159) -> List[Dict[str, Any]]:
+    """One row per menu size."""
+    results = []
+    automaton = category_infer._text_scores
+    norm = category_infer._norm
+    category_infer._get_keyword_tables()  # built once per process, not per run
+    for n in sizes:
+        items = menu(n, seed)
+        texts = [(norm(it["name"]), norm(it["description"])) for it in items]
+
+        scan_ms = _timed(lambda: [_scan_text_scores(a, b) for a, b in texts])
+        automaton_ms = _timed(lambda: [automaton(a, b) for a, b in texts])
+        same_scores = all(
+            {k: v for k, v in automaton(a, b).items() if v} == _scan_text_scores(a, b)
+            for a, b in texts)
+
+        category_infer._text_scores = _scan_text_scores
+        try:
+            apply_scan_ms = _timed(lambda: category_infer.apply_inference_to_items(items))
+            expected = category_infer.apply_inference_to_items(items)
+        finally:
+            category_infer._text_scores = automaton
+        apply_ms = _timed(lambda: category_infer.apply_inference_to_items(items))
+        got = category_infer.apply_inference_to_items(items)
+
+        results.append({
+            "items": n,
+            "scoring_scan_ms": round(scan_ms, 1),
+            "scoring_automaton_ms": round(automaton_ms, 1),
+            "apply_scan_ms": round(apply_scan_ms, 1),
+            "apply_automaton_ms": round(apply_ms, 1),
+            "identical": same_scores and got == expected,
+        })
+    return results
+
+
+def format_report(rows: List[Dict[str, Any]]) -> str:
+    lines = [f"{'items':>6} {'scoring scan ms':>16} {'automaton ms':>13} "
+             f"{'apply scan ms':>14} {'automaton ms':>13} identical"]
+    for r in rows:
+        lines.append(f"{r['items']:>6} {r['scoring_scan_ms']:>16} {r['scoring_automaton_ms']:>13} "
+                     f"{r['apply_scan_ms']:>14} {r['apply_automaton_ms']:>13} {r['identical']}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    ap.add_argument("--items", type=int, nargs="+", default=[1000, 5000, 20000])
+    ap.add_argument("--seed", type=int, default=159)
+    ap.add_argument("--json", action="store_true", help="print JSON instead of a table")
+    args = ap.parse_args(argv)
+
+    rows = run(args.items, seed=args.seed)
+    print(json.dumps(rows, indent=2) if args.json else format_report(rows))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""Benchmark near-duplicate name detection: all pairs vs. the Day 157 index.
+
+Usage:
+    python tools/bench_cross_item_duplicates.py             # 100 .. 5000 items
+    python tools/bench_cross_item_duplicates.py --sizes 400 2000 --seed 7
+
+Builds a synthetic catering / bar style menu of N items (modifier +
+dish + style names, ~8% OCR-style typos of earlier items, a few exact
+repeats) and runs cross_item._check_duplicate_names twice:
+
+  all_pairs — every pair of names through SequenceMatcher (pre-Day-157)
+  indexed   — _fuzzy_candidate_pairs() prefix filter, then SequenceMatcher
+
+Reports wall time, pairs compared, and whether both runs produced the same
+price_flags on every item.
+"""
+import argparse
+import copy
+import json
+import os
+import random
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, _ROOT)
+
+from storage import cross_item  # noqa: E402
+
+_MODIFIERS = ["Grilled", "Crispy", "Spicy", "Smoked", "Roasted", "Blackened", "Honey",
+              "Garlic", "Buffalo", "Lemon", "Pesto", "Teriyaki", "Cajun", "BBQ", "Truffle",
+              "Sesame", "Chipotle", "Maple", "Jalapeno", "Herb"]
+_DISHES = ["Chicken Wings", "Salmon", "Shrimp Tacos", "Pork Belly", "Tofu Bowl",
+           "Margherita Pizza", "Caesar Salad", "Burger", "Flatbread", "Meatballs",
+           "Calamari", "Brisket", "Sliders", "Quesadilla", "Risotto", "Gnocchi",
+           "Ribeye", "Nachos", "Lager", "IPA", "Old Fashioned", "Margarita", "Mojito",
+           "Cabernet", "Pinot Noir", "Negroni", "Espresso Martini", "Mule"]
+_STYLES = ["", "", "Platter", "Tray (serves 10)", "Half Pan", "Full Pan", "Pitcher",
+           "Flight", "Bucket", "Skewers"]
+
+
+def _typo(rng: random.Random, name: str) -> str:
+    i = rng.randrange(1, len(name) - 1)
+    op = rng.choice(("drop", "double", "swap", "replace"))
+    if op == "drop":
+        return name[:i] + name[i + 1:]
+    if op == "double":
+        return name[:i] + name[i] + name[i:]
+    if op == "swap":
+        return name[:i - 1] + name[i] + name[i - 1] + name[i + 1:]
+    return name[:i] + rng.choice("aeilnorst") + name[i + 1:]
+
+
+def corpus(n: int, seed: int = 157) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    names: List[str] = []
+    for _ in range(n):
+        roll = rng.random()
+        if names and roll < 0.08:
+            names.append(_typo(rng, rng.choice(names)))
+        elif names and roll < 0.10:
+            names.append(rng.choice(names))
+        else:
+            parts = [rng.choice(_MODIFIERS), rng.choice(_DISHES), rng.choice(_STYLES)]
+            names.append(" ".join(p for p in parts if p))
+    return [
+        {"name": name, "price_cents": rng.choice((899, 1299, 1599, 4500, 8900)),
+         "price_flags": []}
+        for name in names
+    ]
+
+
+def _all_pairs(names: List[str]):
+    return [(i, j) for i in range(len(names)) for j in range(i + 1, len(names))]
+
+
+def _run(blocks: List[Dict[str, Any]], candidates) -> Dict[str, Any]:
+    blocks = copy.deepcopy(blocks)
+    compared = []
+    orig = cross_item._fuzzy_candidate_pairs
+
+    def counting(names):
+        pairs = candidates(names)
+        compared.append(len(pairs))
+        return pairs
+    cross_item._fuzzy_candidate_pairs = counting
+    try:
+        t0 = time.perf_counter()
+        cross_item._check_duplicate_names(blocks)
+        ms = (time.perf_counter() - t0) * 1000.0
+    finally:
+        cross_item._fuzzy_candidate_pairs = orig
+    return {"ms": ms, "pairs": compared[0], "flags": [b["price_flags"] for b in blocks]}
+
+
+def run(sizes: List[int], *, seed: int = 157) -> List[Dict[str, Any]]:
+    """Both candidate strategies per size; one row per size."""
+    results = []
+    indexed_fn = cross_item._fuzzy_candidate_pairs
+    for n in sizes:
+        blocks = corpus(n, seed)
+        slow = _run(blocks, _all_pairs)
+        fast = _run(blocks, indexed_fn)
+        results.append({
+            "items": n,
+            "all_pairs_ms": round(slow["ms"], 1),
+            "indexed_ms": round(fast["ms"], 1),
+            "all_pairs_compared": slow["pairs"],
+            "indexed_compared": fast["pairs"],
+            "flagged_items": sum(1 for f in fast["flags"] if f),
+            "identical": slow["flags"] == fast["flags"],
+        })
+    return results
+
+
+def format_report(rows: List[Dict[str, Any]]) -> str:
+    lines = [f"{'items':>6} {'all-pairs ms':>13} {'indexed ms':>11} "
+             f"{'pairs (all)':>12} {'pairs (idx)':>12} {'flagged':>8} identical"]
+    for r in rows:
+        lines.append(f"{r['items']:>6} {r['all_pairs_ms']:>13} {r['indexed_ms']:>11} "
+                     f"{r['all_pairs_compared']:>12} {r['indexed_compared']:>12} "
+                     f"{r['flagged_items']:>8} {r['identical']}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    ap.add_argument("--sizes", type=int, nargs="+", default=[100, 400, 1000, 2500, 5000])
+    ap.add_argument("--seed", type=int, default=157)
+    ap.add_argument("--json", action="store_true", help="print JSON instead of a table")
+    args = ap.parse_args(argv)
+
+    rows = run(args.sizes, seed=args.seed)
+    print(json.dumps(rows, indent=2) if args.json else format_report(rows))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""Measure editor read latency while a background import is writing.
+
+Usage:
+    python tools/bench_db_concurrency.py
+    python tools/bench_db_concurrency.py --seconds 5 --readers 4 --json
+
+Runs the same workload twice against scratch databases:
+
+  legacy  — fresh sqlite3.connect() per call, rollback journal (pre-Day 147)
+  pooled  — storage/db_pool connections (WAL, tuned pragmas, reuse)
+
+One writer thread mimics the import finalize step (one INSERT per item,
+200 items per transaction); reader threads mimic the editor loading a
+draft page.  Reports read latency percentiles, reads that failed with
+"database is locked", and writer throughput.
+"""
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, _ROOT)
+
+from storage import db_pool  # noqa: E402
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS draft_items (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    draft_id    INTEGER NOT NULL,
+    name        TEXT NOT NULL,
+    description TEXT,
+    price_cents INTEGER NOT NULL DEFAULT 0,
+    category    TEXT,
+    position    INTEGER,
+    created_at  TEXT NOT NULL,
+    updated_at  TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_items_draft ON draft_items(draft_id);
+"""
+
+_READ_SQL = ("SELECT * FROM draft_items WHERE draft_id = ? "
+             "ORDER BY position, id LIMIT 200")
+_WRITE_SQL = ("INSERT INTO draft_items (draft_id, name, description, price_cents, "
+              "category, position, created_at, updated_at) "
+              "VALUES (?, ?, ?, ?, ?, ?, datetime('now'), datetime('now'))")
+_BATCH = 200
+
+
+def _legacy_connect(path: Path) -> Callable[[], sqlite3.Connection]:
+    def connect() -> sqlite3.Connection:
+        conn = sqlite3.connect(path)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA foreign_keys = ON;")
+        return conn
+    return connect
+
+
+def _pooled_connect(path: Path) -> Callable[[], sqlite3.Connection]:
+    return lambda: db_pool.connect(path)
+
+
+def _percentiles(samples: List[float]) -> Dict[str, float]:
+    if not samples:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+    s = sorted(samples)
+
+    def pct(p: float) -> float:
+        return round(s[min(len(s) - 1, int(p * len(s)))], 3)
+    return {"p50": pct(0.50), "p95": pct(0.95), "p99": pct(0.99), "max": round(s[-1], 3)}
+
+
+def _seed(path: Path, mode: str, n: int) -> None:
+    conn = sqlite3.connect(path)
+    if mode == "legacy":
+        conn.execute("PRAGMA journal_mode = DELETE")
+    conn.executescript(_SCHEMA)
+    conn.executemany(_WRITE_SQL, [
+        (1, f"Seed item {i}", "seeded", 1000 + i, f"Cat {i % 12}", i) for i in range(n)
+    ])
+    conn.commit()
+    conn.close()
+
+
+def run(mode: str, path: Path, *, seconds: float = 3.0, readers: int = 4,
+        seed_items: int = 2000) -> Dict[str, Any]:
+    """Run one mode; returns latency/throughput numbers."""
+    if mode not in ("legacy", "pooled"):
+        raise ValueError(f"unknown mode: {mode}")
+    path = Path(path)
+    _seed(path, mode, seed_items)
+    connect = _legacy_connect(path) if mode == "legacy" else _pooled_connect(path)
+
+    stop = threading.Event()
+    lock = threading.Lock()
+    latencies: List[float] = []
+    counters = {"read_errors": 0, "rows_written": 0, "write_errors": 0}
+
+    def writer() -> None:
+        pos = seed_items
+        while not stop.is_set():
+            try:
+                with connect() as conn:
+                    for _ in range(_BATCH):
+                        conn.execute(_WRITE_SQL, (2, f"Imported {pos}", "import", 999, "Cat", pos))
+                        pos += 1
+                with lock:
+                    counters["rows_written"] += _BATCH
+            except sqlite3.OperationalError:
+                with lock:
+                    counters["write_errors"] += 1
+
+    def reader() -> None:
+        mine: List[float] = []
+        while not stop.is_set():
+            t0 = time.perf_counter()
+            try:
+                with connect() as conn:
+                    conn.execute(_READ_SQL, (1,)).fetchall()
+                mine.append((time.perf_counter() - t0) * 1000.0)
+            except sqlite3.OperationalError:
+                with lock:
+                    counters["read_errors"] += 1
+        with lock:
+            latencies.extend(mine)
+
+    threads = [threading.Thread(target=writer)] + [
+        threading.Thread(target=reader) for _ in range(readers)]
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+
+    return {
+        "mode": mode,
+        "seconds": seconds,
+        "readers": readers,
+        "reads": len(latencies),
+        "reads_per_s": round(len(latencies) / seconds, 1),
+        "read_ms": _percentiles(latencies),
+        **counters,
+    }
+
+
+def format_report(results: List[Dict[str, Any]]) -> str:
+    lines = [f"{'mode':<8} {'reads/s':>9} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8} "
+             f"{'locked':>7} {'rows written':>13}"]
+    for r in results:
+        ms = r["read_ms"]
+        lines.append(f"{r['mode']:<8} {r['reads_per_s']:>9} {ms['p50']:>8} {ms['p95']:>8} "
+                     f"{ms['p99']:>8} {ms['max']:>8} {r['read_errors']:>7} "
+                     f"{r['rows_written']:>13}")
+    lines.append("(read latency in ms)")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    ap.add_argument("--seconds", type=float, default=3.0)
+    ap.add_argument("--readers", type=int, default=4)
+    ap.add_argument("--seed-items", type=int, default=2000)
+    ap.add_argument("--json", action="store_true", help="print JSON instead of a table")
+    args = ap.parse_args(argv)
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="servline_dbbench_") as tmp:
+        for mode in ("legacy", "pooled"):
+            results.append(run(mode, Path(tmp) / f"{mode}.db", seconds=args.seconds,
+                               readers=args.readers, seed_items=args.seed_items))
+        db_pool.close_all()
+
+    print(json.dumps(results, indent=2) if args.json else format_report(results))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
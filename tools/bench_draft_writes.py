@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""Benchmark draft item writes: per-row statements vs. the Day 148 bulk path.
+
+Usage:
+    python tools/bench_draft_writes.py                 # 1k and 10k items
+    python tools/bench_draft_writes.py --sizes 300 --variants 4
+
+For each size, writes N items with V size variants each into a scratch
+database twice:
+
+  per_row — one INSERT per item and per variant, lastrowid per row, variant
+            delete+reinsert per item on update (the pre-Day-148 loop)
+  bulk    — drafts._insert_items_bulk() / upsert_draft_items()
+
+"insert" mirrors the import finalize step; "update" mirrors an editor save
+that resends every item with its variants.
+"""
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, _ROOT)
+
+from storage import db_pool  # noqa: E402
+from storage import drafts  # noqa: E402
+
+_SCHEMA = Path(_ROOT) / "storage" / "schema.sql"
+
+
+def _payload(n: int, variants: int) -> List[Dict[str, Any]]:
+    return [
+        {
+            "name": f"Item {i}",
+            "description": "Bench item",
+            "price_cents": 900 + i % 500,
+            "category": f"Cat {i % 15}",
+            "position": i,
+            "_variants": [
+                {"label": f"Size {k}", "price_cents": 900 + k * 200, "kind": "size", "position": k}
+                for k in range(variants)
+            ],
+        }
+        for i in range(n)
+    ]
+
+
+def _per_row_write(draft_id: int, items: List[Dict[str, Any]]) -> List[int]:
+    """The pre-Day-148 statement pattern, kept here as the reference."""
+    ids: List[int] = []
+    with drafts.db_connect() as conn:
+        cur = conn.cursor()
+        for it in items:
+            norm = drafts._normalize_item_for_db(it)
+            item_id = it.get("id")
+            if item_id:
+                cur.execute(
+                    "UPDATE draft_items SET name=?, description=?, price_cents=?, "
+                    "category=COALESCE(?, category), position=COALESCE(?, position), "
+                    "updated_at=? WHERE id=? AND draft_id=?",
+                    (norm["name"], norm["description"], norm["price_cents"],
+                     norm["category"], norm["position"], drafts._now(), item_id, draft_id),
+                )
+                cur.execute("DELETE FROM draft_item_variants WHERE item_id=?", (item_id,))
+            else:
+                cur.execute(
+                    "INSERT INTO draft_items (draft_id, name, description, price_cents, "
+                    "category, position, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (draft_id, norm["name"], norm["description"], norm["price_cents"],
+                     norm["category"], norm["position"], drafts._now(), drafts._now()),
+                )
+                item_id = int(cur.lastrowid)
+            ids.append(item_id)
+            for v in it.get("_variants") or []:
+                vn = drafts._normalize_variant_for_db(v)
+                cur.execute(
+                    "INSERT INTO draft_item_variants (item_id, label, price_cents, kind, "
+                    "position, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (item_id, vn["label"], vn["price_cents"], vn["kind"], vn["position"],
+                     drafts._now(), drafts._now()),
+                )
+        conn.commit()
+    return ids
+
+
+def _bulk_insert(draft_id: int, items: List[Dict[str, Any]]) -> List[int]:
+    return drafts._insert_items_bulk(draft_id, items)
+
+
+def _bulk_update(draft_id: int, items: List[Dict[str, Any]]) -> List[int]:
+    return drafts.upsert_draft_items(draft_id, items)["updated_ids"]
+
+
+def _timed(fn, *args) -> (float, Any):
+    t0 = time.perf_counter()
+    out = fn(*args)
+    return (time.perf_counter() - t0) * 1000.0, out
+
+
+def run(sizes: List[int], workdir: Path, *, variants: int = 3) -> List[Dict[str, Any]]:
+    """Run both write paths for each size; returns one row per (size, path)."""
+    results = []
+    orig_path = drafts.DB_PATH
+    try:
+        for n in sizes:
+            for path_name in ("per_row", "bulk"):
+                drafts.DB_PATH = Path(workdir) / f"bench_{path_name}_{n}.db"
+                drafts._ensure_schema()
+                raw = sqlite3.connect(drafts.DB_PATH)
+                raw.executescript(_SCHEMA.read_text(encoding="utf-8"))
+                raw.close()
+                draft_id = drafts._insert_draft(title=f"bench {n}", restaurant_id=None)
+                items = _payload(n, variants)
+                insert = _per_row_write if path_name == "per_row" else _bulk_insert
+                update = _per_row_write if path_name == "per_row" else _bulk_update
+
+                insert_ms, ids = _timed(insert, draft_id, items)
+                for it, iid in zip(items, ids):
+                    it["id"] = iid
+                    it["name"] += " (edited)"
+                update_ms, _ = _timed(update, draft_id, items)
+                results.append({
+                    "items": n,
+                    "variants_per_item": variants,
+                    "path": path_name,
+                    "insert_ms": round(insert_ms, 1),
+                    "update_ms": round(update_ms, 1),
+                })
+    finally:
+        drafts.DB_PATH = orig_path
+        db_pool.close_all()
+    return results
+
+
+def format_report(rows: List[Dict[str, Any]]) -> str:
+    lines = [f"{'items':>7} {'path':<8} {'insert ms':>10} {'update ms':>10}"]
+    for r in rows:
+        lines.append(f"{r['items']:>7} {r['path']:<8} {r['insert_ms']:>10} {r['update_ms']:>10}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    ap.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    ap.add_argument("--variants", type=int, default=3)
+    ap.add_argument("--json", action="store_true", help="print JSON instead of a table")
+    args = ap.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="servline_writebench_") as tmp:
+        rows = run(args.sizes, Path(tmp), variants=args.variants)
+    print(json.dumps(rows, indent=2) if args.json else format_report(rows))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
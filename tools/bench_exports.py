@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""Benchmark draft exports: buffered bodies vs. the Day 155 streamed path.
+
+Usage:
+    python tools/bench_exports.py                      # 20k-item catalog
+    python tools/bench_exports.py --items 5000 --variants 2
+
+Seeds a scratch database with one N-item draft (V size variants per item)
+and builds each export body twice:
+
+  buffered — get_draft_items() + StringIO / json.dumps(indent=2) /
+             a regular openpyxl Workbook (the pre-Day-155 routes)
+  streamed — iter_draft_items() + portal/export_stream.py generators /
+             Workbook(write_only=True)
+
+Reported per format: time to first byte, total time, and peak Python
+memory (tracemalloc, measured in a separate pass so it does not skew the
+timings).  CSV and JSON bodies are byte-compared.  XLSX runs only when
+openpyxl is installed; its "first byte" is the finished workbook, since a
+zip cannot be sent before its directory is written.
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, _ROOT)
+
+from portal import export_stream  # noqa: E402
+from storage import db_pool  # noqa: E402
+from storage import drafts  # noqa: E402
+
+_SCHEMA = Path(_ROOT) / "storage" / "schema.sql"
+_CSV_HEADER = ["id", "name", "description", "price_cents", "category", "position"]
+
+
+def _payload(n: int, variants: int) -> List[Dict[str, Any]]:
+    return [
+        {
+            "name": f"Item {i}",
+            "description": "Bench item with a description of typical length",
+            "price_cents": 900 + i % 500,
+            "category": f"Cat {i % 15}",
+            "position": i,
+            "_variants": [
+                {"label": f"Size {k}", "price_cents": 900 + k * 200, "kind": "size", "position": k}
+                for k in range(variants)
+            ],
+        }
+        for i in range(n)
+    ]
+
+
+def _csv_row(it: Dict[str, Any]) -> List[Any]:
+    return [it.get("id"), it.get("name", ""), it.get("description", ""),
+            it.get("price_cents", 0), it.get("category") or "",
+            it.get("position") if it.get("position") is not None else ""]
+
+
+def _json_item(it: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": it.get("id"),
+        "name": it.get("name", ""),
+        "price_cents": it.get("price_cents", 0),
+        "category": it.get("category") or "",
+        "variants": [{"label": v.get("label", ""), "price_cents": v.get("price_cents", 0)}
+                     for v in (it.get("variants") or [])],
+    }
+
+
+# -- buffered (pre-Day-155) bodies -------------------------------------------
+def _csv_buffered(draft_id: int) -> Iterator[bytes]:
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(_CSV_HEADER)
+    for it in drafts.get_draft_items(draft_id):
+        writer.writerow(_csv_row(it))
+    yield buf.getvalue().encode("utf-8-sig")
+
+
+def _json_buffered(draft_id: int) -> Iterator[bytes]:
+    payload = {"draft_id": draft_id,
+               "items": [_json_item(it) for it in drafts.get_draft_items(draft_id)]}
+    yield json.dumps(payload, indent=2).encode("utf-8")
+
+
+def _xlsx_body(draft_id: int, *, write_only: bool) -> Iterator[bytes]:
+    import openpyxl as xl  # type: ignore[import]
+    wb = xl.Workbook(write_only=write_only)
+    ws = wb.create_sheet("Bench") if write_only else wb.active
+    items = (drafts.iter_draft_items(draft_id) if write_only
+             else drafts.get_draft_items(draft_id))
+    ws.append(["name", "description", "price_cents", "category"])
+    for it in items:
+        ws.append([it["name"], it["description"], it["price_cents"], it["category"]])
+        for v in it.get("variants") or []:
+            ws.append(["  " + v["label"], v["kind"], v["price_cents"], ""])
+    with tempfile.TemporaryFile() as fh:
+        wb.save(fh)
+        fh.seek(0)
+        yield from iter(lambda: fh.read(export_stream.FILE_CHUNK_BYTES), b"")
+
+
+# -- streamed (Day 155) bodies ---------------------------------------------
+def _csv_streamed(draft_id: int) -> Iterator[bytes]:
+    return export_stream.csv_stream(
+        _CSV_HEADER, (_csv_row(it) for it in drafts.iter_draft_items(draft_id)))
+
+
+def _json_streamed(draft_id: int) -> Iterator[bytes]:
+    return export_stream.json_stream(
+        {"draft_id": draft_id, "items": None}, "items",
+        (_json_item(it) for it in drafts.iter_draft_items(draft_id)))
+
+
+def _consume(make_body: Callable[[int], Iterator[bytes]], draft_id: int) -> Dict[str, Any]:
+    drafts.clear_item_cache()  # both paths start cold
+    t0 = time.perf_counter()
+    first_ms = None
+    size = 0
+    for chunk in make_body(draft_id):
+        if first_ms is None:
+            first_ms = (time.perf_counter() - t0) * 1000.0
+        size += len(chunk)
+    return {"first_ms": first_ms or 0.0, "total_ms": (time.perf_counter() - t0) * 1000.0,
+            "bytes": size}
+
+
+def _peak_kib(make_body: Callable[[int], Iterator[bytes]], draft_id: int) -> int:
+    drafts.clear_item_cache()
+    tracemalloc.start()
+    try:
+        for _chunk in make_body(draft_id):
+            pass
+        return tracemalloc.get_traced_memory()[1] // 1024
+    finally:
+        tracemalloc.stop()
+
+
+def _body(make_body: Callable[[int], Iterator[bytes]], draft_id: int) -> bytes:
+    drafts.clear_item_cache()
+    return b"".join(make_body(draft_id))
+
+
+def run(items: int = 20000, workdir: Optional[Path] = None, *,
+        variants: int = 3) -> List[Dict[str, Any]]:
+    """Build every export both ways; returns one row per format."""
+    formats = [("csv", _csv_buffered, _csv_streamed),
+               ("json", _json_buffered, _json_streamed)]
+    try:
+        import openpyxl  # type: ignore[import]  # noqa: F401
+        formats.append(("xlsx", lambda d: _xlsx_body(d, write_only=False),
+                        lambda d: _xlsx_body(d, write_only=True)))
+    except ImportError:
+        pass
+
+    results = []
+    orig_path = drafts.DB_PATH
+    with tempfile.TemporaryDirectory(prefix="servline_exportbench_") as tmp:
+        try:
+            drafts.DB_PATH = Path(workdir or tmp) / f"bench_exports_{items}.db"
+            drafts._ensure_schema()
+            raw = sqlite3.connect(drafts.DB_PATH)
+            raw.executescript(_SCHEMA.read_text(encoding="utf-8"))
+            raw.close()
+            draft_id = drafts._insert_draft(title=f"bench {items}", restaurant_id=None)
+            drafts._insert_items_bulk(draft_id, _payload(items, variants))
+
+            for name, buffered, streamed in formats:
+                row: Dict[str, Any] = {"format": name, "items": items,
+                                       "variants_per_item": variants}
+                for label, make_body in (("buffered", buffered), ("streamed", streamed)):
+                    timing = _consume(make_body, draft_id)
+                    row[f"{label}_first_ms"] = round(timing["first_ms"], 1)
+                    row[f"{label}_total_ms"] = round(timing["total_ms"], 1)
+                    row[f"{label}_peak_kib"] = _peak_kib(make_body, draft_id)
+                    row[f"{label}_bytes"] = timing["bytes"]
+                if name != "xlsx":
+                    row["identical"] = _body(buffered, draft_id) == _body(streamed, draft_id)
+                results.append(row)
+        finally:
+            drafts.DB_PATH = orig_path
+            drafts.clear_item_cache()
+            db_pool.close_all()
+    return results
+
+
+def format_report(rows: List[Dict[str, Any]], *, items: int) -> str:
+    lines = [f"{items} items",
+             f"{'format':<6} {'path':<9} {'first byte ms':>14} {'total ms':>9} {'peak KiB':>9}"]
+    for r in rows:
+        for label in ("buffered", "streamed"):
+            lines.append(f"{r['format']:<6} {label:<9} {r[f'{label}_first_ms']:>14} "
+                         f"{r[f'{label}_total_ms']:>9} {r[f'{label}_peak_kib']:>9}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    ap.add_argument("--items", type=int, default=20000)
+    ap.add_argument("--variants", type=int, default=3)
+    ap.add_argument("--json", action="store_true", help="print JSON instead of a table")
+    args = ap.parse_args(argv)
+
+    rows = run(args.items, variants=args.variants)
+    print(json.dumps(rows, indent=2) if args.json else format_report(rows, items=args.items))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""Benchmark OCR name correction: linear vocabulary scan vs. the Day 158 index.
+
+Usage:
+    python tools/bench_menu_corrections.py              # 200 / 1000 / 3000 lines
+    python tools/bench_menu_corrections.py --lines 500 --seed 7
+
+Builds a synthetic OCR'd menu (2-5 words per line drawn from
+FOOD_VOCABULARY, ~30% of them with OCR-style typos, plus prices and
+punctuation) and runs menu_corrections.batch_correct three ways:
+
+  linear  — fuzzy_match_food scanning every vocabulary word of similar
+            length with SequenceMatcher (pre-Day-158, vocabulary sorted so
+            ties resolve the same way)
+  cold    — the length-bucketed index, memo empty
+  warm    — the same call again (every word memoized)
+
+Reports wall time per mode and whether the corrected lines are identical.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from difflib import SequenceMatcher
+from typing import Any, Dict, List, Optional
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, _ROOT)
+
+from storage import menu_corrections  # noqa: E402
+
+
+def _typo(rng: random.Random, word: str) -> str:
+    i = rng.randrange(len(word))
+    op = rng.random()
+    if op < 0.3:
+        return word[:i] + word[i + 1:]
+    if op < 0.7:
+        return word[:i] + rng.choice("l1iIoO0rnme") + word[i + 1:]
+    return word[:i] + rng.choice("abcdefghijklmnopqrstuvwxyz") + word[i:]
+
+
+def menu(lines: int, seed: int = 158) -> List[str]:
+    rng = random.Random(seed)
+    vocab = sorted(w for w in menu_corrections.FOOD_VOCABULARY if " " not in w)
+    out = []
+    for _ in range(lines):
+        words = []
+        for _ in range(rng.randint(2, 5)):
+            w = rng.choice(vocab)
+            if len(w) > 3 and rng.random() < 0.3:
+                w = _typo(rng, w)
+            words.append(w.capitalize() if rng.random() < 0.6 else w)
+        line = " ".join(words)
+        if rng.random() < 0.5:
+            line += f" - ${rng.randint(5, 40)}.{rng.choice(('00', '50', '95'))}"
+        out.append(line)
+    return out
+
+
+def _linear_match(text: str, threshold: float = 0.75) -> Optional[str]:
+    if not text or len(text) < 3:
+        return None
+    lower = text.lower()
+    if lower in menu_corrections.FOOD_VOCABULARY:
+        return None
+    best_match = None
+    best_ratio = threshold
+    for word in sorted(menu_corrections.FOOD_VOCABULARY):
+        if abs(len(word) - len(lower)) > 3:
+            continue
+        ratio = SequenceMatcher(None, lower, word).ratio()
+        if ratio > best_ratio:
+            best_ratio = ratio
+            best_match = word
+    return best_match
+
+
+def _timed(items: List[str]):
+    t0 = time.perf_counter()
+    out = menu_corrections.batch_correct(items)
+    return (time.perf_counter() - t0) * 1000.0, out
+
+
+def run(sizes: List[int], *, seed: int = 158) -> List[Dict[str, Any]]:
+    """One row per menu size."""
+    results = []
+    indexed = menu_corrections.fuzzy_match_food
+    for n in sizes:
+        items = menu(n, seed)
+        menu_corrections.fuzzy_match_food = _linear_match
+        try:
+            linear_ms, expected = _timed(items)
+        finally:
+            menu_corrections.fuzzy_match_food = indexed
+        menu_corrections._food_index = None
+        menu_corrections._fuzzy_memo.clear()
+        cold_ms, cold = _timed(items)
+        warm_ms, warm = _timed(items)
+        results.append({
+            "lines": n,
+            "words": sum(len(line.split()) for line in items),
+            "linear_ms": round(linear_ms, 1),
+            "cold_ms": round(cold_ms, 1),
+            "warm_ms": round(warm_ms, 1),
+            "changed_lines": sum(1 for _, _, changed in cold if changed),
+            "identical": cold == expected and warm == expected,
+        })
+    return results
+
+
+def format_report(rows: List[Dict[str, Any]]) -> str:
+    lines = [f"{'lines':>6} {'words':>6} {'linear ms':>10} {'cold ms':>8} "
+             f"{'warm ms':>8} {'changed':>8} identical"]
+    for r in rows:
+        lines.append(f"{r['lines']:>6} {r['words']:>6} {r['linear_ms']:>10} {r['cold_ms']:>8} "
+                     f"{r['warm_ms']:>8} {r['changed_lines']:>8} {r['identical']}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    ap.add_argument("--lines", type=int, nargs="+", default=[200, 1000, 3000])
+    ap.add_argument("--seed", type=int, default=158)
+    ap.add_argument("--json", action="store_true", help="print JSON instead of a table")
+    args = ap.parse_args(argv)
+
+    rows = run(args.lines, seed=args.seed)
+    print(json.dumps(rows, indent=2) if args.json else format_report(rows))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
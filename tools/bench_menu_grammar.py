@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""Benchmark menu line parsing: pre-Day-161 parser vs. trigger scans + parse cache.
+
+Usage:
+    python tools/bench_menu_grammar.py                 # fixture corpus, 5 runs
+    python tools/bench_menu_grammar.py --runs 20 --json
+
+Corpus: every line of the OCR text fixtures in fixtures/sample_menus (the
+same page read by several OCR passes, so lines repeat across files).  Each
+"run" classifies the whole corpus once with classify_menu_lines, the way
+a re-import or re-extraction of the same draft does.  Modes:
+
+  legacy      — no cache, typo / W/ rules applied line by line as before
+  uncached    — no cache, Day 161 trigger scans (cost of a never-seen line)
+  cached      — Day 161 parse cache, empty at the start of the first run
+
+plus the typo / W/ normalisation steps alone over the corpus, legacy vs.
+trigger-gated.  Reports wall time per mode and whether all modes produce
+identical results.
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, _ROOT)
+
+from storage.parsers import menu_grammar  # noqa: E402
+
+_FIXTURES = Path(_ROOT) / "fixtures" / "sample_menus"
+
+
+def corpus() -> List[str]:
+    lines: List[str] = []
+    for path in sorted(_FIXTURES.glob("*.txt")):
+        lines.extend(path.read_text(encoding="utf-8", errors="replace").splitlines())
+    return lines
+
+
+def _legacy_normalize_ocr_typos(text: str) -> str:
+    """The pre-Day-161 loop: every dict typo and every pattern, every line."""
+    for typo, fix in menu_grammar._OCR_TYPO_MAP.items():
+        if typo in text:
+            text = text.replace(typo, fix)
+    for pattern, replacement in menu_grammar._OCR_TYPO_PATTERNS:
+        text = pattern.sub(replacement, text)
+    return text
+
+
+def _legacy_normalize_w_slash(text: str) -> str:
+    text = re.sub(r'\bW/\s*', 'with ', text, flags=re.IGNORECASE)
+    text = re.sub(r'\bWI/\s*', 'with ', text, flags=re.IGNORECASE)
+    text = re.sub(r'\bWi\s+(?=[BCDFGHJKLMNPQRSTVWXYZbcdfghjklmnpqrstvwxyz])', 'with ', text)
+    return menu_grammar._WI_NOSPACE_RE.sub(menu_grammar._wi_nospace_repl, text)
+
+
+def _classify_runs(lines: List[str], runs: int) -> List[List[Dict[str, Any]]]:
+    return [[asdict(p) for p in menu_grammar.classify_menu_lines(lines)] for _ in range(runs)]
+
+
+def _timed(fn) -> tuple:
+    t0 = time.perf_counter()
+    out = fn()
+    return (time.perf_counter() - t0) * 1000.0, out
+
+
+def run(runs: int = 5, lines: Optional[List[str]] = None) -> Dict[str, Any]:
+    lines = corpus() if lines is None else lines
+    mg = menu_grammar
+    cached_parse = mg.parse_menu_line
+    typos, w_slash = mg._normalize_ocr_typos, mg._normalize_w_slash
+
+    mg.parse_menu_line = mg._parse_menu_line_uncached
+    try:
+        mg._normalize_ocr_typos, mg._normalize_w_slash = (
+            _legacy_normalize_ocr_typos, _legacy_normalize_w_slash)
+        try:
+            legacy_ms, expected = _timed(lambda: _classify_runs(lines, runs))
+        finally:
+            mg._normalize_ocr_typos, mg._normalize_w_slash = typos, w_slash
+        uncached_ms, uncached = _timed(lambda: _classify_runs(lines, runs))
+    finally:
+        mg.parse_menu_line = cached_parse
+
+    def normalise(typo_fn, w_fn):
+        return [[w_fn(typo_fn(line.strip())) for line in lines] for _ in range(runs)]
+
+    norm_legacy_ms, norm_expected = _timed(
+        lambda: normalise(_legacy_normalize_ocr_typos, _legacy_normalize_w_slash))
+    norm_ms, norm_got = _timed(lambda: normalise(typos, w_slash))
+
+    mg.clear_parse_cache()
+    cached_ms, cached = _timed(lambda: _classify_runs(lines, runs))
+    stats = mg.parse_cache_stats()
+
+    return {
+        "lines": len(lines),
+        "distinct_lines": len(set(lines)),
+        "runs": runs,
+        "legacy_ms": round(legacy_ms, 1),
+        "uncached_ms": round(uncached_ms, 1),
+        "cached_ms": round(cached_ms, 1),
+        "normalize_legacy_ms": round(norm_legacy_ms, 1),
+        "normalize_ms": round(norm_ms, 1),
+        "cache_hits": stats["hits"],
+        "cache_misses": stats["misses"],
+        "identical": expected == uncached == cached and norm_expected == norm_got,
+    }
+
+
+def format_report(row: Dict[str, Any]) -> str:
+    return "\n".join([
+        f"corpus: {row['lines']} lines ({row['distinct_lines']} distinct) x {row['runs']} runs",
+        f"  legacy    {row['legacy_ms']:>9} ms",
+        f"  uncached  {row['uncached_ms']:>9} ms",
+        f"  cached    {row['cached_ms']:>9} ms  "
+        f"({row['cache_hits']} hits / {row['cache_misses']} misses)",
+        f"  normalise {row['normalize_legacy_ms']:>9} ms legacy -> {row['normalize_ms']} ms",
+        f"  identical {row['identical']}",
+    ])
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--json", action="store_true", help="print JSON instead of a table")
+    args = ap.parse_args(argv)
+
+    row = run(args.runs)
+    print(json.dumps(row, indent=2) if args.json else format_report(row))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
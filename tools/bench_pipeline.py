@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""Benchmark the import pipeline end to end against recorded AI responses.
+
+Usage:
+    # 1. Record fixtures once (needs real keys):
+    python tools/bench_pipeline.py --mode record uploads/XXXX_pizza_real.pdf
+
+    # 2. Benchmark offline, as often as you like:
+    python tools/bench_pipeline.py uploads/XXXX_pizza_real.pdf
+    python tools/bench_pipeline.py --latency recorded --repeat 3 uploads/*.pdf
+
+Runs run_ocr_and_make_draft() for each menu with storage/ai_replay in the
+requested mode and prints per-stage timings (from the Day 99 pipeline
+tracker) split into AI wait vs. local work.  AI wait is the time at least
+one AI call was in flight (concurrent calls counted once); the summed
+per-call latency is reported next to it.  Replay uses zero simulated
+latency by default, so the numbers are the non-AI cost of the pipeline.
+Writes import jobs and drafts to the configured dev database.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Add project root to path
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, _ROOT)
+
+try:
+    from dotenv import load_dotenv
+    load_dotenv(os.path.join(_ROOT, ".env"))
+except ImportError:
+    pass
+
+from storage import ai_replay  # noqa: E402
+
+
+def ai_wait_seconds(calls: List[Dict[str, Any]]) -> float:
+    """Wall time covered by the union of the calls' [started, started + elapsed] spans.
+
+    Calls logged without a start time cannot be placed and are counted as
+    if they ran alone.
+    """
+    spans = []
+    loose = 0.0
+    for c in calls:
+        elapsed = c.get("elapsed_s", 0.0)
+        if c.get("started") is None:
+            loose += elapsed
+        else:
+            spans.append((c["started"], c["started"] + elapsed))
+    total = 0.0
+    cur_start = cur_end = None
+    for start, end in sorted(spans):
+        if cur_end is None or start > cur_end:
+            if cur_end is not None:
+                total += cur_end - cur_start
+            cur_start, cur_end = start, end
+        else:
+            cur_end = max(cur_end, end)
+    if cur_end is not None:
+        total += cur_end - cur_start
+    return total + loose
+
+
+def stage_timings(metrics: Optional[Dict[str, Any]], calls: List[Dict[str, Any]],
+                  wall_s: float) -> Dict[str, Any]:
+    """Fold a tracker summary + replay call log into one benchmark row."""
+    stages = []
+    for name, info in ((metrics or {}).get("steps") or {}).items():
+        stages.append({
+            "stage": name,
+            "status": info.get("status"),
+            "ms": int(info.get("duration_ms") or 0),
+            "items": info.get("items", 0),
+        })
+    ai_ms = int(round(ai_wait_seconds(calls) * 1000))
+    call_ms = int(round(sum(c.get("elapsed_s", 0.0) for c in calls) * 1000))
+    by_provider: Dict[str, int] = {}
+    for c in calls:
+        by_provider[c["provider"]] = by_provider.get(c["provider"], 0) + 1
+    wall_ms = int(round(wall_s * 1000))
+    return {
+        "wall_ms": wall_ms,
+        "ai_calls": len(calls),
+        "ai_calls_by_provider": by_provider,
+        "ai_wait_ms": ai_ms,
+        "ai_call_ms": call_ms,
+        "local_ms": max(0, wall_ms - ai_ms),
+        "stages": stages,
+        "bottleneck": (metrics or {}).get("bottleneck"),
+    }
+
+
+def format_report(results: List[Dict[str, Any]]) -> str:
+    lines: List[str] = []
+    for r in results:
+        lines.append(f"{r['menu']}  (run {r['run']})  status={r.get('status')}")
+        lines.append(f"  wall {r['wall_ms']}ms = AI {r['ai_wait_ms']}ms "
+                     f"({r['ai_calls']} calls, {r['ai_call_ms']}ms summed) "
+                     f"+ local {r['local_ms']}ms")
+        for st in r["stages"]:
+            lines.append(f"    {st['stage']:<34} {st['ms']:>8}ms  "
+                         f"{st['status'] or '':<8} items={st['items']}")
+        if r.get("bottleneck"):
+            lines.append(f"  bottleneck: {r['bottleneck']}")
+    return "\n".join(lines)
+
+
+def bench_menu(path: Path) -> Dict[str, Any]:
+    """Run one menu through run_ocr_and_make_draft and collect timings."""
+    from portal import app as portal_app
+    from storage import drafts as drafts_store
+
+    job_id = portal_app.create_import_job(path.name)
+    ai_replay.reset_call_log()
+    t0 = time.monotonic()
+    portal_app.run_ocr_and_make_draft(job_id, path)
+    wall = time.monotonic() - t0
+
+    job = portal_app.get_import_job(job_id)
+    metrics = None
+    draft_id = portal_app._get_or_create_draft_for_job(job_id, allow_create=False)
+    if draft_id:
+        dbg = drafts_store.load_ocr_debug(draft_id) or {}
+        metrics = dbg.get("pipeline_metrics")
+    row = stage_timings(metrics, ai_replay.call_log(), wall)
+    row.update({"menu": path.name, "job_id": job_id, "draft_id": draft_id,
+                "status": job["status"] if job else None})
+    return row
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    ap.add_argument("menus", nargs="+", help="menu image/PDF files")
+    ap.add_argument("--mode", choices=("replay", "record"), default="replay")
+    ap.add_argument("--fixtures", help="fixture directory (default fixtures/ai_replay)")
+    ap.add_argument("--latency", default="0",
+                    help='simulated AI latency: "recorded" or seconds (default 0)')
+    ap.add_argument("--scale", type=float, default=1.0, help="latency multiplier")
+    ap.add_argument("--repeat", type=int, default=1)
+    ap.add_argument("--json", action="store_true", help="print JSON instead of a table")
+    args = ap.parse_args(argv)
+
+    ai_replay.configure(mode=args.mode, latency=args.latency, scale=args.scale,
+                        fixtures_dir=args.fixtures)
+
+    results = []
+    for m in args.menus:
+        path = Path(m)
+        if not path.exists():
+            print(f"File not found: {path}", file=sys.stderr)
+            return 1
+        for run in range(1, args.repeat + 1):
+            row = bench_menu(path)
+            row["run"] = run
+            results.append(row)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(format_report(results))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""Benchmark per-group price statistics: pre-Day-164 per-group loops vs. price_stats.
+
+Usage:
+    python tools/bench_price_stats.py                       # 5000 rows, 5 runs
+    python tools/bench_price_stats.py --rows 20000 --groups 200 --json
+
+Input: a synthetic chain menu — `rows` priced items / variants spread over
+`groups` category or size-family groups, with a few decimal-shift and
+far-off prices mixed in.  Each run computes what the two consumers need:
+
+  cross_item       median + MAD per category, then the 3 x MAD outlier mask
+  price_integrity  median + quartiles per family, then the 4 x IQR mask
+
+legacy is the statistics.median-per-group code both modules used before
+Day 164; price_stats is one PriceColumns and its two masks (NumPy
+path when installed and rows >= NUMPY_MIN_ROWS).  Reports wall time per
+mode and whether both produce identical masks.
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, _ROOT)
+
+from storage import price_stats  # noqa: E402
+
+
+def make_rows(rows: int, groups: int, seed: int = 164) -> Tuple[List[int], List[int]]:
+    rng = random.Random(seed)
+    bases = [rng.randint(300, 3000) for _ in range(groups)]
+    keys: List[int] = []
+    prices: List[int] = []
+    for _ in range(rows):
+        g = rng.randrange(groups)
+        price = bases[g] + rng.randint(-150, 150)
+        r = rng.random()
+        if r < 0.01:
+            price *= 100          # decimal shift
+        elif r < 0.03:
+            price //= 4           # far below the band
+        keys.append(g)
+        prices.append(price)
+    return keys, prices
+
+
+def _legacy_masks(keys: List[int], prices: List[int]) -> Tuple[List[bool], List[bool]]:
+    groups: Dict[int, List[int]] = {}
+    for k, p in zip(keys, prices):
+        groups.setdefault(k, []).append(p)
+
+    mad_rule: Dict[int, Tuple[float, float]] = {}
+    iqr_rule: Dict[int, Tuple[float, float]] = {}
+    for k, ps in groups.items():
+        if len(ps) < 3:
+            continue
+        median = statistics.median(ps)
+        if median <= 0:
+            continue
+        mad = statistics.median([abs(p - median) for p in ps])
+        mad_rule[k] = (median, 3.0 * max(mad, median * 0.10))
+        ps_sorted = sorted(ps)
+        q1 = statistics.median(ps_sorted[: len(ps_sorted) // 2])
+        q3 = statistics.median(ps_sorted[len(ps_sorted) // 2:])
+        iqr_rule[k] = (median, max(q3 - q1, 1))
+
+    mad_mask = [k in mad_rule and abs(p - mad_rule[k][0]) > mad_rule[k][1]
+                for k, p in zip(keys, prices)]
+    iqr_mask = [k in iqr_rule and p > 0 and abs(p - iqr_rule[k][0]) / iqr_rule[k][1] > 4
+                for k, p in zip(keys, prices)]
+    return mad_mask, iqr_mask
+
+
+def _new_masks(keys: List[int], prices: List[int]) -> Tuple[List[bool], List[bool]]:
+    columns = price_stats.PriceColumns(keys, prices)
+    return columns.mad_outlier_mask(), columns.iqr_outlier_mask()
+
+
+def _timed(fn, runs: int) -> tuple:
+    t0 = time.perf_counter()
+    for _ in range(runs):
+        out = fn()
+    return (time.perf_counter() - t0) * 1000.0, out
+
+
+def run(runs: int = 5, rows: int = 5000, groups: int = 60) -> Dict[str, Any]:
+    keys, prices = make_rows(rows, groups)
+    legacy_ms, expected = _timed(lambda: _legacy_masks(keys, prices), runs)
+    new_ms, got = _timed(lambda: _new_masks(keys, prices), runs)
+    return {
+        "rows": rows,
+        "groups": groups,
+        "runs": runs,
+        "numpy": price_stats.np is not None and rows >= price_stats.NUMPY_MIN_ROWS,
+        "legacy_ms": round(legacy_ms, 1),
+        "price_stats_ms": round(new_ms, 1),
+        "mad_outliers": sum(got[0]),
+        "iqr_outliers": sum(got[1]),
+        "identical": expected == got,
+    }
+
+
+def format_report(row: Dict[str, Any]) -> str:
+    return "\n".join([
+        f"input: {row['rows']} rows in {row['groups']} groups x {row['runs']} runs "
+        f"(numpy path: {row['numpy']})",
+        f"  legacy      {row['legacy_ms']:>9} ms",
+        f"  price_stats {row['price_stats_ms']:>9} ms",
+        f"  outliers    {row['mad_outliers']} MAD / {row['iqr_outliers']} IQR",
+        f"  identical   {row['identical']}",
+    ])
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--rows", type=int, default=5000)
+    ap.add_argument("--groups", type=int, default=60)
+    ap.add_argument("--json", action="store_true", help="print JSON instead of a table")
+    args = ap.parse_args(argv)
+
+    row = run(args.runs, args.rows, args.groups)
+    print(json.dumps(row, indent=2) if args.json else format_report(row))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""Benchmark OCR name corrections for repair recommendations: per item vs. per-run token table.
+
+Usage:
+    python tools/bench_repair_corrections.py                      # 2000 items, 5 runs
+    python tools/bench_repair_corrections.py --items 10000 --distinct 300 --json
+
+Input: a menu of `items` low-confidence items whose names are drawn from
+`distinct` names built out of a small pool of clean and OCR-garbled words
+("Chlcken", "Sandwlch", "sssseeeccc"), so the same tokens recur across
+many items — as on a real scanned menu.  Each run starts with cold caches
+(fuzzy-match memo, garble verdicts) and computes the name-repair
+recommendations of Step 9.4:
+
+  legacy  pre-Day-166: garble check + correct_menu_item() per item
+  table   semantic_confidence: garble verdicts memoized, one
+          correction_table() over the distinct tokens of the flagged
+          names, names rebuilt from lookups
+
+Reports wall time per mode, distinct tokens corrected, and whether both
+produce identical recommendations.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, _ROOT)
+
+from storage import menu_corrections, semantic_confidence as sc  # noqa: E402
+
+_WORDS = [
+    "Chlcken", "Grllled", "Sandwlch", "Wlngs", "Pepperonl", "Salnon", "Burgr", "Spagetti",
+    "rnozzarella", "sssseeeccc", "nnnoooccc", "Chicken", "Pizza", "Garden", "Salad", "Wrap",
+    "Fresh", "Buffalo", "Cheese", "Special",
+]
+
+
+def make_items(items: int, distinct: int, seed: int = 166) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    names = []
+    for _ in range(distinct):
+        name = " ".join(rng.choice(_WORDS) for _ in range(rng.randint(2, 4)))
+        names.append(name.upper() if rng.random() < 0.15 else name)
+    return [
+        {
+            "name": rng.choice(names),
+            "semantic_tier": rng.choice(["medium", "low", "reject"]),
+            "semantic_confidence_details": {"name_quality_score": rng.choice([0.2, 0.3, 0.5])},
+        }
+        for _ in range(items)
+    ]
+
+
+def _cold() -> None:
+    menu_corrections._fuzzy_memo.clear()
+    sc._is_name_garbled.cache_clear()
+
+
+def _legacy_recs(items: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+    """_build_name_recommendations before Day 166: every item corrects its own name."""
+    is_garbled = sc._is_name_garbled.__wrapped__
+    out = []
+    for item in items:
+        priority = sc._TIER_TO_PRIORITY.get(item.get("semantic_tier", "reject"))
+        details = item.get("semantic_confidence_details") or {}
+        if priority is None or details.get("name_quality_score", 1.0) >= sc._REPAIR_THRESHOLD_NAME_QUALITY:
+            out.append([])
+            continue
+        name = sc._extract_name(item)
+        garbled = bool(name) and is_garbled(name)
+        if garbled or (name and len(name) >= sc._NAME_SHORT_THRESHOLD
+                       and not (name == name.upper() and len(name) > 2)):
+            corrected = menu_corrections.correct_menu_item(name)
+            corrected = corrected if corrected and corrected != name else None
+        else:
+            corrected = None
+        # Only the correction-dependent part of the recommendation matters here.
+        out.append([{"garbled": garbled, "proposed_fix": corrected}] if name else [])
+    return out
+
+
+def _table_recs(items: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+    candidates = sc._ocr_correction_candidates(sc._name_to_correct(item) for item in items)
+    out = []
+    for item in items:
+        priority = sc._TIER_TO_PRIORITY.get(item.get("semantic_tier", "reject"))
+        details = item.get("semantic_confidence_details") or {}
+        if priority is None or details.get("name_quality_score", 1.0) >= sc._REPAIR_THRESHOLD_NAME_QUALITY:
+            out.append([])
+            continue
+        name = sc._extract_name(item)
+        garbled = bool(name) and sc._is_name_garbled(name)
+        corrected = candidates.get(name) if sc._name_to_correct(item) else None
+        out.append([{"garbled": garbled, "proposed_fix": corrected}] if name else [])
+    return out
+
+
+def _timed(fn, items, runs: int) -> tuple:
+    elapsed = 0.0
+    for _ in range(runs):
+        _cold()
+        t0 = time.perf_counter()
+        out = fn(items)
+        elapsed += time.perf_counter() - t0
+    return elapsed * 1000.0, out
+
+
+def run(runs: int = 5, items: int = 2000, distinct: int = 120) -> Dict[str, Any]:
+    menu = make_items(items, distinct)
+    legacy_ms, expected = _timed(_legacy_recs, menu, runs)
+    table_ms, got = _timed(_table_recs, menu, runs)
+    flagged = [n for n in (sc._name_to_correct(item) for item in menu) if n]
+    tokens = menu_corrections.correction_table(dict.fromkeys(flagged))
+    return {
+        "items": items,
+        "distinct_names": len(set(item["name"] for item in menu)),
+        "distinct_tokens": len(tokens),
+        "runs": runs,
+        "legacy_ms": round(legacy_ms, 1),
+        "table_ms": round(table_ms, 1),
+        "corrections": sum(1 for recs in got for r in recs if r["proposed_fix"]),
+        "identical": expected == got,
+    }
+
+
+def format_report(row: Dict[str, Any]) -> str:
+    return "\n".join([
+        f"input: {row['items']} items, {row['distinct_names']} distinct names, "
+        f"{row['distinct_tokens']} distinct tokens x {row['runs']} runs",
+        f"  legacy      {row['legacy_ms']:>9} ms",
+        f"  table       {row['table_ms']:>9} ms",
+        f"  corrections {row['corrections']}",
+        f"  identical   {row['identical']}",
+    ])
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--items", type=int, default=2000)
+    ap.add_argument("--distinct", type=int, default=120)
+    ap.add_argument("--json", action="store_true", help="print JSON instead of a table")
+    args = ap.parse_args(argv)
+
+    row = run(args.runs, args.items, args.distinct)
+    print(json.dumps(row, indent=2) if args.json else format_report(row))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""Benchmark variant label classification: pre-Day-165 per-rule regexes vs. parsers/vocab.
+
+Usage:
+    python tools/bench_variant_vocab.py                     # 5000 labels, 5 runs
+    python tools/bench_variant_vocab.py --labels 20000 --json
+
+Input: `labels` variant labels drawn from the sizes, counts, flavors,
+styles and combo sides seen on pizza / wing menus ("Large", '14"', "6pc",
+"Honey BBQ", "Thin Crust", "W/Fries", ...), plus the size-mention lines a
+menu item carries ("Large Pepperoni 14in").  Modes:
+
+  legacy   variant_engine before Day 165: inch search, piece search,
+           token split + dict lookup, bare-number findall, then one
+           substring test per style / flavor token; menu lines scanned
+           separately for size words and numeric sizes
+  vocab    the shared bundle: one LABEL_SIZE_RE scan + trie searches
+           per label, one SIZE_MENTION_RE scan per line
+  cached   variant_engine._infer_variant_kind_and_normalized_size with
+           its label cache (the path enrichment runs; labels repeat)
+
+Reports microseconds per label / line and whether every mode agrees.
+"""
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, _ROOT)
+
+from storage import variant_engine  # noqa: E402
+from storage.parsers import vocab  # noqa: E402
+from storage.parsers.combo_vocab import is_combo_food  # noqa: E402
+from storage.parsers.size_vocab import NUMERIC_SIZE_RE, SIZE_WORD_MAP, SIZE_WORD_RE  # noqa: E402
+
+_SIZES = ["Small", "Medium", "Large", "XL", "Sm", "Lg", "Family Size", "Personal", "Half", "Whole"]
+_COUNTS = ['10"', '14"', "16 inch", "12in", "6pc", "12 pcs", "24ct", "10 piece", "16"]
+_FLAVORS = ["Hot", "Mild", "Honey BBQ", "Garlic Parm", "Lemon Pepper", "Buffalo", "Mango Habanero",
+            "Plain", "Cajun", "Teriyaki"]
+_STYLES = ["Thin Crust", "Deep Dish", "Bone-In", "Boneless", "Gluten Free", "Sicilian Style",
+           "Hand Tossed", "Grilled"]
+_COMBOS = ["W/Fries", "with Cheese", "W/ Onion Rings", "Fries", "with soda"]
+_OTHER = ["Regular Crust", "Pepperoni", "Combo #2", "Slice + Drink", "Cheese", "Veggie"]
+_NAMES = ["Pepperoni Pizza", "Cheese Pizza", "Buffalo Wings", "Garden Salad", "Sub", "Calzone"]
+
+_INCH_RE = re.compile(r'(\d{1,2})\s*(?:["]|in(?:ch(?:es)?)?)\b', re.IGNORECASE)
+_PIECE_RE = re.compile(r'(\d{1,2})\s*(?:pc|pcs|piece|pieces|ct)\b', re.IGNORECASE)
+
+
+def make_labels(n: int, seed: int = 165) -> List[str]:
+    rng = random.Random(seed)
+    pools = [_SIZES, _COUNTS, _FLAVORS, _STYLES, _COMBOS, _OTHER]
+    return [rng.choice(rng.choice(pools)) for _ in range(n)]
+
+
+def make_lines(n: int, seed: int = 165) -> List[str]:
+    rng = random.Random(seed)
+    return [
+        f"{rng.choice(_SIZES)} {rng.choice(_NAMES)} {rng.choice(_COUNTS)} {rng.randint(6, 30)}.99"
+        for _ in range(n)
+    ]
+
+
+def _legacy_classify(label: str) -> Tuple[str, Optional[str]]:
+    low = label.strip().lower()
+    if low:
+        m = _INCH_RE.search(low)
+        if m:
+            return "size", f"{int(m.group(1))}in"
+        m = _PIECE_RE.search(low)
+        if m:
+            return "size", f"{int(m.group(1))}pc"
+        for t in re.split(r"\s+", low):
+            mapped = SIZE_WORD_MAP.get(t.strip(".,;:-"))
+            if mapped:
+                return "size", mapped
+        for n in [int(n) for n in re.findall(r"\b(\d{1,2})\b", low)]:
+            if 6 <= n <= 30:
+                return "size", f"{n}in"
+
+    stripped = label.strip()
+    m = re.match(r'^(?:w/\s*|with\s+)(.+)$', stripped, re.IGNORECASE)
+    if (m and is_combo_food(m.group(1).strip())) or is_combo_food(stripped):
+        return "combo", None
+
+    low = label.lower()
+    for token in vocab.STYLE_TOKENS:
+        if token in low:
+            return "style", None
+    for token in vocab.FLAVOR_TOKENS:
+        if token in low:
+            return "flavor", None
+    return "other", None
+
+
+def _vocab_classify(label: str) -> Tuple[str, Optional[str]]:
+    size = vocab.label_size(label)
+    if size is not None:
+        return "size", size
+    if vocab.label_is_combo(label):
+        return "combo", None
+    return vocab.label_flavor_or_style(label) or "other", None
+
+
+def _legacy_mentions(line: str) -> Tuple[List[str], List[str]]:
+    return ([m.group(1) for m in SIZE_WORD_RE.finditer(line)],
+            [m.group(0) for m in NUMERIC_SIZE_RE.finditer(line)])
+
+
+def _vocab_mentions(line: str) -> Tuple[List[str], List[str]]:
+    words, numerics = vocab.scan_size_mentions(line)
+    return words, [full for full, _ in numerics]
+
+
+def _timed(fn, items: List[str], runs: int) -> tuple:
+    t0 = time.perf_counter()
+    for _ in range(runs):
+        out = [fn(x) for x in items]
+    return (time.perf_counter() - t0) * 1e6 / (runs * max(len(items), 1)), out
+
+
+def run(runs: int = 5, labels: int = 5000) -> Dict[str, Any]:
+    items = make_labels(labels)
+    lines = make_lines(max(labels // 5, 1))
+
+    cached = variant_engine._infer_variant_kind_and_normalized_size
+    cached.cache_clear()
+    legacy_us, expected = _timed(_legacy_classify, items, runs)
+    vocab_us, got = _timed(_vocab_classify, items, runs)
+    cached_us, got_cached = _timed(cached, items, runs)
+    legacy_line_us, expected_lines = _timed(_legacy_mentions, lines, runs)
+    vocab_line_us, got_lines = _timed(_vocab_mentions, lines, runs)
+    return {
+        "labels": labels,
+        "distinct_labels": len(set(items)),
+        "lines": len(lines),
+        "runs": runs,
+        "legacy_us_per_label": round(legacy_us, 2),
+        "vocab_us_per_label": round(vocab_us, 2),
+        "cached_us_per_label": round(cached_us, 2),
+        "legacy_us_per_line": round(legacy_line_us, 2),
+        "vocab_us_per_line": round(vocab_line_us, 2),
+        "identical": expected == got == got_cached and expected_lines == got_lines,
+    }
+
+
+def format_report(row: Dict[str, Any]) -> str:
+    return "\n".join([
+        f"input: {row['labels']} labels ({row['distinct_labels']} distinct), "
+        f"{row['lines']} menu lines x {row['runs']} runs",
+        f"  labels  legacy {row['legacy_us_per_label']:>7} us   vocab {row['vocab_us_per_label']:>7} us"
+        f"   cached {row['cached_us_per_label']:>7} us",
+        f"  lines   legacy {row['legacy_us_per_line']:>7} us   vocab {row['vocab_us_per_line']:>7} us",
+        f"  identical {row['identical']}",
+    ])
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--labels", type=int, default=5000)
+    ap.add_argument("--json", action="store_true", help="print JSON instead of a table")
+    args = ap.parse_args(argv)
+
+    row = run(args.runs, args.labels)
+    print(json.dumps(row, indent=2) if args.json else format_report(row))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())